@@ -94,3 +94,58 @@ EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
 LOGIN_URL = 'login'
 LOGIN_REDIRECT_URL = 'dashboard'
 LOGOUT_REDIRECT_URL = 'login'
+
+# OpenAlex API (DOI metadata lookups and bulk import enrichment)
+OPENALEX_API_URL = os.getenv('OPENALEX_API_URL', 'https://api.openalex.org')
+OPENALEX_MAILTO = os.getenv('OPENALEX_MAILTO', '')  # Joins OpenAlex's "polite pool"
+OPENALEX_BATCH_SIZE = int(os.getenv('OPENALEX_BATCH_SIZE', '50'))
+OPENALEX_MAX_WORKERS = int(os.getenv('OPENALEX_MAX_WORKERS', '4'))
+OPENALEX_MAX_RETRIES = int(os.getenv('OPENALEX_MAX_RETRIES', '3'))
+OPENALEX_RATE_LIMIT = float(os.getenv('OPENALEX_RATE_LIMIT', '10'))  # requests/second
+OPENALEX_TIMEOUT = int(os.getenv('OPENALEX_TIMEOUT', '10'))
+OPENALEX_CACHE_TTL = int(os.getenv('OPENALEX_CACHE_TTL', str(30 * 24 * 3600)))  # seconds
+OPENALEX_NEGATIVE_CACHE_TTL = int(os.getenv('OPENALEX_NEGATIVE_CACHE_TTL', str(24 * 3600)))  # unknown DOIs
+
+# Bulk imports: rows written per bulk_create batch
+IMPORT_CHUNK_SIZE = int(os.getenv('IMPORT_CHUNK_SIZE', '500'))
+
+# Background import jobs (see `manage.py run_import_worker`)
+# True queues uploads for `run_import_worker`, which must then be running (docker-compose starts one)
+IMPORT_JOBS_ASYNC = os.getenv('IMPORT_JOBS_ASYNC', 'False') == 'True'  # False: run in the request
+IMPORT_JOB_ROOT = os.getenv('IMPORT_JOB_ROOT', str(BASE_DIR / 'import_jobs'))  # not under MEDIA_ROOT
+IMPORT_JOB_PROGRESS_INTERVAL = float(os.getenv('IMPORT_JOB_PROGRESS_INTERVAL', '2'))  # seconds
+IMPORT_JOB_STALE_AFTER = int(os.getenv('IMPORT_JOB_STALE_AFTER', '900'))  # seconds without a heartbeat
+IMPORT_JOB_MAX_ERRORS = int(os.getenv('IMPORT_JOB_MAX_ERRORS', '500'))  # row errors kept per job
+
+# Output comparison title scoring: 'sequence' (difflib) or 'ngram' (trigram cosine)
+OUTPUT_TITLE_SIMILARITY = os.getenv('OUTPUT_TITLE_SIMILARITY', 'sequence')
+
+# Live duplicate lookup on the output form: seconds a candidate query is cached
+OUTPUT_LOOKUP_CACHE_TTL = int(os.getenv('OUTPUT_LOOKUP_CACHE_TTL', '60'))
+# ...and the shortest time between two lookups by one user (milliseconds)
+OUTPUT_LOOKUP_MIN_INTERVAL_MS = int(os.getenv('OUTPUT_LOOKUP_MIN_INTERVAL_MS', '200'))
+
+# Cache shared by every process (web workers and the import worker), so that
+# invalidating the dashboard snapshot reaches all of them. The database table
+# is created by `migrate`; set CACHE_BACKEND / CACHE_LOCATION to use Redis or
+# Memcached instead. 'local' is per process, for values that are never
+# invalidated and only expire (duplicate-lookup candidates).
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND', 'django.core.cache.backends.db.DatabaseCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', 'ref_manager_cache'),
+    },
+    'local': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+}
+
+# Dashboard statistics snapshot: longest time it is served from the cache (seconds);
+# saves and deletes through the ORM invalidate it immediately
+DASHBOARD_STATS_TTL = int(os.getenv('DASHBOARD_STATS_TTL', '3600'))
+
+# Risk dashboards: most quality-vs-risk points sent to the scatter plot (0: no limit)
+RISK_SCATTER_MAX_POINTS = int(os.getenv('RISK_SCATTER_MAX_POINTS', '2000'))
+
+# Output, colleague, task and request lists: rows per (keyset) page
+LIST_PAGE_SIZE = int(os.getenv('LIST_PAGE_SIZE', '50'))
@@ -265,5 +265,91 @@ class SubmissionOutputAdmin(admin.ModelAdmin):
     search_fields = ['submission__name', 'output__title']
 
 
+# OpenAlex metadata cache
+from .models import DOIMetadataCache
+
+@admin.register(DOIMetadataCache)
+class DOIMetadataCacheAdmin(admin.ModelAdmin):
+    list_display = ['doi', 'found', 'fetched_at', 'hit_count', 'miss_count']
+    list_filter = ['found']
+    search_fields = ['doi']
+    date_hierarchy = 'fetched_at'
+    readonly_fields = ['hit_count', 'miss_count']
+    
+    def changelist_view(self, request, extra_context=None):
+        extra_context = extra_context or {}
+        stats = DOIMetadataCache.get_stats()
+        self.message_user(
+            request,
+            f"{stats['entries']} cached DOIs ({stats['not_found']} not found); "
+            f"{stats['hits']} hits / {stats['misses']} misses ({stats['hit_rate']}% hit rate)"
+        )
+        return super().changelist_view(request, extra_context)
+
+
+# Background CSV imports
+from .models import ImportJob
+
+@admin.register(ImportJob)
+class ImportJobAdmin(admin.ModelAdmin):
+    list_display = ['id', 'kind', 'original_name', 'status', 'created_by', 'rows_processed',
+                    'created_count', 'skipped_count', 'error_count', 'created_at', 'finished_at']
+    list_filter = ['status', 'kind']
+    search_fields = ['original_name', 'created_by__username']
+    date_hierarchy = 'created_at'
+    readonly_fields = ['worker', 'rows_total', 'rows_processed', 'created_count', 'skipped_count',
+                       'error_count', 'result_messages', 'errors', 'created_at', 'started_at',
+                       'finished_at', 'updated_at']
+
+
+# Duplicate outputs found by manage.py find_duplicate_outputs
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.html import format_html
+from .models import DuplicateCandidate, DuplicateSweep
+
+@admin.register(DuplicateCandidate)
+class DuplicateCandidateAdmin(admin.ModelAdmin):
+    list_display = ['cluster_link', 'output_a', 'output_b', 'confidence_percent', 'reason_list',
+                    'status', 'found_at']
+    list_filter = ['status']
+    search_fields = ['output_a__title', 'output_b__title', 'output_a__doi', 'output_b__doi']
+    list_select_related = ['output_a', 'output_b']
+    raw_id_fields = ['output_a', 'output_b']
+    readonly_fields = ['cluster', 'confidence', 'reasons', 'reviewed_by', 'reviewed_at', 'found_at',
+                       'updated_at']
+    actions = ['mark_duplicate', 'mark_distinct']
+    
+    @admin.display(description='Cluster', ordering='cluster')
+    def cluster_link(self, obj):
+        url = reverse('admin:core_duplicatecandidate_changelist')
+        return format_html('<a href="{}?cluster={}">#{}</a>', url, obj.cluster, obj.cluster)
+    
+    @admin.display(description='Confidence', ordering='confidence')
+    def confidence_percent(self, obj):
+        return f"{obj.confidence:.0%}"
+    
+    @admin.display(description='Reasons')
+    def reason_list(self, obj):
+        return ', '.join(obj.reasons)
+    
+    def _review(self, request, queryset, status):
+        updated = queryset.update(status=status, reviewed_by=request.user, reviewed_at=timezone.now())
+        self.message_user(request, f"{updated} candidate pair(s) marked as {dict(DuplicateCandidate.STATUS_CHOICES)[status].lower()}")
+    
+    @admin.action(description='Mark as confirmed duplicates')
+    def mark_duplicate(self, request, queryset):
+        self._review(request, queryset, 'duplicate')
+    
+    @admin.action(description='Mark as not duplicates')
+    def mark_distinct(self, request, queryset):
+        self._review(request, queryset, 'distinct')
+
+
+@admin.register(DuplicateSweep)
+class DuplicateSweepAdmin(admin.ModelAdmin):
+    list_display = ['started_at', 'finished_at', 'incremental', 'outputs_compared', 'candidates_found']
+    list_filter = ['incremental']
+
 # Access Control Admin
 from .admin_access_control import *
@@ -1,7 +1,21 @@
 from django.apps import AppConfig
+from django.core.management import call_command
+from django.db.models.signals import post_migrate
+
+
+def create_cache_table(sender, using='default', **kwargs):
+    """Create the DatabaseCache table (settings.CACHES) on migrate; a no-op for other backends."""
+    call_command('createcachetable', database=using, verbosity=0)
 
 
 class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core'
     verbose_name = 'REF Core'
+
+    def ready(self):
+        from . import colleague_stats, dashboard_stats, output_search
+        dashboard_stats.connect_signals()
+        colleague_stats.connect_signals()
+        output_search.connect_signals()
+        post_migrate.connect(create_cache_table, sender=self, dispatch_uid='core-create-cache-table')
@@ -0,0 +1,184 @@
+"""
+Find colleagues that are probably the same person.
+
+Works from the name keys stored on ``Colleague`` (see
+``match_keys.colleague_name_keys``). Colleagues are blocked on the Soundex
+code of their folded surname, so "O'Brien" / "OBrien", "Müller" / "Muller"
+and most spelling variants share a block. Within a block the distinct
+surname keys are compared first, then only colleagues with similar
+surnames and the same first initial (or no initials) are paired and scored:
+
+- name similarity: surname keys (equal, or ``SequenceMatcher`` ratio)
+  times how well the initials agree;
+- shared outputs: outputs linked to both through ``OutputColleague``,
+  which happens when an import created a second record for an author;
+- temporary staff id: imports give auto-created colleagues their surname
+  as staff id (see ``ColleagueResolver.create``).
+
+Pairs scoring at least ``MIN_SCORE`` are joined into groups, ranked by
+their best pair.
+"""
+
+from collections import defaultdict
+from difflib import SequenceMatcher
+from itertools import combinations
+
+from django.db.models import Count
+
+from .match_keys import fold_name
+from .models import Colleague, OutputColleague
+
+NAME_WEIGHT = 0.6
+SHARED_OUTPUTS_WEIGHT = 0.25
+STAFF_ID_WEIGHT = 0.15
+
+MIN_SURNAME_SIMILARITY = 0.8
+MIN_SCORE = 0.5
+
+
+def initials_agreement(initials, other):
+    """1.0 for equal initials, less for compatible ones, 0.0 when they contradict."""
+    if not initials or not other:
+        return 0.85  # unknown first names
+    if initials == other:
+        return 1.0
+    if initials.startswith(other) or other.startswith(initials):
+        return 0.9
+    if initials[0] == other[0]:
+        return 0.7
+    return 0.0
+
+
+def is_temporary_staff_id(staff_id, surname_key):
+    """Whether ``staff_id`` is the surname-derived id given to auto-created colleagues."""
+    folded = fold_name(staff_id)
+    if not folded or not surname_key:
+        return False
+    # Temporary ids are the first 20 characters of the surname
+    return folded == surname_key or (len(staff_id) == 20 and surname_key.startswith(folded))
+
+
+def find_duplicate_groups(limit=None):
+    """
+    Return groups of probable duplicate colleagues, best first.
+
+    Each group is a dict with ``colleagues`` (Colleague objects with their
+    user and an ``output_count``), ``score`` (0-1, its best pair),
+    ``reasons`` and ``count``.
+    """
+    rows = Colleague.objects.exclude(surname_code='').values_list(
+        'pk', 'surname_key', 'surname_code', 'name_initials', 'staff_id'
+    )
+    # surname code -> surname key -> first initial -> members
+    blocks = defaultdict(lambda: defaultdict(lambda: defaultdict(list)))
+    for pk, surname_key, surname_code, initials, staff_id in rows.iterator(chunk_size=2000):
+        member = (pk, surname_key, initials, is_temporary_staff_id(staff_id, surname_key))
+        blocks[surname_code][surname_key][initials[:1]].append(member)
+
+    # Name-compatible pairs first; outputs are only loaded for those
+    candidates = []
+    for by_surname in blocks.values():
+        for key, other_key, surname_similarity in _similar_surnames(list(by_surname)):
+            for a, b in _initial_pairs(by_surname[key], by_surname[other_key], key == other_key):
+                agreement = initials_agreement(a[2], b[2])
+                if agreement:
+                    candidates.append((a, b, surname_similarity, agreement))
+    if not candidates:
+        return []
+
+    outputs = defaultdict(set)
+    involved = {member[0] for a, b, _, _ in candidates for member in (a, b)}
+    links = OutputColleague.objects.filter(colleague_id__in=involved).values_list('colleague_id', 'output_id')
+    for colleague_id, output_id in links.iterator(chunk_size=2000):
+        outputs[colleague_id].add(output_id)
+
+    pairs = []
+    for a, b, surname_similarity, agreement in candidates:
+        shared = len(outputs[a[0]] & outputs[b[0]])
+        temporary = a[3] or b[3]
+        score = (
+            NAME_WEIGHT * surname_similarity * agreement
+            + SHARED_OUTPUTS_WEIGHT * min(shared, 2) / 2
+            + STAFF_ID_WEIGHT * temporary
+        )
+        if score < MIN_SCORE:
+            continue
+        reasons = ['Same surname' if surname_similarity == 1.0
+                   else f'Surname {int(surname_similarity * 100)}% similar']
+        if agreement == 1.0 and a[2]:
+            reasons.append('Same initials')
+        elif agreement > 0.85:
+            reasons.append('Compatible initials')
+        if shared:
+            reasons.append(f'{shared} shared output(s)')
+        if temporary:
+            reasons.append('Auto-created staff ID')
+        pairs.append((a[0], b[0], score, reasons))
+
+    return _build_groups(pairs, limit)
+
+
+def _similar_surnames(keys):
+    """Yield (key, other_key, similarity) for equal and similar surname keys of a block."""
+    for key in keys:
+        yield key, key, 1.0
+    for key, other_key in combinations(keys, 2):
+        matcher = SequenceMatcher(None, key, other_key)
+        if (matcher.real_quick_ratio() >= MIN_SURNAME_SIMILARITY
+                and matcher.quick_ratio() >= MIN_SURNAME_SIMILARITY):
+            similarity = matcher.ratio()
+            if similarity >= MIN_SURNAME_SIMILARITY:
+                yield key, other_key, similarity
+
+
+def _initial_pairs(by_initial, other_by_initial, same_surname):
+    """Pairs of members with the same first initial, or where either has none."""
+    for initial, members in by_initial.items():
+        for other_initial, others in other_by_initial.items():
+            if initial and other_initial and initial != other_initial:
+                continue
+            if same_surname:
+                if initial == other_initial:
+                    yield from combinations(members, 2)
+                elif initial < other_initial:  # each mixed pair once
+                    yield from ((a, b) for a in members for b in others)
+            else:
+                yield from ((a, b) for a in members for b in others)
+
+
+def _build_groups(pairs, limit):
+    parent = {}
+
+    def find(pk):
+        while parent.get(pk, pk) != pk:
+            pk = parent[pk]
+        return pk
+
+    for a, b, _, _ in pairs:
+        root_a, root_b = find(a), find(b)
+        if root_a != root_b:
+            parent[max(root_a, root_b)] = min(root_a, root_b)
+
+    groups = defaultdict(lambda: {'ids': set(), 'score': 0.0, 'reasons': set()})
+    for a, b, score, reasons in pairs:
+        group = groups[find(a)]
+        group['ids'].update((a, b))
+        group['score'] = max(group['score'], score)
+        group['reasons'].update(reasons)
+
+    ranked = sorted(groups.values(), key=lambda g: (-g['score'], -len(g['ids']), min(g['ids'])))
+    if limit is not None:
+        ranked = ranked[:limit]
+
+    colleagues = Colleague.objects.filter(
+        pk__in={pk for group in ranked for pk in group['ids']}
+    ).select_related('user').annotate(output_count=Count('outputs')).in_bulk()
+    return [
+        {
+            'colleagues': sorted((colleagues[pk] for pk in group['ids']), key=lambda c: c.pk),
+            'score': group['score'],
+            'reasons': sorted(group['reasons']),
+            'count': len(group['ids']),
+        }
+        for group in ranked
+    ]
@@ -0,0 +1,140 @@
+"""
+In-memory author name -> Colleague resolution for imports.
+
+``find_or_create_colleague`` used to run up to two queries per author and,
+when creating a colleague, probe ``User.objects.filter(username=...)``
+until a free username turned up. ``ColleagueResolver`` loads every
+colleague once into dictionaries keyed by staff id, surname and
+surname + initials, keeps the set of taken usernames, and registers the
+colleagues it creates, so an import resolves each author with dict lookups.
+
+Same-surname matches are resolved deterministically: an exact
+surname + initials match wins, then surname + first initial, then the
+lowest-id colleague with that surname.
+"""
+
+import logging
+import re
+import unicodedata
+from collections import defaultdict
+
+from django.contrib.auth.models import User
+
+from .match_keys import name_initials as initials
+from .models import Colleague
+
+logger = logging.getLogger(__name__)
+
+
+def split_author_name(author_name):
+    """Split 'SURNAME, First Names' or 'First Names Surname' into (surname, first_names)."""
+    parts = author_name.split(',')
+    if len(parts) >= 2:
+        return parts[0].strip(), parts[1].strip()
+
+    name_parts = author_name.split()
+    if not name_parts:
+        return '', ''
+    return name_parts[-1], ' '.join(name_parts[:-1])
+
+
+def normalize_surname(surname):
+    """Casefold and strip accents and trailing punctuation: 'Müller.' -> 'muller'."""
+    folded = unicodedata.normalize('NFKD', surname or '')
+    folded = ''.join(c for c in folded if not unicodedata.combining(c))
+    return folded.casefold().strip().strip('.,')
+
+
+class ColleagueResolver:
+    """Resolve author names to colleagues without a query per author; build once per import."""
+
+    EMAIL_DOMAIN = 'york.ac.uk'
+
+    def __init__(self):
+        self.by_staff_id = {}
+        self.by_surname = defaultdict(list)
+        self.by_surname_initials = defaultdict(list)
+        self.by_surname_initial = defaultdict(list)
+        self.usernames = set(User.objects.values_list('username', flat=True))
+        self.created = []
+
+        colleagues = Colleague.objects.select_related('user').order_by('pk')
+        for colleague in colleagues:
+            self._register(colleague)
+
+    def _register(self, colleague):
+        self.by_staff_id[colleague.staff_id.lower()] = colleague
+
+        surname = normalize_surname(colleague.user.last_name)
+        if not surname:
+            return
+        self.by_surname[surname].append(colleague)
+        colleague_initials = initials(colleague.user.first_name)
+        if colleague_initials:
+            self.by_surname_initials[(surname, colleague_initials)].append(colleague)
+            self.by_surname_initial[(surname, colleague_initials[0])].append(colleague)
+
+    def find(self, author_name):
+        """Return the best matching colleague for ``author_name``, or None."""
+        last_name, first_names = split_author_name(author_name or '')
+        if not last_name:
+            return None
+
+        # Temporary staff ids are derived from the surname, see create()
+        colleague = self.by_staff_id.get(last_name[:20].lower())
+        if colleague:
+            return colleague
+
+        surname = normalize_surname(last_name)
+        author_initials = initials(first_names)
+        if author_initials:
+            for key, index in (((surname, author_initials), self.by_surname_initials),
+                               ((surname, author_initials[0]), self.by_surname_initial)):
+                if index.get(key):
+                    return index[key][0]
+
+        matches = self.by_surname.get(surname)
+        return matches[0] if matches else None
+
+    def create(self, author_name, set_as_coauthor=False):
+        """Create a User and Colleague for ``author_name`` and add them to the maps."""
+        last_name, first_names = split_author_name(author_name or '')
+        if not last_name:
+            return None
+
+        first_part = first_names.split()[0].lower() if first_names else 'user'
+        base_username = re.sub(r'[^a-z0-9._-]', '', f"{first_part}.{last_name.lower()}")[:30]
+        username = base_username
+        counter = 1
+        while username in self.usernames:
+            username = f"{base_username}{counter}"
+            counter += 1
+
+        user = User.objects.create_user(
+            username=username,
+            email=f"{username}@{self.EMAIL_DOMAIN}",
+            first_name=first_names[:150],
+            last_name=last_name[:150],
+            password=User.objects.make_random_password(),
+        )
+        self.usernames.add(username)
+
+        colleague = Colleague.objects.create(
+            user=user,
+            staff_id=last_name[:20].upper(),  # Temporary staff_id until HR data is imported
+            title='Dr',
+            fte=1.0,
+            contract_type='permanent',
+            employment_status='current',
+            colleague_category='coauthor' if set_as_coauthor else 'independent',
+        )
+        self._register(colleague)
+        self.created.append(colleague)
+        return colleague
+
+    def resolve(self, author_name, create_if_missing=True, set_as_coauthor=False):
+        """find(), falling back to create() when allowed."""
+        colleague = self.find(author_name)
+        if colleague or not create_if_missing:
+            return colleague
+        return self.create(author_name, set_as_coauthor=set_as_coauthor)
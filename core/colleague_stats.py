@@ -0,0 +1,157 @@
+"""
+Per-colleague output statistics, stored in ``ColleagueStats``.
+
+The colleague list, detail and report pages show output counts and REF
+completion for every colleague. Instead of counting on every request
+(a query per colleague through ``Colleague.submitted_outputs_count``),
+the numbers are stored one row per colleague and read with a join.
+
+Rows are recomputed for the colleagues a change touches:
+
+- post_save/post_delete on ``Output`` (both the old and new colleague
+  when an output is reassigned), ``OutputColleague`` and ``Colleague``
+  (its FTE sets the required outputs), see ``connect_signals``;
+- explicitly by the bulk writers, which bypass those signals.
+
+``manage.py rebuild_colleague_stats`` recomputes every row, e.g. after
+``QuerySet.update()`` writes.
+"""
+
+from django.db.models import Count, Q
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.utils import timezone
+
+from .models import Colleague, ColleagueStats, Output, OutputColleague
+from .quality_scores import score_band_lookups
+
+STAT_FIELDS = [
+    'total_outputs', 'approved_outputs', 'four_star_outputs', 'three_star_outputs',
+    'linked_outputs', 'required_outputs', 'completion_percentage',
+]
+
+
+def compute_stats(colleague_ids=None, apps=None):
+    """
+    Colleague id -> ColleagueStats field values, for ``colleague_ids``
+    (default all). Pass a migration's ``apps`` to query historical models.
+    """
+    models = {
+        name: apps.get_model('core', name) if apps else model
+        for name, model in [('Colleague', Colleague), ('Output', Output), ('OutputColleague', OutputColleague)]
+    }
+    colleagues = models['Colleague'].objects.order_by()
+    outputs = models['Output'].objects.order_by()
+    links = models['OutputColleague'].objects.order_by()
+    if colleague_ids is not None:
+        colleagues = colleagues.filter(pk__in=colleague_ids)
+        outputs = outputs.filter(colleague_id__in=colleague_ids)
+        links = links.filter(colleague_id__in=colleague_ids)
+
+    counts = {
+        row['colleague_id']: row
+        for row in outputs.values('colleague_id').annotate(
+            total_outputs=Count('pk'),
+            approved_outputs=Count('pk', filter=Q(status='approved')),
+            four_star_outputs=Count('pk', filter=Q(**score_band_lookups('quality_score_average', '4*'))),
+            three_star_outputs=Count('pk', filter=Q(**score_band_lookups('quality_score_average', '3*'))),
+        )
+    }
+    linked = dict(
+        links.values('colleague_id').annotate(count=Count('output_id', distinct=True))
+        .values_list('colleague_id', 'count')
+    )
+
+    stats = {}
+    for pk, fte in colleagues.values_list('pk', 'fte'):
+        row = counts.get(pk, {})
+        required = Colleague.required_outputs_for(fte)
+        approved = row.get('approved_outputs', 0)
+        stats[pk] = {
+            'total_outputs': row.get('total_outputs', 0),
+            'approved_outputs': approved,
+            'four_star_outputs': row.get('four_star_outputs', 0),
+            'three_star_outputs': row.get('three_star_outputs', 0),
+            'linked_outputs': linked.get(pk, 0),
+            'required_outputs': required,
+            'completion_percentage': Colleague.completion_percentage_for(approved, required),
+        }
+    return stats
+
+
+def refresh_colleague_stats(colleague_ids=None, create=True):
+    """
+    Recompute the stored statistics of ``colleague_ids`` (default every
+    colleague), writing only rows that changed. Missing rows are created
+    unless ``create`` is False, as while a colleague is being deleted.
+    Returns the number of rows written.
+    """
+    if colleague_ids is not None:
+        colleague_ids = {pk for pk in colleague_ids if pk is not None}
+        if not colleague_ids:
+            return 0
+    stats = compute_stats(colleague_ids)
+    existing = ColleagueStats.objects.all()
+    if colleague_ids is not None:
+        existing = existing.filter(pk__in=colleague_ids)
+    existing = existing.in_bulk()
+
+    now = timezone.now()
+    to_update, to_create = [], []
+    for pk, values in stats.items():
+        row = existing.get(pk)
+        if row is None:
+            if create:
+                to_create.append(ColleagueStats(colleague_id=pk, **values))
+        elif any(getattr(row, field) != value for field, value in values.items()):
+            for field, value in values.items():
+                setattr(row, field, value)
+            row.updated_at = now
+            to_update.append(row)
+    ColleagueStats.objects.bulk_update(to_update, STAT_FIELDS + ['updated_at'], batch_size=500)
+    ColleagueStats.objects.bulk_create(to_create, batch_size=500)
+    return len(to_update) + len(to_create)
+
+
+def _remember_output_colleague(sender, instance, raw=False, update_fields=None, **kwargs):
+    """Note the colleague a saved output had, so reassigning it refreshes both."""
+    instance._stats_previous_colleague_id = None
+    if raw or instance._state.adding or instance.pk is None:
+        return
+    if update_fields is not None and 'colleague' not in update_fields:
+        return
+    instance._stats_previous_colleague_id = (
+        Output.objects.filter(pk=instance.pk).values_list('colleague_id', flat=True).first()
+    )
+
+
+def _output_saved(sender, instance, raw=False, **kwargs):
+    if not raw:
+        refresh_colleague_stats(
+            [instance.colleague_id, getattr(instance, '_stats_previous_colleague_id', None)]
+        )
+
+
+def _colleague_saved(sender, instance, raw=False, **kwargs):
+    if not raw:
+        refresh_colleague_stats([instance.pk])
+
+
+def _colleague_link_saved(sender, instance, raw=False, **kwargs):
+    if not raw:
+        refresh_colleague_stats([instance.colleague_id])
+
+
+def _colleague_output_deleted(sender, instance, **kwargs):
+    # The colleague may be deleted in the same cascade: only update rows
+    refresh_colleague_stats([instance.colleague_id], create=False)
+
+
+def connect_signals():
+    """Keep the statistics current as outputs, links and colleagues change."""
+    pre_save.connect(_remember_output_colleague, sender=Output, dispatch_uid='colleague-stats-output-pre-save')
+    post_save.connect(_output_saved, sender=Output, dispatch_uid='colleague-stats-output-save')
+    post_delete.connect(_colleague_output_deleted, sender=Output, dispatch_uid='colleague-stats-output-delete')
+    post_save.connect(_colleague_link_saved, sender=OutputColleague, dispatch_uid='colleague-stats-link-save')
+    post_delete.connect(_colleague_output_deleted, sender=OutputColleague,
+                        dispatch_uid='colleague-stats-link-delete')
+    post_save.connect(_colleague_saved, sender=Colleague, dispatch_uid='colleague-stats-colleague-save')
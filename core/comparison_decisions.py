@@ -0,0 +1,231 @@
+"""
+Apply review decisions for a comparison run in bulk.
+
+``process_comparison_decisions`` used to create or merge one output per
+decision, resolving each first author with its own queries. ``apply_decisions``
+works in passes instead, inside one transaction:
+
+1. build the new outputs and validate them with ``ImportWriter.check``;
+2. resolve the first author of every row that passed with one
+   ``ColleagueResolver`` (creating colleagues that do not exist yet), so
+   a rejected row never leaves an auto-created user behind;
+3. insert the new outputs through ``ImportWriter`` (``bulk_create``);
+4. load every merge target with one query, fill in what it is missing and
+   write them with one ``bulk_update`` over the fields that changed;
+5. record the decisions on the ``ComparisonResult`` rows.
+
+Rows that cannot be applied (no colleague, no publication year, a missing
+merge target) are reported in ``errors`` and left undecided.
+"""
+
+import logging
+import re
+import time
+
+from django.db import transaction
+from django.utils import timezone
+
+from .colleague_resolver import ColleagueResolver
+from .dashboard_stats import invalidate_dashboard_stats
+from .import_writer import ImportWriter
+from .match_keys import output_match_keys, parse_authors
+from .models import ComparisonResult, Output
+
+logger = logging.getLogger(__name__)
+
+IMPORT_ACTIONS = ('import', 'import_as_new')
+
+# Fields copied onto a merge target when it has none of its own
+MERGE_FIELDS = ('doi', 'url', 'publication_venue')
+
+
+def publication_type_code(value):
+    """Map a spreadsheet type ('Article', 'Book chapter', 'C') to an Output type code."""
+    value = (value or '').strip()
+    codes = dict(Output.PUBLICATION_TYPES)
+    if value.upper() in codes:
+        return value.upper()
+    for code, label in Output.PUBLICATION_TYPES:
+        if value and value.lower() in label.lower():
+            return code
+    return 'H'
+
+
+def publication_year(data):
+    """The row's publication year, from ``publication_year`` or the date, or None."""
+    value = data.get('publication_year') or data.get('publication_date')
+    match = re.search(r'\b(\d{4})\b', str(value or ''))
+    return int(match.group(1)) if match else None
+
+
+def apply_decisions(run, decisions):
+    """
+    Apply ``decisions`` ({result_id: {action, merge_into_id, edits}}) to the
+    undecided results of ``run``.
+
+    Returns a dict with per-action counts (imported, merged, skipped), the
+    row-level ``errors`` and per-phase ``timings`` in seconds.
+    """
+    started = time.perf_counter()
+    timings = {}
+    errors = []
+    decided = {'import': [], 'merge': [], 'skip': []}
+
+    results = run.results.filter(pk__in=[int(pk) for pk in decisions], decision='')
+    imports, merges = [], []
+    for result in results:
+        decision = decisions.get(str(result.pk)) or decisions.get(result.pk) or {}
+        action = decision.get('action')
+        data = dict(result.spreadsheet_row)
+        data.update(decision.get('edits') or {})
+        if action in IMPORT_ACTIONS:
+            imports.append((result, data))
+        elif action == 'merge':
+            merges.append((result, data, decision.get('merge_into_id') or result.best_match_id))
+        elif action == 'skip':
+            decided['skip'].append(result)
+
+    with transaction.atomic():
+        with ImportWriter() as writer:
+            phase = time.perf_counter()
+            checked = _build_outputs(imports, writer)
+            timings['validate'] = time.perf_counter() - phase
+
+            phase = time.perf_counter()
+            colleagues = _resolve_colleagues(checked)
+            timings['colleagues'] = time.perf_counter() - phase
+
+            phase = time.perf_counter()
+            decided['import'] = _create_outputs(checked, colleagues, writer)
+            timings['create'] = time.perf_counter() - phase
+        errors.extend(writer.errors)
+
+        phase = time.perf_counter()
+        decided['merge'] = _merge_outputs(merges, errors)
+        timings['merge'] = time.perf_counter() - phase
+
+        now = timezone.now()
+        for action, action_results in decided.items():
+            for result in action_results:
+                result.decision = action
+                result.decided_at = now
+        ComparisonResult.objects.bulk_update(
+            [result for action_results in decided.values() for result in action_results],
+            ['decision', 'decided_at'],
+            batch_size=500,
+        )
+
+    timings['total'] = time.perf_counter() - started
+    return {
+        'imported': len(decided['import']),
+        'merged': len(decided['merge']),
+        'skipped': len(decided['skip']),
+        'errors': errors,
+        'timings': {phase: round(seconds, 3) for phase, seconds in timings.items()},
+    }
+
+
+def _first_author(data):
+    authors = parse_authors(data.get('all_authors', ''))
+    return authors[0] if authors else ''
+
+
+def _build_outputs(imports, writer):
+    """
+    Unsaved outputs for the rows being imported, as (result, data, output)
+    for the rows that pass validation; the colleague is set later.
+    """
+    checked = []
+    for result, data in imports:
+        year = publication_year(data)
+        if year is None:
+            writer.error(result.row_number, 'No publication year.')
+            continue
+        output = Output(
+            title=data.get('title', ''),
+            publication_type=publication_type_code(data.get('publication_type')),
+            publication_year=year,
+            publication_venue=data.get('publication_venue', ''),
+            doi=data.get('doi', ''),
+            url=data.get('url', ''),
+            all_authors=data.get('all_authors', ''),
+            author_position=1,
+        )
+        if writer.check(result.row_number, output, require_colleague=False):
+            checked.append((result, data, output))
+    return checked
+
+
+def _resolve_colleagues(checked):
+    """First author name -> Colleague (or None) for every row that passed validation."""
+    if not checked:
+        return {}
+    resolver = ColleagueResolver()
+    colleagues = {}
+    for _, data, _ in checked:
+        author = _first_author(data)
+        if author in colleagues:
+            continue
+        try:
+            # A failed User/Colleague insert is rolled back on its own
+            with transaction.atomic():
+                colleagues[author] = resolver.resolve(author) if author else None
+        except Exception as e:
+            logger.warning("Error creating colleague for %s: %s", author, e)
+            colleagues[author] = None
+    return colleagues
+
+
+def _create_outputs(checked, colleagues, writer):
+    """Insert the checked rows; returns the results whose output was created."""
+    queued = []
+    for result, data, output in checked:
+        colleague = colleagues.get(_first_author(data))
+        if colleague is None:
+            writer.error(result.row_number, 'No colleague found for the first author.')
+            continue
+        output.colleague = colleague
+        output.uoa = colleague.unit_of_assessment
+        if writer.add(result.row_number, output):
+            queued.append((result, output))
+    writer.flush()
+    return [result for result, output in queued if output.pk]
+
+
+def _merge_outputs(merges, errors):
+    """Fill empty fields of the merge targets; returns the results that were merged."""
+    if not merges:
+        return []
+    targets = Output.objects.in_bulk({target_id for _, _, target_id in merges if target_id})
+    note = f"\n[Merged from spreadsheet import on {timezone.now().date()}]"
+
+    merged = []
+    changed_outputs = {}
+    changed_fields = set()
+    for result, data, target_id in merges:
+        output = targets.get(target_id)
+        if output is None:
+            errors.append(f"Row {result.row_number}: Output to merge into no longer exists.")
+            continue
+        for field in MERGE_FIELDS:
+            value = (data.get(field) or '').strip()
+            if value and not getattr(output, field):
+                setattr(output, field, value[:output._meta.get_field(field).max_length])
+                changed_fields.add(field)
+        output.internal_notes = (output.internal_notes or '') + note
+        changed_fields.add('internal_notes')
+        changed_outputs[output.pk] = output
+        merged.append(result)
+
+    if changed_outputs:
+        outputs = list(changed_outputs.values())
+        if 'doi' in changed_fields:
+            for output in outputs:
+                output.update_match_keys()
+            changed_fields.update(output_match_keys('', '', ''))
+        now = timezone.now()
+        for output in outputs:
+            output.updated_at = now
+        Output.objects.bulk_update(outputs, sorted(changed_fields | {'updated_at'}), batch_size=500)
+        invalidate_dashboard_stats()
+    return merged
@@ -0,0 +1,123 @@
+"""
+Streaming CSV reader for uploaded files.
+
+The importers used to do ``csv_file.read().decode(...)`` followed by
+``list(csv.DictReader(...))``, which holds the upload in memory as bytes,
+as text and as a list of dicts. ``iter_csv_rows`` reads the file chunk by
+chunk through an incremental decoder and yields one row at a time, so
+memory stays flat however large the export is.
+
+The encoding is decided once per file: ``detect_encoding`` reads it
+through a UTF-8 decoder first (a pass that keeps nothing), and a file
+with any invalid byte is decoded as Latin-1, which accepts any byte, from
+the start. Every row of a file is decoded the same way, wherever the
+chunk boundaries fall. A UTF-8 byte order mark is dropped in either case,
+so it never ends up glued to the first column name as "ï»¿".
+"""
+
+import codecs
+import csv
+from itertools import islice
+
+CHUNK_SIZE = 64 * 1024
+
+FALLBACK_ENCODING = 'latin-1'
+
+
+def detect_encoding(file, chunk_size=CHUNK_SIZE):
+    """
+    'utf-8-sig' if the whole of ``file`` is valid UTF-8, else
+    FALLBACK_ENCODING. Leaves the file rewound.
+    """
+    file.seek(0)
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    try:
+        for chunk in _iter_chunks(file, chunk_size):
+            if isinstance(chunk, str):
+                break
+            decoder.decode(chunk)
+        else:
+            decoder.decode(b'', final=True)
+    except UnicodeDecodeError:
+        return FALLBACK_ENCODING
+    finally:
+        file.seek(0)
+    return 'utf-8-sig'
+
+
+def iter_text_lines(file, encoding=None, chunk_size=CHUNK_SIZE):
+    """
+    Yield decoded lines (newline kept) from a binary file or UploadedFile,
+    in ``encoding`` or else the one ``detect_encoding`` picks.
+    """
+    if encoding is None:
+        encoding = detect_encoding(file, chunk_size)
+    elif hasattr(file, 'seek'):
+        file.seek(0)
+
+    decoder = codecs.getincrementaldecoder(encoding)()
+    # utf-8-sig drops the BOM itself; other encodings decode it to text
+    bom = codecs.BOM_UTF8.decode(encoding, 'ignore')
+    at_start = True
+    buffer = ''
+    for chunk in _iter_chunks(file, chunk_size):
+        buffer += chunk if isinstance(chunk, str) else decoder.decode(chunk)
+        if at_start:
+            if len(buffer) < len(bom) and bom.startswith(buffer):
+                continue
+            at_start = False
+            if bom and buffer.startswith(bom):
+                buffer = buffer[len(bom):]
+        end = buffer.rfind('\n')
+        if end == -1:
+            continue
+        complete, buffer = buffer[:end + 1], buffer[end + 1:]
+        yield from _split_lines(complete)
+
+    buffer += decoder.decode(b'', final=True)
+    if buffer:
+        yield buffer
+
+
+def iter_csv_rows(file, chunk_size=CHUNK_SIZE):
+    """Yield each data row of an uploaded CSV file as a dict (like csv.DictReader)."""
+    return csv.DictReader(iter_text_lines(file, chunk_size=chunk_size))
+
+
+def read_csv_header(file):
+    """Return the column names of an uploaded CSV file, leaving it rewound."""
+    fieldnames = csv.DictReader(iter_text_lines(file)).fieldnames or []
+    file.seek(0)
+    return fieldnames
+
+
+def iter_blocks(iterable, size):
+    """Yield lists of up to ``size`` consecutive items (``itertools.batched`` before 3.12)."""
+    iterator = iter(iterable)
+    while True:
+        block = list(islice(iterator, size))
+        if not block:
+            return
+        yield block
+
+
+def _iter_chunks(file, chunk_size):
+    if hasattr(file, 'chunks'):
+        yield from file.chunks(chunk_size)
+        return
+    while True:
+        chunk = file.read(chunk_size)
+        if not chunk:
+            return
+        yield chunk
+
+
+def _split_lines(text):
+    """Split on '\\n' only; ``str.splitlines`` also breaks on '\\r', '\\x1c', etc."""
+    start = 0
+    while True:
+        end = text.find('\n', start)
+        if end == -1:
+            return
+        yield text[start:end + 1]
+        start = end + 1
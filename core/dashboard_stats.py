@@ -0,0 +1,127 @@
+"""
+Dashboard statistics, computed with a few aggregate queries and cached.
+
+``get_dashboard_stats`` returns the numbers (and recent outputs) shown on
+the dashboard. They are computed with one conditional-aggregate query per
+model, ``Count(..., filter=Q(...))``, with the quality ratings bucketed on
+the stored ``quality_score_average``, and stored in the cache as a single
+snapshot. The dashboard therefore costs one cache read until something
+changes. The cache must be shared by all processes (``CACHES`` in
+settings) for an invalidation in one worker to reach the others.
+
+The snapshot is dropped by post_save/post_delete on the models it counts
+(see ``connect_signals``, called from ``CoreConfig.ready``) and by the
+bulk writers, which bypass those signals. Overdue counts depend on the
+date, so a snapshot from an earlier day is recomputed, and
+``DASHBOARD_STATS_TTL`` bounds how stale it can get through other
+``QuerySet.update()`` writes.
+"""
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Q
+from django.db.models.signals import post_delete, post_save
+from django.utils import timezone
+
+from .models import (
+    Colleague, CriticalFriend, CriticalFriendAssignment, InternalPanelAssignment,
+    InternalPanelMember, Output, Request,
+)
+from .quality_scores import score_band_lookups
+
+CACHE_KEY = 'dashboard:stats'
+
+ACTIVE_CF_STATUSES = ['assigned', 'accepted', 'in-progress']
+ACTIVE_PANEL_STATUSES = ['assigned', 'in_progress']
+
+# Quality buckets of the average rating: (key, star band)
+QUALITY_BUCKETS = [
+    ('four_star', '4*'),
+    ('three_star', '3*'),
+    ('two_star', '2*'),
+    ('one_star', '1*'),
+    ('unclassified', 'U'),
+]
+
+
+def get_dashboard_stats():
+    """The dashboard snapshot, from the cache when it is still current."""
+    today = timezone.localdate()
+    stats = cache.get(CACHE_KEY)
+    if stats is None or stats['date'] != today:
+        stats = compute_dashboard_stats(today)
+        cache.set(CACHE_KEY, stats, getattr(settings, 'DASHBOARD_STATS_TTL', 3600))
+    return stats
+
+
+def invalidate_dashboard_stats(**kwargs):
+    """Drop the cached snapshot; usable as a signal receiver."""
+    cache.delete(CACHE_KEY)
+
+
+def compute_dashboard_stats(today=None):
+    """Compute the dashboard snapshot from the database."""
+    today = today or timezone.localdate()
+
+    outputs = Output.objects.aggregate(
+        total_outputs=Count('pk'),
+        approved_outputs=Count('pk', filter=Q(status='approved')),
+        outputs_in_review=Count('pk', filter=Q(status__in=['internal-review', 'external-review'])),
+        **{
+            key: Count('pk', filter=Q(
+                status='approved', **score_band_lookups('quality_score_average', star)
+            ))
+            for key, star in QUALITY_BUCKETS
+        },
+    )
+    quality_distribution = {key: outputs.pop(key) for key, _ in QUALITY_BUCKETS}
+    total_rated_outputs = sum(quality_distribution.values())
+    quality_percentages = {
+        key: round(count / total_rated_outputs * 100, 1) if total_rated_outputs else 0
+        for key, count in quality_distribution.items()
+    }
+
+    requests = Request.objects.aggregate(
+        pending_requests=Count('pk', filter=Q(status='pending')),
+        overdue_requests=Count(
+            'pk', filter=Q(status__in=['pending', 'in-progress'], deadline__lt=today)
+        ),
+    )
+    cf_assignments = CriticalFriendAssignment.objects.aggregate(
+        active_cf_assignments=Count('pk', filter=Q(status__in=ACTIVE_CF_STATUSES)),
+        overdue_assignments=Count(
+            'pk', filter=Q(status__in=ACTIVE_CF_STATUSES, due_date__lt=today)
+        ),
+    )
+    panel_assignments = InternalPanelAssignment.objects.aggregate(
+        active_panel_assignments=Count('pk', filter=Q(status__in=ACTIVE_PANEL_STATUSES)),
+        overdue_panel_assignments=Count(
+            'pk', filter=Q(status__in=ACTIVE_PANEL_STATUSES, review_date__lt=today)
+        ),
+    )
+
+    return {
+        'date': today,
+        'total_colleagues': Colleague.objects.filter(is_returnable=True).count(),
+        **outputs,
+        **requests,
+        **cf_assignments,
+        **panel_assignments,
+        'critical_friends_count': CriticalFriend.objects.count(),
+        'internal_panel_count': InternalPanelMember.objects.filter(is_active=True).count(),
+        'quality_distribution': quality_distribution,
+        'quality_percentages': quality_percentages,
+        'recent_outputs': list(
+            Output.objects.select_related('colleague__user').order_by('-updated_at')[:5]
+        ),
+    }
+
+
+def connect_signals():
+    """Invalidate the snapshot whenever a model it counts is saved or deleted."""
+    for model in (Output, Colleague, CriticalFriend, CriticalFriendAssignment,
+                  InternalPanelMember, InternalPanelAssignment, Request):
+        post_save.connect(invalidate_dashboard_stats, sender=model,
+                          dispatch_uid=f'dashboard-stats-save-{model.__name__}')
+        post_delete.connect(invalidate_dashboard_stats, sender=model,
+                            dispatch_uid=f'dashboard-stats-delete-{model.__name__}')
@@ -177,33 +177,19 @@ def output_view_permission(view_func):
         if not request.user.is_authenticated:
             return redirect('login')
         
-        # Get output
+        profile = getattr(request.user, 'ref_profile', None)
+        if not profile:
+            return HttpResponseForbidden("No user profile found")
+        
+        # Get output, annotated with the user's permissions on it
         pk = kwargs.get('pk') or kwargs.get('output_pk')
         try:
-            output = Output.objects.get(pk=pk)
+            output = Output.objects.with_permissions(profile).get(pk=pk)
         except Output.DoesNotExist:
             from django.http import Http404
             raise Http404("Output not found")
         
-        profile = getattr(request.user, 'ref_profile', None)
-        if not profile:
-            return HttpResponseForbidden("No user profile found")
-        
-        # Check view permission
-        can_view = False
-        
-        if profile.can_view_all_outputs:
-            can_view = True
-        elif hasattr(output, 'owner') and output.owner == profile:
-            can_view = True
-        elif hasattr(output, 'colleague') and output.colleague:
-            if hasattr(output.colleague, 'user_profile') and output.colleague.user_profile == profile:
-                can_view = True
-        elif profile.is_panel_member:
-            if hasattr(output, 'panel_assignments'):
-                can_view = output.panel_assignments.filter(panel_member=profile).exists()
-        
-        if not can_view:
+        if not output.can_view:
             return HttpResponseForbidden("You don't have permission to view this output")
         
         # Add output to request for convenience
@@ -230,31 +216,19 @@ def output_edit_permission(view_func):
         if not request.user.is_authenticated:
             return redirect('login')
         
-        # Get output
+        profile = getattr(request.user, 'ref_profile', None)
+        if not profile:
+            return HttpResponseForbidden("No user profile found")
+        
+        # Get output, annotated with the user's permissions on it
         pk = kwargs.get('pk') or kwargs.get('output_pk')
         try:
-            output = Output.objects.get(pk=pk)
+            output = Output.objects.with_permissions(profile).get(pk=pk)
         except Output.DoesNotExist:
             from django.http import Http404
             raise Http404("Output not found")
         
-        profile = getattr(request.user, 'ref_profile', None)
-        if not profile:
-            return HttpResponseForbidden("No user profile found")
-        
-        # Check edit permission
-        can_edit = False
-        
-        if profile.can_edit_any_output:
-            can_edit = True
-        elif profile.can_create_outputs:
-            if hasattr(output, 'owner') and output.owner == profile:
-                can_edit = True
-            elif hasattr(output, 'colleague') and output.colleague:
-                if hasattr(output.colleague, 'user_profile') and output.colleague.user_profile == profile:
-                    can_edit = True
-        
-        if not can_edit:
+        if not output.can_edit:
             return HttpResponseForbidden("You don't have permission to edit this output")
         
         # Add output to request for convenience
@@ -325,28 +299,19 @@ def can_rate_output(view_func):
         if not request.user.is_authenticated:
             return redirect('login')
         
-        # Get output
+        profile = getattr(request.user, 'ref_profile', None)
+        if not profile:
+            return HttpResponseForbidden("No user profile found")
+        
+        # Get output, annotated with the user's permissions on it
         pk = kwargs.get('pk') or kwargs.get('output_pk')
         try:
-            output = Output.objects.get(pk=pk)
+            output = Output.objects.with_permissions(profile).get(pk=pk)
         except Output.DoesNotExist:
             from django.http import Http404
             raise Http404("Output not found")
         
-        profile = getattr(request.user, 'ref_profile', None)
-        if not profile:
-            return HttpResponseForbidden("No user profile found")
-        
-        # Check rating permission
-        can_rate = False
-        
-        if profile.is_admin:
-            can_rate = True
-        elif profile.can_rate_assigned and profile.is_panel_member:
-            if hasattr(output, 'panel_assignments'):
-                can_rate = output.panel_assignments.filter(panel_member=profile).exists()
-        
-        if not can_rate:
+        if not output.can_rate:
             return HttpResponseForbidden("You are not assigned to rate this output")
         
         # Add output to request for convenience
@@ -0,0 +1,113 @@
+"""
+Find duplicate outputs already in the database.
+
+``OutputComparator`` indexes every output by its stored match keys and
+scores the blocked candidate pairs (see ``find_internal_duplicates``);
+``sweep`` stores what it finds as ``DuplicateCandidate`` rows and groups
+linked pairs into clusters for review in the admin.
+
+A full sweep checks every output. An incremental sweep only checks the
+outputs created or updated since the last sweep started, against all
+outputs, which keeps nightly runs cheap. Either way, pairs a reviewer has
+already confirmed or dismissed are kept as they are, and pending pairs
+that no longer match (among the outputs checked) are removed.
+"""
+
+import logging
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import DuplicateCandidate, DuplicateSweep, Output
+from .output_comparison import OutputComparator
+
+logger = logging.getLogger(__name__)
+
+
+def sweep(incremental=False, title_backend=None):
+    """Run a duplicate sweep and return its ``DuplicateSweep`` record."""
+    started_at = timezone.now()
+    last = DuplicateSweep.objects.filter(finished_at__isnull=False).first() if incremental else None
+
+    changed = None
+    if last is not None:
+        changed = set(
+            Output.objects.filter(updated_at__gte=last.started_at).values_list('pk', flat=True)
+        )
+
+    if changed is None or changed:
+        comparator = OutputComparator(Output.objects.all(), title_backend=title_backend)
+        pairs = comparator.find_internal_duplicates(changed)
+        compared = len(changed) if changed is not None else Output.objects.count()
+    else:
+        pairs, compared = {}, 0
+
+    with transaction.atomic():
+        _store_candidates(pairs, changed)
+        _assign_clusters()
+        record = DuplicateSweep.objects.create(
+            started_at=started_at,
+            finished_at=timezone.now(),
+            incremental=last is not None,
+            outputs_compared=compared,
+            candidates_found=len(pairs),
+        )
+    logger.info("Duplicate sweep compared %d outputs, found %d candidate pairs", compared, len(pairs))
+    return record
+
+
+def _store_candidates(pairs, changed):
+    """Upsert ``pairs`` and drop stale pending candidates among the outputs checked."""
+    existing = DuplicateCandidate.objects.all()
+    if changed is not None:
+        existing = existing.filter(Q(output_a__in=changed) | Q(output_b__in=changed))
+    existing = {(c.output_a_id, c.output_b_id): c for c in existing}
+
+    stale = [c.pk for key, c in existing.items() if key not in pairs and c.status == 'pending']
+    if stale:
+        DuplicateCandidate.objects.filter(pk__in=stale).delete()
+
+    now = timezone.now()
+    to_update, to_create = [], []
+    for (a, b), (confidence, reasons) in pairs.items():
+        # Every pair found involves a checked output, so it is in ``existing`` if stored
+        candidate = existing.get((a, b))
+        if candidate is not None:
+            candidate.confidence = confidence
+            candidate.reasons = reasons
+            candidate.updated_at = now
+            to_update.append(candidate)
+        else:
+            to_create.append(DuplicateCandidate(
+                output_a_id=a, output_b_id=b, cluster=a, confidence=confidence, reasons=reasons,
+            ))
+    DuplicateCandidate.objects.bulk_update(to_update, ['confidence', 'reasons', 'updated_at'], batch_size=500)
+    DuplicateCandidate.objects.bulk_create(to_create, batch_size=500)
+
+
+def _assign_clusters():
+    """Set each candidate's cluster to the lowest output id linked to it (dismissed pairs don't link)."""
+    rows = list(DuplicateCandidate.objects.values_list('pk', 'output_a', 'output_b', 'status', 'cluster'))
+    parent = {}
+
+    def find(pk):
+        root = pk
+        while parent.get(root, root) != root:
+            root = parent[root]
+        while pk != root:
+            parent[pk], pk = root, parent.get(pk, pk)
+        return root
+
+    for _, a, b, status, _ in rows:
+        if status != 'distinct':
+            root_a, root_b = find(a), find(b)
+            if root_a != root_b:
+                parent[max(root_a, root_b)] = min(root_a, root_b)
+
+    changed = []
+    for pk, a, b, status, cluster in rows:
+        root = find(a) if status != 'distinct' else a
+        if root != cluster:
+            changed.append(DuplicateCandidate(pk=pk, cluster=root))
+    DuplicateCandidate.objects.bulk_update(changed, ['cluster'], batch_size=500)
@@ -1,195 +1,334 @@
 import openpyxl
+from django.conf import settings
 from django.contrib.auth.models import User
 from django.db import transaction
+from django.utils import timezone
 from decimal import Decimal
 from datetime import datetime
-from .models import Colleague, Output, CriticalFriend
+from .models import Colleague, Output, CriticalFriend, UserProfile
+from .csv_stream import iter_blocks
+from .import_writer import ImportWriter
+from .colleague_stats import refresh_colleague_stats
+from .dashboard_stats import invalidate_dashboard_stats
+from .match_keys import colleague_name_keys
 
 
 class ExcelImporter:
-    """Import data from Excel files into the database"""
-    
-    def __init__(self):
+    """Import data from Excel files into the database
+
+    Workbooks are opened read-only and streamed with ``values_only`` rows, so
+    no cell objects are built. Rows are handled in batches: the staff IDs,
+    usernames and emails a batch refers to are fetched with one query each,
+    and only new or changed records are written, with bulk_create/bulk_update.
+    """
+
+    COLLEAGUE_FIELDS = ['user_id', 'title', 'fte', 'contract_type', 'unit_of_assessment', 'is_returnable']
+    CRITICAL_FRIEND_FIELDS = ['name', 'institution', 'expertise_areas', 'research_interests']
+
+    def __init__(self, batch_size=None):
         self.errors = []
         self.warnings = []
         self.imported_count = 0
-    
+        self.created_count = 0
+        self.updated_count = 0
+        self.unchanged_count = 0
+        self.batch_size = batch_size or getattr(settings, 'IMPORT_CHUNK_SIZE', 500)
+
+    def _iter_rows(self, file_path):
+        """Yield (row_num, {header: value}) for the active sheet without loading it whole"""
+        workbook = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+        try:
+            rows = workbook.active.iter_rows(values_only=True)
+            headers = next(rows, None) or ()
+            for row_num, row in enumerate(rows, start=2):
+                yield row_num, dict(zip(headers, row))
+        finally:
+            # Read-only workbooks keep the file open until closed
+            workbook.close()
+
+    def _iter_batches(self, file_path):
+        return iter_blocks(self._iter_rows(file_path), self.batch_size)
+
+    def _apply_changes(self, instance, values):
+        """Set ``values`` on ``instance``; return the names of fields that changed"""
+        changed = [field for field, value in values.items() if getattr(instance, field) != value]
+        for field in changed:
+            setattr(instance, field, values[field])
+        return changed
+
     def import_colleagues(self, file_path):
         """Import colleagues from Excel file"""
         try:
-            workbook = openpyxl.load_workbook(file_path)
-            sheet = workbook.active
-            
-            headers = [cell.value for cell in sheet[1]]
-            
             with transaction.atomic():
-                for row_num, row in enumerate(sheet.iter_rows(min_row=2, values_only=True), start=2):
-                    try:
-                        data = dict(zip(headers, row))
-                        
-                        if not data.get('Staff ID'):
-                            continue
-                        
-                        username = data.get('Email', '').split('@')[0] or f"user_{data['Staff ID']}"
-                        user, created = User.objects.get_or_create(
-                            username=username,
-                            defaults={
-                                'first_name': data.get('First Name', ''),
-                                'last_name': data.get('Last Name', ''),
-                                'email': data.get('Email', ''),
-                            }
-                        )
-                        
-                        fte = float(data.get('FTE', 1.0))
-                        if fte < 0.1 or fte > 1.0:
-                            self.warnings.append(f"Row {row_num}: FTE out of range, using 1.0")
-                            fte = 1.0
-                        
-                        contract_map = {
-                            'permanent': 'permanent',
-                            'fixed-term': 'fixed-term',
-                            'fixed term': 'fixed-term',
-                            'research': 'research',
-                        }
-                        contract_type = contract_map.get(
-                            str(data.get('Contract Type', 'permanent')).lower(),
-                            'permanent'
-                        )
-                        
-                        returnable_str = str(data.get('Is Returnable', 'yes')).lower()
-                        is_returnable = returnable_str in ['yes', 'y', 'true', '1']
-                        
-                        colleague, created = Colleague.objects.update_or_create(
-                            staff_id=data['Staff ID'],
-                            defaults={
-                                'user': user,
-                                'title': data.get('Title', ''),
-                                'fte': Decimal(str(fte)),
-                                'contract_type': contract_type,
-                                'unit_of_assessment': data.get('Unit of Assessment', 'Unknown'),
-                                'is_returnable': is_returnable,
-                            }
-                        )
-                        
-                        self.imported_count += 1
-                        
-                    except Exception as e:
-                        self.errors.append(f"Row {row_num}: {str(e)}")
-            
+                for batch in self._iter_batches(file_path):
+                    self._import_colleague_batch(batch)
             return True
             
         except Exception as e:
             self.errors.append(f"Error reading file: {str(e)}")
             return False
+
+    def _parse_colleague_row(self, row_num, data):
+        email = str(data.get('Email') or '').strip()
+        staff_id = str(data['Staff ID']).strip()
+        
+        fte = float(data.get('FTE') or 1.0)
+        if fte < 0.1 or fte > 1.0:
+            self.warnings.append(f"Row {row_num}: FTE out of range, using 1.0")
+            fte = 1.0
+        
+        contract_map = {
+            'permanent': 'permanent',
+            'fixed-term': 'fixed-term',
+            'fixed term': 'fixed-term',
+            'research': 'research',
+        }
+        contract_type = contract_map.get(
+            str(data.get('Contract Type') or 'permanent').lower(),
+            'permanent'
+        )
+        
+        returnable_str = str(data.get('Is Returnable') or 'yes').lower()
+        is_returnable = returnable_str in ['yes', 'y', 'true', '1']
+        
+        user_values = {
+            'username': email.split('@')[0] or f"user_{staff_id}",
+            'first_name': data.get('First Name') or '',
+            'last_name': data.get('Last Name') or '',
+            'email': email,
+        }
+        colleague_values = {
+            'title': data.get('Title') or '',
+            'fte': Decimal(str(fte)),
+            'contract_type': contract_type,
+            'unit_of_assessment': data.get('Unit of Assessment') or 'Unknown',
+            'is_returnable': is_returnable,
+        }
+        return staff_id, user_values, colleague_values
+
+    def _import_colleague_batch(self, batch):
+        records = []
+        for row_num, data in batch:
+            try:
+                if not data.get('Staff ID'):
+                    continue
+                records.append((row_num, *self._parse_colleague_row(row_num, data)))
+            except Exception as e:
+                self.errors.append(f"Row {row_num}: {str(e)}")
+        if not records:
+            return
+        
+        # One query each for the users and colleagues this batch refers to
+        usernames = {user_values['username'] for _, _, user_values, _ in records}
+        users = {user.username: user for user in User.objects.filter(username__in=usernames)}
+        colleagues = {
+            colleague.staff_id: colleague
+            for colleague in Colleague.objects.filter(staff_id__in={staff_id for _, staff_id, _, _ in records})
+        }
+        
+        # Users are only created, never updated, as with get_or_create before
+        new_users = {}
+        for _, _, user_values, _ in records:
+            if user_values['username'] not in users:
+                new_users.setdefault(user_values['username'], User(**user_values))
+        if new_users:
+            User.objects.bulk_create(new_users.values())
+            # bulk_create skips the post_save signal that creates profiles
+            UserProfile.objects.bulk_create([UserProfile(user=user) for user in new_users.values()])
+            users.update(new_users)
+        
+        # Colleague.user is one-to-one: know who already owns each user
+        staff_id_by_user = dict(
+            Colleague.objects.filter(user__in=[users[name] for name in usernames])
+            .values_list('user_id', 'staff_id')
+        )
+        
+        to_create = []
+        to_update = {}
+        updated_fields = set()
+        now = timezone.now()
+        for row_num, staff_id, user_values, colleague_values in records:
+            user = users[user_values['username']]
+            owner = staff_id_by_user.get(user.pk)
+            if owner is not None and owner != staff_id:
+                self.errors.append(
+                    f"Row {row_num}: user '{user.username}' is already linked to staff ID '{owner}'"
+                )
+                continue
+            
+            values = {
+                'user_id': user.pk,
+                **colleague_values,
+                **colleague_name_keys(user.first_name, user.last_name),
+            }
+            colleague = colleagues.get(staff_id)
+            if colleague is None:
+                colleague = Colleague(staff_id=staff_id, **values)
+                colleagues[staff_id] = colleague
+                to_create.append(colleague)
+                self.created_count += 1
+            else:
+                previous_user_id = colleague.user_id
+                changed = self._apply_changes(colleague, values)
+                if changed and colleague.pk is not None:
+                    colleague.updated_at = now
+                    to_update[staff_id] = colleague
+                    updated_fields.update(changed)
+                    self.updated_count += 1
+                elif not changed:
+                    self.unchanged_count += 1
+                if previous_user_id != colleague.user_id:
+                    staff_id_by_user.pop(previous_user_id, None)
+            staff_id_by_user[user.pk] = staff_id
+            self.imported_count += 1
+        
+        if to_update:
+            Colleague.objects.bulk_update(
+                to_update.values(), sorted(updated_fields) + ['updated_at'], batch_size=self.batch_size
+            )
+        if to_create:
+            Colleague.objects.bulk_create(to_create, batch_size=self.batch_size)
+        invalidate_dashboard_stats()
+        refresh_colleague_stats(
+            [colleague.pk for colleague in to_update.values()] + [colleague.pk for colleague in to_create]
+        )
     
     def import_outputs(self, file_path):
         """Import outputs from Excel file"""
         try:
-            workbook = openpyxl.load_workbook(file_path)
-            sheet = workbook.active
-            
-            headers = [cell.value for cell in sheet[1]]
-            
-            with transaction.atomic():
-                for row_num, row in enumerate(sheet.iter_rows(min_row=2, values_only=True), start=2):
-                    try:
-                        data = dict(zip(headers, row))
-                        
-                        if not data.get('Staff ID') or not data.get('Title'):
-                            continue
-                        
-                        try:
-                            colleague = Colleague.objects.get(staff_id=data['Staff ID'])
-                        except Colleague.DoesNotExist:
-                            self.errors.append(f"Row {row_num}: Staff ID '{data['Staff ID']}' not found")
-                            continue
-                        
-                        pub_date = self._parse_date(data.get('Publication Date'))
-                        if not pub_date:
-                            pub_date = datetime.now().date()
-                            self.warnings.append(f"Row {row_num}: Invalid date, using today")
-                        
-                        quality_map = {
-                            '4*': '4*', '4': '4*',
-                            '3*': '3*', '3': '3*',
-                            '2*': '2*', '2': '2*',
-                            '1*': '1*', '1': '1*',
-                            'u': 'U', 'unclassified': 'U',
-                        }
-                        quality_rating = quality_map.get(
-                            str(data.get('Quality Rating', 'U')).lower(),
-                            'U'
-                        )
-                        
-                        is_open_access = str(data.get('Is Open Access', 'no')).lower() in ['yes', 'y', 'true', '1']
-                        is_double_weighted = str(data.get('Is Double Weighted', 'no')).lower() in ['yes', 'y', 'true', '1']
-                        is_interdisciplinary = str(data.get('Is Interdisciplinary', 'no')).lower() in ['yes', 'y', 'true', '1']
-                        
-                        output = Output.objects.create(
-                            colleague=colleague,
-                            title=data['Title'],
-                            all_authors=data.get('All Authors', ''),
-                            author_position=int(data.get('Author Position', 1)),
-                            publication_type=data.get('Publication Type', 'A'),
-                            publication_date=pub_date,
-                            publication_venue=data.get('Publication Venue', ''),
-                            quality_rating=quality_rating,
-                            doi=data.get('DOI', ''),
-                            url=data.get('URL', ''),
-                            abstract=data.get('Abstract', ''),
-                            is_open_access=is_open_access,
-                            is_double_weighted=is_double_weighted,
-                            is_interdisciplinary=is_interdisciplinary,
-                            status='draft',
-                        )
-                        
-                        self.imported_count += 1
-                        
-                    except Exception as e:
-                        self.errors.append(f"Row {row_num}: {str(e)}")
+            with ImportWriter(chunk_size=self.batch_size) as writer:
+                for batch in self._iter_batches(file_path):
+                    staff_ids = {str(data['Staff ID']).strip() for _, data in batch if data.get('Staff ID')}
+                    colleagues = {
+                        colleague.staff_id: colleague
+                        for colleague in Colleague.objects.filter(staff_id__in=staff_ids)
+                    }
+                    for row_num, data in batch:
+                        self._import_output_row(row_num, data, colleagues, writer)
             
+            self.imported_count += writer.created
+            self.created_count += writer.created
+            self.errors.extend(writer.errors)
             return True
             
         except Exception as e:
             self.errors.append(f"Error reading file: {str(e)}")
             return False
+
+    def _import_output_row(self, row_num, data, colleagues, writer):
+        try:
+            if not data.get('Staff ID') or not data.get('Title'):
+                return
+            
+            colleague = colleagues.get(str(data['Staff ID']).strip())
+            if colleague is None:
+                self.errors.append(f"Row {row_num}: Staff ID '{data['Staff ID']}' not found")
+                return
+            
+            pub_date = self._parse_date(data.get('Publication Date'))
+            if not pub_date:
+                pub_date = datetime.now().date()
+                self.warnings.append(f"Row {row_num}: Invalid date, using today")
+            
+            quality_map = {
+                '4*': '4*', '4': '4*',
+                '3*': '3*', '3': '3*',
+                '2*': '2*', '2': '2*',
+                '1*': '1*', '1': '1*',
+                'u': 'U', 'unclassified': 'U',
+            }
+            quality_rating = quality_map.get(
+                str(data.get('Quality Rating') or 'U').lower(),
+                'U'
+            )
+            
+            is_open_access = str(data.get('Is Open Access') or 'no').lower() in ['yes', 'y', 'true', '1']
+            is_double_weighted = str(data.get('Is Double Weighted') or 'no').lower() in ['yes', 'y', 'true', '1']
+            is_interdisciplinary = str(data.get('Is Interdisciplinary') or 'no').lower() in ['yes', 'y', 'true', '1']
+            
+            output = Output(
+                colleague=colleague,
+                title=data['Title'],
+                all_authors=data.get('All Authors') or '',
+                author_position=int(data.get('Author Position') or 1),
+                publication_type=data.get('Publication Type') or 'A',
+                publication_year=pub_date.year,
+                publication_venue=data.get('Publication Venue') or '',
+                uoa=colleague.unit_of_assessment,
+                quality_rating=quality_rating,
+                doi=data.get('DOI') or '',
+                url=data.get('URL') or '',
+                abstract=data.get('Abstract') or '',
+                is_open_access=is_open_access,
+                is_double_weighted=is_double_weighted,
+                is_interdisciplinary=is_interdisciplinary,
+                status='draft',
+            )
+            writer.add(row_num, output)
+            
+        except Exception as e:
+            self.errors.append(f"Row {row_num}: {str(e)}")
     
     def import_critical_friends(self, file_path):
         """Import critical friends from Excel file"""
         try:
-            workbook = openpyxl.load_workbook(file_path)
-            sheet = workbook.active
-            
-            headers = [cell.value for cell in sheet[1]]
-            
             with transaction.atomic():
-                for row_num, row in enumerate(sheet.iter_rows(min_row=2, values_only=True), start=2):
-                    try:
-                        data = dict(zip(headers, row))
-                        
-                        if not data.get('Name') or not data.get('Email'):
-                            continue
-                        
-                        cf, created = CriticalFriend.objects.update_or_create(
-                            email=data['Email'],
-                            defaults={
-                                'name': data['Name'],
-                                'institution': data.get('Institution', ''),
-                                'expertise_area': data.get('Expertise Area', ''),
-                                'bio': data.get('Bio', ''),
-                            }
-                        )
-                        
-                        self.imported_count += 1
-                        
-                    except Exception as e:
-                        self.errors.append(f"Row {row_num}: {str(e)}")
-            
+                for batch in self._iter_batches(file_path):
+                    self._import_critical_friend_batch(batch)
             return True
             
         except Exception as e:
             self.errors.append(f"Error reading file: {str(e)}")
             return False
+
+    def _import_critical_friend_batch(self, batch):
+        records = []
+        for row_num, data in batch:
+            if not data.get('Name') or not data.get('Email'):
+                continue
+            records.append((row_num, str(data['Email']).strip(), {
+                'name': str(data['Name']).strip(),
+                'institution': data.get('Institution') or '',
+                'expertise_areas': data.get('Expertise Area') or '',
+                'research_interests': data.get('Bio') or '',
+            }))
+        if not records:
+            return
+        
+        # Email is not unique on CriticalFriend; update the oldest record
+        friends = {}
+        for friend in CriticalFriend.objects.filter(email__in={email for _, email, _ in records}).order_by('-pk'):
+            friends[friend.email] = friend
+        
+        to_create = []
+        to_update = {}
+        updated_fields = set()
+        now = timezone.now()
+        for row_num, email, values in records:
+            friend = friends.get(email)
+            if friend is None:
+                friend = CriticalFriend(email=email, **values)
+                friends[email] = friend
+                to_create.append(friend)
+                self.created_count += 1
+            else:
+                changed = self._apply_changes(friend, values)
+                if changed and friend.pk is not None:
+                    friend.updated_at = now
+                    to_update[email] = friend
+                    updated_fields.update(changed)
+                    self.updated_count += 1
+                elif not changed:
+                    self.unchanged_count += 1
+            self.imported_count += 1
+        
+        if to_update:
+            CriticalFriend.objects.bulk_update(
+                to_update.values(), sorted(updated_fields) + ['updated_at'], batch_size=self.batch_size
+            )
+        if to_create:
+            CriticalFriend.objects.bulk_create(to_create, batch_size=self.batch_size)
+        invalidate_dashboard_stats()
     
     def _parse_date(self, date_value):
         """Parse various date formats"""
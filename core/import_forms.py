@@ -4,7 +4,8 @@ Forms for importing data from CSV files
 from django import forms
 from django.core.exceptions import ValidationError
 import csv
-import io
+
+from .csv_stream import read_csv_header
 
 
 class CSVUploadForm(forms.Form):
@@ -43,16 +44,11 @@ class CSVUploadForm(forms.Form):
         if csv_file.size > 5 * 1024 * 1024:  # 5MB limit
             raise ValidationError('File size must be under 5MB')
         
-        # Try to read the file to validate it's valid CSV
+        # Read just the header row to validate it's valid CSV
         try:
-            csv_file.seek(0)
-            content = csv_file.read().decode('utf-8')
-            csv_file.seek(0)
+            fieldnames = read_csv_header(csv_file)
             
             # Check if it has the required columns
-            reader = csv.DictReader(io.StringIO(content))
-            fieldnames = reader.fieldnames
-            
             required_fields = ['Title', 'Person']
             missing_fields = [f for f in required_fields if f not in fieldnames]
             
@@ -61,8 +57,6 @@ class CSVUploadForm(forms.Form):
                     f'CSV file is missing required columns: {", ".join(missing_fields)}'
                 )
                 
-        except UnicodeDecodeError:
-            raise ValidationError('File must be UTF-8 encoded')
         except csv.Error as e:
             raise ValidationError(f'Invalid CSV file: {str(e)}')
         
@@ -0,0 +1,164 @@
+"""
+Background import jobs.
+
+Upload views call :func:`enqueue_import` and redirect to the job page;
+``manage.py run_import_worker`` claims queued jobs and runs them with
+:func:`run_job`. Claiming is a conditional UPDATE (``status='queued'`` ->
+``'running'``), so any number of workers can poll the same table without
+two of them taking the same job, on SQLite as well as PostgreSQL.
+
+A runner is ``runner(job, csv_file, progress)`` returning
+``(result_messages, errors)``, where result_messages is a list of
+``(level, text)`` pairs rendered on the job page. Runners write through an
+``ImportWriter(atomic=False)`` so every chunk commits on its own: progress
+is visible to the polling endpoint, and a worker that dies part way keeps
+the chunks already written.
+"""
+
+import logging
+import os
+import socket
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import ImportJob
+
+logger = logging.getLogger(__name__)
+
+RUNNERS = {
+    'enhanced': 'core.views.run_enhanced_import',
+    'pure': 'core.views.run_pure_import',
+    'bulk_upload': 'core.views.run_bulk_upload',
+}
+
+
+class JobProgress:
+    """
+    Progress counters for a running job, written to its row every few seconds.
+
+    The upload is not read an extra time just to count its rows: while the
+    runner reads ``file``, rows_total is estimated from the rows processed
+    and the share of the file read so far, and it is set exactly when the
+    job finishes.
+    """
+
+    FIELDS = ('rows_total', 'rows_processed', 'created_count', 'skipped_count', 'error_count')
+
+    def __init__(self, job, interval=None, file=None):
+        self.job = job
+        self.interval = settings.IMPORT_JOB_PROGRESS_INTERVAL if interval is None else interval
+        self.file = file
+        self._last_saved = time.monotonic()
+
+    def update(self, force=False, **counts):
+        """Set any of FIELDS; the row is only written once per interval unless forced."""
+        for name, value in counts.items():
+            setattr(self.job, name, value)
+
+        now = time.monotonic()
+        if force or now - self._last_saved >= self.interval:
+            self._last_saved = now
+            if 'rows_total' not in counts:
+                self.job.rows_total = self.estimate_rows_total()
+            ImportJob.objects.filter(pk=self.job.pk).update(
+                updated_at=timezone.now(),
+                **{name: getattr(self.job, name) for name in self.FIELDS}
+            )
+
+    def estimate_rows_total(self):
+        """Rows processed scaled up by the fraction of ``file`` read, or None before any."""
+        processed = self.job.rows_processed
+        if self.file is None or not processed:
+            return self.job.rows_total
+        position, size = self.file.tell(), self.file.size
+        if not position or not size:
+            return self.job.rows_total
+        # The reader runs up to a chunk ahead, so never estimate below what is done
+        return max(processed, round(processed * size / position))
+
+
+def enqueue_import(kind, uploaded_file, user, **options):
+    """Store the upload and queue a job; runs it inline if IMPORT_JOBS_ASYNC is off."""
+    job = ImportJob(kind=kind, original_name=uploaded_file.name[:255], options=options,
+                    created_by=user if user and user.is_authenticated else None)
+    job.file.save(os.path.basename(uploaded_file.name), uploaded_file, save=False)
+    job.save()
+
+    if not settings.IMPORT_JOBS_ASYNC and claim_job(job.pk, worker='inline'):
+        job.refresh_from_db()
+        run_job(job)
+    return job
+
+
+def default_worker_name():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def claim_job(pk, worker):
+    """Atomically move a queued job to running; False if someone else got it first."""
+    now = timezone.now()
+    return bool(ImportJob.objects.filter(pk=pk, status='queued').update(
+        status='running', worker=worker[:100], started_at=now, updated_at=now,
+    ))
+
+
+def claim_next_job(worker):
+    """Claim the oldest queued job, or return None if there is nothing to do."""
+    fail_stale_jobs()
+    candidates = ImportJob.objects.filter(status='queued').order_by('created_at')
+    for pk in candidates.values_list('pk', flat=True)[:20]:
+        if claim_job(pk, worker):
+            return ImportJob.objects.get(pk=pk)
+    return None
+
+
+def fail_stale_jobs():
+    """Fail running jobs whose worker stopped sending heartbeats, deleting their uploads."""
+    cutoff = timezone.now() - timedelta(seconds=settings.IMPORT_JOB_STALE_AFTER)
+    stale = ImportJob.objects.filter(status='running', updated_at__lt=cutoff)
+    for job in stale.exclude(file=''):
+        job.file.delete(save=False)
+    return stale.update(
+        status='failed',
+        file='',
+        finished_at=timezone.now(),
+        result_messages=[{
+            'level': 'error',
+            'text': 'The import worker stopped responding. Rows written before it stopped '
+                    'were kept; re-upload with "skip duplicates" to finish the import.',
+        }],
+    )
+
+
+def run_job(job):
+    """Run a claimed job to completion and record its outcome."""
+    runner = import_string(RUNNERS[job.kind])
+    started = time.monotonic()
+
+    try:
+        with job.file.open('rb') as csv_file:
+            progress = JobProgress(job, file=csv_file)
+            result_messages, errors = runner(job, csv_file, progress)
+    except Exception as e:
+        logger.exception("Import job %s failed", job.pk)
+        job.status = 'failed'
+        job.result_messages = [{'level': 'error', 'text': f"Import failed: {e}"}]
+    else:
+        job.status = 'completed'
+        job.rows_total = job.rows_processed
+        job.result_messages = [{'level': level, 'text': text} for level, text in result_messages]
+        job.errors = errors[:settings.IMPORT_JOB_MAX_ERRORS]
+        job.error_count = len(errors)
+
+    # Failed jobs are re-uploaded, not retried, so the stored file is never needed again
+    job.file.delete(save=False)
+    job.finished_at = timezone.now()
+    job.save()
+    logger.info("Import job %s %s in %.1fs: %s rows, %s created, %s skipped, %s errors",
+                job.pk, job.status, time.monotonic() - started, job.rows_processed,
+                job.created_count, job.skipped_count, job.error_count)
+    return job
@@ -0,0 +1,240 @@
+"""
+Chunked bulk writer shared by the output importers.
+
+Importers validate and queue one ``Output`` per row (plus its
+``OutputColleague`` links); the writer inserts them with ``bulk_create``
+every ``IMPORT_CHUNK_SIZE`` rows instead of one INSERT per row. If the
+database still rejects a chunk, that chunk is replayed row by row inside
+savepoints so only the offending rows are reported, by row number.
+
+Usage::
+
+    with ImportWriter() as writer:          # one transaction for the import
+        for row_num, row in enumerate(rows, start=2):
+            writer.add(row_num, Output(...))
+    writer.created, writer.errors
+
+With ``atomic=False`` each chunk commits on its own instead, which the
+background import jobs use so their progress is visible while they run.
+
+``DuplicateIndex`` supports ``skip_duplicates`` with in-memory lookups.
+"""
+
+import logging
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import DatabaseError, models, transaction
+
+from .colleague_stats import refresh_colleague_stats
+from .dashboard_stats import invalidate_dashboard_stats
+from .match_keys import normalize_doi, normalize_title
+from .models import Output, OutputColleague
+
+logger = logging.getLogger(__name__)
+
+
+class ImportWriter:
+    """Accumulate ``Output`` rows and write them in ``bulk_create`` chunks."""
+
+    def __init__(self, chunk_size=None, atomic=True):
+        self.chunk_size = max(1, chunk_size or getattr(settings, 'IMPORT_CHUNK_SIZE', 500))
+        self.atomic = atomic
+        self.created = 0
+        self.errors = []        # "Row N: message", in the order they were found
+        self.chunks_written = 0
+        self._pending = []      # (row_num, output, links)
+        self._atomic = None
+
+    # -- transaction handling -------------------------------------------------
+
+    def __enter__(self):
+        if self.atomic:
+            self._atomic = transaction.atomic()
+            self._atomic.__enter__()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if self._atomic is None:
+            if exc_type is None:
+                self.flush()
+            return False
+        if exc_type is None:
+            try:
+                self.flush()
+            except BaseException as e:
+                self._atomic.__exit__(type(e), e, e.__traceback__)
+                raise
+        return self._atomic.__exit__(exc_type, exc_value, traceback)
+
+    # -- public API -----------------------------------------------------------
+
+    def add(self, row_num, output, links=None):
+        """
+        Validate and queue ``output`` for insertion.
+
+        ``links`` is a list of unsaved ``OutputColleague`` instances without
+        an output; by default the output's colleague is linked as the main
+        colleague. Returns False (and records the error) if the row is invalid.
+        """
+        if not self.check(row_num, output):
+            return False
+        # bulk_create bypasses Output.save()
+        output.update_match_keys()
+        output.update_quality_scores()
+
+        if links is None:
+            links = [OutputColleague(colleague_id=output.colleague_id, is_main=True,
+                                     author_position=output.author_position)]
+        seen = set()
+        unique_links = []
+        for link in links:
+            if link.colleague_id and link.colleague_id not in seen:
+                seen.add(link.colleague_id)
+                unique_links.append(link)
+
+        self._pending.append((row_num, output, unique_links))
+        if len(self._pending) >= self.chunk_size:
+            self.flush()
+        return True
+
+    def check(self, row_num, output, require_colleague=True):
+        """
+        Validate ``output`` without queuing it, for importers that want to
+        reject a row before resolving its colleague. Returns False (and
+        records the error) if the row is invalid.
+        """
+        try:
+            self._validate(output, require_colleague)
+        except ValidationError as e:
+            self.error(row_num, _format_validation_error(e))
+            return False
+        return True
+
+    def error(self, row_num, message):
+        """Record a row-level error found by the importer itself."""
+        self.errors.append(f"Row {row_num}: {message}")
+
+    def flush(self):
+        """Write all queued rows."""
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, []
+
+        try:
+            with transaction.atomic():
+                Output.objects.bulk_create([output for _, output, _ in pending])
+                self._write_links(pending)
+            self.created += len(pending)
+        except DatabaseError as e:
+            logger.warning("Bulk insert of %d rows failed (%s); retrying row by row", len(pending), e)
+            self._write_rows_individually(pending)
+        self.chunks_written += 1
+        # bulk_create sends no post_save signals
+        invalidate_dashboard_stats()
+        refresh_colleague_stats(
+            {output.colleague_id for _, output, _ in pending}
+            | {link.colleague_id for _, _, links in pending for link in links}
+        )
+
+    # -- internals ------------------------------------------------------------
+
+    def _write_links(self, pending):
+        links = []
+        for _, output, output_links in pending:
+            for link in output_links:
+                link.output = output
+                links.append(link)
+        if links:
+            OutputColleague.objects.bulk_create(links)
+
+    def _write_rows_individually(self, pending):
+        for row_num, output, links in pending:
+            output.pk = None
+            output._state.adding = True
+            try:
+                with transaction.atomic():
+                    output.save(force_insert=True)
+                    self._write_links([(row_num, output, links)])
+                self.created += 1
+            except DatabaseError as e:
+                self.error(row_num, str(e))
+
+    @staticmethod
+    def _validate(output, require_colleague=True):
+        """
+        Check what the database would reject, without a query per row:
+        missing colleague, NULLs in NOT NULL columns, unconvertible values
+        and over-long strings. Converted values are written back.
+        """
+        errors = {}
+        if require_colleague and output.colleague_id is None:
+            errors['colleague'] = ['No colleague linked to this output.']
+
+        for field in output._meta.concrete_fields:
+            if field.primary_key or field.is_relation:
+                continue
+            if getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False):
+                continue
+            value = getattr(output, field.attname)
+            if value is None:
+                if not field.null:
+                    errors[field.name] = [field.error_messages['null']]
+                continue
+            try:
+                value = field.to_python(value)
+            except ValidationError as e:
+                errors[field.name] = e.messages
+                continue
+            if isinstance(field, models.CharField) and field.max_length and len(value) > field.max_length:
+                errors[field.name] = [f'Longer than {field.max_length} characters.']
+                continue
+            setattr(output, field.attname, value)
+
+        if errors:
+            raise ValidationError(errors)
+
+
+class DuplicateIndex:
+    """
+    DOIs and normalized titles of existing outputs, loaded once per import
+    from their stored match keys.
+
+    Replaces a pair of case-insensitive ``exists()`` scans per row with set
+    lookups. Rows queued earlier in the same upload are added with
+    :meth:`add`, so duplicates within the file are caught as well.
+    """
+
+    def __init__(self, queryset=None):
+        queryset = Output.objects.all() if queryset is None else queryset
+        self.dois = set()
+        self.titles = set()
+        keys = queryset.values_list('doi_normalized', 'title_normalized')
+        for doi, title in keys.iterator(chunk_size=2000):
+            if doi:
+                self.dois.add(doi)
+            if title:
+                self.titles.add(title)
+
+    def match(self, doi='', title=''):
+        """Return 'doi' or 'title' for the key that is already taken, else None."""
+        if doi and normalize_doi(doi) in self.dois:
+            return 'doi'
+        if title and normalize_title(title) in self.titles:
+            return 'title'
+        return None
+
+    def add(self, doi='', title=''):
+        if doi:
+            self.dois.add(normalize_doi(doi))
+        if title:
+            normalized = normalize_title(title)
+            if normalized:
+                self.titles.add(normalized)
+
+
+def _format_validation_error(error):
+    return '; '.join(
+        f"{field}: {' '.join(messages)}" if field != '__all__' else ' '.join(messages)
+        for field, messages in error.message_dict.items()
+    )
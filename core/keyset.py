@@ -0,0 +1,204 @@
+"""
+Keyset (seek) pagination for the list pages.
+
+OFFSET pagination makes the database read and discard every earlier row
+(and ``Paginator`` counts the whole table), so page cost grows with the
+table. A keyset page continues *after* the last row shown instead: the
+cursor holds that row's ordering values, with the primary key as the
+tie-breaker, and the next page is "rows ordered after these values,
+LIMIT n", which costs the same deep in the list as at its start when the
+ordering is indexed.
+
+Lists keep their existing ordering (the queryset's ``order_by`` or the
+model's ``Meta.ordering``), which may include annotations such as a
+search rank; nullable fields sort last. Cursors are opaque url-safe
+strings holding only the position, so following one with the same
+filters and search continues the same list, and rows added or removed
+meanwhile do not shift or repeat the following pages. Paging is forward
+only: pages link to the next page and back to the start.
+
+``?format=json`` returns the page's rendered rows plus the next cursor
+(``fragment_response``), for "load more" / infinite scroll.
+"""
+
+import base64
+import binascii
+import json
+from functools import reduce
+from operator import or_
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import F, Q
+from django.http import JsonResponse
+from django.template.loader import render_to_string
+from django.utils.http import urlencode
+
+CURSOR_PARAM = 'after'
+FORMAT_PARAM = 'format'
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+class KeysetPage:
+    """One page of a list: iterate over it, then follow ``next_url``."""
+
+    def __init__(self, object_list, cursor=None, next_cursor=None, query=''):
+        self.object_list = object_list
+        self.cursor = cursor
+        self.next_cursor = next_cursor
+        self.query = query
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def first_url(self):
+        return f'?{self.query}'
+
+    @property
+    def next_url(self):
+        if self.next_cursor is None:
+            return None
+        separator = '&' if self.query else ''
+        return f'?{self.query}{separator}{urlencode({CURSOR_PARAM: self.next_cursor})}'
+
+
+def _resolve_field(model, path):
+    """The model field at the end of a ``__`` lookup path."""
+    field = None
+    for name in path.split('__'):
+        field = model._meta.pk if name == 'pk' else model._meta.get_field(name)
+        model = field.related_model
+    return field
+
+
+def _sort_keys(queryset):
+    """(path, descending, field) for the queryset's ordering, ending with the primary key."""
+    ordering = list(queryset.query.order_by or queryset.model._meta.ordering)
+    keys = []
+    for item in ordering:
+        if not isinstance(item, str) or item == '?':
+            raise ValueError(f'Keyset pagination needs field orderings, not {item!r}')
+        path = item.lstrip('-')
+        annotation = queryset.query.annotations.get(path)
+        try:
+            field = annotation.output_field if annotation is not None else _resolve_field(queryset.model, path)
+        except FieldDoesNotExist:
+            raise ValueError(f'Keyset pagination cannot order by {item!r}')
+        keys.append((path, item.startswith('-'), field))
+    pk = queryset.model._meta.pk
+    if not any(field == pk for _, _, field in keys):
+        keys.append(('pk', False, pk))
+    return keys
+
+
+def _dump(value):
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    if isinstance(value, (str, int, float, bool)) or value is None:
+        return value
+    return str(value)
+
+
+def encode_cursor(values):
+    data = json.dumps([_dump(value) for value in values], separators=(',', ':'))
+    return base64.urlsafe_b64encode(data.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor, keys):
+    """Cursor -> ordering values as Python objects; raises InvalidCursor."""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+        if not isinstance(values, list) or len(values) != len(keys):
+            raise InvalidCursor(cursor)
+        return [
+            None if value is None else field.to_python(value)
+            for (_, _, field), value in zip(keys, values)
+        ]
+    except (binascii.Error, UnicodeDecodeError, json.JSONDecodeError, ValidationError, TypeError):
+        raise InvalidCursor(cursor)
+
+
+def _after(keys, values):
+    """Q selecting the rows ordered after ``values``."""
+    conditions = []
+    same = Q()
+    for (path, descending, field), value in zip(keys, values):
+        if value is None:
+            # Nulls sort last: only other nulls (tie-broken by later keys) follow
+            after = None
+            equal = Q(**{f'{path}__isnull': True})
+        else:
+            after = Q(**{f"{path}__{'lt' if descending else 'gt'}": value})
+            if field.null:
+                after |= Q(**{f'{path}__isnull': True})
+            equal = Q(**{path: value})
+        if after is not None:
+            conditions.append(same & after)
+        same &= equal
+    return reduce(or_, conditions) if conditions else Q(pk__in=[])
+
+
+def paginate(queryset, cursor=None, per_page=None, query=''):
+    """
+    The page of ``queryset`` following ``cursor`` (the first page without
+    one). ``per_page`` defaults to ``LIST_PAGE_SIZE``; ``query`` is the
+    urlencoded filters the page links carry. Raises InvalidCursor.
+    """
+    if per_page is None:
+        per_page = getattr(settings, 'LIST_PAGE_SIZE', 50)
+    keys = _sort_keys(queryset)
+    queryset = queryset.order_by(*[
+        getattr(F(path), 'desc' if descending else 'asc')(nulls_last=True) if field.null
+        else f"{'-' if descending else ''}{path}"
+        for path, descending, field in keys
+    ]).annotate(**{f'keyset_{i}': F(path) for i, (path, _, _) in enumerate(keys)})
+    if cursor:
+        queryset = queryset.filter(_after(keys, decode_cursor(cursor, keys)))
+
+    rows = list(queryset[:per_page + 1])
+    next_cursor = None
+    if len(rows) > per_page:
+        rows = rows[:per_page]
+        next_cursor = encode_cursor([getattr(rows[-1], f'keyset_{i}') for i in range(len(keys))])
+    return KeysetPage(rows, cursor or None, next_cursor, query)
+
+
+def paginate_request(request, queryset, per_page=None):
+    """
+    ``paginate`` from the request's cursor, keeping its other parameters
+    (filters, search) in the page links. An invalid cursor restarts the list.
+    """
+    params = request.GET.copy()
+    cursor = params.pop(CURSOR_PARAM, [None])[-1]
+    params.pop(FORMAT_PARAM, None)
+    query = params.urlencode()
+    try:
+        return paginate(queryset, cursor, per_page, query)
+    except InvalidCursor:
+        return paginate(queryset, None, per_page, query)
+
+
+def wants_fragment(request):
+    """Whether the request asks for the rows as a JSON fragment (infinite scroll)."""
+    return request.GET.get(FORMAT_PARAM) == 'json'
+
+
+def fragment_response(request, template_name, context, page):
+    """The page's rows rendered by ``template_name``, and where the list continues."""
+    return JsonResponse({
+        'html': render_to_string(template_name, context, request=request),
+        'has_next': page.has_next,
+        'next_cursor': page.next_cursor,
+        'next_url': page.next_url,
+    })
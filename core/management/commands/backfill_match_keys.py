@@ -0,0 +1,39 @@
+"""
+Management command that recomputes the canonical match keys stored on
+outputs, and the name keys stored on colleagues.
+
+The keys are kept up to date on save and by the importers, and migrations
+0005 and 0008 fill them in for existing rows. Run this after changing the
+normalization rules in core/match_keys.py, or after writing outputs with
+``QuerySet.update()``.
+
+Usage:
+    python manage.py backfill_match_keys
+    python manage.py backfill_match_keys --batch-size 2000
+"""
+
+from django.core.management.base import BaseCommand
+
+from core.match_keys import backfill_match_keys, backfill_name_keys
+from core.models import Colleague, Output
+
+
+class Command(BaseCommand):
+    help = 'Recompute the match keys of all outputs and the name keys of all colleagues'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Rows read and updated per batch (default: 500)'
+        )
+
+    def handle(self, *args, **options):
+        total = Output.objects.count()
+        updated = backfill_match_keys(Output.objects.all(), batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'✓ Updated match keys on {updated} of {total} outputs'))
+        
+        total = Colleague.objects.count()
+        updated = backfill_name_keys(Colleague.objects.all(), batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'✓ Updated name keys on {updated} of {total} colleagues'))
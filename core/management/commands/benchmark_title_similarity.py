@@ -0,0 +1,162 @@
+"""
+Management command comparing the OutputComparator title similarity backends.
+
+Scores a labelled sample of title pairs with every backend and reports
+throughput (pairs/second), precision/recall against the labels at the
+comparator's title threshold, and how often the backends agree. It then
+times a full OutputComparator run per backend: every first title of the
+sample compared against all second titles (rows/second).
+
+Without --pairs the sample is generated from existing output titles:
+each sampled title is paired with a perturbed copy (case, punctuation,
+a typo, a dropped or swapped word; labelled duplicate) and with another
+title sharing a word with it (labelled distinct).
+
+Usage:
+    python manage.py benchmark_title_similarity
+    python manage.py benchmark_title_similarity --sample 2000 --seed 7
+
+    # CSV with title_a,title_b,duplicate (1/0) columns
+    python manage.py benchmark_title_similarity --pairs labelled_pairs.csv
+"""
+
+import csv
+import random
+import time
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.match_keys import normalize_title, title_words
+from core.models import Output
+from core.output_comparison import OutputComparator
+from core.title_similarity import SCORERS, get_title_scorer
+
+
+class Command(BaseCommand):
+    help = 'Benchmark the title similarity backends used for duplicate detection'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--pairs',
+            help='CSV file of labelled pairs (title_a,title_b,duplicate)'
+        )
+        parser.add_argument(
+            '--sample',
+            type=int,
+            default=1000,
+            help='Titles to sample from the database when generating pairs (default: 1000)'
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=0,
+            help='Random seed for sampling and perturbations (default: 0)'
+        )
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        if options['pairs']:
+            pairs = self._read_pairs(options['pairs'])
+        else:
+            pairs = self._generate_pairs(options['sample'], rng)
+        if not pairs:
+            raise CommandError('No labelled pairs to score')
+
+        pairs = [(normalize_title(a), normalize_title(b), label) for a, b, label in pairs]
+        threshold = OutputComparator.TITLE_SIMILARITY_THRESHOLD
+        duplicates = sum(label for _, _, label in pairs)
+        self.stdout.write(
+            f'{len(pairs)} labelled pairs ({duplicates} duplicates), threshold {threshold}\n'
+        )
+
+        predictions = {}
+        for backend in SCORERS:
+            scorer = get_title_scorer(threshold, backend)
+            start = time.perf_counter()
+            scores = [scorer.similarity(a, b) for a, b, _ in pairs]
+            elapsed = time.perf_counter() - start
+            predictions[backend] = [score > threshold for score in scores]
+            self._report(backend, pairs, predictions[backend], elapsed)
+
+        first, second = SCORERS
+        agreement = sum(
+            a == b for a, b in zip(predictions[first], predictions[second])
+        ) / len(pairs)
+        self.stdout.write(self.style.SUCCESS(
+            f'✓ {first} and {second} agree on {agreement:.1%} of pairs\n'
+        ))
+
+        outputs = [Output(pk=i, title=b, all_authors='') for i, (_, b, _) in enumerate(pairs)]
+        rows = [{'title': a, 'all_authors': ''} for a, _, _ in pairs]
+        for backend in SCORERS:
+            start = time.perf_counter()
+            results = OutputComparator(outputs, title_backend=backend).compare_spreadsheet(rows)
+            elapsed = time.perf_counter() - start
+            self.stdout.write(
+                f'{backend:>10}: comparator {len(rows) / elapsed:,.0f} rows/s against {len(outputs)} outputs '
+                f'({len(results["duplicates"])} rows with matches)'
+            )
+
+    def _report(self, backend, pairs, predicted, elapsed):
+        counts = defaultdict(int)
+        for (_, _, label), guess in zip(pairs, predicted):
+            counts[(bool(label), guess)] += 1
+        true_positive = counts[(True, True)]
+        precision = true_positive / max(1, true_positive + counts[(False, True)])
+        recall = true_positive / max(1, true_positive + counts[(True, False)])
+        rate = len(pairs) / elapsed if elapsed else float('inf')
+        self.stdout.write(
+            f'{backend:>10}: {rate:,.0f} pairs/s  precision {precision:.1%}  recall {recall:.1%}'
+        )
+
+    @staticmethod
+    def _read_pairs(path):
+        try:
+            with open(path, newline='', encoding='utf-8-sig') as handle:
+                return [
+                    (row['title_a'], row['title_b'], row['duplicate'].strip().lower() in ('1', 'true', 'yes'))
+                    for row in csv.DictReader(handle)
+                ]
+        except (OSError, KeyError) as e:
+            raise CommandError(f'Could not read labelled pairs from {path}: {e}')
+
+    def _generate_pairs(self, sample_size, rng):
+        titles = list(Output.objects.exclude(title='').values_list('title', flat=True).distinct()[:50000])
+        if len(titles) < 2:
+            raise CommandError('Need at least two outputs to sample titles from; pass --pairs instead')
+        sample = rng.sample(titles, min(sample_size, len(titles)))
+
+        by_word = defaultdict(list)
+        for title in titles:
+            for word in title_words(normalize_title(title)):
+                by_word[word].append(title)
+
+        pairs = []
+        for title in sample:
+            pairs.append((title, self._perturb(title, rng), True))
+            words = sorted(title_words(normalize_title(title)))
+            others = [other for other in by_word[rng.choice(words)] if other != title] if words else []
+            if others:
+                pairs.append((title, rng.choice(others), False))
+        return pairs
+
+    @staticmethod
+    def _perturb(title, rng):
+        """A plausible re-keyed version of ``title``."""
+        words = title.split()
+        change = rng.choice(['case', 'punctuation', 'typo', 'drop', 'swap'])
+        if change == 'case':
+            return title.upper() if rng.random() < 0.5 else title.lower()
+        if change == 'punctuation':
+            return title.replace(':', ' -').replace(',', '') + '.'
+        if change == 'drop' and len(words) > 4:
+            del words[rng.randrange(len(words))]
+            return ' '.join(words)
+        if change == 'swap' and len(words) > 2:
+            i = rng.randrange(len(words) - 1)
+            words[i], words[i + 1] = words[i + 1], words[i]
+            return ' '.join(words)
+        # typo: replace one letter
+        i = rng.randrange(len(title))
+        return title[:i] + rng.choice('abcdefghijklmnopqrstuvwxyz') + title[i + 1:]
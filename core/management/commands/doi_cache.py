@@ -0,0 +1,59 @@
+"""
+Management command for inspecting and pruning the DOI metadata cache.
+
+Usage:
+    # Show hit/miss counters
+    python manage.py doi_cache
+
+    # Delete entries older than their TTL
+    python manage.py doi_cache --purge-expired
+
+    # Drop everything (e.g. after changing the parser)
+    python manage.py doi_cache --clear
+"""
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+from django.utils import timezone
+
+from core.models import DOIMetadataCache
+
+
+class Command(BaseCommand):
+    help = 'Show statistics for, or prune, the OpenAlex DOI metadata cache'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--purge-expired',
+            action='store_true',
+            help='Delete cache entries that are past their TTL'
+        )
+        parser.add_argument(
+            '--clear',
+            action='store_true',
+            help='Delete all cache entries'
+        )
+
+    def handle(self, *args, **options):
+        if options['clear']:
+            deleted, _ = DOIMetadataCache.objects.all().delete()
+            self.stdout.write(self.style.SUCCESS(f'✓ Cleared {deleted} cache entries'))
+        elif options['purge_expired']:
+            now = timezone.now()
+            ttl = timedelta(seconds=settings.OPENALEX_CACHE_TTL)
+            negative_ttl = timedelta(seconds=settings.OPENALEX_NEGATIVE_CACHE_TTL)
+            deleted, _ = DOIMetadataCache.objects.filter(
+                Q(found=True, fetched_at__lt=now - ttl) |
+                Q(found=False, fetched_at__lt=now - negative_ttl)
+            ).delete()
+            self.stdout.write(self.style.SUCCESS(f'✓ Purged {deleted} expired entries'))
+
+        stats = DOIMetadataCache.get_stats()
+        self.stdout.write('\nDOI Metadata Cache:')
+        self.stdout.write(f"  Entries:   {stats['entries']} ({stats['not_found']} negative)")
+        self.stdout.write(f"  Hits:      {stats['hits']}")
+        self.stdout.write(f"  Misses:    {stats['misses']}")
+        self.stdout.write(f"  Hit rate:  {stats['hit_rate']}%")
@@ -0,0 +1,49 @@
+"""
+Management command that finds duplicate outputs already in the database.
+
+Candidate pairs are stored as DuplicateCandidate rows, grouped into
+clusters, and reviewed in the admin (Core > Duplicate Candidates).
+See core/duplicate_sweep.py.
+
+Usage:
+    python manage.py find_duplicate_outputs
+
+    # Nightly: only outputs created or updated since the last sweep
+    python manage.py find_duplicate_outputs --incremental
+
+    python manage.py find_duplicate_outputs --title-backend ngram
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.duplicate_sweep import sweep
+from core.title_similarity import SCORERS
+
+
+class Command(BaseCommand):
+    help = 'Find likely duplicate outputs in the database and record them for review'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--incremental',
+            action='store_true',
+            help='Only check outputs changed since the last sweep (a full sweep if there is none)'
+        )
+        parser.add_argument(
+            '--title-backend',
+            choices=sorted(SCORERS),
+            help='Title similarity backend (default: OUTPUT_TITLE_SIMILARITY setting)'
+        )
+
+    def handle(self, *args, **options):
+        try:
+            record = sweep(incremental=options['incremental'], title_backend=options['title_backend'])
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        kind = 'incremental' if record.incremental else 'full'
+        elapsed = (record.finished_at - record.started_at).total_seconds()
+        self.stdout.write(self.style.SUCCESS(
+            f'✓ {kind.capitalize()} sweep checked {record.outputs_compared} outputs in {elapsed:.1f}s: '
+            f'{record.candidates_found} candidate pairs'
+        ))
@@ -0,0 +1,25 @@
+"""
+Management command that recomputes the per-colleague output statistics
+stored in ``ColleagueStats``.
+
+The statistics are kept up to date by signals and the importers; run this
+after writing outputs or colleagues with ``QuerySet.update()``, or to
+check nothing has drifted (it reports how many rows it had to change).
+
+Usage:
+    python manage.py rebuild_colleague_stats
+"""
+
+from django.core.management.base import BaseCommand
+
+from core.colleague_stats import refresh_colleague_stats
+from core.models import Colleague
+
+
+class Command(BaseCommand):
+    help = 'Recompute the stored output statistics of every colleague'
+
+    def handle(self, *args, **options):
+        total = Colleague.objects.count()
+        updated = refresh_colleague_stats()
+        self.stdout.write(self.style.SUCCESS(f'✓ Rebuilt statistics: {updated} of {total} colleagues changed'))
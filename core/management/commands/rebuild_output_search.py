@@ -0,0 +1,29 @@
+"""
+Management command that repopulates the full-text search indexes of outputs
+and tasks.
+
+The index follows every write through database triggers (SQLite) or a
+generated column (PostgreSQL), and missing triggers are restored after
+each migrate; run this after restoring a database from a dump or if
+search results look stale.
+
+Usage:
+    python manage.py rebuild_output_search
+"""
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from core.models import Output, Task
+from core.output_search import install_search_index
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the full-text search indexes of outputs and tasks'
+
+    def handle(self, *args, **options):
+        install_search_index(connection, rebuild=True)
+        self.stdout.write(self.style.SUCCESS(
+            f'✓ Rebuilt the search indexes ({Output.objects.count()} outputs, '
+            f'{Task.objects.count()} tasks, {connection.vendor})'
+        ))
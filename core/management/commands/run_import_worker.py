@@ -0,0 +1,74 @@
+"""
+Management command that processes queued CSV import jobs.
+
+Usage:
+    # Run until stopped (Ctrl+C / SIGTERM); start several for parallel imports
+    python manage.py run_import_worker
+
+    # Process whatever is queued, then exit (e.g. from cron)
+    python manage.py run_import_worker --once
+"""
+
+import signal
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from core.import_jobs import claim_next_job, default_worker_name, run_job
+
+
+class Command(BaseCommand):
+    help = 'Process queued CSV import jobs'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Exit when the queue is empty instead of polling'
+        )
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=2.0,
+            help='Seconds to wait between polls when the queue is empty (default: 2)'
+        )
+        parser.add_argument(
+            '--name',
+            default='',
+            help='Worker name recorded on claimed jobs (default: host:pid)'
+        )
+
+    def handle(self, *args, **options):
+        worker = options['name'] or default_worker_name()
+        self._stopping = False
+        signal.signal(signal.SIGTERM, self._stop)
+
+        self.stdout.write(f'Import worker {worker} started')
+        processed = 0
+        try:
+            while not self._stopping:
+                close_old_connections()
+                job = claim_next_job(worker)
+                if job is None:
+                    if options['once']:
+                        break
+                    time.sleep(options['poll_interval'])
+                    continue
+
+                self.stdout.write(f'Running job {job.pk} ({job.get_kind_display()}: {job.original_name})')
+                job = run_job(job)
+                processed += 1
+                style = self.style.SUCCESS if job.status == 'completed' else self.style.ERROR
+                self.stdout.write(style(
+                    f'✓ Job {job.pk} {job.status}: {job.created_count} created, '
+                    f'{job.skipped_count} skipped, {job.error_count} errors'
+                ))
+        except KeyboardInterrupt:
+            pass
+
+        self.stdout.write(f'Import worker {worker} stopped after {processed} job(s)')
+
+    def _stop(self, signum, frame):
+        # Finish the current job, then exit
+        self._stopping = True
@@ -0,0 +1,226 @@
+"""
+Canonical match keys for outputs and colleagues.
+
+Duplicate detection compares outputs by DOI, title and author surnames.
+These helpers are the single definition of how each is normalized, and
+``output_match_keys`` derives the keys that ``Output`` stores (and keeps
+up to date on save), so lookups can be indexed equality queries and the
+comparator can load a few short columns instead of whole outputs.
+
+``colleague_name_keys`` does the same for colleague names: an
+ASCII-folded surname, its Soundex code and the initials, which
+``Colleague`` stores for the duplicate colleague finder.
+
+This module must not import models: ``core.models`` imports it.
+"""
+
+import hashlib
+import re
+import unicodedata
+
+DOI_PREFIXES = [
+    'https://doi.org/',
+    'http://doi.org/',
+    'https://dx.doi.org/',
+    'http://dx.doi.org/',
+    'doi.org/',
+    'doi:',
+]
+
+# Words too common to identify a title on their own
+TITLE_STOPWORDS = frozenset({
+    'a', 'an', 'and', 'are', 'as', 'at', 'by', 'for', 'from', 'in', 'into',
+    'is', 'of', 'on', 'or', 'the', 'to', 'with',
+})
+
+
+def normalize_doi(doi):
+    """
+    Normalize a DOI for lookups and comparisons.
+
+    Strips URL/``doi:`` prefixes and surrounding whitespace and lowercases
+    the result (DOIs are case-insensitive). Returns '' for empty input.
+    """
+    if not doi:
+        return ''
+
+    doi = str(doi).strip()
+    for prefix in DOI_PREFIXES:
+        if doi.lower().startswith(prefix):
+            doi = doi[len(prefix):]
+            break
+    return doi.strip().lower()
+
+
+def normalize_title(title):
+    """Lowercase, strip punctuation and collapse whitespace for title comparison."""
+    if not title:
+        return ""
+
+    title = title.lower()
+    title = re.sub(r'[^\w\s]', '', title)
+    title = re.sub(r'\s+', ' ', title)
+    return title.strip()
+
+
+def title_words(normalized_title):
+    """Distinct words of a normalized title, without stopwords where possible."""
+    words = set(normalized_title.split())
+    return (words - TITLE_STOPWORDS) or words
+
+
+def title_fingerprint(normalized_title):
+    """
+    Short hash of a title's distinct non-stopword words, in sorted order.
+
+    Unlike the normalized title it ignores word order and repeated or
+    stopwords, so 'Cats and Dogs' and 'Dogs, Cats' share a fingerprint.
+    """
+    if not normalized_title:
+        return ''
+    canonical = ' '.join(sorted(title_words(normalized_title)))
+    return hashlib.sha1(canonical.encode('utf-8')).hexdigest()[:16]
+
+
+def parse_authors(authors_string):
+    """Parse author string into list of individual authors."""
+    if not authors_string:
+        return []
+
+    # Handle different separators
+    authors = authors_string.replace('//', ';').replace(';;', ';')
+    return [a.strip() for a in authors.split(';') if a.strip()]
+
+
+def author_surname(full_name):
+    """Extract and normalize surname from full name (typically the last word)."""
+    parts = (full_name or '').strip().split()
+    return parts[-1].lower().strip('.,') if parts else ''
+
+
+def author_surnames(authors_string):
+    """Distinct normalized surnames in an author string."""
+    return {surname for surname in map(author_surname, parse_authors(authors_string)) if surname}
+
+
+def surname_signature(authors_string):
+    """Sorted distinct surnames, space-separated: 'Smith, A.; B. Jones' -> 'jones smith'."""
+    return ' '.join(sorted(author_surnames(authors_string)))
+
+
+def output_match_keys(doi, title, all_authors):
+    """The stored match key fields for an output, as a dict."""
+    normalized_title = normalize_title(title)
+    return {
+        'doi_normalized': normalize_doi(doi)[:200],
+        'title_normalized': normalized_title[:500],
+        'title_fingerprint': title_fingerprint(normalized_title),
+        'author_surnames': surname_signature(all_authors),
+    }
+
+
+def backfill_match_keys(queryset, batch_size=500):
+    """
+    Recompute the stored match keys of every output in ``queryset``, writing
+    only rows whose keys changed. Returns the number of rows updated.
+
+    Works on historical models too, so migrations can use it.
+    """
+    fields = list(output_match_keys('', '', ''))
+    rows = queryset.only('pk', 'doi', 'title', 'all_authors', *fields).order_by('pk')
+    changed = []
+    updated = 0
+    for output in rows.iterator(chunk_size=batch_size):
+        keys = output_match_keys(output.doi, output.title, output.all_authors)
+        if any(getattr(output, field) != value for field, value in keys.items()):
+            for field, value in keys.items():
+                setattr(output, field, value)
+            changed.append(output)
+        if len(changed) >= batch_size:
+            queryset.model._default_manager.bulk_update(changed, fields)
+            updated += len(changed)
+            changed = []
+    if changed:
+        queryset.model._default_manager.bulk_update(changed, fields)
+        updated += len(changed)
+    return updated
+
+
+SOUNDEX_CODES = {
+    **dict.fromkeys('bfpv', '1'),
+    **dict.fromkeys('cgjkqsxz', '2'),
+    **dict.fromkeys('dt', '3'),
+    'l': '4',
+    **dict.fromkeys('mn', '5'),
+    'r': '6',
+}
+
+
+def fold_name(name):
+    """
+    ASCII-fold and lowercase a name, keeping letters only:
+    "O'Brien" -> 'obrien', 'Müller' -> 'muller', 'Smith-Jones' -> 'smithjones'.
+    """
+    folded = unicodedata.normalize('NFKD', name or '').encode('ascii', 'ignore').decode('ascii')
+    return re.sub(r'[^a-z]', '', folded.lower())
+
+
+def name_initials(first_names):
+    """Uppercase initials of the given names: 'Jean-Paul R.' -> 'JPR'."""
+    return ''.join(part[0] for part in re.split(r'[\s.\-]+', first_names or '') if part).upper()
+
+
+def soundex(folded_name):
+    """American Soundex code of a folded name ('robert' -> 'R163'), '' if empty."""
+    if not folded_name:
+        return ''
+    code = folded_name[0].upper()
+    previous = SOUNDEX_CODES.get(folded_name[0], '')
+    for letter in folded_name[1:]:
+        digit = SOUNDEX_CODES.get(letter, '')
+        if digit and digit != previous:
+            code += digit
+            if len(code) == 4:
+                break
+        if letter not in 'hw':
+            previous = digit
+    return code.ljust(4, '0')
+
+
+def colleague_name_keys(first_name, last_name):
+    """The stored name key fields for a colleague, as a dict."""
+    surname = fold_name(last_name)
+    return {
+        'surname_key': surname[:150],
+        'surname_code': soundex(surname),
+        'name_initials': name_initials(first_name)[:20],
+    }
+
+
+def backfill_name_keys(queryset, batch_size=500):
+    """
+    Recompute the stored name keys of every colleague in ``queryset``,
+    writing only rows whose keys changed. Returns the number of rows updated.
+
+    Works on historical models too, so migrations can use it.
+    """
+    fields = list(colleague_name_keys('', ''))
+    rows = queryset.select_related('user').only(
+        'pk', 'user__first_name', 'user__last_name', *fields
+    ).order_by('pk')
+    changed = []
+    updated = 0
+    for colleague in rows.iterator(chunk_size=batch_size):
+        keys = colleague_name_keys(colleague.user.first_name, colleague.user.last_name)
+        if any(getattr(colleague, field) != value for field, value in keys.items()):
+            for field, value in keys.items():
+                setattr(colleague, field, value)
+            changed.append(colleague)
+        if len(changed) >= batch_size:
+            queryset.model._default_manager.bulk_update(changed, fields)
+            updated += len(changed)
+            changed = []
+    if changed:
+        queryset.model._default_manager.bulk_update(changed, fields)
+        updated += len(changed)
+    return updated
@@ -0,0 +1,31 @@
+# Generated by Django 4.2.7 on 2026-10-17 03:05
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_outputcolleague_output_colleagues'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DOIMetadataCache',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('doi', models.CharField(help_text='Normalized (lowercase, unprefixed) DOI', max_length=200, unique=True)),
+                ('data', models.JSONField(blank=True, help_text='Raw OpenAlex work JSON', null=True)),
+                ('found', models.BooleanField(default=True)),
+                ('fetched_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('hit_count', models.PositiveIntegerField(default=0)),
+                ('miss_count', models.PositiveIntegerField(default=0, help_text='Times fetched from the API')),
+            ],
+            options={
+                'verbose_name': 'DOI Metadata Cache Entry',
+                'verbose_name_plural': 'DOI Metadata Cache',
+                'ordering': ['-fetched_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 4.2.7 on 2026-10-17 03:21
+
+from django.db import migrations, models
+
+from core.match_keys import backfill_match_keys
+
+
+def backfill(apps, schema_editor):
+    Output = apps.get_model('core', 'Output')
+    backfill_match_keys(Output.objects.all())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_importjob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='output',
+            name='author_surnames',
+            field=models.TextField(blank=True, editable=False, help_text='Sorted distinct author surnames, space-separated'),
+        ),
+        migrations.AddField(
+            model_name='output',
+            name='doi_normalized',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=200),
+        ),
+        migrations.AddField(
+            model_name='output',
+            name='title_fingerprint',
+            field=models.CharField(blank=True, db_index=True, editable=False, help_text='Hash of the sorted distinct title words', max_length=16),
+        ),
+        migrations.AddField(
+            model_name='output',
+            name='title_normalized',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=500),
+        ),
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 4.2.7 on 2026-10-17 03:25
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('core', '0005_output_match_keys'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ComparisonRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('original_name', models.CharField(blank=True, max_length=255)),
+                ('new_count', models.PositiveIntegerField(default=0)),
+                ('duplicate_count', models.PositiveIntegerField(default=0)),
+                ('exact_count', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='comparison_runs', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Comparison Run',
+                'verbose_name_plural': 'Comparison Runs',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ComparisonResult',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('row_number', models.PositiveIntegerField()),
+                ('category', models.CharField(choices=[('new', 'New'), ('duplicate', 'Potential Duplicate'), ('exact', 'Exact Match')], max_length=10)),
+                ('spreadsheet_row', models.JSONField(help_text='Standardized spreadsheet fields')),
+                ('confidence', models.FloatField(default=0, help_text='Best match confidence (0-1)')),
+                ('matches', models.JSONField(blank=True, default=list, help_text='Summaries of the matching outputs, best first')),
+                ('decision', models.CharField(blank=True, choices=[('', 'Undecided'), ('import', 'Imported'), ('merge', 'Merged'), ('skip', 'Skipped')], max_length=10)),
+                ('decided_at', models.DateTimeField(blank=True, null=True)),
+                ('best_match', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='core.output')),
+                ('run', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='results', to='core.comparisonrun')),
+            ],
+            options={
+                'verbose_name': 'Comparison Result',
+                'verbose_name_plural': 'Comparison Results',
+                'ordering': ['run', 'row_number'],
+                'indexes': [models.Index(fields=['run', 'category', 'confidence'], name='core_compar_run_id_e60364_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,59 @@
+# Generated by Django 4.2.7 on 2026-10-17 03:29
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('core', '0006_comparisonrun'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DuplicateSweep',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('started_at', models.DateTimeField()),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('incremental', models.BooleanField(default=False)),
+                ('outputs_compared', models.PositiveIntegerField(default=0)),
+                ('candidates_found', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Duplicate Sweep',
+                'verbose_name_plural': 'Duplicate Sweeps',
+                'ordering': ['-started_at'],
+            },
+        ),
+        migrations.AlterField(
+            model_name='output',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+        migrations.CreateModel(
+            name='DuplicateCandidate',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('cluster', models.PositiveIntegerField(db_index=True)),
+                ('confidence', models.FloatField(help_text='Match confidence (0-1)')),
+                ('reasons', models.JSONField(blank=True, default=list)),
+                ('status', models.CharField(choices=[('pending', 'Pending Review'), ('duplicate', 'Confirmed Duplicate'), ('distinct', 'Not a Duplicate')], default='pending', max_length=10)),
+                ('reviewed_at', models.DateTimeField(blank=True, null=True)),
+                ('found_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('output_a', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='core.output')),
+                ('output_b', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='core.output')),
+                ('reviewed_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Duplicate Candidate',
+                'verbose_name_plural': 'Duplicate Candidates',
+                'ordering': ['cluster', '-confidence'],
+                'unique_together': {('output_a', 'output_b')},
+            },
+        ),
+    ]
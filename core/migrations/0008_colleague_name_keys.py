@@ -0,0 +1,36 @@
+# Generated by Django 4.2.7 on 2026-10-17 03:31
+
+from django.db import migrations, models
+
+from core.match_keys import backfill_name_keys
+
+
+def backfill(apps, schema_editor):
+    Colleague = apps.get_model('core', 'Colleague')
+    backfill_name_keys(Colleague.objects.all())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_duplicate_candidates'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='colleague',
+            name='name_initials',
+            field=models.CharField(blank=True, editable=False, max_length=20),
+        ),
+        migrations.AddField(
+            model_name='colleague',
+            name='surname_code',
+            field=models.CharField(blank=True, db_index=True, editable=False, help_text='Soundex code of the surname', max_length=4),
+        ),
+        migrations.AddField(
+            model_name='colleague',
+            name='surname_key',
+            field=models.CharField(blank=True, db_index=True, editable=False, help_text='ASCII-folded surname, letters only', max_length=150),
+        ),
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 4.2.7 on 2026-10-17 03:38
+
+from django.db import migrations, models
+
+from core.quality_scores import backfill_quality_scores
+
+
+def backfill(apps, schema_editor):
+    Output = apps.get_model('core', 'Output')
+    backfill_quality_scores(Output.objects.all())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_colleague_name_keys'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='output',
+            name='quality_score_average',
+            field=models.DecimalField(blank=True, db_index=True, decimal_places=2, editable=False, max_digits=3, null=True),
+        ),
+        migrations.AddField(
+            model_name='output',
+            name='quality_score_external',
+            field=models.DecimalField(blank=True, decimal_places=2, editable=False, max_digits=3, null=True),
+        ),
+        migrations.AddField(
+            model_name='output',
+            name='quality_score_internal',
+            field=models.DecimalField(blank=True, decimal_places=2, editable=False, max_digits=3, null=True),
+        ),
+        migrations.AddField(
+            model_name='output',
+            name='quality_score_overall',
+            field=models.DecimalField(blank=True, decimal_places=2, editable=False, help_text='Score of the deprecated overall rating', max_digits=3, null=True),
+        ),
+        migrations.AddField(
+            model_name='output',
+            name='quality_score_self',
+            field=models.DecimalField(blank=True, decimal_places=2, editable=False, max_digits=3, null=True),
+        ),
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
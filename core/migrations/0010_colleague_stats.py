@@ -0,0 +1,43 @@
+# Generated by Django 4.2.7 on 2026-10-17 03:42
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+from core.colleague_stats import compute_stats
+
+
+def backfill(apps, schema_editor):
+    ColleagueStats = apps.get_model('core', 'ColleagueStats')
+    ColleagueStats.objects.bulk_create(
+        [ColleagueStats(colleague_id=pk, **values) for pk, values in compute_stats(apps=apps).items()],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_output_quality_scores'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ColleagueStats',
+            fields=[
+                ('colleague', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='core.colleague')),
+                ('total_outputs', models.PositiveIntegerField(default=0)),
+                ('approved_outputs', models.PositiveIntegerField(default=0)),
+                ('four_star_outputs', models.PositiveIntegerField(default=0, help_text='Outputs with an average rating in the 4* band')),
+                ('three_star_outputs', models.PositiveIntegerField(default=0, help_text='Outputs with an average rating in the 3* band')),
+                ('linked_outputs', models.PositiveIntegerField(default=0, help_text='Outputs linked to the colleague as an author')),
+                ('required_outputs', models.PositiveIntegerField(default=0)),
+                ('completion_percentage', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Colleague Statistics',
+                'verbose_name_plural': 'Colleague Statistics',
+            },
+        ),
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,87 @@
+# Generated by Django 4.2.7 on 2026-10-17 05:10
+
+from django.db import migrations
+
+# The DDL is frozen here as it was when this migration was written; later
+# changes to core.output_search need a migration of their own.
+
+SQLITE_INSTALL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS core_output_search USING fts5("
+    "title, all_authors, publication_venue, keywords, abstract, "
+    "content='core_output', content_rowid='id', "
+    "tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+
+    "CREATE TRIGGER IF NOT EXISTS core_output_search_insert AFTER INSERT ON core_output BEGIN "
+    "INSERT INTO core_output_search(rowid, title, all_authors, publication_venue, keywords, abstract) "
+    "VALUES (new.id, new.title, new.all_authors, new.publication_venue, new.keywords, new.abstract); END",
+
+    "CREATE TRIGGER IF NOT EXISTS core_output_search_delete AFTER DELETE ON core_output BEGIN "
+    "INSERT INTO core_output_search(core_output_search, rowid, title, all_authors, publication_venue, "
+    "keywords, abstract) "
+    "VALUES ('delete', old.id, old.title, old.all_authors, old.publication_venue, old.keywords, "
+    "old.abstract); END",
+
+    "CREATE TRIGGER IF NOT EXISTS core_output_search_update "
+    "AFTER UPDATE OF title, all_authors, publication_venue, keywords, abstract ON core_output BEGIN "
+    "INSERT INTO core_output_search(core_output_search, rowid, title, all_authors, publication_venue, "
+    "keywords, abstract) "
+    "VALUES ('delete', old.id, old.title, old.all_authors, old.publication_venue, old.keywords, "
+    "old.abstract); "
+    "INSERT INTO core_output_search(rowid, title, all_authors, publication_venue, keywords, abstract) "
+    "VALUES (new.id, new.title, new.all_authors, new.publication_venue, new.keywords, new.abstract); END",
+
+    "INSERT INTO core_output_search(core_output_search) VALUES ('rebuild')",
+]
+
+SQLITE_UNINSTALL = [
+    "DROP TRIGGER IF EXISTS core_output_search_insert",
+    "DROP TRIGGER IF EXISTS core_output_search_delete",
+    "DROP TRIGGER IF EXISTS core_output_search_update",
+    "DROP TABLE IF EXISTS core_output_search",
+]
+
+POSTGRESQL_INSTALL = [
+    "ALTER TABLE core_output ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS ("
+    "setweight(to_tsvector('english'::regconfig, coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('english'::regconfig, coalesce(all_authors, '')), 'B') || "
+    "setweight(to_tsvector('english'::regconfig, coalesce(publication_venue, '')), 'C') || "
+    "setweight(to_tsvector('english'::regconfig, coalesce(keywords, '')), 'B') || "
+    "setweight(to_tsvector('english'::regconfig, coalesce(abstract, '')), 'D')"
+    ") STORED",
+
+    "CREATE INDEX IF NOT EXISTS core_output_search_vector ON core_output USING GIN (search_vector)",
+]
+
+POSTGRESQL_UNINSTALL = [
+    "DROP INDEX IF EXISTS core_output_search_vector",
+    "ALTER TABLE core_output DROP COLUMN IF EXISTS search_vector",
+]
+
+
+def _run(schema_editor, statements):
+    for sql in statements.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(sql, params=None)
+
+
+def install(apps, schema_editor):
+    _run(schema_editor, {'sqlite': SQLITE_INSTALL, 'postgresql': POSTGRESQL_INSTALL})
+
+
+def uninstall(apps, schema_editor):
+    _run(schema_editor, {'sqlite': SQLITE_UNINSTALL, 'postgresql': POSTGRESQL_UNINSTALL})
+
+
+class Migration(migrations.Migration):
+    """
+    Full-text index of outputs: an FTS5 table kept in sync by triggers on
+    SQLite, a generated tsvector column with a GIN index on PostgreSQL.
+    See core.output_search.
+    """
+
+    dependencies = [
+        ('core', '0010_colleague_stats'),
+    ]
+
+    operations = [
+        migrations.RunPython(install, uninstall),
+    ]
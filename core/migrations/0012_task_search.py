@@ -0,0 +1,80 @@
+# Generated by Django 4.2.7 on 2026-10-17 09:40
+
+from django.db import migrations
+
+# The DDL is frozen here as it was when this migration was written; later
+# changes to core.output_search need a migration of their own.
+
+SQLITE_INSTALL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS core_task_search USING fts5("
+    "title, description, notes, "
+    "content='core_task', content_rowid='id', "
+    "tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+
+    "CREATE TRIGGER IF NOT EXISTS core_task_search_insert AFTER INSERT ON core_task BEGIN "
+    "INSERT INTO core_task_search(rowid, title, description, notes) "
+    "VALUES (new.id, new.title, new.description, new.notes); END",
+
+    "CREATE TRIGGER IF NOT EXISTS core_task_search_delete AFTER DELETE ON core_task BEGIN "
+    "INSERT INTO core_task_search(core_task_search, rowid, title, description, notes) "
+    "VALUES ('delete', old.id, old.title, old.description, old.notes); END",
+
+    "CREATE TRIGGER IF NOT EXISTS core_task_search_update "
+    "AFTER UPDATE OF title, description, notes ON core_task BEGIN "
+    "INSERT INTO core_task_search(core_task_search, rowid, title, description, notes) "
+    "VALUES ('delete', old.id, old.title, old.description, old.notes); "
+    "INSERT INTO core_task_search(rowid, title, description, notes) "
+    "VALUES (new.id, new.title, new.description, new.notes); END",
+
+    "INSERT INTO core_task_search(core_task_search) VALUES ('rebuild')",
+]
+
+SQLITE_UNINSTALL = [
+    "DROP TRIGGER IF EXISTS core_task_search_insert",
+    "DROP TRIGGER IF EXISTS core_task_search_delete",
+    "DROP TRIGGER IF EXISTS core_task_search_update",
+    "DROP TABLE IF EXISTS core_task_search",
+]
+
+POSTGRESQL_INSTALL = [
+    "ALTER TABLE core_task ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS ("
+    "setweight(to_tsvector('english'::regconfig, coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('english'::regconfig, coalesce(description, '')), 'B') || "
+    "setweight(to_tsvector('english'::regconfig, coalesce(notes, '')), 'C')"
+    ") STORED",
+
+    "CREATE INDEX IF NOT EXISTS core_task_search_vector ON core_task USING GIN (search_vector)",
+]
+
+POSTGRESQL_UNINSTALL = [
+    "DROP INDEX IF EXISTS core_task_search_vector",
+    "ALTER TABLE core_task DROP COLUMN IF EXISTS search_vector",
+]
+
+
+def _run(schema_editor, statements):
+    for sql in statements.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(sql, params=None)
+
+
+def install(apps, schema_editor):
+    _run(schema_editor, {'sqlite': SQLITE_INSTALL, 'postgresql': POSTGRESQL_INSTALL})
+
+
+def uninstall(apps, schema_editor):
+    _run(schema_editor, {'sqlite': SQLITE_UNINSTALL, 'postgresql': POSTGRESQL_UNINSTALL})
+
+
+class Migration(migrations.Migration):
+    """
+    Full-text index of tasks on title, description and notes, built like
+    the output index of 0011. See core.output_search.
+    """
+
+    dependencies = [
+        ('core', '0011_output_search'),
+    ]
+
+    operations = [
+        migrations.RunPython(install, uninstall),
+    ]
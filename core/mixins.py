@@ -156,28 +156,9 @@ class OutputAccessMixin(REFAccessMixin):
         
         profile = self.get_user_profile()
         
-        if not profile:
-            return Output.objects.none()
-        
-        # If user can view all outputs (Admin or Observer role)
-        if profile.can_view_all_outputs:
-            return Output.objects.all()
-        
-        # Build query for outputs the user can see
-        from django.db.models import Q
-        
-        # Start with empty query
-        query = Q(pk__isnull=True)  # Always false - will be OR'd with real conditions
-        
-        # Own outputs (for Colleague or Internal Panel roles)
-        if profile.can_create_outputs:
-            query |= Q(owner=profile) | Q(colleague__user_profile=profile)
-        
-        # Assigned outputs (for Internal Panel role)
-        if profile.is_panel_member:
-            query |= Q(panel_assignments__panel_member=profile)
-        
-        return Output.objects.filter(query).distinct()
+        # Own, co-authored and (for panel members) assigned outputs, or all
+        # for Admin and Observer roles; annotated with the row permissions
+        return Output.objects.visible_to(profile).with_permissions(profile)
 
 
 class OutputViewMixin(OutputAccessMixin):
@@ -197,28 +178,8 @@ class OutputViewMixin(OutputAccessMixin):
     
     def _can_view_output(self, output, profile):
         """Check if user can view this output"""
-        if not profile:
-            return False
-        
-        # Can view all outputs?
-        if profile.can_view_all_outputs:
-            return True
-        
-        # Owner?
-        if hasattr(output, 'owner') and output.owner == profile:
-            return True
-        
-        # Linked colleague?
-        if hasattr(output, 'colleague') and output.colleague:
-            if hasattr(output.colleague, 'user_profile') and output.colleague.user_profile == profile:
-                return True
-        
-        # Assigned panel member?
-        if profile.is_panel_member:
-            if hasattr(output, 'panel_assignments'):
-                return output.panel_assignments.filter(panel_member=profile).exists()
-        
-        return False
+        from .models import Output
+        return Output.objects.permission(profile, 'can_view', output)
 
 
 class OutputEditMixin(OutputAccessMixin):
@@ -237,28 +198,9 @@ class OutputEditMixin(OutputAccessMixin):
         return obj
     
     def _can_edit_output(self, output, profile):
-        """Check if user can edit this output"""
-        if not profile:
-            return False
-        
-        # Can edit any output? (Admin role)
-        if profile.can_edit_any_output:
-            return True
-        
-        # Cannot create outputs = cannot edit own outputs either
-        if not profile.can_create_outputs:
-            return False
-        
-        # Owner can edit their own
-        if hasattr(output, 'owner') and output.owner == profile:
-            return True
-        
-        # User linked to colleague can edit
-        if hasattr(output, 'colleague') and output.colleague:
-            if hasattr(output.colleague, 'user_profile') and output.colleague.user_profile == profile:
-                return True
-        
-        return False
+        """Check if user can edit this output (Admin, or the main colleague with a creating role)"""
+        from .models import Output
+        return Output.objects.permission(profile, 'can_edit', output)
 
 
 class OutputDeleteMixin(OutputAccessMixin):
@@ -285,25 +227,10 @@ class RatingAccessMixin(REFAccessMixin):
     
     def can_rate_output(self, output):
         """Check if current user can rate this output"""
-        profile = self.get_user_profile()
-        
-        if not profile:
-            return False
-        
-        # Admin can rate anything
-        if profile.is_admin:
-            return True
-        
-        # Must have rating permission
-        if not profile.can_rate_assigned:
-            return False
-        
-        # Panel members can rate if assigned
-        if profile.is_panel_member:
-            if hasattr(output, 'panel_assignments'):
-                return output.panel_assignments.filter(panel_member=profile).exists()
+        from .models import Output
         
-        return False
+        # Admin can rate anything, panel members what they are assigned
+        return Output.objects.permission(self.get_user_profile(), 'can_rate', output)
     
     def can_edit_rating(self, rating):
         """Check if current user can edit this rating"""
@@ -1,10 +1,134 @@
+import os
+
+from django.core.files.storage import FileSystemStorage
 from django.db import models
+from django.db.models.signals import post_save
+from django.dispatch import receiver
 from decimal import Decimal
 from django.contrib.auth.models import User
 from django.core.validators import EmailValidator, MinValueValidator, MaxValueValidator
 from django.utils import timezone
 from django.urls import reverse
 
+from .match_keys import colleague_name_keys, output_match_keys
+from .output_permissions import permission_bit
+from .quality_scores import QUALITY_SCORE_FIELDS, output_quality_scores
+
+
+class ColleagueQuerySet(models.QuerySet):
+    def visible_to(self, profile):
+        """Colleagues ``profile`` (a UserProfile) may view: all, or only their own record"""
+        if profile is None:
+            return self.none()
+        if profile.can_view_all_colleagues:
+            return self
+        return self.filter(user_id=profile.user_id)
+
+
+class OutputQuerySet(models.QuerySet):
+    """
+    Output permissions for a UserProfile, as SQL.
+
+    ``visible_to``, ``editable_by`` and ``rateable_by`` filter in the
+    database, and ``with_permissions`` annotates every row with the
+    booleans in ``PERMISSION_ANNOTATIONS`` so templates make no per-row
+    permission queries (see also ``output_permissions.attach_permissions``
+    for already fetched pages). Role permissions come from the profile's
+    permission snapshot; ownership (main colleague), co-authorship
+    (OutputColleague), panel assignment (PanelAssignment) and the
+    profile's own rating (InternalRating) are conditions on the row, all
+    but the first EXISTS subqueries.
+    """
+
+    PERMISSION_ANNOTATIONS = (
+        'can_view', 'can_edit', 'can_delete', 'can_rate', 'is_owner', 'is_assigned', 'has_rated',
+    )
+
+    def _rules(self, profile):
+        """Annotation name -> True, False or a Q deciding it per output"""
+        if profile is None:
+            return dict.fromkeys(self.PERMISSION_ANNOTATIONS, False)
+        owner = models.Q(colleague__user_id=profile.user_id)
+        coauthor = models.Exists(OutputColleague.objects.filter(
+            output_id=models.OuterRef('pk'), colleague__user_id=profile.user_id
+        ))
+        assigned = models.Exists(PanelAssignment.objects.filter(
+            output_id=models.OuterRef('pk'), panel_member_id=profile.pk
+        ))
+        is_assigned = assigned if profile.is_panel_member else False
+        has_rated = models.Exists(InternalRating.objects.filter(
+            output_id=models.OuterRef('pk'), rater_id=profile.pk
+        ))
+
+        can_view = True
+        if not profile.can_view_all_outputs:
+            can_view = owner | coauthor
+            if profile.is_panel_member:
+                can_view |= assigned
+
+        can_edit = profile.can_edit_any_output or (profile.can_create_outputs and owner)
+
+        can_rate = profile.is_admin or (profile.can_rate_assigned and is_assigned)
+
+        return {
+            'can_view': can_view,
+            'can_edit': can_edit,
+            'can_delete': profile.can_delete_any_output,
+            'can_rate': can_rate,
+            'is_owner': owner,
+            'is_assigned': is_assigned,
+            'has_rated': has_rated,
+        }
+
+    def _filter_rule(self, rule):
+        if rule is True:
+            return self
+        if rule is False:
+            return self.none()
+        return self.filter(rule)
+
+    def visible_to(self, profile):
+        """Outputs ``profile`` may view"""
+        return self._filter_rule(self._rules(profile)['can_view'])
+
+    def editable_by(self, profile):
+        """Outputs ``profile`` may edit"""
+        return self._filter_rule(self._rules(profile)['can_edit'])
+
+    def rateable_by(self, profile):
+        """Outputs ``profile`` may rate"""
+        return self._filter_rule(self._rules(profile)['can_rate'])
+
+    def with_permissions(self, profile):
+        """Annotate each output with ``profile``'s PERMISSION_ANNOTATIONS"""
+        annotations = {'permissions_profile_id': models.Value(profile.pk if profile else None,
+                                                              output_field=models.IntegerField())}
+        for name, rule in self._rules(profile).items():
+            if isinstance(rule, bool):
+                annotations[name] = models.Value(rule, output_field=models.BooleanField())
+            else:
+                annotations[name] = models.ExpressionWrapper(rule, output_field=models.BooleanField())
+        return self.annotate(**annotations)
+
+    def permission(self, profile, name, output):
+        """
+        One PERMISSION_ANNOTATIONS value for one output: read from its
+        permission bitmap or ``with_permissions`` annotation for this
+        profile when present, otherwise from the roles alone or, if the
+        row decides, one query.
+        """
+        if not profile:
+            return False
+        bit = permission_bit(output, profile, name)
+        if bit is not None:
+            return bit
+        if getattr(output, 'permissions_profile_id', None) == profile.pk:
+            return getattr(output, name)
+        rule = self._rules(profile)[name]
+        if isinstance(rule, bool):
+            return rule
+        return self.filter(rule, pk=output.pk).exists()
+
 
 class Colleague(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE)
@@ -77,6 +201,22 @@ class Colleague(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    # Name keys for the duplicate colleague finder, derived from the user's
+    # name (see match_keys.colleague_name_keys)
+    surname_key = models.CharField(
+        max_length=150, blank=True, db_index=True, editable=False,
+        help_text="ASCII-folded surname, letters only"
+    )
+    surname_code = models.CharField(
+        max_length=4, blank=True, db_index=True, editable=False,
+        help_text="Soundex code of the surname"
+    )
+    name_initials = models.CharField(max_length=20, blank=True, editable=False)
+    
+    NAME_KEY_FIELDS = ('surname_key', 'surname_code', 'name_initials')
+    
+    objects = ColleagueQuerySet.as_manager()
+    
     class Meta:
         ordering = ['user__last_name', 'user__first_name']
     
@@ -92,25 +232,95 @@ class Colleague(models.Model):
     def is_current_staff(self):
         """Check if this is a current staff member"""
         return self.employment_status == 'current'
+    
+    def update_name_keys(self):
+        """Recompute the name keys from the user's name; returns the names of fields that changed."""
+        changed = []
+        for field, value in colleague_name_keys(self.user.first_name, self.user.last_name).items():
+            if getattr(self, field) != value:
+                setattr(self, field, value)
+                changed.append(field)
+        return changed
+    
+    def save(self, *args, **kwargs):
+        changed = self.update_name_keys()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and changed:
+            kwargs['update_fields'] = set(update_fields) | set(changed)
+        super().save(*args, **kwargs)
 
-
+    @staticmethod
+    def required_outputs_for(fte):
+        if fte >= 0.2:
+            return min(int(float(fte) * 2.5), 5)
+        return 0
+    
+    @staticmethod
+    def completion_percentage_for(submitted, required):
+        if required == 0:
+            return 100
+        return min(int((submitted / required) * 100), 100)
+    
     @property
     def required_outputs(self):
-        if self.fte >= 0.2:
-            return min(int(float(self.fte) * 2.5), 5)
-        return 0
+        return self.required_outputs_for(self.fte)
     
 
     @property
     def submitted_outputs_count(self):
-        return self.outputs.filter(status='approved').count()
+        # Stored in ColleagueStats (see core.colleague_stats); load it with select_related('stats')
+        try:
+            return self.stats.approved_outputs
+        except ColleagueStats.DoesNotExist:
+            return self.outputs.filter(status='approved').count()
     
     @property
     def completion_percentage(self):
-        required = self.required_outputs
-        if required == 0:
-            return 100
-        return min(int((self.submitted_outputs_count / required) * 100), 100)
+        return self.completion_percentage_for(self.submitted_outputs_count, self.required_outputs)
+
+
+@receiver(post_save, sender=User)
+def update_colleague_name_keys(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    """Keep a colleague's name keys in step with its user's name."""
+    if created or raw:
+        return
+    if update_fields is not None and not {'first_name', 'last_name'} & set(update_fields):
+        return  # e.g. the last_login update on every login
+    keys = colleague_name_keys(instance.first_name, instance.last_name)
+    Colleague.objects.filter(user=instance).exclude(**keys).update(**keys)
+
+
+class ColleagueStats(models.Model):
+    """
+    Output statistics of a colleague, so list and report pages read them
+    with a join. Kept up to date by the signal receivers and bulk writers
+    in core.colleague_stats; `manage.py rebuild_colleague_stats` recomputes
+    every row.
+    """
+    colleague = models.OneToOneField(
+        Colleague, on_delete=models.CASCADE, primary_key=True, related_name='stats'
+    )
+    total_outputs = models.PositiveIntegerField(default=0)
+    approved_outputs = models.PositiveIntegerField(default=0)
+    four_star_outputs = models.PositiveIntegerField(
+        default=0, help_text="Outputs with an average rating in the 4* band"
+    )
+    three_star_outputs = models.PositiveIntegerField(
+        default=0, help_text="Outputs with an average rating in the 3* band"
+    )
+    linked_outputs = models.PositiveIntegerField(
+        default=0, help_text="Outputs linked to the colleague as an author"
+    )
+    required_outputs = models.PositiveIntegerField(default=0)
+    completion_percentage = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        verbose_name = 'Colleague Statistics'
+        verbose_name_plural = 'Colleague Statistics'
+    
+    def __str__(self):
+        return f"Statistics for {self.colleague}"
 
 
 class Output(models.Model):
@@ -372,6 +582,49 @@ class Output(models.Model):
         help_text="Critical friend assessment of rigour (0.00-4.00)"
     )
     
+    # ========== CANONICAL MATCH KEYS ==========
+    # Derived from doi/title/all_authors by update_match_keys() on save (bulk
+    # writers call it themselves); used for duplicate detection
+    
+    doi_normalized = models.CharField(max_length=200, blank=True, db_index=True, editable=False)
+    title_normalized = models.CharField(max_length=500, blank=True, db_index=True, editable=False)
+    title_fingerprint = models.CharField(
+        max_length=16,
+        blank=True,
+        db_index=True,
+        editable=False,
+        help_text="Hash of the sorted distinct title words"
+    )
+    author_surnames = models.TextField(
+        blank=True,
+        editable=False,
+        help_text="Sorted distinct author surnames, space-separated"
+    )
+    
+    MATCH_KEY_SOURCES = ('doi', 'title', 'all_authors')
+    MATCH_KEY_FIELDS = ('doi_normalized', 'title_normalized', 'title_fingerprint', 'author_surnames')
+    
+    # ========== NUMERIC QUALITY SCORES ==========
+    # Derived from the quality rating fields by update_quality_scores() on
+    # save (0.00-4.00, null when unrated); used for SQL aggregates and filters
+    
+    quality_score_internal = models.DecimalField(
+        max_digits=3, decimal_places=2, null=True, blank=True, editable=False
+    )
+    quality_score_external = models.DecimalField(
+        max_digits=3, decimal_places=2, null=True, blank=True, editable=False
+    )
+    quality_score_self = models.DecimalField(
+        max_digits=3, decimal_places=2, null=True, blank=True, editable=False
+    )
+    quality_score_average = models.DecimalField(
+        max_digits=3, decimal_places=2, null=True, blank=True, db_index=True, editable=False
+    )
+    quality_score_overall = models.DecimalField(
+        max_digits=3, decimal_places=2, null=True, blank=True, editable=False,
+        help_text="Score of the deprecated overall rating"
+    )
+    
     @property
     def osr_self_average(self):
         """Calculate average of O/S/R self-assessment ratings."""
@@ -597,7 +850,7 @@ class Output(models.Model):
     submitted_date = models.DateTimeField(null=True, blank=True)
     approved_date = models.DateTimeField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
-    updated_at = models.DateTimeField(auto_now=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)  # incremental duplicate sweeps
     # ========== RISK ASSESSMENT FIELDS (Added by setup script) ==========
     
     content_risk_score = models.DecimalField(
@@ -924,6 +1177,8 @@ class Output(models.Model):
         """
         return self.output_colleagues.select_related('colleague__user').all()
     
+    objects = OutputQuerySet.as_manager()
+    
     class Meta:
         ordering = ['-publication_year', 'title']
     
@@ -932,6 +1187,38 @@ class Output(models.Model):
     
     def get_absolute_url(self):
         return reverse('output_detail', kwargs={'pk': self.pk})
+    
+    def update_match_keys(self):
+        """Recompute the canonical match keys; returns the names of fields that changed."""
+        changed = []
+        for field, value in output_match_keys(self.doi, self.title, self.all_authors).items():
+            if getattr(self, field) != value:
+                setattr(self, field, value)
+                changed.append(field)
+        return changed
+    
+    def update_quality_scores(self):
+        """Recompute the numeric quality scores; returns the names of fields that changed."""
+        changed = []
+        for field, value in output_quality_scores(self).items():
+            if getattr(self, field) != value:
+                setattr(self, field, value)
+                changed.append(field)
+        return changed
+    
+    def save(self, *args, **kwargs):
+        self.update_match_keys()
+        self.update_quality_scores()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            update_fields = set(update_fields)
+            if update_fields & set(self.MATCH_KEY_SOURCES):
+                update_fields |= set(self.MATCH_KEY_FIELDS)
+            for rating_field, score_field in QUALITY_SCORE_FIELDS.items():
+                if rating_field in update_fields:
+                    update_fields.add(score_field)
+            kwargs['update_fields'] = update_fields
+        super().save(*args, **kwargs)
 
 
 class OutputColleague(models.Model):
@@ -1574,28 +1861,15 @@ class REFSubmission(models.Model):
     
     def calculate_quality_score(self):
         """Calculate average quality score from included outputs."""
-        outputs = self.outputs.all()
-        if not outputs:
-            self.portfolio_quality_score = Decimal('0.00')
-            return
+        from django.db.models import Avg
+        from django.db.models.functions import Coalesce
         
-        quality_map = {'4*': 4.0, '3*': 3.0, '2*': 2.0, '1*': 1.0, 'U': 0.0}
-        total = 0
-        count = 0
-        
-        for output in outputs:
-            rating = output.quality_rating_average or output.quality_rating
-            if rating:
-                try:
-                    total += float(rating)
-                    count += 1
-                except (ValueError, TypeError):
-                    if rating in quality_map:
-                        total += quality_map[rating]
-                        count += 1
-        
-        if count > 0:
-            self.portfolio_quality_score = Decimal(str(total / count))
+        # The average rating, falling back to the deprecated overall rating
+        average = self.outputs.aggregate(
+            score=Avg(Coalesce('quality_score_average', 'quality_score_overall'))
+        )['score']
+        if average is not None:
+            self.portfolio_quality_score = Decimal(str(average)).quantize(Decimal('0.01'))
         else:
             self.portfolio_quality_score = Decimal('0.00')
     
@@ -1850,6 +2124,339 @@ class SubmissionOutput(models.Model):
         return f"{self.submission.name}: {self.output.title[:50]}"
 
 
+class DOIMetadataCache(models.Model):
+    """
+    Cached OpenAlex work record, keyed by normalized DOI.
+    
+    Shared by the single-DOI lookup endpoint and the bulk importers so that
+    re-importing a spreadsheet or re-opening a form is a local lookup.
+    Rows with found=False are negative cache entries for DOIs OpenAlex
+    does not know about.
+    """
+    doi = models.CharField(max_length=200, unique=True, help_text="Normalized (lowercase, unprefixed) DOI")
+    data = models.JSONField(null=True, blank=True, help_text="Raw OpenAlex work JSON")
+    found = models.BooleanField(default=True)
+    fetched_at = models.DateTimeField(default=timezone.now)
+    
+    # Counters for tuning the cache TTL
+    hit_count = models.PositiveIntegerField(default=0)
+    miss_count = models.PositiveIntegerField(default=0, help_text="Times fetched from the API")
+    
+    class Meta:
+        ordering = ['-fetched_at']
+        verbose_name = 'DOI Metadata Cache Entry'
+        verbose_name_plural = 'DOI Metadata Cache'
+    
+    def __str__(self):
+        status = "" if self.found else " (not found)"
+        return f"{self.doi}{status}"
+    
+    def is_fresh(self, now=None):
+        """Check whether this entry is still within its TTL."""
+        from django.conf import settings
+        
+        if self.found:
+            ttl = getattr(settings, 'OPENALEX_CACHE_TTL', 30 * 24 * 3600)
+        else:
+            ttl = getattr(settings, 'OPENALEX_NEGATIVE_CACHE_TTL', 24 * 3600)
+        now = now or timezone.now()
+        return (now - self.fetched_at).total_seconds() < ttl
+    
+    @classmethod
+    def get_stats(cls):
+        """Return aggregate hit/miss counters across the whole cache."""
+        from django.db.models import Count, Sum
+        
+        totals = cls.objects.aggregate(
+            entries=Count('id'),
+            not_found=Count('id', filter=models.Q(found=False)),
+            hits=Sum('hit_count'),
+            misses=Sum('miss_count'),
+        )
+        hits = totals['hits'] or 0
+        misses = totals['misses'] or 0
+        totals['hits'] = hits
+        totals['misses'] = misses
+        totals['hit_rate'] = round(hits / (hits + misses) * 100, 1) if hits + misses else 0
+        return totals
+
+
+
+class ImportJobStorage(FileSystemStorage):
+    """
+    Uploads waiting for the import worker, under IMPORT_JOB_ROOT rather than
+    MEDIA_ROOT (which is served publicly). The setting is read on each access.
+    """
+    @property
+    def base_location(self):
+        from django.conf import settings
+        return getattr(settings, 'IMPORT_JOB_ROOT', 'import_jobs')
+    
+    @property
+    def location(self):
+        return os.path.abspath(self.base_location)
+
+
+def import_job_storage():
+    return ImportJobStorage()
+
+
+class ImportJob(models.Model):
+    """
+    An uploaded CSV waiting for, or being processed by, the import worker.
+    
+    Upload views create a queued job and return straight away;
+    ``manage.py run_import_worker`` claims queued jobs (several workers can
+    run side by side), writes progress counters back every few seconds and
+    stores the result messages shown on the job page.
+    """
+    KIND_CHOICES = [
+        ('enhanced', 'Enhanced bulk import'),
+        ('pure', 'Pure CSV import'),
+        ('bulk_upload', 'Bulk upload for a colleague'),
+    ]
+    
+    STATUS_CHOICES = [
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('completed', 'Completed'),
+        ('failed', 'Failed'),
+    ]
+    
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='queued')
+    file = models.FileField(upload_to='%Y/%m/', storage=import_job_storage, blank=True)
+    original_name = models.CharField(max_length=255, blank=True)
+    options = models.JSONField(default=dict, blank=True, help_text="Form options for the importer")
+    created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True,
+                                   related_name='import_jobs')
+    worker = models.CharField(max_length=100, blank=True, help_text="Worker that claimed the job")
+    
+    # Progress, updated while the job runs
+    rows_total = models.PositiveIntegerField(null=True, blank=True)
+    rows_processed = models.PositiveIntegerField(default=0)
+    created_count = models.PositiveIntegerField(default=0)
+    skipped_count = models.PositiveIntegerField(default=0)
+    error_count = models.PositiveIntegerField(default=0)
+    
+    # Outcome
+    result_messages = models.JSONField(default=list, blank=True,
+                                       help_text="[{'level': ..., 'text': ...}] shown on the job page")
+    errors = models.JSONField(default=list, blank=True, help_text="Row errors (capped)")
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True, help_text="Doubles as the worker heartbeat")
+    
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [models.Index(fields=['status', 'created_at'])]
+        verbose_name = 'Import Job'
+        verbose_name_plural = 'Import Jobs'
+    
+    def __str__(self):
+        return f"{self.get_kind_display()}: {self.original_name} ({self.get_status_display()})"
+    
+    def get_absolute_url(self):
+        return reverse('import_job_detail', kwargs={'pk': self.pk})
+    
+    @property
+    def is_finished(self):
+        return self.status in ('completed', 'failed')
+    
+    @property
+    def rows_per_second(self):
+        if not self.started_at:
+            return None
+        end = self.finished_at or timezone.now()
+        elapsed = (end - self.started_at).total_seconds()
+        return self.rows_processed / elapsed if elapsed > 0 else None
+    
+    @property
+    def eta_seconds(self):
+        """Estimated seconds remaining, from the throughput so far."""
+        if self.is_finished:
+            return 0
+        rate = self.rows_per_second
+        if not rate or self.rows_total is None:
+            return None
+        return max(self.rows_total - self.rows_processed, 0) / rate
+    
+    @property
+    def percent_complete(self):
+        if self.status == 'completed':
+            return 100
+        if not self.rows_total:
+            return 0
+        return min(int(self.rows_processed * 100 / self.rows_total), 100)
+    
+    def progress(self):
+        """JSON-serialisable progress snapshot for the polling endpoint."""
+        rate = self.rows_per_second
+        eta = self.eta_seconds
+        return {
+            'id': self.pk,
+            'status': self.status,
+            'finished': self.is_finished,
+            'rows_total': self.rows_total,
+            'rows_processed': self.rows_processed,
+            'created': self.created_count,
+            'skipped': self.skipped_count,
+            'errors': self.error_count,
+            'percent': self.percent_complete,
+            'rows_per_second': round(rate, 1) if rate is not None else None,
+            'eta_seconds': round(eta) if eta is not None else None,
+        }
+
+
+
+class ComparisonRun(models.Model):
+    """
+    One spreadsheet compared against the database outputs.
+    
+    The per-row results live in ComparisonResult so the review page can be
+    paginated and filtered, and a half-reviewed run can be picked up again.
+    """
+    
+    created_by = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='comparison_runs'
+    )
+    original_name = models.CharField(max_length=255, blank=True)
+    new_count = models.PositiveIntegerField(default=0)
+    duplicate_count = models.PositiveIntegerField(default=0)
+    exact_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name = 'Comparison Run'
+        verbose_name_plural = 'Comparison Runs'
+    
+    def __str__(self):
+        return f"{self.original_name or 'Comparison'} ({self.created_at:%Y-%m-%d %H:%M})"
+    
+    def get_absolute_url(self):
+        return reverse('review_comparison', kwargs={'run_id': self.pk})
+    
+    @property
+    def total(self):
+        return self.new_count + self.duplicate_count + self.exact_count
+
+
+class ComparisonResult(models.Model):
+    """One spreadsheet row of a ComparisonRun and what was decided for it."""
+    
+    CATEGORY_CHOICES = [
+        ('new', 'New'),
+        ('duplicate', 'Potential Duplicate'),
+        ('exact', 'Exact Match'),
+    ]
+    
+    DECISION_CHOICES = [
+        ('', 'Undecided'),
+        ('import', 'Imported'),
+        ('merge', 'Merged'),
+        ('skip', 'Skipped'),
+    ]
+    
+    run = models.ForeignKey(ComparisonRun, on_delete=models.CASCADE, related_name='results')
+    row_number = models.PositiveIntegerField()
+    category = models.CharField(max_length=10, choices=CATEGORY_CHOICES)
+    spreadsheet_row = models.JSONField(help_text="Standardized spreadsheet fields")
+    confidence = models.FloatField(default=0, help_text="Best match confidence (0-1)")
+    best_match = models.ForeignKey(
+        Output,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+'
+    )
+    matches = models.JSONField(
+        default=list,
+        blank=True,
+        help_text="Summaries of the matching outputs, best first"
+    )
+    decision = models.CharField(max_length=10, choices=DECISION_CHOICES, blank=True)
+    decided_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        ordering = ['run', 'row_number']
+        indexes = [models.Index(fields=['run', 'category', 'confidence'])]
+        verbose_name = 'Comparison Result'
+        verbose_name_plural = 'Comparison Results'
+    
+    def __str__(self):
+        return f"Row {self.row_number}: {self.spreadsheet_row.get('title', '')[:50]}"
+    
+    @property
+    def confidence_percent(self):
+        return round(self.confidence * 100)
+
+
+class DuplicateSweep(models.Model):
+    """One run of ``manage.py find_duplicate_outputs``."""
+    
+    started_at = models.DateTimeField()
+    finished_at = models.DateTimeField(null=True, blank=True)
+    incremental = models.BooleanField(default=False)
+    outputs_compared = models.PositiveIntegerField(default=0)
+    candidates_found = models.PositiveIntegerField(default=0)
+    
+    class Meta:
+        ordering = ['-started_at']
+        verbose_name = 'Duplicate Sweep'
+        verbose_name_plural = 'Duplicate Sweeps'
+    
+    def __str__(self):
+        kind = 'Incremental' if self.incremental else 'Full'
+        return f"{kind} sweep {self.started_at:%Y-%m-%d %H:%M}"
+
+
+class DuplicateCandidate(models.Model):
+    """
+    A pair of database outputs that look like the same work.
+    
+    ``output_a`` always has the lower id. Candidates linked through a shared
+    output form a cluster, identified by the lowest output id in it.
+    """
+    
+    STATUS_CHOICES = [
+        ('pending', 'Pending Review'),
+        ('duplicate', 'Confirmed Duplicate'),
+        ('distinct', 'Not a Duplicate'),
+    ]
+    
+    output_a = models.ForeignKey(Output, on_delete=models.CASCADE, related_name='+')
+    output_b = models.ForeignKey(Output, on_delete=models.CASCADE, related_name='+')
+    cluster = models.PositiveIntegerField(db_index=True)
+    confidence = models.FloatField(help_text="Match confidence (0-1)")
+    reasons = models.JSONField(default=list, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    reviewed_by = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+'
+    )
+    reviewed_at = models.DateTimeField(null=True, blank=True)
+    found_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        ordering = ['cluster', '-confidence']
+        unique_together = ['output_a', 'output_b']
+        verbose_name = 'Duplicate Candidate'
+        verbose_name_plural = 'Duplicate Candidates'
+    
+    def __str__(self):
+        return f"Output {self.output_a_id} / {self.output_b_id} ({self.confidence:.0%})"
+
 # ============================================================
 # USAGE NOTES:
 # ============================================================
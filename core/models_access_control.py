@@ -128,6 +128,13 @@ class Role(models.Model):
         help_text="Can import data into the system"
     )
     
+    PERMISSION_FIELDS = (
+        'can_view_all_outputs', 'can_view_all_colleagues', 'can_view_all_ratings',
+        'can_edit_any_output', 'can_delete_any_output', 'can_edit_any_rating',
+        'can_create_outputs', 'can_rate_assigned', 'can_unfinalise_ratings',
+        'can_manage_users', 'can_assign_panel', 'can_export_data', 'can_import_data',
+    )
+    
     class Meta:
         verbose_name = "Role"
         verbose_name_plural = "Roles"
@@ -179,6 +186,31 @@ class Role(models.Model):
         }
 
 
+class PermissionSnapshot:
+    """
+    A user's roles and combined permissions, read once from the database.
+    
+    UserProfile builds one on the first role or permission check and
+    answers every later check from it, so a request (which loads its own
+    ``request.user.ref_profile``) costs one roles query however many
+    checks its views and templates make.
+    """
+    
+    def __init__(self, roles):
+        self.roles = list(roles)
+        self.role_codes = frozenset(role.code for role in self.roles)
+        self.permissions = frozenset(
+            name for name in Role.PERMISSION_FIELDS
+            if any(getattr(role, name) for role in self.roles)
+        )
+    
+    def has_role(self, role_code):
+        return role_code in self.role_codes
+    
+    def has_permission(self, permission_name):
+        return permission_name in self.permissions
+
+
 class UserProfile(models.Model):
     """
     Extended user profile with REF-specific roles.
@@ -219,9 +251,31 @@ class UserProfile(models.Model):
         verbose_name_plural = "User Profiles"
     
     def __str__(self):
-        role_list = ", ".join(r.name for r in self.roles.all())
+        role_list = ", ".join(r.name for r in self.permissions.roles)
         return f"{self.user.username} ({role_list or 'No roles'})"
     
+    # ==========================================
+    # Permission snapshot
+    # ==========================================
+    
+    @property
+    def permissions(self):
+        """Roles and combined permissions, loaded with one query and kept on this instance"""
+        snapshot = self.__dict__.get('_permission_snapshot')
+        if snapshot is None:
+            # roles.all() uses prefetched roles when the caller prefetched them
+            snapshot = self._permission_snapshot = PermissionSnapshot(self.roles.all())
+        return snapshot
+    
+    def invalidate_permissions(self):
+        """Drop the snapshot (and prefetched roles) after the roles change"""
+        self.__dict__.pop('_permission_snapshot', None)
+        getattr(self, '_prefetched_objects_cache', {}).pop('roles', None)
+    
+    def refresh_from_db(self, *args, **kwargs):
+        self.invalidate_permissions()
+        super().refresh_from_db(*args, **kwargs)
+    
     # ==========================================
     # Role checking properties
     # ==========================================
@@ -229,39 +283,39 @@ class UserProfile(models.Model):
     @property
     def role_codes(self):
         """Get set of role codes for efficient checking"""
-        return set(self.roles.values_list('code', flat=True))
+        return set(self.permissions.role_codes)
     
     @property
     def is_admin(self):
         """Check if user has Admin role"""
-        return Role.ADMIN in self.role_codes
+        return self.permissions.has_role(Role.ADMIN)
     
     @property
     def is_observer(self):
         """Check if user has Observer role"""
-        return Role.OBSERVER in self.role_codes
+        return self.permissions.has_role(Role.OBSERVER)
     
     @property
     def is_panel_member(self):
         """Check if user has Internal Panel role"""
-        return Role.INTERNAL_PANEL in self.role_codes
+        return self.permissions.has_role(Role.INTERNAL_PANEL)
     
     @property
     def is_colleague(self):
         """Check if user has Colleague role"""
-        return Role.COLLEAGUE in self.role_codes
+        return self.permissions.has_role(Role.COLLEAGUE)
     
     def has_role(self, role_code):
         """Check if user has a specific role"""
-        return role_code in self.role_codes
+        return self.permissions.has_role(role_code)
     
     def has_any_role(self, *role_codes):
         """Check if user has any of the specified roles"""
-        return bool(self.role_codes.intersection(role_codes))
+        return not self.permissions.role_codes.isdisjoint(role_codes)
     
     def has_all_roles(self, *role_codes):
         """Check if user has all of the specified roles"""
-        return set(role_codes).issubset(self.role_codes)
+        return self.permissions.role_codes.issuperset(role_codes)
     
     # ==========================================
     # Combined permission properties
@@ -270,7 +324,7 @@ class UserProfile(models.Model):
     
     def _has_permission(self, permission_name):
         """Check if any of the user's roles grant this permission"""
-        return self.roles.filter(**{permission_name: True}).exists()
+        return self.permissions.has_permission(permission_name)
     
     @property
     def can_view_all_outputs(self):
@@ -348,7 +402,11 @@ class UserProfile(models.Model):
     
     def get_role_display(self):
         """Return comma-separated list of role names"""
-        return ", ".join(r.name for r in self.roles.all()) or "No roles"
+        return ", ".join(r.name for r in self.permissions.roles) or "No roles"
+    
+    # Changing roles through these methods (or any roles.add/remove/set/clear
+    # on this instance) invalidates the permission snapshot, see
+    # invalidate_permission_snapshot below
     
     def add_role(self, role_code):
         """Add a role to this user"""
@@ -360,7 +418,7 @@ class UserProfile(models.Model):
     
     def remove_role(self, role_code):
         """Remove a role from this user"""
-        self.roles.filter(code=role_code).delete()
+        self.roles.remove(role_code)
     
     def set_roles(self, *role_codes):
         """Set user's roles to exactly these roles"""
@@ -527,10 +585,17 @@ class InternalRating(models.Model):
 # Signal handlers for automatic profile creation
 # ==========================================
 
-from django.db.models.signals import post_save
+from django.db.models.signals import m2m_changed, post_save
 from django.dispatch import receiver
 
 
+@receiver(m2m_changed, sender=UserProfile.roles.through)
+def invalidate_permission_snapshot(sender, instance, action, reverse, **kwargs):
+    """Drop the permission snapshot of a profile whose roles changed"""
+    if action.startswith('post_') and not reverse:
+        instance.invalidate_permissions()
+
+
 @receiver(post_save, sender=User)
 def create_user_profile(sender, instance, created, **kwargs):
     """Automatically create a UserProfile when a User is created"""
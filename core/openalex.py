@@ -0,0 +1,535 @@
+"""
+OpenAlex Batch Enrichment
+For REF Manager Django Application
+
+Resolves many DOIs against the OpenAlex API in as few requests as possible.
+DOIs are grouped into ``filter=doi:a|b|c`` batch queries which are run on a
+bounded worker pool over one pooled ``requests.Session``, with retry/backoff
+on transient failures and a polite client-side rate limit.
+
+Results are persisted in the DOIMetadataCache table (with a TTL and
+negative caching of unknown DOIs), and every caller turns raw works into
+form/model fields through the single parse_work() function.
+
+Usage:
+    from core.openalex import OpenAlexEnricher, MetadataLookup, parse_work
+
+    enricher = OpenAlexEnricher()
+    works = enricher.fetch_many(['10.1038/nature12373', '10.1000/xyz'])
+    # works['10.1038/nature12373'] -> raw OpenAlex work dict
+    # works['10.1000/xyz']         -> None (not found in OpenAlex)
+    # DOIs whose batch failed after all retries are absent from the result
+    # and listed in enricher.stats.failed_dois
+
+    # Same, but served from the local cache where possible
+    lookup = MetadataLookup()
+    works = lookup.get_many(dois)
+    metadata = parse_work(works['10.1038/nature12373'])
+"""
+
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import requests
+from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
+from requests.adapters import HTTPAdapter
+
+from .match_keys import normalize_doi
+from .models import DOIMetadataCache
+
+logger = logging.getLogger(__name__)
+
+USER_AGENT = 'REF-Manager/3.1 (University Research Management System)'
+
+# HTTP status codes worth retrying (rate limited / upstream trouble)
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class _RateLimiter:
+    """Thread-safe limiter spacing request starts at least 1/rate seconds apart."""
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate else 0.0
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+
+    def wait(self):
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        delay = slot - now
+        if delay > 0:
+            time.sleep(delay)
+
+
+class EnrichmentStats:
+    """Throughput and latency figures for one enrichment run."""
+
+    def __init__(self):
+        self.dois_requested = 0
+        self.dois_found = 0
+        self.requests_made = 0
+        self.retries = 0
+        self.latencies = []
+        self.failed_dois = set()
+        self.elapsed = 0.0
+        self._lock = threading.Lock()
+
+    def record_request(self, latency):
+        with self._lock:
+            self.requests_made += 1
+            self.latencies.append(latency)
+
+    def record_retry(self):
+        with self._lock:
+            self.retries += 1
+
+    @property
+    def mean_latency(self):
+        """Mean API round-trip time in seconds."""
+        if not self.latencies:
+            return 0.0
+        return sum(self.latencies) / len(self.latencies)
+
+    @property
+    def max_latency(self):
+        return max(self.latencies) if self.latencies else 0.0
+
+    @property
+    def dois_per_second(self):
+        if not self.elapsed:
+            return 0.0
+        return self.dois_requested / self.elapsed
+
+    def summary(self):
+        """Return a one-line, human-readable summary."""
+        return (
+            f"{self.dois_found}/{self.dois_requested} DOIs resolved in "
+            f"{self.elapsed:.2f}s using {self.requests_made} API requests "
+            f"(mean latency {self.mean_latency * 1000:.0f}ms, "
+            f"max {self.max_latency * 1000:.0f}ms, {self.retries} retries)"
+        )
+
+
+class OpenAlexEnricher:
+    """
+    Batch DOI resolver for the OpenAlex ``/works`` endpoint.
+
+    All tuning knobs default to the ``OPENALEX_*`` settings so the API URL
+    can be pointed at a local stand-in server for testing.
+    """
+
+    # OpenAlex accepts up to 100 OR-ed values per filter; 50 keeps URLs short
+    DEFAULT_BATCH_SIZE = 50
+
+    def __init__(self, base_url=None, batch_size=None, max_workers=None,
+                 max_retries=None, backoff=None, rate_limit=None,
+                 timeout=None, mailto=None, session=None):
+        self.base_url = (
+            base_url or getattr(settings, 'OPENALEX_API_URL', 'https://api.openalex.org')
+        ).rstrip('/')
+        self.batch_size = batch_size or getattr(settings, 'OPENALEX_BATCH_SIZE', self.DEFAULT_BATCH_SIZE)
+        self.max_workers = max_workers or getattr(settings, 'OPENALEX_MAX_WORKERS', 4)
+        self.max_retries = (
+            max_retries if max_retries is not None
+            else getattr(settings, 'OPENALEX_MAX_RETRIES', 3)
+        )
+        self.backoff = backoff if backoff is not None else getattr(settings, 'OPENALEX_BACKOFF', 0.5)
+        self.timeout = timeout or getattr(settings, 'OPENALEX_TIMEOUT', 10)
+        self.mailto = mailto if mailto is not None else getattr(settings, 'OPENALEX_MAILTO', '')
+        self.rate_limiter = _RateLimiter(
+            rate_limit if rate_limit is not None else getattr(settings, 'OPENALEX_RATE_LIMIT', 10)
+        )
+        self.session = session or self._build_session()
+        self.stats = EnrichmentStats()
+
+    def _build_session(self):
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.max_workers)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        session.headers['User-Agent'] = USER_AGENT
+        return session
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def fetch_many(self, dois):
+        """
+        Resolve an iterable of DOIs.
+
+        Returns:
+            dict mapping normalized DOI -> raw OpenAlex work (or None when
+            OpenAlex has no record). DOIs whose request failed after all
+            retries are omitted and recorded in ``self.stats.failed_dois``.
+        """
+        self.stats = EnrichmentStats()
+        unique = []
+        seen = set()
+        for doi in dois:
+            doi = normalize_doi(doi)
+            if doi and doi not in seen:
+                seen.add(doi)
+                unique.append(doi)
+
+        self.stats.dois_requested = len(unique)
+        if not unique:
+            return {}
+
+        # ',' and '|' are filter syntax, so such DOIs are looked up one by one
+        batchable = [d for d in unique if ',' not in d and '|' not in d]
+        singles = [d for d in unique if ',' in d or '|' in d]
+
+        jobs = [
+            (self._fetch_batch, batchable[i:i + self.batch_size])
+            for i in range(0, len(batchable), self.batch_size)
+        ]
+        jobs += [(self._fetch_single, [doi]) for doi in singles]
+
+        results = {}
+        started = time.monotonic()
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            futures = {pool.submit(func, chunk): chunk for func, chunk in jobs}
+            for future in as_completed(futures):
+                chunk = futures[future]
+                try:
+                    results.update(future.result())
+                except requests.RequestException as e:
+                    logger.warning("OpenAlex lookup failed for %d DOIs: %s", len(chunk), e)
+                    self.stats.failed_dois.update(chunk)
+        self.stats.elapsed = time.monotonic() - started
+        self.stats.dois_found = sum(1 for work in results.values() if work)
+
+        logger.info("OpenAlex enrichment: %s", self.stats.summary())
+        return results
+
+    def fetch_one(self, doi):
+        """Resolve a single DOI; returns the raw work dict or None."""
+        doi = normalize_doi(doi)
+        if not doi:
+            return None
+        return self._fetch_single([doi]).get(doi)
+
+    # ------------------------------------------------------------------
+    # Request helpers
+    # ------------------------------------------------------------------
+
+    def _fetch_batch(self, chunk):
+        params = {
+            'filter': 'doi:' + '|'.join(chunk),
+            'per-page': len(chunk),
+        }
+        response = self._get(f"{self.base_url}/works", params)
+        response.raise_for_status()
+
+        results = {doi: None for doi in chunk}
+        for work in response.json().get('results', []):
+            doi = normalize_doi(work.get('doi'))
+            if doi in results:
+                results[doi] = work
+        return results
+
+    def _fetch_single(self, chunk):
+        doi = chunk[0]
+        response = self._get(f"{self.base_url}/works/doi:{doi}", {})
+        if response.status_code == 404:
+            return {doi: None}
+        response.raise_for_status()
+        return {doi: response.json()}
+
+    def _get(self, url, params):
+        """GET with rate limiting and exponential backoff on transient errors."""
+        if self.mailto:
+            params = dict(params, mailto=self.mailto)
+
+        attempt = 0
+        while True:
+            self.rate_limiter.wait()
+            started = time.monotonic()
+            try:
+                response = self.session.get(url, params=params, timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout):
+                self.stats.record_request(time.monotonic() - started)
+                if attempt >= self.max_retries:
+                    raise
+                delay = self.backoff * (2 ** attempt)
+            else:
+                self.stats.record_request(time.monotonic() - started)
+                if response.status_code not in RETRY_STATUS_CODES or attempt >= self.max_retries:
+                    return response
+                delay = self._retry_after(response) or self.backoff * (2 ** attempt)
+
+            attempt += 1
+            self.stats.record_retry()
+            time.sleep(delay)
+
+    @staticmethod
+    def _retry_after(response):
+        try:
+            return float(response.headers.get('Retry-After', ''))
+        except ValueError:
+            return None
+
+
+class MetadataLookup:
+    """
+    DOI -> OpenAlex work lookup backed by the DOIMetadataCache table.
+
+    Fresh cache entries (including negative ones) are served locally; only
+    missing or expired DOIs go to the API, in one batched enrichment run.
+    ``hits`` and ``misses`` count what happened during this lookup's life.
+    """
+
+    def __init__(self, enricher=None):
+        self.enricher = enricher or OpenAlexEnricher()
+        self.hits = 0
+        self.misses = 0
+
+    def get_many(self, dois):
+        """
+        Resolve an iterable of DOIs.
+
+        Returns the same shape as OpenAlexEnricher.fetch_many: normalized
+        DOI -> work (or None if unknown); DOIs that could not be fetched
+        are omitted.
+        """
+        wanted = {normalize_doi(doi) for doi in dois}
+        wanted.discard('')
+        if not wanted:
+            return {}
+
+        now = timezone.now()
+        results = {}
+        entries = {}
+        for chunk in _chunks(sorted(wanted), 500):
+            for entry in DOIMetadataCache.objects.filter(doi__in=chunk):
+                entries[entry.doi] = entry
+
+        fresh = {doi: entry for doi, entry in entries.items() if entry.is_fresh(now)}
+        for doi, entry in fresh.items():
+            results[doi] = entry.data if entry.found else None
+        if fresh:
+            DOIMetadataCache.objects.filter(
+                pk__in=[entry.pk for entry in fresh.values()]
+            ).update(hit_count=F('hit_count') + 1)
+        self.hits += len(fresh)
+
+        to_fetch = wanted - set(fresh)
+        if to_fetch:
+            self.misses += len(to_fetch)
+            fetched = self.enricher.fetch_many(to_fetch)
+            self._store(fetched, entries, now)
+            results.update(fetched)
+
+        return results
+
+    def get(self, doi):
+        """
+        Resolve a single DOI; returns the raw work or None if unknown.
+
+        Network and HTTP errors from the API are propagated to the caller.
+        """
+        doi = normalize_doi(doi)
+        if not doi:
+            return None
+
+        entry = DOIMetadataCache.objects.filter(doi=doi).first()
+        if entry and entry.is_fresh():
+            DOIMetadataCache.objects.filter(pk=entry.pk).update(hit_count=F('hit_count') + 1)
+            self.hits += 1
+            return entry.data if entry.found else None
+
+        self.misses += 1
+        work = self.enricher.fetch_one(doi)
+        self._store({doi: work}, {doi: entry} if entry else {}, timezone.now())
+        return work
+
+    @staticmethod
+    def _store(fetched, existing, now):
+        """Insert new cache entries and refresh expired ones."""
+        to_create = []
+        to_update = []
+        for doi, work in fetched.items():
+            entry = existing.get(doi)
+            if entry is None:
+                to_create.append(DOIMetadataCache(
+                    doi=doi, data=work, found=work is not None, fetched_at=now, miss_count=1,
+                ))
+            else:
+                entry.data = work
+                entry.found = work is not None
+                entry.fetched_at = now
+                entry.miss_count += 1
+                to_update.append(entry)
+
+        # ignore_conflicts: a concurrent import may have cached the same DOI
+        DOIMetadataCache.objects.bulk_create(to_create, batch_size=500, ignore_conflicts=True)
+        DOIMetadataCache.objects.bulk_update(
+            to_update, ['data', 'found', 'fetched_at', 'miss_count'], batch_size=500
+        )
+
+
+def _chunks(items, size):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+# ----------------------------------------------------------------------
+# Parsing: raw OpenAlex work -> REF-Manager output fields
+# ----------------------------------------------------------------------
+
+def parse_work(data):
+    """
+    Convert a raw OpenAlex work into REF-Manager output fields.
+
+    This is the only place OpenAlex payloads are interpreted; the DOI
+    lookup endpoint and the bulk importers both go through it.
+    """
+    biblio = data.get('biblio') or {}
+    open_access = data.get('open_access') or {}
+    doi = normalize_doi(data.get('doi'))
+
+    return {
+        'title': data.get('title', '') or '',
+        'publication_year': data.get('publication_year'),
+        'publication_venue': _extract_venue(data),
+        'volume': biblio.get('volume', '') or '',
+        'issue': biblio.get('issue', '') or '',
+        'pages': _format_pages(biblio),
+        'all_authors': _format_authors(data.get('authorships', [])),
+        'citation_count': data.get('cited_by_count', 0) or 0,
+        'is_oa': open_access.get('is_oa', False),
+        'oa_status': _map_oa_status(open_access.get('oa_status')),
+        'doi_url': f"https://doi.org/{doi}" if doi else '',
+        'publication_type': _map_publication_type(data.get('type')),
+        'abstract': data.get('abstract', '') or '',
+        'keywords': _extract_keywords(data),
+    }
+
+
+def _extract_venue(data):
+    """Extract publication venue from OpenAlex data."""
+    # Try primary location first
+    primary = data.get('primary_location', {})
+    if primary:
+        source = primary.get('source', {})
+        if source:
+            return source.get('display_name', '')[:200]
+    
+    # Fallback to locations array
+    locations = data.get('locations', [])
+    for loc in locations:
+        source = loc.get('source', {})
+        if source and source.get('display_name'):
+            return source.get('display_name', '')[:200]
+    
+    return ''
+
+
+def _format_pages(biblio):
+    """Format page range from OpenAlex biblio data."""
+    first = biblio.get('first_page', '') or ''
+    last = biblio.get('last_page', '') or ''
+    
+    if first and last and first != last:
+        return f"{first}-{last}"
+    elif first:
+        return first
+    return ''
+
+
+def _format_authors(authorships):
+    """
+    Format author list from OpenAlex authorships.
+    
+    Returns comma-separated list of author names, truncated to 500 chars.
+    """
+    if not authorships:
+        return ''
+    
+    names = []
+    for authorship in authorships:
+        author = authorship.get('author', {})
+        name = author.get('display_name', '')
+        if name:
+            names.append(name)
+    
+    result = ", ".join(names)
+    
+    # Truncate if too long
+    if len(result) > 500:
+        result = result[:497] + "..."
+    
+    return result
+
+
+def _map_oa_status(api_status):
+    """
+    Map OpenAlex OA status to REF-Manager OA status choices.
+    
+    OpenAlex uses: gold, green, hybrid, bronze, closed
+    Our model uses: gold, green, hybrid, bronze, closed, non_compliant
+    """
+    if not api_status:
+        return 'closed'
+    
+    mapping = {
+        'gold': 'gold',
+        'green': 'green',
+        'hybrid': 'hybrid',
+        'bronze': 'bronze',
+        'closed': 'closed',
+    }
+    return mapping.get(api_status.lower(), 'closed')
+
+
+def _map_publication_type(api_type):
+    """
+    Map OpenAlex work type to REF-Manager publication_type choices.
+    
+    OpenAlex types: journal-article, book-chapter, book, proceedings-article, etc.
+    Our model uses: A, B, C, D, E, F, G, H
+    """
+    if not api_type:
+        return 'H'  # Other
+    
+    mapping = {
+        'journal-article': 'A',
+        'article': 'A',
+        'book-chapter': 'C',
+        'book': 'B',
+        'edited-book': 'B',
+        'monograph': 'B',
+        'proceedings-article': 'D',
+        'proceedings': 'D',
+        'dissertation': 'H',
+        'report': 'H',
+        'dataset': 'H',
+        'preprint': 'H',
+    }
+    return mapping.get(api_type.lower(), 'H')
+
+
+def _extract_keywords(data):
+    """Extract keywords/concepts from OpenAlex data."""
+    concepts = data.get('concepts', [])
+    if not concepts:
+        return ''
+    
+    # Get top 5 concepts by score
+    sorted_concepts = sorted(
+        concepts,
+        key=lambda x: x.get('score', 0),
+        reverse=True
+    )[:5]
+    
+    keywords = [c.get('display_name', '') for c in sorted_concepts if c.get('display_name')]
+    return ", ".join(keywords)
@@ -6,43 +6,103 @@ This module provides advanced comparison between spreadsheet data and
 database outputs with fuzzy matching and interactive review.
 """
 
-from difflib import SequenceMatcher
-from django.db.models import Q
-from django.utils.dateparse import parse_date
-from datetime import timedelta
+from collections import Counter, defaultdict
 import re
 
+from django.db.models import QuerySet
+
+from .match_keys import author_surnames, normalize_doi, normalize_title, title_words
+from .title_similarity import get_title_scorer
+
 
 class OutputComparator:
     """
     Compare spreadsheet outputs against database with intelligent matching.
+    
+    Indexes over the database outputs are built once, at construction, from
+    their stored match keys (see match_keys.py): a DOI map, an inverted index
+    of author surnames and one of title words. A row
+    is only scored against outputs that share a surname or enough title words
+    with it; nothing else can reach the minimum confidence (a close date alone
+    is worth at most 0.2). Each pair's signals are computed once and used for
+    both the confidence and the match reasons.
     """
     
     # Thresholds for similarity matching
     TITLE_SIMILARITY_THRESHOLD = 0.85  # 85% similar titles
     AUTHOR_OVERLAP_THRESHOLD = 0.5     # 50% author overlap
-    DATE_PROXIMITY_DAYS = 180          # Within 6 months
+    MIN_CONFIDENCE = 0.3
     
-    def __init__(self, outputs_queryset):
+    def __init__(self, outputs_queryset, title_backend=None):
         """
         Initialize with existing outputs from database.
         
         Args:
-            outputs_queryset: Django QuerySet of Output objects
+            outputs_queryset: Django QuerySet of Output objects. Only their
+                stored match keys are loaded up front; the outputs that end
+                up in the results are fetched from it afterwards. A list of
+                Output instances is accepted as well.
+            title_backend: Title similarity backend, 'sequence' or 'ngram'
+                (see title_similarity.py); defaults to the
+                OUTPUT_TITLE_SIMILARITY setting.
         """
-        self.db_outputs = list(outputs_queryset)
+        self.outputs_queryset = outputs_queryset
         self.results = {
             'new': [],           # Completely new outputs
             'duplicates': [],    # Potential duplicates with matches
             'exact': [],         # Exact matches (skip)
         }
-        
+        self._unresolved = []    # (result dict, key) holding an output pk
+        self.title_scorer = get_title_scorer(self.TITLE_SIMILARITY_THRESHOLD, title_backend)
+        self._build_indexes()
+    
+    def _iter_match_keys(self):
+        """Yield (pk, doi, title, surnames, year) for each output."""
+        outputs = self.outputs_queryset
+        if isinstance(outputs, QuerySet):
+            yield from outputs.values_list(
+                'pk', 'doi_normalized', 'title_normalized', 'author_surnames', 'publication_year'
+            ).iterator(chunk_size=2000)
+            return
+        
+        self._instances = {}
+        for output in outputs:
+            output.update_match_keys()
+            self._instances[output.pk] = output
+            yield (output.pk, output.doi_normalized, output.title_normalized,
+                   output.author_surnames, output.publication_year)
+    
+    def _build_indexes(self):
+        """Index the database outputs by DOI, surname and title word."""
+        self._by_doi = defaultdict(list)
+        self._by_surname = defaultdict(list)
+        self._by_title_word = defaultdict(list)
+        self._pks = []
+        self._keys = []     # per output: (surname count, year)
+        self._surnames = [] # per output: surname list, for find_internal_duplicates
+        
+        for position, (pk, doi, title, surnames, year) in enumerate(self._iter_match_keys()):
+            if doi:
+                self._by_doi[doi].append(position)
+            
+            for word in title_words(title):
+                self._by_title_word[word].append(position)
+            
+            surnames = surnames.split()
+            for surname in surnames:
+                self._by_surname[surname].append(position)
+            
+            self._pks.append(pk)
+            self._keys.append((len(surnames), year))
+            self._surnames.append(surnames)
+            self.title_scorer.add(title)
+    
     def compare_spreadsheet(self, spreadsheet_rows):
         """
         Compare each row from spreadsheet against database.
         
         Args:
-            spreadsheet_rows: List of dicts with keys: 
+            spreadsheet_rows: Iterable of dicts with keys: 
                 'title', 'all_authors', 'doi', 'publication_date', etc.
         
         Returns:
@@ -51,20 +111,34 @@ class OutputComparator:
         for row in spreadsheet_rows:
             self._process_row(row)
         
+        self._resolve_outputs()
         return self.results
     
+    def _resolve_outputs(self):
+        """Replace the output pks recorded in the results with Output objects."""
+        pks = {item[key] for item, key in self._unresolved}
+        if isinstance(self.outputs_queryset, QuerySet):
+            outputs = self.outputs_queryset.in_bulk(pks)
+        else:
+            outputs = self._instances
+        for item, key in self._unresolved:
+            item[key] = outputs[item[key]]
+        self._unresolved = []
+    
     def _process_row(self, row):
         """Process a single spreadsheet row."""
         # First check for exact DOI match (most reliable)
         if row.get('doi'):
             doi_match = self._find_doi_match(row['doi'])
             if doi_match:
-                self.results['exact'].append({
+                exact = {
                     'spreadsheet_row': row,
                     'database_match': doi_match,
                     'match_type': 'doi',
                     'confidence': 1.0
-                })
+                }
+                self.results['exact'].append(exact)
+                self._unresolved.append((exact, 'database_match'))
                 return
         
         # Check for potential duplicates using multiple criteria
@@ -82,17 +156,9 @@ class OutputComparator:
             })
     
     def _find_doi_match(self, doi):
-        """Find exact DOI match in database."""
-        if not doi:
-            return None
-        
-        # Clean DOI
-        doi_clean = doi.strip().lower()
-        
-        for output in self.db_outputs:
-            if output.doi and output.doi.strip().lower() == doi_clean:
-                return output
-        return None
+        """Find exact DOI match in database; returns the output's pk."""
+        positions = self._by_doi.get(normalize_doi(doi))
+        return self._pks[positions[0]] if positions else None
     
     def _find_potential_matches(self, row):
         """
@@ -100,207 +166,181 @@ class OutputComparator:
         
         Returns sorted list of matches with confidence scores.
         """
-        matches = []
+        title = self._normalize_title(row.get('title', ''))
+        surnames = author_surnames(row.get('all_authors', ''))
+        year = self._year_of(row.get('publication_date'))
         
-        for db_output in self.db_outputs:
-            confidence = self._calculate_match_confidence(row, db_output)
-            
-            if confidence > 0:
-                matches.append({
-                    'output': db_output,
-                    'confidence': confidence,
-                    'match_reasons': self._get_match_reasons(row, db_output, confidence)
-                })
+        matches = []
+        for position, confidence, signals in self._score_candidates(title, surnames, year):
+            match = {
+                'output': self._pks[position],
+                'confidence': confidence,
+                'match_reasons': self._get_match_reasons(signals)
+            }
+            matches.append(match)
+            self._unresolved.append((match, 'output'))
         
         # Sort by confidence (highest first)
         matches.sort(key=lambda x: x['confidence'], reverse=True)
+        return matches
+    
+    def _score_candidates(self, title, surnames, year, after=-1):
+        """
+        Yield (position, confidence, signals) for the indexed outputs that
+        reach MIN_CONFIDENCE against a normalized title, surname set and year.
+        Only outputs at positions greater than ``after`` are considered.
+        """
+        shared_surnames = Counter()
+        for surname in surnames:
+            shared_surnames.update(self._by_surname.get(surname, ()))
+        
+        # Similar titles share most of their words; ignore single common words
+        shared_words = Counter()
+        words = title_words(title)
+        for word in words:
+            shared_words.update(self._by_title_word.get(word, ()))
+        min_shared_words = max(1, len(words) // 2)
+        
+        title_candidates = {
+            position for position, count in shared_words.items()
+            if count >= min_shared_words and position > after
+        }
+        # Shared surnames / larger surname count, as for the author overlap
+        author_overlaps = {
+            position: count / max(len(surnames), self._keys[position][0])
+            for position, count in shared_surnames.items() if position > after
+        }
+        author_candidates = {
+            position for position, overlap in author_overlaps.items()
+            if overlap > self.AUTHOR_OVERLAP_THRESHOLD
+        }
+        
+        title_scores = self.title_scorer.similarities(title, title_candidates) if title else {}
         
-        # Only return matches above a minimum threshold
-        return [m for m in matches if m['confidence'] >= 0.3]
+        for position in sorted(title_candidates | author_candidates):
+            _, db_year = self._keys[position]
+            signals = {
+                'title_similarity': title_scores.get(position, 0.0),
+                'author_overlap': author_overlaps.get(position, 0.0),
+                'date_proximity': 1.0 if year and year == db_year else 0.0,
+            }
+            confidence = self._calculate_match_confidence(signals)
+            
+            if confidence >= self.MIN_CONFIDENCE:
+                yield position, confidence, signals
+    
+    def find_internal_duplicates(self, pks=None):
+        """
+        Find duplicates among the indexed outputs themselves.
+        
+        Args:
+            pks: Only look for duplicates of these outputs (compared against
+                all indexed outputs). By default every output is checked.
+        
+        Returns:
+            dict {(lower pk, higher pk): (confidence, reasons)}; outputs
+            sharing a DOI have confidence 1.0.
+        """
+        positions = range(len(self._pks))
+        if pks is not None:
+            pks = set(pks)
+            positions = [position for position in positions if self._pks[position] in pks]
+        
+        pairs = {}
+        
+        def add(position, other, confidence, reasons):
+            a, b = sorted((self._pks[position], self._pks[other]))
+            if (a, b) not in pairs or pairs[(a, b)][0] < confidence:
+                pairs[(a, b)] = (confidence, reasons)
+        
+        for doi_positions in self._by_doi.values():
+            if len(doi_positions) > 1:
+                for position in doi_positions:
+                    for other in doi_positions:
+                        if other != position and (pks is None or self._pks[position] in pks):
+                            add(position, other, 1.0, ['Same DOI'])
+        
+        titles = self.title_scorer.titles
+        for position in positions:
+            # A full sweep scores each pair once, from its first output
+            candidates = self._score_candidates(
+                titles[position], set(self._surnames[position]), self._keys[position][1],
+                after=position if pks is None else -1,
+            )
+            for other, confidence, signals in candidates:
+                if other != position:
+                    add(position, other, confidence, self._get_match_reasons(signals))
+        return pairs
     
-    def _calculate_match_confidence(self, row, db_output):
+    def _calculate_match_confidence(self, signals):
         """
-        Calculate confidence score (0-1) that row matches db_output.
+        Calculate confidence score (0-1) from a pair's signals.
         
         Uses multiple signals:
         - Title similarity (weighted 0.5)
         - Author overlap (weighted 0.3)  
-        - Date proximity (weighted 0.2)
+        - Date proximity (weighted 0.2); outputs only store a year, so
+          this is 1.0 for the same publication year
         """
         confidence = 0.0
         
-        # Title similarity
-        title_sim = self._string_similarity(
-            self._normalize_title(row.get('title', '')),
-            self._normalize_title(db_output.title)
-        )
-        if title_sim > self.TITLE_SIMILARITY_THRESHOLD:
-            confidence += title_sim * 0.5
+        if signals['title_similarity'] > self.TITLE_SIMILARITY_THRESHOLD:
+            confidence += signals['title_similarity'] * 0.5
         
-        # Author overlap
-        author_overlap = self._calculate_author_overlap(
-            row.get('all_authors', ''),
-            db_output.all_authors
-        )
-        if author_overlap > self.AUTHOR_OVERLAP_THRESHOLD:
-            confidence += author_overlap * 0.3
+        if signals['author_overlap'] > self.AUTHOR_OVERLAP_THRESHOLD:
+            confidence += signals['author_overlap'] * 0.3
         
-        # Date proximity
-        date_proximity = self._calculate_date_proximity(
-            row.get('publication_date'),
-            db_output.publication_date
-        )
-        if date_proximity > 0:
-            confidence += date_proximity * 0.2
+        if signals['date_proximity'] > 0:
+            confidence += signals['date_proximity'] * 0.2
         
         return confidence
     
-    def _get_match_reasons(self, row, db_output, confidence):
+    def _get_match_reasons(self, signals):
         """Get human-readable reasons why this is a potential match."""
         reasons = []
         
-        title_sim = self._string_similarity(
-            self._normalize_title(row.get('title', '')),
-            self._normalize_title(db_output.title)
-        )
+        title_sim = signals['title_similarity']
         if title_sim > self.TITLE_SIMILARITY_THRESHOLD:
             reasons.append(f"Title {int(title_sim*100)}% similar")
         
-        author_overlap = self._calculate_author_overlap(
-            row.get('all_authors', ''),
-            db_output.all_authors
-        )
+        author_overlap = signals['author_overlap']
         if author_overlap > self.AUTHOR_OVERLAP_THRESHOLD:
             reasons.append(f"{int(author_overlap*100)}% author overlap")
         
-        date_proximity = self._calculate_date_proximity(
-            row.get('publication_date'),
-            db_output.publication_date
-        )
-        if date_proximity > 0.5:
+        if signals['date_proximity'] > 0.5:
             reasons.append("Similar publication date")
         
         return reasons
     
     @staticmethod
-    def _string_similarity(str1, str2):
-        """Calculate similarity ratio between two strings (0-1)."""
-        if not str1 or not str2:
-            return 0.0
-        return SequenceMatcher(None, str1, str2).ratio()
+    def _year_of(value):
+        """Publication year of a date or of the first four-digit number in a string, or None."""
+        if not value:
+            return None
+        if hasattr(value, 'year'):
+            return value.year
+        match = re.search(r'\b(\d{4})\b', str(value))
+        return int(match.group(1)) if match else None
     
     @staticmethod
     def _normalize_title(title):
         """Normalize title for comparison."""
-        if not title:
-            return ""
-        
-        # Lowercase, remove punctuation, extra spaces
-        title = title.lower()
-        title = re.sub(r'[^\w\s]', '', title)
-        title = re.sub(r'\s+', ' ', title)
-        return title.strip()
-    
-    def _calculate_author_overlap(self, authors1, authors2):
-        """
-        Calculate overlap between two author lists.
-        
-        Returns ratio (0-1) of overlapping authors.
-        """
-        if not authors1 or not authors2:
-            return 0.0
-        
-        # Split and normalize author names
-        list1 = self._parse_authors(authors1)
-        list2 = self._parse_authors(authors2)
-        
-        if not list1 or not list2:
-            return 0.0
-        
-        # Find overlapping surnames (most reliable part)
-        surnames1 = {self._get_surname(a) for a in list1}
-        surnames2 = {self._get_surname(a) for a in list2}
-        
-        overlap = len(surnames1 & surnames2)
-        total = max(len(surnames1), len(surnames2))
-        
-        return overlap / total if total > 0 else 0.0
-    
-    @staticmethod
-    def _parse_authors(authors_string):
-        """Parse author string into list of individual authors."""
-        if not authors_string:
-            return []
-        
-        # Handle different separators
-        authors = authors_string.replace('//', ';').replace(';;', ';')
-        authors = [a.strip() for a in authors.split(';') if a.strip()]
-        
-        return authors
-    
-    @staticmethod
-    def _get_surname(full_name):
-        """Extract and normalize surname from full name."""
-        if not full_name:
-            return ""
-        
-        # Typically last word is surname
-        parts = full_name.strip().split()
-        surname = parts[-1] if parts else ""
-        
-        # Normalize
-        surname = surname.lower().strip('.,')
-        return surname
-    
-    def _calculate_date_proximity(self, date1, date2):
-        """
-        Calculate how close two dates are.
-        
-        Returns 1.0 if same date, decreasing to 0 as dates diverge.
-        """
-        if not date1 or not date2:
-            return 0.0
-        
-        # Parse if string
-        if isinstance(date1, str):
-            date1 = parse_date(date1)
-        if isinstance(date2, str):
-            date2 = parse_date(date2)
-        
-        if not date1 or not date2:
-            return 0.0
-        
-        # Calculate days difference
-        days_diff = abs((date1 - date2).days)
-        
-        if days_diff == 0:
-            return 1.0
-        elif days_diff <= self.DATE_PROXIMITY_DAYS:
-            # Linear decay from 1.0 to 0.0 over DATE_PROXIMITY_DAYS
-            return 1.0 - (days_diff / self.DATE_PROXIMITY_DAYS)
-        else:
-            return 0.0
+        return normalize_title(title)
 
 
 def parse_csv_to_dict(csv_file):
     """
-    Parse uploaded CSV file into list of dictionaries.
+    Parse uploaded CSV file into dictionaries, streaming it row by row.
     
     Args:
         csv_file: Django UploadedFile object
     
-    Returns:
-        List of dicts with standardized keys
+    Yields:
+        Dicts with standardized keys
     """
-    import csv
-    import io
+    from .csv_stream import iter_csv_rows
     
-    # Decode file
-    csv_text = csv_file.read().decode('utf-8')
-    csv_reader = csv.DictReader(io.StringIO(csv_text))
-    
-    rows = []
-    for row in csv_reader:
+    for row in iter_csv_rows(csv_file):
         # Standardize keys (handle different CSV formats)
         standardized = {
             'title': row.get('title') or row.get('Title') or row.get('Proposed_Title', ''),
@@ -311,6 +351,4 @@ def parse_csv_to_dict(csv_file):
             'publication_type': row.get('publication_type') or row.get('Type') or row.get('Publication_Type', ''),
             'raw_row': row  # Keep original data
         }
-        rows.append(standardized)
-    
-    return rows
+        yield standardized
@@ -0,0 +1,136 @@
+"""
+Live "possible duplicate" lookup for the output form.
+
+``find_similar_outputs`` is called as the user types a title or DOI, so
+it only runs indexed or narrow queries over the stored match keys (see
+match_keys.py):
+
+- the normalized DOI, and the normalized title and title fingerprint,
+  are equality lookups on indexed columns;
+- similar titles come from a small candidate set: the outputs whose
+  title best matches the longest words typed so far, from the full-text
+  index (output_search.py; at most ``CANDIDATE_LIMIT``), rescored in
+  Python by trigram cosine similarity.
+
+Each candidate query is cached in the process (the ``local`` cache) for
+``OUTPUT_LOOKUP_CACHE_TTL`` seconds under its normalized key. While a title is being typed the longest words
+rarely change, so a burst of keystrokes is served from the cache and only
+rescored. Candidates are shared by all users; the results are restricted
+to the outputs the caller may see afterwards.
+
+``wants_lookup`` and ``throttled`` let the endpoint skip input too short
+to look up and lookups closer together than
+``OUTPUT_LOOKUP_MIN_INTERVAL_MS``, whatever the client's own debounce.
+"""
+
+import hashlib
+import re
+import time
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.db.models import Q
+
+from .match_keys import normalize_doi, normalize_title, title_fingerprint, title_words
+from .models import Output
+from .output_search import search_outputs
+from .title_similarity import NgramCosineScorer
+
+MIN_TITLE_LENGTH = 10       # normalized characters before titles are looked up
+SEARCH_WORDS = 2            # longest title words used to find candidates
+MIN_SEARCH_WORD_LENGTH = 4
+CANDIDATE_LIMIT = 200
+MIN_SIMILARITY = 0.5        # lower than the comparator's: titles may be half typed
+DOI_PATTERN = re.compile(r'^10\.\d{4,9}/\S+$')  # a complete DOI, after normalize_doi
+
+
+def _cached(kind, key, query):
+    """Run ``query()`` (returning a list) at most once per TTL for ``kind``/``key``."""
+    digest = hashlib.sha1(key.encode('utf-8')).hexdigest()
+    cache_key = f'output-lookup:{kind}:{digest}'
+    local = caches['local']
+    result = local.get(cache_key)
+    if result is None:
+        result = query()
+        local.set(cache_key, result, getattr(settings, 'OUTPUT_LOOKUP_CACHE_TTL', 60))
+    return result
+
+
+def wants_lookup(title='', doi=''):
+    """Whether ``title`` / ``doi`` are complete enough to look up."""
+    return len(normalize_title(title)) >= MIN_TITLE_LENGTH or bool(DOI_PATTERN.match(normalize_doi(doi)))
+
+
+def throttled(user_id):
+    """
+    True if ``user_id`` looked up less than ``OUTPUT_LOOKUP_MIN_INTERVAL_MS``
+    ago; otherwise record this lookup and return False. Kept in the shared
+    default cache, so it holds across workers.
+    """
+    interval = getattr(settings, 'OUTPUT_LOOKUP_MIN_INTERVAL_MS', 200) / 1000
+    cache_key = f'output-lookup:user:{user_id}'
+    now = time.time()
+    last = cache.get(cache_key)
+    if last is not None and now - last < interval:
+        return True
+    cache.set(cache_key, now, max(1, int(interval) + 1))
+    return False
+
+
+def find_similar_outputs(title='', doi='', exclude_pk=None, limit=5, queryset=None):
+    """
+    Return up to ``limit`` outputs of ``queryset`` (all outputs by default;
+    pass ``Output.objects.visible_to(profile)`` for a user) resembling
+    ``title`` / ``doi``, best first, as dicts with ``output``,
+    ``similarity`` (0-1) and ``reason``.
+    """
+    if queryset is None:
+        queryset = Output.objects.all()
+    scores = {}  # pk -> (similarity, reason)
+
+    doi = normalize_doi(doi)
+    if DOI_PATTERN.match(doi):
+        pks = _cached('doi', doi, lambda: list(
+            Output.objects.filter(doi_normalized=doi).values_list('pk', flat=True)[:CANDIDATE_LIMIT]
+        ))
+        for pk in pks:
+            scores[pk] = (1.0, 'Same DOI')
+
+    title = normalize_title(title)
+    if len(title) >= MIN_TITLE_LENGTH:
+        fingerprint = title_fingerprint(title)
+        exact = _cached('title', title, lambda: list(
+            Output.objects.filter(
+                Q(title_normalized=title) | Q(title_fingerprint=fingerprint)
+            ).values_list('pk', flat=True)[:CANDIDATE_LIMIT]
+        ))
+        for pk in exact:
+            scores.setdefault(pk, (1.0, 'Same title'))
+
+        words = sorted(
+            (word for word in title_words(title) if len(word) >= MIN_SEARCH_WORD_LENGTH),
+            key=lambda word: (-len(word), word),
+        )[:SEARCH_WORDS]
+        if words:
+            candidates = _cached('words', ' '.join(sorted(words)), lambda: list(
+                search_outputs(Output.objects.all(), ' '.join(words), columns=('title',))
+                .order_by('-search_rank', 'pk').values_list('pk', 'title_normalized')[:CANDIDATE_LIMIT]
+            ))
+            scorer = NgramCosineScorer(MIN_SIMILARITY)
+            vector = scorer.vector(title)
+            for pk, candidate in candidates:
+                if pk in scores:
+                    continue
+                similarity = scorer.cosine(vector, scorer.vector(candidate))
+                if similarity >= MIN_SIMILARITY:
+                    scores[pk] = (similarity, f'Title {int(similarity * 100)}% similar')
+
+    # Candidates are for all users: limit only after restricting them to ``queryset``
+    scores.pop(exclude_pk, None)
+    ranked = sorted(scores.items(), key=lambda item: (-item[1][0], item[0]))
+    outputs = queryset.select_related('colleague__user').in_bulk([pk for pk, _ in ranked])
+    return [
+        {'output': outputs[pk], 'similarity': similarity, 'reason': reason}
+        for pk, (similarity, reason) in ranked
+        if pk in outputs
+    ][:limit]
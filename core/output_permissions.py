@@ -0,0 +1,81 @@
+"""
+Permission bitmaps for lists of outputs.
+
+List templates check several permissions per row through the
+``ref_permissions`` filters (``can_view``, ``can_edit``, ``can_rate``,
+``output_actions``...), each of which may query the database.
+``attach_permissions`` evaluates all of them for a page of outputs at
+once - ``OutputQuerySet.with_permissions`` restricted to the page's ids,
+so ownership, co-authorship, panel assignment and the user's own rating
+come from one query - and stores them on each output as an int,
+``permission_bits``. ``OutputQuerySet.permission``, and so the filters,
+answer from the bitmap when it was attached for the same profile.
+
+This module must not import models: models.py reads the flags.
+"""
+
+CAN_VIEW = 1 << 0
+CAN_EDIT = 1 << 1
+CAN_DELETE = 1 << 2
+CAN_RATE = 1 << 3
+IS_OWNER = 1 << 4
+IS_ASSIGNED = 1 << 5
+HAS_RATED = 1 << 6
+
+# OutputQuerySet.PERMISSION_ANNOTATIONS name -> bit
+PERMISSION_FLAGS = {
+    'can_view': CAN_VIEW,
+    'can_edit': CAN_EDIT,
+    'can_delete': CAN_DELETE,
+    'can_rate': CAN_RATE,
+    'is_owner': IS_OWNER,
+    'is_assigned': IS_ASSIGNED,
+    'has_rated': HAS_RATED,
+}
+
+BATCH_SIZE = 500
+
+
+def pack_permissions(values):
+    """Bitmap of the PERMISSION_FLAGS names whose value is true."""
+    bits = 0
+    for name, flag in PERMISSION_FLAGS.items():
+        if values.get(name):
+            bits |= flag
+    return bits
+
+
+def permission_bit(output, profile, name):
+    """
+    The ``name`` permission from ``output``'s bitmap, or None if no bitmap
+    was attached for ``profile``.
+    """
+    if getattr(output, 'permission_bits_profile_id', None) != profile.pk:
+        return None
+    return bool(output.permission_bits & PERMISSION_FLAGS[name])
+
+
+def attach_permissions(outputs, profile):
+    """
+    Set ``permission_bits`` on each of ``outputs`` (a list, page or
+    queryset) for ``profile``, and return them as a list.
+    """
+    from .models import Output
+
+    outputs = list(outputs)
+    if not profile:
+        return outputs
+    names = list(PERMISSION_FLAGS)
+    ids = [output.pk for output in outputs]
+    bits = {}
+    for start in range(0, len(ids), BATCH_SIZE):
+        rows = (
+            Output.objects.filter(pk__in=ids[start:start + BATCH_SIZE]).order_by()
+            .with_permissions(profile).values_list('pk', *names)
+        )
+        for pk, *values in rows:
+            bits[pk] = pack_permissions(dict(zip(names, values)))
+    for output in outputs:
+        output.permission_bits = bits.get(output.pk, 0)
+        output.permission_bits_profile_id = profile.pk
+    return outputs
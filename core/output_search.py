@@ -0,0 +1,320 @@
+"""
+Full-text search over outputs.
+
+The output list used to search with ``icontains`` on three columns, a
+leading-wildcard LIKE that reads the whole table. Outputs are now indexed
+on title, authors, venue, keywords and abstract:
+
+- SQLite: an FTS5 table, ``core_output_search``, that reads its text from
+  ``core_output`` (external content) and is kept in sync by triggers, so
+  ``bulk_create()`` and ``QuerySet.update()`` writes are indexed too.
+  Ranked with bm25.
+- PostgreSQL: a generated, weighted ``tsvector`` column,
+  ``core_output.search_vector``, with a GIN index. Ranked with SearchRank.
+
+``search_outputs`` filters and ranks a queryset the same way on both
+(other databases fall back to ``icontains``) and ``add_search_snippets``
+highlights the matches for a page of results. Every word of the query
+must match, as a prefix: "mach learn" finds "machine learning".
+
+Tasks are indexed the same way on title, description and notes
+(``core_task_search`` / ``core_task.search_vector``) and searched with
+``search_tasks``. Each index is a ``SearchIndex``.
+
+Migrations 0011 (outputs) and 0012 (tasks) create the indexes;
+``install_search_index`` runs again after every ``migrate`` because
+SQLite rebuilds a table for some schema changes, dropping its triggers.
+``manage.py rebuild_output_search`` repopulates them.
+"""
+
+import re
+from functools import reduce
+from operator import and_, or_
+
+from django.apps import apps
+from django.db import connections
+from django.db.models import F, FloatField, Q, TextField, Value
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Concat
+from django.db.models.signals import post_migrate
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+from .models import Output
+
+OUTPUT_TABLE = 'core_output'
+SEARCH_TABLE = 'core_output_search'
+SEARCH_COLUMNS = ('title', 'all_authors', 'publication_venue', 'keywords', 'abstract')
+
+# How much a match in each column counts: bm25 weights on SQLite, tsvector
+# weight labels (A highest) on PostgreSQL
+SEARCH_WEIGHTS = {'title': 10.0, 'all_authors': 5.0, 'publication_venue': 2.0, 'keywords': 3.0, 'abstract': 1.0}
+SEARCH_LABELS = {'title': 'A', 'all_authors': 'B', 'publication_venue': 'C', 'keywords': 'B', 'abstract': 'D'}
+SEARCH_CONFIG = 'english'
+
+SNIPPET_TOKENS = 16
+# Match delimiters in the database's snippet text, turned into <mark> after escaping
+_START, _STOP = '\x02', '\x03'
+
+_SQLITE_TRIGGERS = {
+    '{search}_insert': (
+        'AFTER INSERT ON {table} BEGIN '
+        'INSERT INTO {search}(rowid, {columns}) VALUES (new.id, {new}); END'
+    ),
+    '{search}_delete': (
+        'AFTER DELETE ON {table} BEGIN '
+        "INSERT INTO {search}({search}, rowid, {columns}) VALUES ('delete', old.id, {old}); END"
+    ),
+    '{search}_update': (
+        'AFTER UPDATE OF {columns} ON {table} BEGIN '
+        "INSERT INTO {search}({search}, rowid, {columns}) VALUES ('delete', old.id, {old}); "
+        'INSERT INTO {search}(rowid, {columns}) VALUES (new.id, {new}); END'
+    ),
+}
+
+
+def query_terms(query):
+    """The words of a search query, lower-cased; punctuation and operators are dropped."""
+    return re.findall(r'[^\W_]+', (query or '').lower())
+
+
+def _vendor(using):
+    return connections[using].vendor
+
+
+class SearchIndex:
+    """
+    The full-text index of some text ``columns`` of ``table``, with a bm25
+    weight and a tsvector label per column.
+    """
+
+    def __init__(self, table, columns, weights, labels):
+        self.table = table
+        self.search_table = f'{table}_search'
+        self.columns = columns
+        self.weights = weights
+        self.labels = labels
+
+    @property
+    def triggers(self):
+        """Trigger name -> CREATE TRIGGER statement (SQLite)."""
+        names = {'table': self.table, 'search': self.search_table}
+        values = dict(
+            names,
+            columns=', '.join(self.columns),
+            new=', '.join(f'new.{column}' for column in self.columns),
+            old=', '.join(f'old.{column}' for column in self.columns),
+        )
+        return {
+            name.format(**names): f'CREATE TRIGGER IF NOT EXISTS {name.format(**names)} ' + body.format(**values)
+            for name, body in _SQLITE_TRIGGERS.items()
+        }
+
+    def fts_match(self, terms, columns=None):
+        # Quoted so every word is a plain token, '*' for prefix matching; words are ANDed
+        match = ' '.join(f'"{term}"*' for term in terms)
+        if columns and set(columns) != set(self.columns):
+            match = f"{{{' '.join(columns)}}} : ({match})"
+        return match
+
+    def tsquery(self, terms, columns=None):
+        from django.contrib.postgres.search import SearchQuery
+
+        labels = ''
+        if columns and set(columns) != set(self.columns):
+            # Other columns are left out by their weight labels
+            labels = ''.join(sorted({self.labels[column] for column in columns}))
+        return SearchQuery(' & '.join(f'{term}:*{labels}' for term in terms),
+                           search_type='raw', config=SEARCH_CONFIG)
+
+    def search(self, queryset, query, columns=None):
+        """
+        The rows of ``queryset`` matching every word of ``query`` in
+        ``columns`` (all by default), annotated with ``search_rank`` (higher
+        is better). ``queryset`` must be the outer query, not a subquery.
+        """
+        terms = query_terms(query)
+        if not terms:
+            return queryset.none().annotate(search_rank=Value(0.0, output_field=FloatField()))
+        vendor = _vendor(queryset.db)
+
+        if vendor == 'sqlite':
+            match = self.fts_match(terms, columns)
+            weights = ', '.join(str(self.weights[column]) for column in self.columns)
+            matches = RawSQL(f'SELECT rowid FROM {self.search_table} WHERE {self.search_table} MATCH %s',
+                             (match,))
+            # bm25() is lower for better matches
+            rank = RawSQL(
+                f'SELECT -bm25({self.search_table}, {weights}) FROM {self.search_table} '
+                f'WHERE {self.search_table} MATCH %s AND {self.search_table}.rowid = "{self.table}"."id"',
+                (match,), output_field=FloatField(),
+            )
+            return queryset.filter(pk__in=matches).annotate(search_rank=rank)
+
+        if vendor == 'postgresql':
+            from django.contrib.postgres.search import SearchRank, SearchVectorField
+
+            tsquery = self.tsquery(terms, columns)
+            vector = RawSQL(f'"{self.table}"."search_vector"', (), output_field=SearchVectorField())
+            return queryset.alias(search_vector=vector).filter(search_vector=tsquery).annotate(
+                search_rank=SearchRank(F('search_vector'), tsquery)
+            )
+
+        return queryset.filter(reduce(and_, [
+            reduce(or_, [Q(**{f'{column}__icontains': term}) for column in columns or self.columns])
+            for term in terms
+        ])).annotate(search_rank=Value(0.0, output_field=FloatField()))
+
+    def install(self, connection, create=True, rebuild=False):
+        """See ``install_search_index``."""
+        tables = connection.introspection.table_names()
+        if self.table not in tables:
+            return False
+
+        if connection.vendor == 'sqlite':
+            if self.search_table not in tables and not create:
+                return False
+            triggers = self.triggers
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT name FROM sqlite_master WHERE type = 'trigger' AND tbl_name = %s", [self.table]
+                )
+                existing = {row[0] for row in cursor.fetchall()}
+                changed = self.search_table not in tables or not existing.issuperset(triggers)
+                cursor.execute(
+                    f'CREATE VIRTUAL TABLE IF NOT EXISTS {self.search_table} USING fts5('
+                    f"{', '.join(self.columns)}, content='{self.table}', content_rowid='id', "
+                    f"tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+                )
+                for sql in triggers.values():
+                    cursor.execute(sql)
+                if changed or rebuild:
+                    cursor.execute(f"INSERT INTO {self.search_table}({self.search_table}) VALUES ('rebuild')")
+            return changed or rebuild
+
+        if connection.vendor == 'postgresql':
+            if not create:
+                return False
+            vector = ' || '.join(
+                f"setweight(to_tsvector('{SEARCH_CONFIG}'::regconfig, coalesce({column}, '')), "
+                f"'{self.labels[column]}')"
+                for column in self.columns
+            )
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f'ALTER TABLE {self.table} ADD COLUMN IF NOT EXISTS search_vector tsvector '
+                    f'GENERATED ALWAYS AS ({vector}) STORED'
+                )
+                cursor.execute(
+                    f'CREATE INDEX IF NOT EXISTS {self.search_table}_vector ON {self.table} '
+                    f'USING GIN (search_vector)'
+                )
+            # The generated column fills and updates itself
+            return rebuild
+
+        return False
+
+    def uninstall(self, connection):
+        with connection.cursor() as cursor:
+            if connection.vendor == 'sqlite':
+                for name in self.triggers:
+                    cursor.execute(f'DROP TRIGGER IF EXISTS {name}')
+                cursor.execute(f'DROP TABLE IF EXISTS {self.search_table}')
+            elif connection.vendor == 'postgresql':
+                cursor.execute(f'DROP INDEX IF EXISTS {self.search_table}_vector')
+                cursor.execute(f'ALTER TABLE {self.table} DROP COLUMN IF EXISTS search_vector')
+
+
+OUTPUT_INDEX = SearchIndex(OUTPUT_TABLE, SEARCH_COLUMNS, SEARCH_WEIGHTS, SEARCH_LABELS)
+TASK_INDEX = SearchIndex(
+    'core_task', ('title', 'description', 'notes'),
+    weights={'title': 10.0, 'description': 2.0, 'notes': 1.0},
+    labels={'title': 'A', 'description': 'B', 'notes': 'C'},
+)
+INDEXES = (OUTPUT_INDEX, TASK_INDEX)
+
+
+def search_outputs(queryset, query, columns=SEARCH_COLUMNS):
+    """
+    The outputs of ``queryset`` matching every word of ``query`` in
+    ``columns``, annotated with ``search_rank`` (higher is better); order by
+    ``-search_rank`` for ranked results. ``queryset`` must be the outer
+    query, not a subquery.
+    """
+    return OUTPUT_INDEX.search(queryset, query, columns)
+
+
+def search_tasks(queryset, query):
+    """The tasks of ``queryset`` matching every word of ``query``, like ``search_outputs``."""
+    return TASK_INDEX.search(queryset, query)
+
+
+def highlight(snippet):
+    """Snippet text with match delimiters -> safe HTML with the matches in <mark>."""
+    html = escape(snippet).replace(_START, '<mark>').replace(_STOP, '</mark>')
+    return mark_safe(html)
+
+
+def add_search_snippets(outputs, query):
+    """
+    Set ``search_snippet`` (safe HTML, '' when there is none) on each of
+    ``outputs`` - a page of ``search_outputs`` results - with one query.
+    """
+    outputs = list(outputs)
+    terms = query_terms(query)
+    ids = [output.pk for output in outputs]
+    snippets = {}
+    if terms and ids:
+        using = outputs[0]._state.db or 'default'
+        vendor = _vendor(using)
+        if vendor == 'sqlite':
+            placeholders = ', '.join(['%s'] * len(ids))
+            with connections[using].cursor() as cursor:
+                cursor.execute(
+                    f"SELECT rowid, snippet({SEARCH_TABLE}, -1, %s, %s, '…', {SNIPPET_TOKENS}) "
+                    f'FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s AND rowid IN ({placeholders})',
+                    [_START, _STOP, OUTPUT_INDEX.fts_match(terms), *ids],
+                )
+                snippets = dict(cursor.fetchall())
+        elif vendor == 'postgresql':
+            from django.contrib.postgres.search import SearchHeadline
+
+            text = Concat(*[
+                part for column in SEARCH_COLUMNS for part in (F(column), Value(' … '))
+            ][:-1], output_field=TextField())
+            snippets = dict(
+                Output.objects.using(using).filter(pk__in=ids).annotate(
+                    snippet=SearchHeadline(text, OUTPUT_INDEX.tsquery(terms), start_sel=_START, stop_sel=_STOP,
+                                           max_words=SNIPPET_TOKENS, min_words=SNIPPET_TOKENS // 2)
+                ).values_list('pk', 'snippet')
+            )
+    for output in outputs:
+        snippet = snippets.get(output.pk)
+        output.search_snippet = highlight(snippet) if snippet else ''
+    return outputs
+
+
+def install_search_index(connection, create=True, rebuild=False):
+    """
+    Create whatever part of the search indexes is missing on ``connection``
+    (only repair existing ones unless ``create``), repopulating an index
+    when anything changed or ``rebuild`` is set. Returns True if it did
+    either for any index.
+    """
+    results = [index.install(connection, create, rebuild) for index in INDEXES]
+    return any(results)
+
+
+def uninstall_search_index(connection):
+    for index in INDEXES:
+        index.uninstall(connection)
+
+
+def _repair_after_migrate(sender, using='default', **kwargs):
+    install_search_index(connections[using], create=False)
+
+
+def connect_signals():
+    """Restore triggers that a migration's table rebuild dropped."""
+    post_migrate.connect(_repair_after_migrate, sender=apps.get_app_config('core'),
+                         dispatch_uid='output-search-repair')
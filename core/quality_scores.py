@@ -0,0 +1,114 @@
+"""
+Numeric quality scores for outputs.
+
+The quality rating fields of ``Output`` are strings: star ratings from the
+choices ('4*' ... '1*', 'U') or, for ``quality_rating_average``, a decimal
+such as '3.25' written by the review workflow. ``Output`` stores a numeric
+copy of each (kept up to date on save), so distributions, averages, range
+filters and ordering by quality can be done by the database.
+
+``rating_score`` is the single definition of how a rating string maps to
+a score between 0 and 4.
+
+This module must not import models: ``core.models`` imports it.
+"""
+
+from decimal import Decimal, InvalidOperation
+
+STAR_SCORES = {
+    '4*': Decimal('4.00'),
+    '3*': Decimal('3.00'),
+    '2*': Decimal('2.00'),
+    '1*': Decimal('1.00'),
+    'u': Decimal('0.00'),
+    'unclassified': Decimal('0.00'),
+}
+MAX_SCORE = Decimal('4.00')
+
+# Star band of a score: (rating, lower bound); each band runs up to the one above
+STAR_BANDS = (
+    ('4*', Decimal('3.50')),
+    ('3*', Decimal('2.50')),
+    ('2*', Decimal('1.50')),
+    ('1*', Decimal('0.50')),
+    ('U', None),
+)
+
+# Rating field -> stored score field
+QUALITY_SCORE_FIELDS = {
+    'quality_rating_internal': 'quality_score_internal',
+    'quality_rating_external': 'quality_score_external',
+    'quality_rating_self': 'quality_score_self',
+    'quality_rating_average': 'quality_score_average',
+    'quality_rating': 'quality_score_overall',
+}
+
+
+def rating_score(rating):
+    """'3*' -> 3.00, '3.25' -> 3.25, 'U' -> 0.00; None when blank or unreadable."""
+    rating = str(rating or '').strip().lower()
+    if not rating:
+        return None
+    if rating in STAR_SCORES:
+        return STAR_SCORES[rating]
+    try:
+        score = Decimal(rating)
+    except InvalidOperation:
+        return None
+    if not score.is_finite() or not Decimal(0) <= score <= MAX_SCORE:
+        return None
+    return score.quantize(Decimal('0.01'))
+
+
+def score_band_lookups(field, rating):
+    """
+    Filter lookups selecting the scores in ``field`` that fall in the star
+    band of ``rating``: ``score_band_lookups('quality_score_average', '3*')``
+    gives 2.50 <= score < 3.50.
+    """
+    lookups = {f'{field}__isnull': False}
+    upper = None
+    for star, lower in STAR_BANDS:
+        if star == rating:
+            if lower is not None:
+                lookups[f'{field}__gte'] = lower
+            if upper is not None:
+                lookups[f'{field}__lt'] = upper
+            return lookups
+        upper = lower
+    raise ValueError(f"Unknown quality rating {rating!r}")
+
+
+def output_quality_scores(output):
+    """The stored score fields for ``output``'s ratings, as a dict."""
+    return {
+        score_field: rating_score(getattr(output, rating_field))
+        for rating_field, score_field in QUALITY_SCORE_FIELDS.items()
+    }
+
+
+def backfill_quality_scores(queryset, batch_size=500):
+    """
+    Recompute the stored quality scores of every output in ``queryset``,
+    writing only rows whose scores changed. Returns the number of rows updated.
+
+    Works on historical models too, so migrations can use it.
+    """
+    fields = list(QUALITY_SCORE_FIELDS.values())
+    rows = queryset.only('pk', *QUALITY_SCORE_FIELDS, *fields).order_by('pk')
+    changed = []
+    updated = 0
+    for output in rows.iterator(chunk_size=batch_size):
+        scores = output_quality_scores(output)
+        if any(getattr(output, field) != value for field, value in scores.items()):
+            for field, value in scores.items():
+                setattr(output, field, value)
+            changed.append(output)
+        if len(changed) >= batch_size:
+            queryset.model._default_manager.bulk_update(changed, fields)
+            updated += len(changed)
+            changed = []
+    if changed:
+        queryset.model._default_manager.bulk_update(changed, fields)
+        updated += len(changed)
+    return updated
@@ -0,0 +1,169 @@
+"""
+Risk analytics shared by the risk dashboards.
+
+``risk_summary`` computes everything the dashboards count or average for a
+set of outputs in one aggregate query: risk band counts, average risk and
+quality, quality bands, OA compliance and REF readiness (see
+``ref_ready_filter``). ``risk_by_status`` is one grouped query.
+``scatter_points`` projects the quality-vs-risk points with
+``values_list``; above ``max_points`` it keeps every n-th output (by id)
+in SQL, so very large portfolios send a bounded number of points.
+
+With these the dashboards run a fixed number of queries however many
+outputs there are.
+"""
+
+import math
+from datetime import timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.db.models import Avg, Count, F, Q, Window
+from django.db.models.functions import Coalesce, Mod, RowNumber
+
+from .models import Output
+from .quality_scores import score_band_lookups
+
+# Risk bands of overall_risk_score, as in Output.get_risk_level(): (key, lower, upper)
+RISK_BANDS = [
+    ('low', None, Decimal('0.25')),
+    ('medium_low', Decimal('0.25'), Decimal('0.50')),
+    ('medium_high', Decimal('0.50'), Decimal('0.75')),
+    ('high', Decimal('0.75'), None),
+]
+RISK_COLORS = {
+    'low': '#28a745',
+    'medium_low': '#ffc107',
+    'medium_high': '#fd7e14',
+    'high': '#dc3545',
+}
+
+# Quality bands of the (deprecated) overall rating, as in Output.get_quality_value()
+QUALITY_BANDS = [
+    ('four_star', '4*'),
+    ('three_star', '3*'),
+    ('two_star', '2*'),
+    ('one_star', '1*'),
+    ('unclassified', 'U'),
+]
+
+OA_DEPOSIT_DAYS = 92  # Output.check_oa_compliance()
+
+
+def risk_band_filter(lower, upper):
+    """Q selecting overall risk scores in [lower, upper)."""
+    q = Q()
+    if lower is not None:
+        q &= Q(overall_risk_score__gte=lower)
+    if upper is not None:
+        q &= Q(overall_risk_score__lt=upper)
+    return q
+
+
+def risk_band(score):
+    """The RISK_BANDS key of a risk score."""
+    for key, lower, upper in RISK_BANDS:
+        if upper is None or score < upper:
+            return key
+
+
+def ref_ready_filter():
+    """Q selecting the outputs for which ``Output.is_ref_ready()`` is True."""
+    late_deposit = Q(deposit_date__isnull=True) | Q(
+        deposit_date__gt=F('acceptance_date') + timedelta(days=OA_DEPOSIT_DAYS)
+    )
+    oa_non_compliant = Q(acceptance_date__isnull=False, oa_exception='none') & late_deposit
+    return (
+        ~Q(title='') & ~Q(all_authors='')
+        & (~Q(quality_rating_average='') | ~Q(quality_rating=''))
+        & Q(status__in=['approved', 'ready'])
+        & ~oa_non_compliant
+    )
+
+
+def risk_summary(outputs=None):
+    """
+    Counts, percentages and averages for ``outputs`` (all outputs by
+    default), from one aggregate query.
+    """
+    outputs = Output.objects.all() if outputs is None else outputs
+    row = outputs.aggregate(
+        total=Count('pk'),
+        with_risk=Count('pk', filter=~Q(overall_risk_score=0)),
+        avg_risk=Avg('overall_risk_score'),
+        avg_quality=Avg(Coalesce('quality_score_overall', Decimal('0.00'))),
+        oa_risk=Count('pk', filter=Q(oa_compliance_risk=True)),
+        ref_ready=Count('pk', filter=ref_ready_filter()),
+        **{
+            f'risk_{key}': Count('pk', filter=risk_band_filter(lower, upper))
+            for key, lower, upper in RISK_BANDS
+        },
+        **{
+            f'quality_{key}': Count('pk', filter=Q(**score_band_lookups('quality_score_overall', star)))
+            for key, star in QUALITY_BANDS
+        },
+    )
+    total = row['total']
+
+    def percentage(count):
+        return round(count / total * 100, 1) if total else 0
+
+    risk_distribution = {key: row[f'risk_{key}'] for key, _, _ in RISK_BANDS}
+    return {
+        'total': total,
+        'with_risk': row['with_risk'],
+        'avg_risk': float(row['avg_risk'] or 0),
+        'avg_quality': float(row['avg_quality'] or 0),
+        'risk_distribution': risk_distribution,
+        'risk_percentages': {key: percentage(count) for key, count in risk_distribution.items()},
+        'quality_distribution': {key: row[f'quality_{key}'] for key, _ in QUALITY_BANDS},
+        'oa_risk': row['oa_risk'],
+        'oa_compliant': total - row['oa_risk'],
+        'oa_compliance_rate': percentage(total - row['oa_risk']),
+        'ref_ready': row['ref_ready'],
+        'ref_ready_percentage': percentage(row['ref_ready']),
+    }
+
+
+def risk_by_status(outputs=None):
+    """Output count and average risk per status, highest risk first."""
+    outputs = Output.objects.all() if outputs is None else outputs
+    return list(
+        outputs.order_by().values('status')
+        .annotate(avg_risk=Avg('overall_risk_score'), count=Count('pk'))
+        .order_by('-avg_risk')
+    )
+
+
+def scatter_points(outputs, quality_field, max_points=None, total=None):
+    """
+    Quality-vs-risk points (dicts with id, title, quality, risk, risk_level
+    and color) for ``outputs``; those without a ``quality_field`` value are
+    plotted at 0. Sets larger than ``max_points`` (default
+    ``RISK_SCATTER_MAX_POINTS``, 0 for no limit) are thinned to every n-th
+    output by id; pass ``total`` if the number of outputs is already known.
+    """
+    if max_points is None:
+        max_points = getattr(settings, 'RISK_SCATTER_MAX_POINTS', 2000)
+    rows = outputs.annotate(
+        quality=Coalesce(quality_field, Decimal('0.00'))
+    ).order_by('pk')
+    if max_points and total is None:
+        total = outputs.count()
+    if max_points and total > max_points:
+        step = math.ceil(total / max_points)
+        rows = rows.annotate(
+            sample=Mod(Window(RowNumber(), order_by=F('pk').asc()) - 1, step)
+        ).filter(sample=0)
+    points = []
+    for pk, title, quality, risk in rows.values_list('pk', 'title', 'quality', 'overall_risk_score'):
+        band = risk_band(risk)
+        points.append({
+            'id': pk,
+            'title': title[:50],
+            'quality': float(quality),
+            'risk': float(risk),
+            'risk_level': band.replace('_', '-'),  # as Output.get_risk_level()
+            'color': RISK_COLORS[band],
+        })
+    return points
@@ -19,11 +19,17 @@ Usage:
     {% if user.ref_profile|has_permission:'can_export_data' %}
         <a href="{% url 'export' %}">Export</a>
     {% endif %}
+
+The output filters read the permission bitmap that
+core.output_permissions.attach_permissions() sets on a page of outputs,
+so views rendering lists should call it once for the page.
 """
 
 from django import template
 from django.utils.safestring import mark_safe
 
+from core.models import Output
+
 register = template.Library()
 
 
@@ -41,28 +47,7 @@ def can_view(output, user_profile):
             {# show output #}
         {% endif %}
     """
-    if not user_profile:
-        return False
-    
-    # Can view all outputs?
-    if user_profile.can_view_all_outputs:
-        return True
-    
-    # Owner?
-    if hasattr(output, 'owner') and output.owner == user_profile:
-        return True
-    
-    # Linked colleague?
-    if hasattr(output, 'colleague') and output.colleague:
-        if hasattr(output.colleague, 'user_profile') and output.colleague.user_profile == user_profile:
-            return True
-    
-    # Assigned panel member?
-    if user_profile.is_panel_member:
-        if hasattr(output, 'panel_assignments'):
-            return output.panel_assignments.filter(panel_member=user_profile).exists()
-    
-    return False
+    return Output.objects.permission(user_profile, 'can_view', output)
 
 
 @register.filter
@@ -75,27 +60,7 @@ def can_edit(output, user_profile):
             <a href="{% url 'output-edit' output.pk %}">Edit</a>
         {% endif %}
     """
-    if not user_profile:
-        return False
-    
-    # Can edit any output? (Admin)
-    if user_profile.can_edit_any_output:
-        return True
-    
-    # Cannot create = cannot edit
-    if not user_profile.can_create_outputs:
-        return False
-    
-    # Owner?
-    if hasattr(output, 'owner') and output.owner == user_profile:
-        return True
-    
-    # Linked colleague?
-    if hasattr(output, 'colleague') and output.colleague:
-        if hasattr(output.colleague, 'user_profile') and output.colleague.user_profile == user_profile:
-            return True
-    
-    return False
+    return Output.objects.permission(user_profile, 'can_edit', output)
 
 
 @register.filter
@@ -108,9 +73,7 @@ def can_delete(output, user_profile):
             <a href="{% url 'output-delete' output.pk %}">Delete</a>
         {% endif %}
     """
-    if not user_profile:
-        return False
-    return user_profile.can_delete_any_output
+    return Output.objects.permission(user_profile, 'can_delete', output)
 
 
 @register.filter
@@ -123,17 +86,7 @@ def is_owner(output, user_profile):
             {# show owner-specific options #}
         {% endif %}
     """
-    if not user_profile:
-        return False
-    
-    if hasattr(output, 'owner') and output.owner == user_profile:
-        return True
-    
-    if hasattr(output, 'colleague') and output.colleague:
-        if hasattr(output.colleague, 'user_profile') and output.colleague.user_profile == user_profile:
-            return True
-    
-    return False
+    return Output.objects.permission(user_profile, 'is_owner', output)
 
 
 # ==========================================
@@ -150,23 +103,7 @@ def can_rate(output, user_profile):
             <a href="{% url 'rating-create' output.pk %}">Add Rating</a>
         {% endif %}
     """
-    if not user_profile:
-        return False
-    
-    # Must have rating permission
-    if not user_profile.can_rate_assigned:
-        return False
-    
-    # Admin can rate anything
-    if user_profile.is_admin:
-        return True
-    
-    # Panel members can rate if assigned
-    if user_profile.is_panel_member:
-        if hasattr(output, 'panel_assignments'):
-            return output.panel_assignments.filter(panel_member=user_profile).exists()
-    
-    return False
+    return Output.objects.permission(user_profile, 'can_rate', output)
 
 
 @register.filter
@@ -243,16 +180,20 @@ def is_assigned_to(output, user_profile):
             {# show rating interface #}
         {% endif %}
     """
-    if not user_profile:
-        return False
-    
-    if not user_profile.is_panel_member:
-        return False
-    
-    if hasattr(output, 'panel_assignments'):
-        return output.panel_assignments.filter(panel_member=user_profile).exists()
+    return Output.objects.permission(user_profile, 'is_assigned', output)
+
+
+@register.filter
+def has_rated(output, user_profile):
+    """
+    Check if user has already rated this output.
     
-    return False
+    Usage:
+        {% if output|has_rated:user.ref_profile %}
+            {# show the existing rating #}
+        {% endif %}
+    """
+    return Output.objects.permission(user_profile, 'has_rated', output)
 
 
 # ==========================================
@@ -282,7 +223,7 @@ def user_role_badges(user_profile):
     }
     
     badges = []
-    for role in user_profile.roles.all():
+    for role in user_profile.permissions.roles:
         style, label = badge_styles.get(role.code, ('bg-light text-dark', role.name))
         badges.append(f'<span class="badge {style}">{label}</span>')
     
@@ -354,7 +295,7 @@ def role_summary(context, user_profile=None):
     
     return {
         'profile': user_profile,
-        'roles': user_profile.roles.all() if user_profile else [],
+        'roles': user_profile.permissions.roles if user_profile else [],
         'can_view_all': user_profile.can_view_all_outputs if user_profile else False,
         'can_edit_any': user_profile.can_edit_any_output if user_profile else False,
         'can_create': user_profile.can_create_outputs if user_profile else False,
@@ -388,4 +329,5 @@ def output_actions(context, output, user_profile=None):
         'can_delete': can_delete(output, user_profile),
         'can_rate': can_rate(output, user_profile),
         'is_owner': is_owner(output, user_profile),
+        'has_rated': has_rated(output, user_profile),
     }
@@ -0,0 +1,109 @@
+"""
+Title similarity backends for OutputComparator.
+
+``OUTPUT_TITLE_SIMILARITY`` selects how candidate titles are scored:
+
+- ``'sequence'`` (default): ``difflib.SequenceMatcher`` ratio, one pair at
+  a time, skipped when its cheap upper bounds cannot beat the threshold.
+- ``'ngram'``: cosine similarity of character trigram vectors. Each title
+  is turned into a sparse, L2-normalized trigram vector once; a row is then
+  scored against all its candidates with one sparse dot product each. That
+  is faster once outputs are candidates for more than one row, and less
+  sensitive to word order.
+
+Both expose the same interface: ``add(normalized_title)`` for every
+database output, in order, then ``similarities(title, positions)`` which
+returns ``{position: score}`` for the given candidate positions.
+``python manage.py benchmark_title_similarity`` compares the two.
+"""
+
+import math
+from collections import Counter
+from difflib import SequenceMatcher
+
+from django.conf import settings
+
+
+class SequenceMatcherScorer:
+    """SequenceMatcher ratio; scores at or below ``threshold`` are reported as 0.0."""
+
+    name = 'sequence'
+
+    def __init__(self, threshold):
+        self.threshold = threshold
+        self.titles = []
+
+    def add(self, title):
+        self.titles.append(title)
+
+    def similarity(self, title, other):
+        if not title or not other:
+            return 0.0
+        matcher = SequenceMatcher(None, title, other)
+        if matcher.real_quick_ratio() <= self.threshold or matcher.quick_ratio() <= self.threshold:
+            return 0.0
+        ratio = matcher.ratio()
+        return ratio if ratio > self.threshold else 0.0
+
+    def similarities(self, title, positions):
+        return {position: self.similarity(title, self.titles[position]) for position in positions}
+
+
+class NgramCosineScorer:
+    """Cosine similarity of character n-gram count vectors (n=3 by default)."""
+
+    name = 'ngram'
+
+    def __init__(self, threshold, n=3):
+        self.threshold = threshold
+        self.n = n
+        self.titles = []
+        self._vectors = {}  # position -> vector, built the first time it is a candidate
+
+    def add(self, title):
+        self.titles.append(title)
+
+    def vector(self, title):
+        """Sparse L2-normalized n-gram vector of ``title`` as {ngram: weight}."""
+        if not title:
+            return {}
+        padded = f' {title} '
+        counts = Counter(padded[i:i + self.n] for i in range(len(padded) - self.n + 1))
+        norm = math.sqrt(sum(count * count for count in counts.values()))
+        return {gram: count / norm for gram, count in counts.items()}
+
+    def _vector_at(self, position):
+        vector = self._vectors.get(position)
+        if vector is None:
+            vector = self._vectors[position] = self.vector(self.titles[position])
+        return vector
+
+    @staticmethod
+    def cosine(vector, other):
+        if len(other) < len(vector):
+            vector, other = other, vector
+        return sum(weight * other.get(gram, 0.0) for gram, weight in vector.items())
+
+    def similarity(self, title, other):
+        return self.cosine(self.vector(title), self.vector(other))
+
+    def similarities(self, title, positions):
+        vector = self.vector(title)
+        return {position: self.cosine(vector, self._vector_at(position)) for position in positions}
+
+
+SCORERS = {
+    SequenceMatcherScorer.name: SequenceMatcherScorer,
+    NgramCosineScorer.name: NgramCosineScorer,
+}
+
+
+def get_title_scorer(threshold, backend=None):
+    """Return a new scorer for ``backend`` (default: settings.OUTPUT_TITLE_SIMILARITY)."""
+    backend = backend or getattr(settings, 'OUTPUT_TITLE_SIMILARITY', 'sequence')
+    try:
+        return SCORERS[backend](threshold)
+    except KeyError:
+        raise ValueError(
+            f"Unknown OUTPUT_TITLE_SIMILARITY backend {backend!r}; expected one of {sorted(SCORERS)}"
+        ) from None
@@ -40,8 +40,11 @@ urlpatterns = [
     
     # NEW: DOI Metadata Fetch API (from evaluation)
     path('outputs/fetch-doi/', views.fetch_doi_metadata, name='fetch_doi_metadata'),
+    path('outputs/check-duplicates/', views.check_output_duplicates, name='check_output_duplicates'),
     path('outputs/bulk-import/', views.enhanced_bulk_import, name='enhanced_bulk_import'),
     path('outputs/csv-template/', views.download_csv_template, name='download_csv_template'),
+    path('imports/<int:pk>/', views.import_job_detail, name='import_job_detail'),
+    path('imports/<int:pk>/progress/', views.import_job_progress, name='import_job_progress'),
     
     # Critical Friends
     path('critical-friends/', views.critical_friend_list, name='critical_friend_list'),
@@ -93,14 +96,9 @@ path('outputs/import/', views.import_outputs, name='import_outputs'),
     # Output comparison and duplicate management
     path('outputs/compare/', views.compare_outputs, name='compare_outputs'),
     path('outputs/compare/review/', views.review_comparison, name='review_comparison'),
-    path('outputs/compare/process/', views.process_comparison_decisions, name='process_comparison_decisions'),
-    path('outputs/compare/quick-import/', views.quick_import_new, name='quick_import_new'),
-
-    # Output comparison and duplicate management
-    path('outputs/compare/', views.compare_outputs, name='compare_outputs'),
-    path('outputs/compare/review/', views.review_comparison, name='review_comparison'),
-    path('outputs/compare/process/', views.process_comparison_decisions, name='process_comparison_decisions'),
-    path('outputs/compare/quick-import/', views.quick_import_new, name='quick_import_new'),
+    path('outputs/compare/<int:run_id>/', views.review_comparison, name='review_comparison'),
+    path('outputs/compare/<int:run_id>/process/', views.process_comparison_decisions, name='process_comparison_decisions'),
+    path('outputs/compare/<int:run_id>/quick-import/', views.quick_import_new, name='quick_import_new'),
 
     # User Management
     path('manage/users/', UserListView.as_view(), name='user-list'),
@@ -5,7 +5,8 @@ from django.contrib.auth.decorators import login_required, user_passes_test
 from django.contrib.auth import login, logout, authenticate
 from django.contrib.auth.models import User
 from django.contrib import messages
-from django.db.models import Count, Q
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import Coalesce
 from django.utils import timezone
 from django.core.mail import send_mail
 from .models import (
@@ -22,8 +23,9 @@ from django.shortcuts import render, redirect
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.views.decorators.http import require_POST
-from django.http import JsonResponse, HttpResponse
+from django.http import Http404, JsonResponse, HttpResponse
 from django.urls import reverse
+from django.core.paginator import Paginator
 import json
 from .output_comparison import OutputComparator, parse_csv_to_dict
 from django.db import transaction
@@ -34,14 +36,33 @@ import csv
 import io
 import re
 from datetime import datetime, date
+import logging
+import time
 import requests
 
 from django.shortcuts import render, redirect
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.db import transaction
-from .models import Output, Colleague
+from .models import Output, Colleague, ImportJob, ComparisonRun, ComparisonResult
 from .forms import EnhancedBulkImportForm
+from .openalex import MetadataLookup, normalize_doi, parse_work
+from .import_writer import DuplicateIndex, ImportWriter
+from .csv_stream import iter_blocks, iter_csv_rows
+from .import_jobs import enqueue_import
+from .colleague_resolver import ColleagueResolver
+from .colleague_duplicates import find_duplicate_groups
+from .output_lookup import find_similar_outputs, throttled, wants_lookup
+from .output_permissions import attach_permissions
+from .keyset import fragment_response, paginate_request, wants_fragment
+from .output_search import add_search_snippets, search_outputs, search_tasks
+from .dashboard_stats import get_dashboard_stats
+from .comparison_decisions import apply_decisions
+from .quality_scores import score_band_lookups
+from .risk_analytics import risk_summary, scatter_points
+from .colleague_stats import refresh_colleague_stats
+
+logger = logging.getLogger(__name__)
 
 @login_required
 def enhanced_bulk_import(request):
@@ -63,89 +84,22 @@ def enhanced_bulk_import(request):
     - publication_type (A=Journal, B=Book, C=Chapter, D=Conference, H=Other)
     - staff_id (for auto-linking to colleagues)
     - abstract, keywords
+    
+    The upload is queued as an ImportJob and processed by run_enhanced_import
+    in the import worker; the user is sent to the job's progress page.
     """
     if request.method == 'POST':
         form = EnhancedBulkImportForm(request.POST, request.FILES)
         
         if form.is_valid():
-            csv_file = request.FILES['csv_file']
-            import_mode = form.cleaned_data['import_mode']
-            skip_duplicates = form.cleaned_data['skip_duplicates']
-            auto_link = form.cleaned_data['auto_link_colleagues']
-            default_oa = form.cleaned_data.get('default_oa_status', '')
-            
-            # Parse CSV
-            try:
-                decoded_file = csv_file.read().decode('utf-8-sig')
-                reader = csv.DictReader(io.StringIO(decoded_file))
-                rows = list(reader)
-            except UnicodeDecodeError:
-                # Try latin-1 encoding
-                csv_file.seek(0)
-                decoded_file = csv_file.read().decode('latin-1')
-                reader = csv.DictReader(io.StringIO(decoded_file))
-                rows = list(reader)
-            except Exception as e:
-                messages.error(request, f"Error reading CSV: {str(e)}")
-                return redirect('enhanced_bulk_import')
-            
-            if not rows:
-                messages.warning(request, "CSV file is empty.")
-                return redirect('enhanced_bulk_import')
-            
-            # Process rows
-            results = {
-                'created': 0,
-                'skipped_duplicate': 0,
-                'skipped_no_doi': 0,
-                'errors': [],
-                'api_fetched': 0,
-            }
-            
-            with transaction.atomic():
-                for row_num, row in enumerate(rows, start=2):  # Start at 2 (header is row 1)
-                    try:
-                        result = _process_import_row(
-                            row=row,
-                            row_num=row_num,
-                            import_mode=import_mode,
-                            skip_duplicates=skip_duplicates,
-                            auto_link=auto_link,
-                            default_oa=default_oa,
-                        )
-                        
-                        if result['status'] == 'created':
-                            results['created'] += 1
-                            if result.get('api_fetched'):
-                                results['api_fetched'] += 1
-                        elif result['status'] == 'skipped_duplicate':
-                            results['skipped_duplicate'] += 1
-                        elif result['status'] == 'skipped_no_doi':
-                            results['skipped_no_doi'] += 1
-                        elif result['status'] == 'error':
-                            results['errors'].append(f"Row {row_num}: {result['message']}")
-                            
-                    except Exception as e:
-                        results['errors'].append(f"Row {row_num}: {str(e)}")
-            
-            # Summary message
-            msg_parts = [f"Import complete: {results['created']} outputs created"]
-            if results['api_fetched']:
-                msg_parts.append(f"({results['api_fetched']} via DOI lookup)")
-            if results['skipped_duplicate']:
-                msg_parts.append(f", {results['skipped_duplicate']} duplicates skipped")
-            if results['skipped_no_doi']:
-                msg_parts.append(f", {results['skipped_no_doi']} skipped (no DOI in smart mode)")
-            
-            messages.success(request, "".join(msg_parts))
-            
-            if results['errors']:
-                for err in results['errors'][:10]:  # Show first 10 errors
-                    messages.warning(request, err)
-                if len(results['errors']) > 10:
-                    messages.warning(request, f"...and {len(results['errors']) - 10} more errors")
-            
-            return redirect('output_list')
+            job = enqueue_import(
+                'enhanced', request.FILES['csv_file'], request.user,
+                import_mode=form.cleaned_data['import_mode'],
+                skip_duplicates=form.cleaned_data['skip_duplicates'],
+                auto_link=form.cleaned_data['auto_link_colleagues'],
+                default_oa=form.cleaned_data.get('default_oa_status', ''),
+            )
+            return redirect('import_job_detail', pk=job.pk)
     else:
         form = EnhancedBulkImportForm()
     
@@ -172,12 +126,154 @@ def enhanced_bulk_import(request):
     return render(request, 'core/enhanced_bulk_import.html', context)
 
 
-def _process_import_row(row, row_num, import_mode, skip_duplicates, auto_link, default_oa):
+def _get_import_job(request, pk):
+    """Return the job if the user started it (or is staff), else 404."""
+    job = get_object_or_404(ImportJob, pk=pk)
+    if job.created_by_id != request.user.pk and not (request.user.is_staff or request.user.is_superuser):
+        raise Http404("Import job not found")
+    return job
+
+
+@login_required
+def import_job_detail(request, pk):
+    """Progress page for a background import; shows the result messages once finished."""
+    job = _get_import_job(request, pk)
+    return render(request, 'core/import_job_detail.html', {
+        'job': job,
+        'title': f'Import: {job.original_name}',
+    })
+
+
+@login_required
+def import_job_progress(request, pk):
+    """JSON progress for a background import, polled by the job page."""
+    return JsonResponse(_get_import_job(request, pk).progress())
+
+
+def run_enhanced_import(job, csv_file, progress):
+    """
+    Import worker for enhanced_bulk_import jobs.
+    
+    Returns (result_messages, errors) for the job record; see core.import_jobs.
+    """
+    import_mode = job.options['import_mode']
+    auto_link = job.options['auto_link']
+    default_oa = job.options.get('default_oa', '')
+    
+    started = time.monotonic()
+    
+    # DOIs are resolved through the local cache and batched, concurrent OpenAlex requests
+    lookup = MetadataLookup() if import_mode in ('hybrid', 'smart') else None
+    
+    # Process rows
+    results = {
+        'created': 0,
+        'skipped_duplicate': 0,
+        'skipped_no_doi': 0,
+        'errors': [],
+        'api_fetched': 0,
+    }
+    row_count = 0
+    
+    duplicates = DuplicateIndex() if job.options['skip_duplicates'] else None
+    
+    # The file is streamed in blocks of rows, so memory use does not grow with
+    # the upload; each block's DOIs are looked up together before it is processed
+    with ImportWriter(atomic=False) as writer:
+        rows = enumerate(iter_csv_rows(csv_file), start=2)  # Start at 2 (header is row 1)
+        for block in iter_blocks(rows, writer.chunk_size):
+            prefetched = lookup.get_many(_row_doi(row) for _, row in block) if lookup else None
+            row_count += len(block)
+            
+            for row_num, row in block:
+                try:
+                    result = _process_import_row(
+                        row=row,
+                        row_num=row_num,
+                        import_mode=import_mode,
+                        duplicates=duplicates,
+                        auto_link=auto_link,
+                        default_oa=default_oa,
+                        writer=writer,
+                        prefetched=prefetched,
+                    )
+                    
+                    if result['status'] == 'queued':
+                        if result.get('api_fetched'):
+                            results['api_fetched'] += 1
+                    elif result['status'] == 'skipped_duplicate':
+                        results['skipped_duplicate'] += 1
+                    elif result['status'] == 'skipped_no_doi':
+                        results['skipped_no_doi'] += 1
+                    elif result['status'] == 'error':
+                        results['errors'].append(f"Row {row_num}: {result['message']}")
+                        
+                except Exception as e:
+                    results['errors'].append(f"Row {row_num}: {str(e)}")
+            
+            writer.flush()
+            progress.update(
+                rows_processed=row_count,
+                created_count=writer.created,
+                skipped_count=results['skipped_duplicate'] + results['skipped_no_doi'],
+                error_count=len(results['errors']) + len(writer.errors),
+            )
+    
+    if not row_count:
+        return [('warning', "CSV file is empty.")], []
+    
+    results['created'] = writer.created
+    results['errors'].extend(writer.errors)
+    progress.update(created_count=writer.created, error_count=len(results['errors']))
+    
+    # Summary message
+    msg_parts = [f"Import complete: {results['created']} outputs created"]
+    if results['api_fetched']:
+        msg_parts.append(f"({results['api_fetched']} via DOI lookup)")
+    if results['skipped_duplicate']:
+        msg_parts.append(f", {results['skipped_duplicate']} duplicates skipped")
+    if results['skipped_no_doi']:
+        msg_parts.append(f", {results['skipped_no_doi']} skipped (no DOI in smart mode)")
+    
+    result_messages = [('success', "".join(msg_parts))]
+    
+    elapsed = time.monotonic() - started
+    rows_per_sec = row_count / elapsed if elapsed else 0
+    timing = f"Processed {row_count} rows in {elapsed:.1f}s ({rows_per_sec:.1f} rows/sec)"
+    if lookup and (lookup.hits or lookup.misses):
+        timing += f"; DOI cache: {lookup.hits} hits, {lookup.misses} misses"
+        if lookup.misses:
+            timing += f"; OpenAlex: {lookup.enricher.stats.summary()}"
+    logger.info("Enhanced bulk import: %s", timing)
+    result_messages.append(('info', timing))
+    
+    return result_messages + _error_messages(results['errors']), results['errors']
+
+
+def _error_messages(errors, limit=10):
+    """Warning messages for the first ``limit`` row errors."""
+    result_messages = [('warning', err) for err in errors[:limit]]
+    if len(errors) > limit:
+        result_messages.append(('warning', f"...and {len(errors) - limit} more errors"))
+    return result_messages
+
+
+def _process_import_row(row, row_num, import_mode, duplicates, auto_link, default_oa,
+                        writer, prefetched=None):
     """
     Process a single CSV row for import.
     
+    The output is validated and queued on ``writer`` (an ImportWriter),
+    which inserts it with the rest of its chunk. ``duplicates`` is a
+    DuplicateIndex when duplicates should be skipped, otherwise None;
+    queued rows are added to it.
+    
+    If ``prefetched`` is given (normalized DOI -> raw OpenAlex work, as
+    returned by OpenAlexEnricher.fetch_many) metadata is taken from it
+    instead of querying the API for this row.
+    
     Returns dict with:
-        status: 'created', 'skipped_duplicate', 'skipped_no_doi', 'error'
+        status: 'queued', 'skipped_duplicate', 'skipped_no_doi', 'error'
         message: descriptive message
         api_fetched: True if metadata came from OpenAlex
     """
@@ -199,10 +295,11 @@ def _process_import_row(row, row_num, import_mode, skip_duplicates, auto_link, d
         return {'status': 'skipped_no_doi', 'message': 'No DOI (smart mode)'}
     
     # Check for duplicates
-    if skip_duplicates:
-        if doi and Output.objects.filter(doi__iexact=doi).exists():
+    if duplicates is not None:
+        match = duplicates.match(doi, title)
+        if match == 'doi':
             return {'status': 'skipped_duplicate', 'message': f'DOI already exists: {doi}'}
-        if title and Output.objects.filter(title__iexact=title).exists():
+        if match == 'title':
             return {'status': 'skipped_duplicate', 'message': f'Title already exists: {title}'}
     
     # Initialize output data
@@ -212,7 +309,13 @@ def _process_import_row(row, row_num, import_mode, skip_duplicates, auto_link, d
     # Try DOI lookup for hybrid and smart modes
     if doi and import_mode in ('hybrid', 'smart'):
         try:
-            api_data = _fetch_openalex_metadata(doi)
+            if prefetched is None:
+                api_data = _fetch_openalex_metadata(doi)
+            elif normalize_doi(doi) in prefetched:
+                work = prefetched[normalize_doi(doi)]
+                api_data = parse_work(work) if work else None
+            else:
+                raise requests.RequestException('OpenAlex lookup failed')
             if api_data:
                 output_data = api_data
                 api_fetched = True
@@ -255,9 +358,9 @@ def _process_import_row(row, row_num, import_mode, skip_duplicates, auto_link, d
             except Colleague.DoesNotExist:
                 pass  # Will leave colleague as None
     
-    # Create the output
+    # Queue the output; the writer inserts it with the rest of its chunk
     try:
-        output = Output.objects.create(
+        output = Output(
             colleague=colleague,
             title=output_data.get('title', '')[:500],
             publication_type=output_data.get('publication_type', 'H'),
@@ -268,106 +371,44 @@ def _process_import_row(row, row_num, import_mode, skip_duplicates, auto_link, d
             pages=output_data.get('pages', '')[:50],
             doi=output_data.get('doi', '')[:100],
             all_authors=output_data.get('all_authors', '')[:500],
+            author_position=1,
+            uoa=colleague.unit_of_assessment if colleague else '',
             abstract=output_data.get('abstract', ''),
             keywords=output_data.get('keywords', '')[:500],
             oa_status=output_data.get('oa_status', 'closed'),
             citation_count=output_data.get('citation_count', 0),
             status='draft',
         )
-        
-        return {
-            'status': 'created',
-            'message': f'Created: {output.title[:50]}',
-            'api_fetched': api_fetched,
-        }
-        
     except Exception as e:
         return {'status': 'error', 'message': str(e)}
+    
+    if not writer.add(row_num, output):
+        return {'status': 'rejected', 'message': 'Invalid row'}
+    if duplicates is not None:
+        duplicates.add(output.doi, output.title)
+    
+    return {
+        'status': 'queued',
+        'message': f'Queued: {output.title[:50]}',
+        'api_fetched': api_fetched,
+    }
+
+
+def _row_doi(row):
+    """Return the raw DOI cell of a CSV row, tolerating header case/whitespace."""
+    for key, value in row.items():
+        if key and key.lower().strip() == 'doi':
+            return (value or '').strip()
+    return ''
 
 
 def _fetch_openalex_metadata(doi):
     """
-    Fetch metadata from OpenAlex API.
+    Fetch metadata for one DOI (via the local DOI metadata cache).
     Returns dict with standardized field names, or None if not found.
     """
-    api_url = f"https://api.openalex.org/works/doi:{doi}"
-    headers = {
-        'User-Agent': 'REF-Manager/3.1 (University Research Management System)'
-    }
-    
-    response = requests.get(api_url, headers=headers, timeout=10)
-    
-    if response.status_code != 200:
-        return None
-    
-    data = response.json()
-    
-    # Extract venue
-    venue = ''
-    primary = data.get('primary_location', {})
-    if primary:
-        source = primary.get('source', {})
-        if source:
-            venue = source.get('display_name', '')[:200]
-    
-    # Extract pages
-    biblio = data.get('biblio', {})
-    first_page = biblio.get('first_page', '') or ''
-    last_page = biblio.get('last_page', '') or ''
-    pages = f"{first_page}-{last_page}" if first_page and last_page else first_page
-    
-    # Extract authors
-    authorships = data.get('authorships', [])
-    authors = ", ".join([
-        a.get('author', {}).get('display_name', '')
-        for a in authorships
-        if a.get('author', {}).get('display_name')
-    ])[:500]
-    
-    # Map publication type
-    type_mapping = {
-        'journal-article': 'A',
-        'article': 'A',
-        'book-chapter': 'C',
-        'book': 'B',
-        'edited-book': 'B',
-        'proceedings-article': 'D',
-    }
-    pub_type = type_mapping.get(data.get('type', '').lower(), 'H')
-    
-    # Map OA status
-    oa_info = data.get('open_access', {})
-    oa_status_mapping = {
-        'gold': 'gold',
-        'green': 'green',
-        'hybrid': 'hybrid',
-        'bronze': 'bronze',
-        'closed': 'closed',
-    }
-    oa_status = oa_status_mapping.get(oa_info.get('oa_status', '').lower(), 'closed')
-    
-    # Extract keywords from concepts
-    concepts = data.get('concepts', [])
-    keywords = ", ".join([
-        c.get('display_name', '')
-        for c in sorted(concepts, key=lambda x: x.get('score', 0), reverse=True)[:5]
-        if c.get('display_name')
-    ])
-    
-    return {
-        'title': data.get('title', ''),
-        'publication_year': data.get('publication_year'),
-        'publication_venue': venue,
-        'volume': biblio.get('volume', '') or '',
-        'issue': biblio.get('issue', '') or '',
-        'pages': pages,
-        'all_authors': authors,
-        'publication_type': pub_type,
-        'oa_status': oa_status,
-        'citation_count': data.get('cited_by_count', 0) or 0,
-        'abstract': data.get('abstract', '') or '',
-        'keywords': keywords,
-    }
+    work = MetadataLookup().get(doi)
+    return parse_work(work) if work else None
 
 
 def _extract_csv_data(row):
@@ -479,6 +520,55 @@ def download_csv_template(request):
     return response
 
 
+@login_required
+def check_output_duplicates(request):
+    """
+    Existing outputs that look like the one being entered, for the output form.
+    
+    Query Parameters:
+        title (str): Title typed so far
+        doi (str): DOI, with or without prefix
+        exclude (int): Output being edited, left out of the results
+    
+    Returns:
+        JsonResponse: {'matches': [{'id', 'title', 'publication_year',
+        'colleague', 'url', 'similarity', 'reason'}, ...]}, best first,
+        among the outputs the user may view. Input too short to look up
+        returns no matches; lookups too close together get a 429 with
+        'throttled' set.
+    """
+    try:
+        exclude_pk = int(request.GET.get('exclude') or 0) or None
+    except ValueError:
+        exclude_pk = None
+    title = request.GET.get('title', '')[:500]
+    doi = request.GET.get('doi', '')[:200]
+    
+    if not wants_lookup(title, doi):
+        return JsonResponse({'matches': []})
+    if throttled(request.user.pk):
+        return JsonResponse({'matches': [], 'throttled': True}, status=429)
+    
+    matches = find_similar_outputs(
+        title=title,
+        doi=doi,
+        exclude_pk=exclude_pk,
+        queryset=Output.objects.visible_to(getattr(request.user, 'ref_profile', None)),
+    )
+    return JsonResponse({'matches': [
+        {
+            'id': match['output'].pk,
+            'title': match['output'].title,
+            'publication_year': match['output'].publication_year,
+            'colleague': match['output'].colleague.user.get_full_name(),
+            'url': reverse('output_detail', args=[match['output'].pk]),
+            'similarity': round(match['similarity'] * 100),
+            'reason': match['reason'],
+        }
+        for match in matches
+    ]})
+
+
 @login_required
 def fetch_doi_metadata(request):
     """
@@ -541,54 +631,30 @@ def fetch_doi_metadata(request):
         }, status=400)
     
     try:
-        # Query OpenAlex API
-        # OpenAlex is free, fast, and aggregates data from Crossref, MAG, and Unpaywall
-        api_url = f"https://api.openalex.org/works/doi:{clean_doi}"
+        # Served from the local DOI metadata cache where possible; misses go
+        # to OpenAlex, which aggregates data from Crossref, MAG, and Unpaywall
+        lookup = MetadataLookup()
+        work = lookup.get(clean_doi)
         
-        # Add polite pool email for better rate limits (optional but recommended)
-        headers = {
-            'User-Agent': 'REF-Manager/3.1 (University Research Management System)'
-        }
-        
-        response = requests.get(api_url, headers=headers, timeout=15)
-        
-        if response.status_code == 404:
+        if work is None:
             return JsonResponse({
                 'error': f'DOI "{clean_doi}" not found in OpenAlex database. Please verify the DOI or enter details manually.'
             }, status=404)
         
-        if response.status_code != 200:
-            return JsonResponse({
-                'error': f'OpenAlex API returned error code {response.status_code}'
-            }, status=500)
-        
-        data = response.json()
-        
-        # Extract and standardize metadata
-        metadata = {
-            'title': data.get('title', '') or '',
-            'publication_year': data.get('publication_year'),
-            'publication_venue': _extract_venue(data),
-            'volume': data.get('biblio', {}).get('volume', '') or '',
-            'issue': data.get('biblio', {}).get('issue', '') or '',
-            'pages': _format_pages(data.get('biblio', {})),
-            'all_authors': _format_authors(data.get('authorships', [])),
-            'citation_count': data.get('cited_by_count', 0) or 0,
-            'is_oa': data.get('open_access', {}).get('is_oa', False),
-            'oa_status': _map_oa_status(data.get('open_access', {}).get('oa_status')),
-            'doi_url': f"https://doi.org/{clean_doi}",
-            'publication_type': _map_publication_type(data.get('type')),
-            # Additional useful data
-            'abstract': data.get('abstract', '') or '',
-            'keywords': _extract_keywords(data),
-        }
+        metadata = parse_work(work)
+        metadata['doi_url'] = f"https://doi.org/{clean_doi}"
         
         return JsonResponse({
             'success': True,
             'data': metadata,
-            'source': 'OpenAlex'
+            'source': 'OpenAlex',
+            'cached': bool(lookup.hits),
         })
         
+    except requests.HTTPError as e:
+        return JsonResponse({
+            'error': f'OpenAlex API returned error code {e.response.status_code}'
+        }, status=500)
     except requests.Timeout:
         return JsonResponse({
             'error': 'Request timed out. OpenAlex may be temporarily unavailable. Please try again.'
@@ -603,126 +669,6 @@ def fetch_doi_metadata(request):
         }, status=500)
 
 
-def _extract_venue(data):
-    """Extract publication venue from OpenAlex data."""
-    # Try primary location first
-    primary = data.get('primary_location', {})
-    if primary:
-        source = primary.get('source', {})
-        if source:
-            return source.get('display_name', '')[:200]
-    
-    # Fallback to locations array
-    locations = data.get('locations', [])
-    for loc in locations:
-        source = loc.get('source', {})
-        if source and source.get('display_name'):
-            return source.get('display_name', '')[:200]
-    
-    return ''
-
-
-def _format_pages(biblio):
-    """Format page range from OpenAlex biblio data."""
-    first = biblio.get('first_page', '') or ''
-    last = biblio.get('last_page', '') or ''
-    
-    if first and last and first != last:
-        return f"{first}-{last}"
-    elif first:
-        return first
-    return ''
-
-
-def _format_authors(authorships):
-    """
-    Format author list from OpenAlex authorships.
-    
-    Returns comma-separated list of author names, truncated to 500 chars.
-    """
-    if not authorships:
-        return ''
-    
-    names = []
-    for authorship in authorships:
-        author = authorship.get('author', {})
-        name = author.get('display_name', '')
-        if name:
-            names.append(name)
-    
-    result = ", ".join(names)
-    
-    # Truncate if too long
-    if len(result) > 500:
-        result = result[:497] + "..."
-    
-    return result
-
-
-def _map_oa_status(api_status):
-    """
-    Map OpenAlex OA status to REF-Manager OA status choices.
-    
-    OpenAlex uses: gold, green, hybrid, bronze, closed
-    Our model uses: gold, green, hybrid, bronze, closed, non_compliant
-    """
-    if not api_status:
-        return 'closed'
-    
-    mapping = {
-        'gold': 'gold',
-        'green': 'green',
-        'hybrid': 'hybrid',
-        'bronze': 'bronze',
-        'closed': 'closed',
-    }
-    return mapping.get(api_status.lower(), 'closed')
-
-
-def _map_publication_type(api_type):
-    """
-    Map OpenAlex work type to REF-Manager publication_type choices.
-    
-    OpenAlex types: journal-article, book-chapter, book, proceedings-article, etc.
-    Our model uses: A, B, C, D, E, F, G, H
-    """
-    if not api_type:
-        return 'H'  # Other
-    
-    mapping = {
-        'journal-article': 'A',
-        'article': 'A',
-        'book-chapter': 'C',
-        'book': 'B',
-        'edited-book': 'B',
-        'monograph': 'B',
-        'proceedings-article': 'D',
-        'proceedings': 'D',
-        'dissertation': 'H',
-        'report': 'H',
-        'dataset': 'H',
-        'preprint': 'H',
-    }
-    return mapping.get(api_type.lower(), 'H')
-
-
-def _extract_keywords(data):
-    """Extract keywords/concepts from OpenAlex data."""
-    concepts = data.get('concepts', [])
-    if not concepts:
-        return ''
-    
-    # Get top 5 concepts by score
-    sorted_concepts = sorted(
-        concepts,
-        key=lambda x: x.get('score', 0),
-        reverse=True
-    )[:5]
-    
-    keywords = [c.get('display_name', '') for c in sorted_concepts if c.get('display_name')]
-    return ", ".join(keywords)
-
-
 User = get_user_model()
 
 
@@ -753,139 +699,8 @@ def logout_view(request):
 
 @login_required
 def dashboard(request):
-    # Colleague statistics
-    total_colleagues = Colleague.objects.filter(is_returnable=True).count()
-    independent_count = Colleague.objects.filter(colleague_category='independent').count()
-    non_independent_count = Colleague.objects.filter(colleague_category='non_independent').count()
-    postdoc_count = Colleague.objects.filter(colleague_category='postdoc').count()
-    academic_count = Colleague.objects.filter(colleague_category='academic').count()
-    research_assistant_count = Colleague.objects.filter(colleague_category='research_assistant').count()
-    support_count = Colleague.objects.filter(colleague_category='support').count()
-    current_staff = Colleague.objects.filter(employment_status='current').count()
-    former_staff = Colleague.objects.filter(employment_status='former').count()
-    
-    # Output statistics
-    total_outputs = Output.objects.count()
-    approved_outputs = Output.objects.filter(status='approved').count()
-    outputs_in_review = Output.objects.filter(
-        status__in=['internal-review', 'external-review']
-    ).count()
-    pending_requests = Request.objects.filter(status='pending').count()
-
-    # Quality distribution calculation with decimal average support
-    approved_outputs_with_ratings = Output.objects.filter(status='approved').exclude(quality_rating_average='')
-    
-    # Initialize counters
-    quality_distribution = {
-        'four_star': 0,      # 3.50 - 4.00
-        'three_star': 0,     # 2.50 - 3.49
-        'two_star': 0,       # 1.50 - 2.49
-        'one_star': 0,       # 0.50 - 1.49
-        'unclassified': 0,   # 0.00 - 0.49
-    }
-    
-    # Count outputs in each range
-    for output in approved_outputs_with_ratings:
-        try:
-            avg = float(output.quality_rating_average)
-            
-            if avg >= 3.50:
-                quality_distribution['four_star'] += 1
-            elif avg >= 2.50:
-                quality_distribution['three_star'] += 1
-            elif avg >= 1.50:
-                quality_distribution['two_star'] += 1
-            elif avg >= 0.50:
-                quality_distribution['one_star'] += 1
-            else:
-                quality_distribution['unclassified'] += 1
-        except (ValueError, TypeError):
-            # If it's still in star format ('4*', '3*'), handle it
-            if output.quality_rating_average == '4*':
-                quality_distribution['four_star'] += 1
-            elif output.quality_rating_average == '3*':
-                quality_distribution['three_star'] += 1
-            elif output.quality_rating_average == '2*':
-                quality_distribution['two_star'] += 1
-            elif output.quality_rating_average == '1*':
-                quality_distribution['one_star'] += 1
-            elif output.quality_rating_average == 'U':
-                quality_distribution['unclassified'] += 1
-    
-    # Calculate percentages
-    total_rated_outputs = sum(quality_distribution.values())
-    
-    if total_rated_outputs > 0:
-        quality_percentages = {
-            'four_star': round(quality_distribution['four_star'] / total_rated_outputs * 100, 1),
-            'three_star': round(quality_distribution['three_star'] / total_rated_outputs * 100, 1),
-            'two_star': round(quality_distribution['two_star'] / total_rated_outputs * 100, 1),
-            'one_star': round(quality_distribution['one_star'] / total_rated_outputs * 100, 1),
-            'unclassified': round(quality_distribution['unclassified'] / total_rated_outputs * 100, 1),
-        }
-    else:
-        quality_percentages = {
-            'four_star': 0,
-            'three_star': 0,
-            'two_star': 0,
-            'one_star': 0,
-            'unclassified': 0,
-        }
-    
-    # Recent activity
-    recent_outputs = Output.objects.select_related('colleague').order_by('-updated_at')[:5]
-    recent_reviews = CriticalFriendAssignment.objects.select_related(
-        'output', 'critical_friend'
-    ).order_by('-assigned_date')[:5]
-    
-    # Critical friend statistics
-    critical_friends_count = CriticalFriend.objects.count()
-    active_cf_assignments = CriticalFriendAssignment.objects.filter(
-        status__in=['assigned', 'accepted', 'in-progress']
-    ).count()
-    
-    overdue_assignments = CriticalFriendAssignment.objects.filter(
-        status__in=['assigned', 'accepted', 'in-progress'],
-        due_date__lt=timezone.now().date()
-    ).count()
-
-    # Internal panel statistics
-    internal_panel_count = InternalPanelMember.objects.filter(is_active=True).count()
-    active_panel_assignments = InternalPanelAssignment.objects.filter(
-        status__in=['assigned', 'in_progress']
-    ).count()
-    
-    overdue_panel_assignments = InternalPanelAssignment.objects.filter(
-        status__in=['assigned', 'in_progress'],
-        review_date__isnull=False,
-        review_date__lt=timezone.now().date()
-    ).count()
-    
-    # Request statistics
-    overdue_requests = Request.objects.filter(
-        status__in=['pending', 'in-progress'],
-        deadline__lt=timezone.now().date()
-    ).count()
-    
-    # Create context with all variables
-    context = {
-        'total_colleagues': total_colleagues,
-        'total_outputs': total_outputs,
-        'approved_outputs': approved_outputs,
-        'outputs_in_review': outputs_in_review,
-        'pending_requests': pending_requests,
-        'recent_outputs': recent_outputs,
-        'recent_reviews': recent_reviews,
-        'critical_friends_count': critical_friends_count,
-        'active_cf_assignments': active_cf_assignments,
-        'overdue_assignments': overdue_assignments,
-        'overdue_requests': overdue_requests,
-        'internal_panel_count': internal_panel_count,
-        'active_panel_assignments': active_panel_assignments,
-        'overdue_panel_assignments': overdue_panel_assignments,
-        'quality_distribution': quality_distribution,
-        'quality_percentages': quality_percentages,
-    }
+    """Landing page; the statistics come from a cached snapshot (see dashboard_stats.py)."""
+    context = get_dashboard_stats()
     
     return render(request, 'core/dashboard.html', context)
 
@@ -893,7 +708,7 @@ def dashboard(request):
 
 @login_required
 def colleague_detail(request, pk):
-    colleague = get_object_or_404(Colleague.objects.select_related('user'), pk=pk)
+    colleague = get_object_or_404(Colleague.objects.select_related('user', 'stats'), pk=pk)
     outputs = colleague.outputs.all().order_by('-publication_year')
     is_own_profile = request.user == colleague.user
     
@@ -969,17 +784,12 @@ def output_list(request):
     
     # Role-based filtering
     user = request.user
-    if hasattr(user, 'ref_profile'):
-        profile = user.ref_profile
-        # Admins and Observers see all
-        if not (profile.is_admin or profile.is_observer):
-            # Panel members see all outputs (they may need to review any)
-            if not profile.is_panel_member:
-                # Regular colleagues only see their own outputs
-                if hasattr(user, 'colleague'):
-                    outputs = outputs.filter(colleague=user.colleague)
-                else:
-                    outputs = outputs.none()
+    profile = getattr(user, 'ref_profile', None)
+    if profile:
+        # Panel members see all outputs (they may need to review any),
+        # others the outputs their roles let them view
+        if not profile.is_panel_member:
+            outputs = outputs.visible_to(profile)
     
     filter_form = OutputFilterForm(request.GET)
     
@@ -992,7 +802,7 @@ def output_list(request):
         if status:
             outputs = outputs.filter(status=status)
         if quality:
-            outputs = outputs.filter(quality_rating_average=quality)
+            outputs = outputs.filter(**score_band_lookups('quality_score_average', quality))
         if uoa:
             outputs = outputs.filter(uoa__icontains=uoa)
         if colleague_id:
@@ -1000,16 +810,21 @@ def output_list(request):
     
     search_query = request.GET.get('search', '')
     if search_query:
-        outputs = outputs.filter(
-            Q(title__icontains=search_query) |
-            Q(all_authors__icontains=search_query) |
-            Q(publication_venue__icontains=search_query)
-        )
+        # Full-text index over title, authors, venue, keywords and abstract; best matches first
+        outputs = search_outputs(outputs, search_query).order_by('-search_rank')
+    
+    page = paginate_request(request, outputs)
+    # Row permissions for the template's ref_permissions filters, in one query
+    outputs = attach_permissions(page, profile)
+    if search_query:
+        add_search_snippets(outputs, search_query)
     
-    outputs = outputs.order_by('-publication_year')
+    if wants_fragment(request):
+        return fragment_response(request, 'core/includes/output_rows.html', {'outputs': outputs}, page)
     
     return render(request, 'core/output_list.html', {
         'outputs': outputs,
+        'page': page,
         'filter_form': filter_form,
         'search_query': search_query,
     })
@@ -1268,8 +1083,13 @@ def request_list(request):
     if status_filter:
         requests = requests.filter(status=status_filter)
     
+    page = paginate_request(request, requests)
+    if wants_fragment(request):
+        return fragment_response(request, 'core/includes/request_rows.html', {'requests': page}, page)
+    
     return render(request, 'core/request_list.html', {
-        'requests': requests,
+        'requests': page,
+        'page': page,
         'status_filter': status_filter,
     })
 
@@ -1371,37 +1191,14 @@ def add_internal_review(request, output_pk):
 def bulk_upload_outputs(request):
     if request.method == 'POST':
         from .forms import BulkUploadForm
-        import csv
-        import io
         
         form = BulkUploadForm(request.POST, request.FILES)
         if form.is_valid():
-            colleague = form.cleaned_data['colleague']
-            csv_file = request.FILES['csv_file']
-            
-            decoded_file = csv_file.read().decode('utf-8')
-            io_string = io.StringIO(decoded_file)
-            reader = csv.DictReader(io_string)
-            
-            created_count = 0
-            for row in reader:
-                try:
-                    Output.objects.create(
-                        colleague=colleague,
-                        title=row['title'],
-                        publication_type=row['publication_type'],
-                        publication_year=row['publication_year'],
-                        publication_venue=row.get('publication_venue', ''),
-                        all_authors=row['all_authors'],
-                        author_position=int(row['author_position']),
-                        uoa=row['uoa'],
-                    )
-                    created_count += 1
-                except Exception as e:
-                    messages.warning(request, f'Error importing row: {str(e)}')
-            
-            messages.success(request, f'Successfully imported {created_count} outputs')
-            return redirect('colleague_detail', pk=colleague.pk)
+            job = enqueue_import(
+                'bulk_upload', request.FILES['csv_file'], request.user,
+                colleague_id=form.cleaned_data['colleague'].pk,
+            )
+            return redirect('import_job_detail', pk=job.pk)
     else:
         from .forms import BulkUploadForm
         form = BulkUploadForm()
@@ -1409,6 +1206,36 @@ def bulk_upload_outputs(request):
     return render(request, 'core/bulk_upload.html', {'form': form})
 
 
+def run_bulk_upload(job, csv_file, progress):
+    """Import worker for bulk_upload_outputs jobs; returns (result_messages, errors)."""
+    colleague = Colleague.objects.get(pk=job.options['colleague_id'])
+    
+    with ImportWriter(atomic=False) as writer:
+        for row_num, row in enumerate(iter_csv_rows(csv_file), start=2):
+            try:
+                output = Output(
+                    colleague=colleague,
+                    title=row['title'],
+                    publication_type=row['publication_type'],
+                    publication_year=row['publication_year'],
+                    publication_venue=row.get('publication_venue', ''),
+                    all_authors=row['all_authors'],
+                    author_position=int(row['author_position']),
+                    uoa=row['uoa'],
+                )
+            except Exception as e:
+                writer.error(row_num, str(e))
+            else:
+                writer.add(row_num, output)
+            progress.update(rows_processed=row_num - 1, created_count=writer.created,
+                            error_count=len(writer.errors))
+    progress.update(created_count=writer.created, error_count=len(writer.errors))
+    
+    result_messages = [('warning', f'Error importing row: {error}') for error in writer.errors]
+    result_messages.append(('success', f'Successfully imported {writer.created} outputs'))
+    return result_messages, writer.errors
+
+
 @login_required
 def reports_dashboard(request):
     """Main reports dashboard"""
@@ -1418,9 +1245,9 @@ def reports_dashboard(request):
 @login_required
 def colleague_outputs_report(request):
     """Report showing outputs per colleague"""
-    colleagues = Colleague.objects.select_related('user').annotate(
-        total_outputs=Count('outputs'),
-        approved_outputs=Count('outputs', filter=Q(outputs__status='approved'))
+    colleagues = Colleague.objects.select_related('user', 'stats').annotate(
+        total_outputs=Coalesce('stats__total_outputs', 0),
+        approved_outputs=Coalesce('stats__approved_outputs', 0),
     ).order_by('user__last_name')
     
     return render(request, 'core/colleague_outputs_report.html', {
@@ -1446,8 +1273,8 @@ def uoa_report(request):
     """Report by Unit of Assessment"""
     uoa_stats = Colleague.objects.values('unit_of_assessment').annotate(
         colleague_count=Count('id'),
-        output_count=Count('outputs'),
-        approved_count=Count('outputs', filter=Q(outputs__status='approved'))
+        output_count=Coalesce(Sum('stats__total_outputs'), 0),
+        approved_count=Coalesce(Sum('stats__approved_outputs'), 0),
     ).order_by('unit_of_assessment')
     
     return render(request, 'core/uoa_report.html', {
@@ -1578,11 +1405,13 @@ def task_list(request):
     if assigned_filter:
         tasks = tasks.filter(assigned_to_id=assigned_filter)
     if search_query:
-        tasks = tasks.filter(
-            Q(title__icontains=search_query) | 
-            Q(description__icontains=search_query) |
-            Q(notes__icontains=search_query)
-        )
+        # Full-text index (core.output_search), not a LIKE scan; the list keeps its own order
+        tasks = search_tasks(tasks, search_query)
+    
+    # Ordered by priority, due date (undated last) and creation
+    page = paginate_request(request, tasks)
+    if wants_fragment(request):
+        return fragment_response(request, 'core/includes/task_rows.html', {'tasks': page}, page)
     
     # Get filter options
     users = User.objects.filter(assigned_tasks__isnull=False).distinct()
@@ -1600,7 +1429,8 @@ def task_list(request):
     }
     
     context = {
-        'tasks': tasks,
+        'tasks': page,
+        'page': page,
         'stats': stats,
         'users': users,
         'status_filter': status_filter,
@@ -1800,89 +1630,24 @@ def parse_authors(person_string):
     return [author for author in authors if author]
 
 
-def find_or_create_colleague(author_name, create_if_missing=True):
+def find_or_create_colleague(author_name, resolver, create_if_missing=True, set_as_coauthor=False):
     """
     Find a colleague by name, or create one (with User account) if allowed
     Handles various name formats
+    
+    ``resolver`` is a ColleagueResolver built once per import; building one
+    loads every colleague, so it is not worth doing for a single lookup.
     """
     if not author_name:
         return None
     
-    # Try to extract last name (usually in UPPERCASE in CSV)
-    parts = author_name.split(',')
-    if len(parts) >= 2:
-        last_name = parts[0].strip()
-        first_names = parts[1].strip()
-    else:
-        # Fallback: split by spaces
-        name_parts = author_name.split()
-        if name_parts:
-            last_name = name_parts[-1]
-            first_names = ' '.join(name_parts[:-1])
-        else:
-            return None
-    
-    # Try to find existing colleague by staff_id
-    colleague = Colleague.objects.filter(staff_id__iexact=last_name[:20]).first()
-    
-    if not colleague:
-        # Try searching by linked User's last name
-        colleague = Colleague.objects.filter(
-            user__last_name__iexact=last_name
-        ).first()
-    
-    if colleague:
-        return colleague
-    
-    # If not found and we're allowed to create
-    if create_if_missing:
-        try:
-            # Create a username from the name (make it unique)
-            if first_names:
-                first_part = first_names.split()[0].lower()
-            else:
-                first_part = 'user'
-            
-            base_username = f"{first_part}.{last_name.lower()}"
-            # Clean username - remove special characters
-            base_username = re.sub(r'[^a-z0-9._-]', '', base_username)[:30]
-            
-            # Make username unique if it already exists
-            username = base_username
-            counter = 1
-            while User.objects.filter(username=username).exists():
-                username = f"{base_username}{counter}"
-                counter += 1
-            
-            # Create email
-            email = f"{username}@york.ac.uk"
-            
-            # Create User account first (required for Colleague)
-            user = User.objects.create_user(
-                username=username,
-                email=email,
-                first_name=first_names[:150] if first_names else '',
-                last_name=last_name[:150],
-                password=User.objects.make_random_password()  # Random password
-            )
-            
-            # Now create Colleague linked to this User
-            colleague = Colleague.objects.create(
-                user=user,  # Link to the User we just created
-                staff_id=last_name[:20].upper(),  # Use last name as temp staff_id
-                title='Dr',  # Default title
-                fte=1.0,  # Default full-time
-                contract_type='permanent',  # Adjust if needed
-                employment_status='current'
-            )
-            
-            return colleague
-            
-        except Exception as e:
-            print(f"Error creating colleague for {author_name}: {str(e)}")
-            return None
-    
-    return None
+    try:
+        # A failed User/Colleague insert is rolled back on its own
+        with transaction.atomic():
+            return resolver.resolve(author_name, create_if_missing, set_as_coauthor=set_as_coauthor)
+    except Exception as e:
+        logger.warning("Error creating colleague for %s: %s", author_name, e)
+        return None
 
 
 def map_publication_type_to_code(type_string):
@@ -1950,183 +1715,12 @@ def import_outputs(request):
         form = CSVUploadForm(request.POST, request.FILES)
         
         if form.is_valid():
-            csv_file = request.FILES['csv_file']
-            skip_duplicates = form.cleaned_data['skip_duplicates']
-            create_missing_staff = form.cleaned_data['create_missing_staff']
-            
-            # Read CSV file
-            csv_file.seek(0)
-            content = csv_file.read().decode('utf-8')
-            csv_reader = csv.DictReader(io.StringIO(content))
-            
-            # Statistics
-            stats = {
-                'total': 0,
-                'created': 0,
-                'skipped': 0,
-                'errors': 0,
-                'error_details': []
-            }
-            
-            # Process each row - use savepoint per row for better error handling
-            for row_num, row in enumerate(csv_reader, start=2):
-                stats['total'] += 1
-                
-                try:
-                    # Use a savepoint for each row so one error doesn't break everything
-                    with transaction.atomic():
-                        # Extract basic info
-                        title = row.get('Title', '').strip()
-                        if not title:
-                            stats['skipped'] += 1
-                            stats['error_details'].append(f'Row {row_num}: Missing title')
-                            continue
-                        
-                        # Check for duplicates
-                        if skip_duplicates and Output.objects.filter(title=title).exists():
-                            stats['skipped'] += 1
-                            continue
-                        
-                        # Parse authors
-                        person_string = row.get('Person', '')
-                        authors = parse_authors(person_string)
-                        
-                        if not authors:
-                            stats['skipped'] += 1
-                            stats['error_details'].append(f'Row {row_num}: No authors found')
-                            continue
-                        
-                        # Get or create primary author (first author)
-                        primary_colleague = find_or_create_colleague(authors[0], create_missing_staff, set_as_coauthor=True )
-
-
-                        if not primary_colleague:
-                            stats['skipped'] += 1
-                            stats['error_details'].append(
-                                f'Row {row_num}: Could not find/create colleague "{authors[0]}"'
-                            )
-                            continue
-                        
-                        # Map publication type to single-letter code
-                        pub_type_code = map_publication_type_to_code(row.get('Type', ''))
-                        
-                        # Parse dates
-                        publication_year = safe_parse_date(
-                            row.get('Full date') or row.get('Earliest published date')
-                        )
-                        
-                        # Extract publication venue (journal + publisher)
-                        journal = row.get('Journal title', '') or ''
-                        publisher = row.get('Publisher', '') or ''
-                        
-                        if journal and publisher:
-                            venue = f"{journal} ({publisher})"
-                        elif journal:
-                            venue = journal
-                        elif publisher:
-                            venue = publisher
-                        else:
-                            venue = 'Unknown'  # Required field, must have value
-                        
-                        # Extract DOI and build URL if no URL provided
-                        doi = (row.get('DOIs (Digital Object Identifiers)', '') or '').strip()
-                        if doi:
-                            # Clean DOI - may have multiple DOIs, take first one
-                            doi_clean = doi.split(',')[0].strip()
-                            # Remove any existing DOI URL prefix
-                            doi_clean = doi_clean.replace('https://doi.org/', '').replace('http://dx.doi.org/', '')
-                            doi = doi_clean[:200]  # Truncate to field length
-                            url = f"https://doi.org/{doi}"
-                        else:
-                            doi = ''
-                            url = ''
-                        
-                        # Check Open Access status
-                        oa_status = row.get('REF Open Access compliance status', '')
-                        is_open_access = oa_status.startswith('REF OA Compliance MET')
-                        
-                        # Build internal notes with all the import metadata
-                        internal_notes = (
-                            f"Imported from CSV on {datetime.now().strftime('%Y-%m-%d %H:%M')}\n\n"
-                            f"Pure ID: {row.get('Pure ID', 'N/A')}\n"
-                            f"Organisational unit: {row.get('Organisational unit', 'N/A')}\n"
-                            f"Managing org unit: {row.get('Managing organisational unit', 'N/A')}\n"
-                            f"Number of internal persons: {row.get('Number of internal persons', 'N/A')}\n"
-                            f"Publisher: {publisher}\n"
-                            f"Journal: {journal}\n"
-                            f"OA Status: {oa_status}\n"
-                            f"OA Notes: {row.get('Open Access compliance notes', 'N/A')}\n"
-                            f"Original CSV Status: {row.get('Current publication status', 'N/A')}\n"
-                        )
-                        
-                        # Create output with ALL required fields
-                        output = Output.objects.create(
-                            # Required ForeignKey
-                            colleague=primary_colleague,
-                            
-                            # Basic publication info (all required)
-                            title=title[:500],  # Truncate to max_length
-                            publication_type=pub_type_code,  # Single letter code
-                            publication_year=publication_year,
-                            publication_venue=venue[:300],  # Truncate to max_length
-                            
-                            # Volume/issue/pages (required, use empty string if missing)
-                            volume=(row.get('Host publication volume', '') or '')[:50],
-                            issue=(row.get('Issue number', '') or '')[:50],
-                            pages=(row.get('Pages (from-to)', '') or '')[:50],
-                            
-                            # Identifiers (required, use empty string if missing)
-                            doi=doi,
-                            isbn=(row.get('ISBN (print)', '') or '')[:50],
-                            url=url[:500] if url else '',
-                            
-                            # Author info (required)
-                            all_authors=person_string if person_string else extract_first_author_name(person_string),
-                            author_position=1,  # Default to first author
-                            
-                            # REF-specific fields (required, use defaults)
-                            uoa='Main Panel A',  # Default - adjust as needed
-                            status='draft',  # Default status for imported items
-                            quality_rating='U',  # Unclassified until reviewed
-                            
-                            # Boolean flags (required)
-                            is_double_weighted=False,  # Default
-                            is_interdisciplinary=False,  # Default
-                            is_open_access=is_open_access,
-                            
-                            # Text fields (required, use default if empty)
-                            abstract=row.get('Abstract', '') or 'Abstract not provided.',
-                            keywords=row.get('Keywords', '') or 'Not specified',
-                            internal_notes=internal_notes,
-                        )
-                        
-                        stats['created'] += 1
-                        
-                except Exception as e:
-                    stats['errors'] += 1
-                    error_msg = f'Row {row_num}: {str(e)}'
-                    stats['error_details'].append(error_msg)
-                    # Print to console for debugging
-                    print(f"Import error: {error_msg}")
-            
-            # Display results
-            messages.success(
-                request,
-                f"Import completed! Created: {stats['created']}, "
-                f"Skipped: {stats['skipped']}, Errors: {stats['errors']}"
+            job = enqueue_import(
+                'pure', request.FILES['csv_file'], request.user,
+                skip_duplicates=form.cleaned_data['skip_duplicates'],
+                create_missing_staff=form.cleaned_data['create_missing_staff'],
             )
-            
-            if stats['error_details']:
-                for error in stats['error_details'][:10]:  # Show first 10 errors
-                    messages.warning(request, error)
-                
-                if len(stats['error_details']) > 10:
-                    messages.warning(
-                        request,
-                        f"...and {len(stats['error_details']) - 10} more errors"
-                    )
-            
-            return redirect('output_list')
+            return redirect('import_job_detail', pk=job.pk)
     
     else:
         form = CSVUploadForm()
@@ -2135,155 +1729,213 @@ def import_outputs(request):
         'form': form,
         'title': 'Import Outputs from CSV'
     })
-"""
-COLLEAGUE MERGE FUNCTIONALITY
-
-Add these functions to core/views.py
-"""
-
-from django.shortcuts import render, redirect, get_object_or_404
-from django.contrib.auth.decorators import login_required, user_passes_test
-from django.contrib import messages
-from django.db import transaction
-from django.db.models import Q, Count
-from core.models import Colleague, Output
-
-# Helper function to check if user is admin/staff
-def is_staff_user(user):
-    return user.is_staff or user.is_superuser
 
 
-@login_required
-@user_passes_test(is_staff_user)
-def find_duplicate_colleagues(request):
-    """
-    Find potential duplicate colleagues based on similar names
-    """
-    # Find colleagues with similar last names
-    from collections import defaultdict
-    
-    all_colleagues = Colleague.objects.select_related('user').all()
-    
-    # Group by similar last names (case insensitive)
-    name_groups = defaultdict(list)
-    for colleague in all_colleagues:
-        if colleague.user:
-            last_name_key = colleague.user.last_name.lower().strip()
-            name_groups[last_name_key].append(colleague)
-    
-    # Find groups with more than one colleague
-    duplicates = []
-    for last_name, colleagues_list in name_groups.items():
-        if len(colleagues_list) > 1:
-            # Add details about each group
-            duplicates.append({
-                'last_name': last_name,
-                'colleagues': colleagues_list,
-                'count': len(colleagues_list)
-            })
-    
-    # Sort by number of duplicates
-    duplicates.sort(key=lambda x: x['count'], reverse=True)
+def run_pure_import(job, csv_file, progress):
+    """Import worker for import_outputs jobs; returns (result_messages, errors)."""
+    skip_duplicates = job.options['skip_duplicates']
+    create_missing_staff = job.options['create_missing_staff']
     
-    return render(request, 'core/duplicate_colleagues.html', {
-        'duplicates': duplicates,
-        'title': 'Find Duplicate Colleagues'
-    })
-
-
-@login_required
-@user_passes_test(is_staff_user)
-def merge_colleagues(request):
-    """
-    Merge two or more colleagues into one
-    """
-    if request.method == 'POST':
-        # Get the IDs of colleagues to merge
-        colleague_ids = request.POST.getlist('colleague_ids')
-        primary_id = request.POST.get('primary_id')
-        
-        if len(colleague_ids) < 2:
-            messages.error(request, 'Please select at least 2 colleagues to merge')
-            return redirect('find_duplicate_colleagues')
-        
-        if not primary_id or primary_id not in colleague_ids:
-            messages.error(request, 'Please select a primary colleague to keep')
-            return redirect('find_duplicate_colleagues')
-        
-        try:
-            with transaction.atomic():
-                # Get the primary colleague (the one to keep)
-                primary = get_object_or_404(Colleague, id=primary_id)
+    # Stream the CSV file row by row
+    csv_reader = iter_csv_rows(csv_file)
+    
+    # Statistics
+    stats = {
+        'total': 0,
+        'created': 0,
+        'skipped': 0,
+        'errors': 0,
+        'error_details': []
+    }
+    
+    # Existing DOIs/titles, plus rows queued earlier in this file
+    duplicates = DuplicateIndex() if skip_duplicates else None
+    
+    # Colleagues and usernames, loaded once for the whole file
+    resolver = ColleagueResolver()
+    
+    # Rows are validated here and inserted in chunks by the writer;
+    # a bad row is reported without rolling back the rest of the import
+    with ImportWriter(atomic=False) as writer:
+        for row_num, row in enumerate(csv_reader, start=2):
+            progress.update(
+                rows_processed=stats['total'],
+                created_count=writer.created,
+                skipped_count=stats['skipped'],
+                error_count=stats['errors'] + len(writer.errors),
+            )
+            stats['total'] += 1
+            
+            try:
+                # Extract basic info
+                title = row.get('Title', '').strip()
+                if not title:
+                    stats['skipped'] += 1
+                    stats['error_details'].append(f'Row {row_num}: Missing title')
+                    continue
                 
-                # Get all colleagues to merge
-                colleagues_to_merge = Colleague.objects.filter(
-                    id__in=colleague_ids
-                ).exclude(id=primary_id)
+                # Check for duplicates
+                first_doi = (row.get('DOIs (Digital Object Identifiers)', '') or '').split(',')[0]
+                if duplicates and duplicates.match(doi=first_doi.strip(), title=title):
+                    stats['skipped'] += 1
+                    continue
                 
-                merge_count = 0
-                outputs_moved = 0
+                # Parse authors
+                person_string = row.get('Person', '')
+                authors = parse_authors(person_string)
                 
-                for colleague in colleagues_to_merge:
-                    # Move all outputs to the primary colleague
-                    outputs = Output.objects.filter(colleague=colleague)
-                    outputs_count = outputs.count()
-                    outputs.update(colleague=primary)
-                    outputs_moved += outputs_count
+                if not authors:
+                    stats['skipped'] += 1
+                    stats['error_details'].append(f'Row {row_num}: No authors found')
+                    continue
+                
+                # Get or create primary author (first author)
+                primary_colleague = find_or_create_colleague(
+                    authors[0], resolver, create_missing_staff, set_as_coauthor=True
+                )
+                
+                if not primary_colleague:
+                    stats['skipped'] += 1
+                    stats['error_details'].append(
+                        f'Row {row_num}: Could not find/create colleague "{authors[0]}"'
+                    )
+                    continue
+                
+                # Map publication type to single-letter code
+                pub_type_code = map_publication_type_to_code(row.get('Type', ''))
+                
+                # Parse dates
+                publication_year = safe_parse_date(
+                    row.get('Full date') or row.get('Earliest published date')
+                ).year
+                
+                # Extract publication venue (journal + publisher)
+                journal = row.get('Journal title', '') or ''
+                publisher = row.get('Publisher', '') or ''
+                
+                if journal and publisher:
+                    venue = f"{journal} ({publisher})"
+                elif journal:
+                    venue = journal
+                elif publisher:
+                    venue = publisher
+                else:
+                    venue = 'Unknown'  # Required field, must have value
+                
+                # Extract DOI and build URL if no URL provided
+                doi = (row.get('DOIs (Digital Object Identifiers)', '') or '').strip()
+                if doi:
+                    # Clean DOI - may have multiple DOIs, take first one
+                    doi_clean = doi.split(',')[0].strip()
+                    # Remove any existing DOI URL prefix
+                    doi_clean = doi_clean.replace('https://doi.org/', '').replace('http://dx.doi.org/', '')
+                    doi = doi_clean[:200]  # Truncate to field length
+                    url = f"https://doi.org/{doi}"
+                else:
+                    doi = ''
+                    url = ''
+                
+                # Check Open Access status
+                oa_status = row.get('REF Open Access compliance status', '')
+                is_open_access = oa_status.startswith('REF OA Compliance MET')
+                
+                # Build internal notes with all the import metadata
+                internal_notes = (
+                    f"Imported from CSV on {datetime.now().strftime('%Y-%m-%d %H:%M')}\n\n"
+                    f"Pure ID: {row.get('Pure ID', 'N/A')}\n"
+                    f"Organisational unit: {row.get('Organisational unit', 'N/A')}\n"
+                    f"Managing org unit: {row.get('Managing organisational unit', 'N/A')}\n"
+                    f"Number of internal persons: {row.get('Number of internal persons', 'N/A')}\n"
+                    f"Publisher: {publisher}\n"
+                    f"Journal: {journal}\n"
+                    f"OA Status: {oa_status}\n"
+                    f"OA Notes: {row.get('Open Access compliance notes', 'N/A')}\n"
+                    f"Original CSV Status: {row.get('Current publication status', 'N/A')}\n"
+                )
+                
+                # Queue output with ALL required fields
+                output = Output(
+                    # Required ForeignKey
+                    colleague=primary_colleague,
                     
-                    # Move internal reviews if any
-                    from core.models import InternalReview
-                    InternalReview.objects.filter(reviewer=colleague).update(reviewer=primary)
+                    # Basic publication info (all required)
+                    title=title[:500],  # Truncate to max_length
+                    publication_type=pub_type_code,  # Single letter code
+                    publication_year=publication_year,
+                    publication_venue=venue[:300],  # Truncate to max_length
                     
-                    # Move internal panel memberships if any
-                    from core.models import InternalPanelMember
-                    InternalPanelMember.objects.filter(colleague=colleague).update(colleague=primary)
+                    # Volume/issue/pages (required, use empty string if missing)
+                    volume=(row.get('Host publication volume', '') or '')[:50],
+                    issue=(row.get('Issue number', '') or '')[:50],
+                    pages=(row.get('Pages (from-to)', '') or '')[:50],
                     
-                    # Keep a record of the merge in notes
-                    merge_note = (
-                        f"\n\nMerged from: {colleague.user.get_full_name() if colleague.user else 'Unknown'} "
-                        f"(Staff ID: {colleague.staff_id}) "
-                        f"on {datetime.now().strftime('%Y-%m-%d')}"
-                    )
+                    # Identifiers (required, use empty string if missing)
+                    doi=doi,
+                    isbn=(row.get('ISBN (print)', '') or '')[:50],
+                    url=url[:500] if url else '',
                     
-                    # Delete the duplicate colleague
-                    # Note: This will also delete their User account
-                    duplicate_user = colleague.user
-                    colleague.delete()
-                    if duplicate_user:
-                        duplicate_user.delete()
+                    # Author info (required)
+                    all_authors=person_string if person_string else extract_first_author_name(person_string),
+                    author_position=1,  # Default to first author
                     
-                    merge_count += 1
-                
-                messages.success(
-                    request,
-                    f'Successfully merged {merge_count} colleague(s) into '
-                    f'{primary.user.get_full_name() if primary.user else primary.staff_id}. '
-                    f'Moved {outputs_moved} output(s).'
+                    # REF-specific fields (required, use defaults)
+                    uoa='Main Panel A',  # Default - adjust as needed
+                    status='draft',  # Default status for imported items
+                    quality_rating='U',  # Unclassified until reviewed
+                    
+                    # Boolean flags (required)
+                    is_double_weighted=False,  # Default
+                    is_interdisciplinary=False,  # Default
+                    is_open_access=is_open_access,
+                    
+                    # Text fields (required, use default if empty)
+                    abstract=row.get('Abstract', '') or 'Abstract not provided.',
+                    keywords=row.get('Keywords', '') or 'Not specified',
+                    internal_notes=internal_notes,
                 )
                 
-        except Exception as e:
-            messages.error(request, f'Error merging colleagues: {str(e)}')
-        
-        return redirect('colleague_list')
-    
-    # GET request - show merge form
-    colleague_ids = request.GET.getlist('ids')
-    
-    if not colleague_ids:
-        messages.warning(request, 'No colleagues selected for merging')
-        return redirect('find_duplicate_colleagues')
+                if writer.add(row_num, output) and duplicates:
+                    duplicates.add(output.doi, output.title)
+                
+            except Exception as e:
+                stats['errors'] += 1
+                error_msg = f'Row {row_num}: {str(e)}'
+                stats['error_details'].append(error_msg)
+                # Print to console for debugging
+                print(f"Import error: {error_msg}")
     
-    colleagues = Colleague.objects.filter(id__in=colleague_ids).select_related('user')
+    stats['created'] = writer.created
+    stats['errors'] += len(writer.errors)
+    stats['error_details'].extend(writer.errors)
     
-    # Get output counts for each colleague
-    for colleague in colleagues:
-        colleague.output_count = Output.objects.filter(colleague=colleague).count()
+    progress.update(rows_processed=stats['total'], created_count=stats['created'],
+                    skipped_count=stats['skipped'], error_count=stats['errors'])
     
-    return render(request, 'core/merge_colleagues.html', {
-        'colleagues': colleagues,
-        'title': 'Merge Colleagues'
-    })
+    # Result messages
+    result_messages = [(
+        'success',
+        f"Import completed! Created: {stats['created']}, "
+        f"Skipped: {stats['skipped']}, Errors: {stats['errors']}"
+    )]
+    return result_messages + _error_messages(stats['error_details']), stats['error_details']
+
+
+"""
+COLLEAGUE MERGE FUNCTIONALITY
+
+Add these functions to core/views.py
+"""
+
+from django.shortcuts import render, redirect, get_object_or_404
+from django.contrib.auth.decorators import login_required, user_passes_test
+from django.contrib import messages
+from django.db import transaction
+from django.db.models import Q, Count
+from core.models import Colleague, Output
 
+# Helper function to check if user is admin/staff
+def is_staff_user(user):
+    return user.is_staff or user.is_superuser
 
 
 @login_required
@@ -2327,40 +1979,22 @@ def is_staff_user(user):
     return user.is_staff or user.is_superuser
 
 
+DUPLICATE_COLLEAGUE_GROUP_LIMIT = 200
+
+
 @login_required
 @user_passes_test(is_staff_user)
 def find_duplicate_colleagues(request):
     """
-    Find potential duplicate colleagues based on similar names
+    Find potential duplicate colleagues: similar surnames (by their stored
+    name keys), compatible initials, shared outputs and auto-created staff
+    IDs. See colleague_duplicates.py.
     """
-    # Find colleagues with similar last names
-    from collections import defaultdict
-    
-    all_colleagues = Colleague.objects.select_related('user').all()
-    
-    # Group by similar last names (case insensitive)
-    name_groups = defaultdict(list)
-    for colleague in all_colleagues:
-        if colleague.user:
-            last_name_key = colleague.user.last_name.lower().strip()
-            name_groups[last_name_key].append(colleague)
-    
-    # Find groups with more than one colleague
-    duplicates = []
-    for last_name, colleagues_list in name_groups.items():
-        if len(colleagues_list) > 1:
-            # Add details about each group
-            duplicates.append({
-                'last_name': last_name,
-                'colleagues': colleagues_list,
-                'count': len(colleagues_list)
-            })
-    
-    # Sort by number of duplicates
-    duplicates.sort(key=lambda x: x['count'], reverse=True)
+    groups = find_duplicate_groups(limit=DUPLICATE_COLLEAGUE_GROUP_LIMIT)
     
     return render(request, 'core/duplicate_colleagues.html', {
-        'duplicates': duplicates,
+        'duplicates': groups,
+        'limit': DUPLICATE_COLLEAGUE_GROUP_LIMIT,
         'title': 'Find Duplicate Colleagues'
     })
 
@@ -2428,6 +2062,9 @@ def merge_colleagues(request):
                     
                     merge_count += 1
                 
+                # QuerySet.update() above sends no signals
+                refresh_colleague_stats([primary.pk])
+                
                 messages.success(
                     request,
                     f'Successfully merged {merge_count} colleague(s) into '
@@ -2447,11 +2084,9 @@ def merge_colleagues(request):
         messages.warning(request, 'No colleagues selected for merging')
         return redirect('find_duplicate_colleagues')
     
-    colleagues = Colleague.objects.filter(id__in=colleague_ids).select_related('user')
-    
-    # Get output counts for each colleague
-    for colleague in colleagues:
-        colleague.output_count = Output.objects.filter(colleague=colleague).count()
+    colleagues = Colleague.objects.filter(id__in=colleague_ids).select_related('user').annotate(
+        output_count=Coalesce('stats__total_outputs', 0)
+    )
     
     return render(request, 'core/merge_colleagues.html', {
         'colleagues': colleagues,
@@ -2468,51 +2103,43 @@ def colleague_list(request):
     category_filter = request.GET.get('category', 'all')
     
     # Base queryset
-    colleagues = Colleague.objects.select_related('user').annotate(
-        output_count=Count('outputs')
+    colleagues = Colleague.objects.select_related('user', 'stats').annotate(
+        output_count=Coalesce('stats__total_outputs', 0)
     )
     
-    # Role-based filtering
+    # Role-based filtering: admins and observers see all, others only themselves
     user = request.user
     if hasattr(user, 'ref_profile'):
-        profile = user.ref_profile
-        # Admins and Observers see all
-        if not (profile.is_admin or profile.is_observer):
-            # Regular colleagues and panel members only see themselves
-            if hasattr(user, 'colleague'):
-                colleagues = colleagues.filter(pk=user.colleague.pk)
-            else:
-                colleagues = colleagues.none()
+        colleagues = colleagues.visible_to(user.ref_profile)
     
     # Apply category filters (only meaningful for admins/observers)
     if category_filter != 'all':
         colleagues = colleagues.filter(colleague_category=category_filter)
     
-    # Order by name
+    # Order by name, one page at a time
     colleagues = colleagues.order_by('user__last_name', 'user__first_name')
+    page = paginate_request(request, colleagues)
+    if wants_fragment(request):
+        return fragment_response(request, 'core/includes/colleague_rows.html', {'colleagues': page}, page)
     
-    # Get category counts for sidebar
-    category_counts = {
-        'all': Colleague.objects.count(),
-        'independent': Colleague.objects.filter(colleague_category='independent').count(),
-        'non_independent': Colleague.objects.filter(colleague_category='non_independent').count(),  # UNDERSCORE!
-        'postdoc': Colleague.objects.filter(colleague_category='postdoc').count(),
-        'research_assistant': Colleague.objects.filter(colleague_category='research_assistant').count(),
-        'academic': Colleague.objects.filter(colleague_category='academic').count(),
-        'support': Colleague.objects.filter(colleague_category='support').count(),
-        'employee': Colleague.objects.filter(colleague_category='employee').count(),
-        'former': Colleague.objects.filter(colleague_category='former').count(),
-        'coauthor': Colleague.objects.filter(colleague_category='coauthor').count(),
-    }
-    
-    # Add employment status counts
-    employment_counts = {
-        'current': Colleague.objects.filter(employment_status='current').count(),
-        'former': Colleague.objects.filter(employment_status='former').count(),
-    }
+    # Category and employment status counts for the sidebar, from one grouped query
+    category_counts = dict.fromkeys(
+        ['all'] + [category for category, _ in Colleague.COLLEAGUE_CATEGORY_CHOICES], 0
+    )
+    employment_counts = {'current': 0, 'former': 0}
+    groups = Colleague.objects.order_by().values_list(
+        'colleague_category', 'employment_status'
+    ).annotate(count=Count('pk'))
+    for category, employment_status, count in groups:
+        category_counts['all'] += count
+        if category in category_counts:
+            category_counts[category] += count
+        if employment_status in employment_counts:
+            employment_counts[employment_status] += count
     
     context = {
-        'colleagues': colleagues,
+        'colleagues': page,
+        'page': page,
         'category_counts': category_counts,
         'employment_counts': employment_counts,
         'current_filter': category_filter,
@@ -2583,346 +2210,102 @@ def critical_friend_assignment_delete(request, pk):
 # Auto-installed by installation script
 # ===========================================
 
+COMPARISON_PAGE_SIZE = 25
+
+
 @login_required
 def compare_outputs(request):
     """
     Upload spreadsheet and compare against database outputs.
-    Shows comparison results with categorization.
+    The results are stored as a ComparisonRun and reviewed page by page.
     """
     if request.method == 'POST' and request.FILES.get('spreadsheet'):
         csv_file = request.FILES['spreadsheet']
         
         try:
             # Parse CSV
-            spreadsheet_rows = parse_csv_to_dict(csv_file)
+            spreadsheet_rows = _number_rows(parse_csv_to_dict(csv_file))
             
             # Get all outputs from database
-            db_outputs = Output.objects.all().select_related('colleague')
+            db_outputs = Output.objects.select_related('colleague__user')
             
             # Run comparison
             comparator = OutputComparator(db_outputs)
             results = comparator.compare_spreadsheet(spreadsheet_rows)
             
-            # Store results in session for review page
-            request.session['comparison_results'] = {
-                'new': _serialize_new_outputs(results['new']),
-                'duplicates': _serialize_duplicates(results['duplicates']),
-                'exact': _serialize_exact_matches(results['exact']),
-                'stats': {
-                    'total': len(spreadsheet_rows),
-                    'new_count': len(results['new']),
-                    'duplicate_count': len(results['duplicates']),
-                    'exact_count': len(results['exact'])
-                }
-            }
+            run = _save_comparison_run(results, csv_file.name, request.user)
+            # Only the id goes in the session, for the run-less review URL
+            request.session['comparison_run_id'] = run.pk
             
-            return redirect('review_comparison')
+            return redirect(run)
             
         except Exception as e:
             messages.error(request, f'Error processing file: {str(e)}')
             return redirect('compare_outputs')
     
-    return render(request, 'core/compare_outputs.html')
+    recent_runs = ComparisonRun.objects.filter(created_by=request.user)[:5]
+    return render(request, 'core/compare_outputs.html', {'recent_runs': recent_runs})
 
 
 @login_required
-def review_comparison(request):
+def review_comparison(request, run_id=None):
     """
     Interactive review page for comparison results.
-    Let user decide what to do with each output.
+    Let user decide what to do with each output, a page at a time;
+    filterable by category, minimum confidence and decision status.
     """
-    results = request.session.get('comparison_results')
-    
-    if not results:
-        messages.warning(request, 'No comparison results found. Please upload a file first.')
-        return redirect('compare_outputs')
-    
-    context = {
-        'new_outputs': results['new'],
-        'duplicates': results['duplicates'],
-        'exact_matches': results['exact'],
-        'stats': results['stats']
-    }
+    if run_id is None:
+        run_id = request.session.get('comparison_run_id')
+        if not run_id:
+            messages.warning(request, 'No comparison results found. Please upload a file first.')
+            return redirect('compare_outputs')
+        return redirect('review_comparison', run_id=run_id)
     
-    return render(request, 'core/review_comparison.html', context)
-
-
-@login_required
-@require_POST
-def process_comparison_decisions(request):
-    """
-    Process user decisions from review page.
-    Import new outputs, merge duplicates, skip exact matches.
-    """
-    try:
-        decisions = json.loads(request.POST.get('decisions', '{}'))
-        results = request.session.get('comparison_results')
-        
-        if not results:
-            return JsonResponse({'error': 'No comparison results found'}, status=400)
-        
-        imported_count = 0
-        merged_count = 0
-        skipped_count = 0
-        
-        with transaction.atomic():
-            # Process new outputs marked for import
-            for idx, decision in decisions.get('new', {}).items():
-                if decision['action'] == 'import':
-                    output_data = results['new'][int(idx)]['spreadsheet_row']
-                    _create_output_from_data(output_data, decision.get('edits', {}))
-                    imported_count += 1
-            
-            # Process duplicates
-            for idx, decision in decisions.get('duplicates', {}).items():
-                duplicate_data = results['duplicates'][int(idx)]
-                
-                if decision['action'] == 'import_as_new':
-                    output_data = duplicate_data['spreadsheet_row']
-                    _create_output_from_data(output_data, decision.get('edits', {}))
-                    imported_count += 1
-                    
-                elif decision['action'] == 'merge':
-                    # Merge into existing output
-                    db_output_id = decision.get('merge_into_id')
-                    if db_output_id:
-                        output_data = duplicate_data['spreadsheet_row']
-                        _merge_into_output(db_output_id, output_data, decision.get('edits', {}))
-                        merged_count += 1
-                        
-                elif decision['action'] == 'skip':
-                    skipped_count += 1
-        
-        # Clear session data
-        del request.session['comparison_results']
-        
-        messages.success(
-            request, 
-            f'Successfully processed: {imported_count} imported, '
-            f'{merged_count} merged, {skipped_count} skipped'
-        )
-        
-        return JsonResponse({
-            'success': True,
-            'imported': imported_count,
-            'merged': merged_count,
-            'skipped': skipped_count
-        })
-        
-    except Exception as e:
-        return JsonResponse({'error': str(e)}, status=500)
-
-
-@login_required
-@require_POST
-def quick_import_new(request):
-    """Quick action: Import all new outputs at once."""
-    results = request.session.get('comparison_results')
+    run = _get_comparison_run(request, run_id)
     
-    if not results:
-        messages.error(request, 'No comparison results found')
-        return redirect('compare_outputs')
+    results = run.results.all()
+    category = request.GET.get('category', '')
+    if category in dict(ComparisonResult.CATEGORY_CHOICES):
+        results = results.filter(category=category)
+    else:
+        category = ''
     
     try:
-        imported = 0
-        with transaction.atomic():
-            for item in results['new']:
-                _create_output_from_data(item['spreadsheet_row'])
-                imported += 1
-        
-        messages.success(request, f'Successfully imported {imported} new outputs')
-        del request.session['comparison_results']
-        
-    except Exception as e:
-        messages.error(request, f'Error importing: {str(e)}')
-    
-    return redirect('output_list')
-
-
-def _serialize_new_outputs(new_list):
-    """Serialize new outputs for session storage."""
-    return [
-        {
-            'spreadsheet_row': item['spreadsheet_row'],
-        }
-        for item in new_list
-    ]
-
-
-def _serialize_duplicates(duplicate_list):
-    """Serialize duplicate matches for session storage."""
-    serialized = []
-    
-    for item in duplicate_list:
-        matches = []
-        for match in item['potential_matches']:
-            output = match['output']
-            matches.append({
-                'id': output.id,
-                'title': output.title,
-                'authors': output.all_authors,
-                'date': str(output.publication_year),
-                'venue': output.publication_venue,
-                'doi': output.doi,
-                'colleague': output.colleague.user.get_full_name(),
-                'confidence': match['confidence'],
-                'match_reasons': match['match_reasons']
-            })
-        
-        serialized.append({
-            'spreadsheet_row': item['spreadsheet_row'],
-            'potential_matches': matches,
-            'best_match': matches[0] if matches else None
-        })
-    
-    return serialized
-
-
-def _serialize_exact_matches(exact_list):
-    """Serialize exact matches for session storage."""
-    return [
-        {
-            'spreadsheet_row': item['spreadsheet_row'],
-            'database_match': {
-                'id': item['database_match'].id,
-                'title': item['database_match'].title,
-                'authors': item['database_match'].all_authors,
-                'colleague': item['database_match'].colleague.user.get_full_name(),
-            },
-            'match_type': item['match_type'],
-            'confidence': item['confidence']
-        }
-        for item in exact_list
-    ]
-
-
-def _create_output_from_data(data, edits=None):
-    """
-    Create new Output from spreadsheet data.
-    
-    Args:
-        data: Dictionary with output fields
-        edits: Optional dictionary with user edits to apply
-    """
-    # Apply edits if provided
-    if edits:
-        data.update(edits)
-    
-    # Find or create colleague (simplified - adapt to your needs)
-    authors = data.get('all_authors', '').split('//')[0].strip()  # First author
-    colleague = _find_or_create_colleague(authors)
-    
-    # Create output
-    output = Output.objects.create(
-        title=data.get('title', ''),
-        all_authors=data.get('all_authors', ''),
-        publication_venue=data.get('publication_venue', ''),
-        publication_type=data.get('publication_type', 'article'),
-        publication_year=data.get('publication_year'),
-        doi=data.get('doi', ''),
-        url=data.get('url', ''),
-        colleague=colleague,
-        unit_of_assessment='Modern Languages',  # Default - customize
-        ref_eligible=True
-    )
-    
-    return output
-
-
-def _merge_into_output(output_id, new_data, edits=None):
-    """
-    Merge new data into existing output.
-    Updates fields that are empty in database but present in spreadsheet.
-    """
-    output = Output.objects.get(id=output_id)
-    
-    # Apply edits if provided
-    if edits:
-        new_data.update(edits)
-    
-    # Update empty fields
-    if not output.doi and new_data.get('doi'):
-        output.doi = new_data['doi']
-    
-    if not output.url and new_data.get('url'):
-        output.url = new_data['url']
-    
-    # Add to notes that this was merged
-    merge_note = f"\n[Merged from spreadsheet import on {timezone.now().date()}]"
-    output.notes = (output.notes or '') + merge_note
-    
-    output.save()
-    return output
-
-
-def _find_or_create_colleague(author_name):
-    pass
-
-# ===========================================
-# OUTPUT COMPARISON VIEWS
-# Auto-installed by installation script
-# ===========================================
-
-@login_required
-def compare_outputs(request):
-    pass
-    """
-    Upload spreadsheet and compare against database outputs.
-    Shows comparison results with categorization.
-    """
-    if request.method == 'POST' and request.FILES.get('spreadsheet'):
-        csv_file = request.FILES['spreadsheet']
-        
-        try:
-            # Parse CSV
-            spreadsheet_rows = parse_csv_to_dict(csv_file)
-            
-            # Get all outputs from database
-            db_outputs = Output.objects.all().select_related('colleague')
-            
-            # Run comparison
-            comparator = OutputComparator(db_outputs)
-            results = comparator.compare_spreadsheet(spreadsheet_rows)
-            
-            # Store results in session for review page
-            request.session['comparison_results'] = {
-                'new': _serialize_new_outputs(results['new']),
-                'duplicates': _serialize_duplicates(results['duplicates']),
-                'exact': _serialize_exact_matches(results['exact']),
-                'stats': {
-                    'total': len(spreadsheet_rows),
-                    'new_count': len(results['new']),
-                    'duplicate_count': len(results['duplicates']),
-                    'exact_count': len(results['exact'])
-                }
-            }
-            
-            return redirect('review_comparison')
-            
-        except Exception as e:
-            messages.error(request, f'Error processing file: {str(e)}')
-            return redirect('compare_outputs')
+        min_confidence = max(0, min(int(request.GET.get('min_confidence') or 0), 100))
+    except ValueError:
+        min_confidence = 0
+    if min_confidence:
+        results = results.filter(confidence__gte=min_confidence / 100)
+    
+    status = request.GET.get('status', '')
+    if status == 'undecided':
+        results = results.filter(decision='')
+    elif status == 'decided':
+        results = results.exclude(decision='')
+    else:
+        status = ''
     
-    return render(request, 'core/compare_outputs.html')
-
-
-@login_required
-def review_comparison(request):
-    """
-    Interactive review page for comparison results.
-    Let user decide what to do with each output.
-    """
-    results = request.session.get('comparison_results')
+    page_obj = Paginator(results, COMPARISON_PAGE_SIZE).get_page(request.GET.get('page'))
     
-    if not results:
-        messages.warning(request, 'No comparison results found. Please upload a file first.')
-        return redirect('compare_outputs')
+    filters = request.GET.copy()
+    filters.pop('page', None)
     
     context = {
-        'new_outputs': results['new'],
-        'duplicates': results['duplicates'],
-        'exact_matches': results['exact'],
-        'stats': results['stats']
+        'run': run,
+        'page_obj': page_obj,
+        'results': page_obj.object_list,
+        'category': category,
+        'min_confidence': min_confidence,
+        'status': status,
+        'filter_query': filters.urlencode(),
+        'stats': {
+            'total': run.total,
+            'new_count': run.new_count,
+            'duplicate_count': run.duplicate_count,
+            'exact_count': run.exact_count,
+            'undecided_new_count': run.results.filter(category='new', decision='').count(),
+            'decided_count': run.results.exclude(decision='').count(),
+        },
     }
     
     return render(request, 'core/review_comparison.html', context)
@@ -2930,212 +2313,127 @@ def review_comparison(request):
 
 @login_required
 @require_POST
-def process_comparison_decisions(request):
+def process_comparison_decisions(request, run_id):
     """
     Process user decisions from review page.
     Import new outputs, merge duplicates, skip exact matches.
+    
+    Expects ``decisions`` as JSON: {result_id: {action, merge_into_id, edits}}.
+    Results that already have a decision are left alone.
+    Decisions are applied in bulk, see ``comparison_decisions.apply_decisions``;
+    the response carries per-action counts, row errors and phase timings.
     """
+    run = _get_comparison_run(request, run_id)
+    
     try:
         decisions = json.loads(request.POST.get('decisions', '{}'))
-        results = request.session.get('comparison_results')
-        
-        if not results:
-            return JsonResponse({'error': 'No comparison results found'}, status=400)
-        
-        imported_count = 0
-        merged_count = 0
-        skipped_count = 0
-        
-        with transaction.atomic():
-            # Process new outputs marked for import
-            for idx, decision in decisions.get('new', {}).items():
-                if decision['action'] == 'import':
-                    output_data = results['new'][int(idx)]['spreadsheet_row']
-                    _create_output_from_data(output_data, decision.get('edits', {}))
-                    imported_count += 1
-            
-            # Process duplicates
-            for idx, decision in decisions.get('duplicates', {}).items():
-                duplicate_data = results['duplicates'][int(idx)]
-                
-                if decision['action'] == 'import_as_new':
-                    output_data = duplicate_data['spreadsheet_row']
-                    _create_output_from_data(output_data, decision.get('edits', {}))
-                    imported_count += 1
-                    
-                elif decision['action'] == 'merge':
-                    # Merge into existing output
-                    db_output_id = decision.get('merge_into_id')
-                    if db_output_id:
-                        output_data = duplicate_data['spreadsheet_row']
-                        _merge_into_output(db_output_id, output_data, decision.get('edits', {}))
-                        merged_count += 1
-                        
-                elif decision['action'] == 'skip':
-                    skipped_count += 1
-        
-        # Clear session data
-        del request.session['comparison_results']
-        
-        messages.success(
-            request, 
-            f'Successfully processed: {imported_count} imported, '
-            f'{merged_count} merged, {skipped_count} skipped'
-        )
-        
-        return JsonResponse({
-            'success': True,
-            'imported': imported_count,
-            'merged': merged_count,
-            'skipped': skipped_count
-        })
-        
+        summary = apply_decisions(run, decisions)
     except Exception as e:
         return JsonResponse({'error': str(e)}, status=500)
+    
+    messages.success(
+        request, 
+        f'Successfully processed: {summary["imported"]} imported, '
+        f'{summary["merged"]} merged, {summary["skipped"]} skipped'
+    )
+    for error in summary['errors']:
+        messages.warning(request, f'Not processed: {error}')
+    
+    return JsonResponse({'success': True, **summary})
 
 
 @login_required
 @require_POST
-def quick_import_new(request):
-    """Quick action: Import all new outputs at once."""
-    results = request.session.get('comparison_results')
-    
-    if not results:
-        messages.error(request, 'No comparison results found')
-        return redirect('compare_outputs')
+def quick_import_new(request, run_id):
+    """Quick action: Import all undecided new outputs of a run at once."""
+    run = _get_comparison_run(request, run_id)
     
     try:
-        imported = 0
-        with transaction.atomic():
-            for item in results['new']:
-                _create_output_from_data(item['spreadsheet_row'])
-                imported += 1
-        
-        messages.success(request, f'Successfully imported {imported} new outputs')
-        del request.session['comparison_results']
-        
+        pks = run.results.filter(category='new', decision='').values_list('pk', flat=True)
+        summary = apply_decisions(run, {str(pk): {'action': 'import'} for pk in pks})
     except Exception as e:
         messages.error(request, f'Error importing: {str(e)}')
+        return redirect(run)
+    
+    messages.success(request, f'Successfully imported {summary["imported"]} new outputs')
+    for error in summary['errors']:
+        messages.warning(request, f'Not imported: {error}')
     
     return redirect('output_list')
 
 
-def _serialize_new_outputs(new_list):
-    """Serialize new outputs for session storage."""
-    return [
-        {
-            'spreadsheet_row': item['spreadsheet_row'],
-        }
-        for item in new_list
-    ]
+def _get_comparison_run(request, run_id):
+    """Return the run if the user created it (or is staff), else 404."""
+    run = get_object_or_404(ComparisonRun, pk=run_id)
+    if run.created_by_id != request.user.pk and not (request.user.is_staff or request.user.is_superuser):
+        raise Http404("Comparison run not found")
+    return run
 
 
-def _serialize_duplicates(duplicate_list):
-    """Serialize duplicate matches for session storage."""
-    serialized = []
-    
-    for item in duplicate_list:
-        matches = []
-        for match in item['potential_matches']:
-            output = match['output']
-            matches.append({
-                'id': output.id,
-                'title': output.title,
-                'authors': output.all_authors,
-                'date': str(output.publication_year),
-                'venue': output.publication_venue,
-                'doi': output.doi,
-                'colleague': output.colleague.user.get_full_name(),
-                'confidence': match['confidence'],
-                'match_reasons': match['match_reasons']
-            })
-        
-        serialized.append({
-            'spreadsheet_row': item['spreadsheet_row'],
-            'potential_matches': matches,
-            'best_match': matches[0] if matches else None
-        })
-    
-    return serialized
+def _number_rows(spreadsheet_rows):
+    """Tag each row with its spreadsheet row number (the header is row 1)."""
+    for row_number, row in enumerate(spreadsheet_rows, start=2):
+        row['row_number'] = row_number
+        yield row
 
 
-def _serialize_exact_matches(exact_list):
-    """Serialize exact matches for session storage."""
-    return [
-        {
-            'spreadsheet_row': item['spreadsheet_row'],
-            'database_match': {
-                'id': item['database_match'].id,
-                'title': item['database_match'].title,
-                'authors': item['database_match'].all_authors,
-                'colleague': item['database_match'].colleague.user.get_full_name(),
-            },
-            'match_type': item['match_type'],
-            'confidence': item['confidence']
-        }
-        for item in exact_list
-    ]
+def _save_comparison_run(results, original_name, user):
+    """Store the comparator results as a ComparisonRun with one ComparisonResult per row."""
+    with transaction.atomic():
+        run = ComparisonRun.objects.create(
+            created_by=user,
+            original_name=original_name[:255],
+            new_count=len(results['new']),
+            duplicate_count=len(results['duplicates']),
+            exact_count=len(results['exact']),
+        )
+        
+        rows = [_comparison_result(run, 'new', item['spreadsheet_row']) for item in results['new']]
+        for item in results['duplicates']:
+            best = item['best_match']
+            rows.append(_comparison_result(
+                run, 'duplicate', item['spreadsheet_row'],
+                confidence=best['confidence'],
+                best_match=best['output'],
+                matches=[
+                    _match_summary(match['output'], match['confidence'], match['match_reasons'])
+                    for match in item['potential_matches']
+                ],
+            ))
+        for item in results['exact']:
+            output = item['database_match']
+            rows.append(_comparison_result(
+                run, 'exact', item['spreadsheet_row'],
+                confidence=item['confidence'],
+                best_match=output,
+                matches=[_match_summary(output, item['confidence'], [f"Same {item['match_type'].upper()}"])],
+            ))
+        
+        rows.sort(key=lambda result: result.row_number)
+        ComparisonResult.objects.bulk_create(rows, batch_size=500)
+    return run
 
 
-def _create_output_from_data(data, edits=None):
-    """
-    Create new Output from spreadsheet data.
-    
-    Args:
-        data: Dictionary with output fields
-        edits: Optional dictionary with user edits to apply
-    """
-    # Apply edits if provided
-    if edits:
-        data.update(edits)
-    
-    # Find or create colleague (simplified - adapt to your needs)
-    authors = data.get('all_authors', '').split('//')[0].strip()  # First author
-    colleague = _find_or_create_colleague(authors)
-    
-    # Create output
-    output = Output.objects.create(
-        title=data.get('title', ''),
-        all_authors=data.get('all_authors', ''),
-        publication_venue=data.get('publication_venue', ''),
-        publication_type=data.get('publication_type', 'article'),
-        publication_year=data.get('publication_year'),
-        doi=data.get('doi', ''),
-        url=data.get('url', ''),
-        colleague=colleague,
-        unit_of_assessment='Modern Languages',  # Default - customize
-        ref_eligible=True
-    )
-    
-    return output
-
-
-def _merge_into_output(output_id, new_data, edits=None):
-    """
-    Merge new data into existing output.
-    Updates fields that are empty in database but present in spreadsheet.
-    """
-    output = Output.objects.get(id=output_id)
-    
-    # Apply edits if provided
-    if edits:
-        new_data.update(edits)
-    
-    # Update empty fields
-    if not output.doi and new_data.get('doi'):
-        output.doi = new_data['doi']
-    
-    if not output.url and new_data.get('url'):
-        output.url = new_data['url']
-    
-    # Add to notes that this was merged
-    merge_note = f"\n[Merged from spreadsheet import on {timezone.now().date()}]"
-    output.notes = (output.notes or '') + merge_note
-    
-    output.save()
-    return output
+def _comparison_result(run, category, spreadsheet_row, **fields):
+    row = dict(spreadsheet_row)
+    row.pop('raw_row', None)  # the standardized fields are all the review needs
+    row_number = row.pop('row_number', 0)
+    return ComparisonResult(run=run, row_number=row_number, category=category, spreadsheet_row=row, **fields)
 
 
+def _match_summary(output, confidence, reasons):
+    """What the review page shows about a matching database output."""
+    return {
+        'id': output.id,
+        'title': output.title,
+        'authors': output.all_authors,
+        'date': str(output.publication_year),
+        'venue': output.publication_venue,
+        'doi': output.doi,
+        'colleague': output.colleague.user.get_full_name(),
+        'confidence': round(confidence * 100),
+        'match_reasons': reasons,
+    }
 
 
 @login_required
@@ -3144,95 +2442,35 @@ def risk_dashboard(request):
     Risk assessment dashboard showing risk distribution and high-risk outputs
     Works with existing fields: overall_risk_score, content_risk_score, timeline_risk_score
     """
-    # Get all outputs with risk data
     outputs = Output.objects.all()
-    outputs_with_risk = outputs.exclude(overall_risk_score=0.0)
-    
-    # Calculate risk levels from overall_risk_score
-    low_risk = outputs.filter(overall_risk_score__lt=0.25)
-    medium_low_risk = outputs.filter(overall_risk_score__gte=0.25, overall_risk_score__lt=0.5)
-    medium_high_risk = outputs.filter(overall_risk_score__gte=0.5, overall_risk_score__lt=0.75)
-    high_risk = outputs.filter(overall_risk_score__gte=0.75)
-    
-    # Risk level distribution
-    risk_distribution = {
-        'low': low_risk.count(),
-        'medium_low': medium_low_risk.count(),
-        'medium_high': medium_high_risk.count(),
-        'high': high_risk.count(),
-    }
-    
-    # Calculate percentages
-    total_outputs = outputs.count()
-    if total_outputs > 0:
-        risk_percentages = {
-            'low': round(risk_distribution['low'] / total_outputs * 100, 1),
-            'medium_low': round(risk_distribution['medium_low'] / total_outputs * 100, 1),
-            'medium_high': round(risk_distribution['medium_high'] / total_outputs * 100, 1),
-            'high': round(risk_distribution['high'] / total_outputs * 100, 1),
-        }
-    else:
-        risk_percentages = {
-            'low': 0,
-            'medium_low': 0,
-            'medium_high': 0,
-            'high': 0,
-        }
+    summary = risk_summary(outputs)
+    distribution = summary['risk_distribution']
     
     # High risk outputs (require attention)
-    high_risk_outputs = high_risk.select_related('colleague')[:20]
-    
-    # OA compliance issues
-    oa_risk_count = outputs.filter(oa_compliance_risk=True).count()
-    oa_risk_outputs = outputs.filter(oa_compliance_risk=True).select_related('colleague')[:10]
+    high_risk_outputs = outputs.filter(overall_risk_score__gte=0.75).select_related('colleague__user')[:20]
+    oa_risk_outputs = outputs.filter(oa_compliance_risk=True).select_related('colleague__user')[:10]
     
-    # Quality vs Risk data for scatter plot
-    scatter_data = []
-    for output in outputs_with_risk:
-        if output.quality_rating_average:
-            try:
-                quality = float(output.quality_rating_average)
-            except (ValueError, TypeError):
-                quality_map = {'4*': 4.0, '3*': 3.0, '2*': 2.0, '1*': 1.0, 'U': 0.0}
-                quality = quality_map.get(output.quality_rating_average, 2.0)
-            
-            # Calculate risk level for this output
-            risk_score = float(output.overall_risk_score)
-            if risk_score < 0.25:
-                risk_level = 'low'
-            elif risk_score < 0.5:
-                risk_level = 'medium-low'
-            elif risk_score < 0.75:
-                risk_level = 'medium-high'
-            else:
-                risk_level = 'high'
-            
-            scatter_data.append({
-                'id': output.id,
-                'title': output.title[:50],
-                'quality': quality,
-                'risk': risk_score,
-                'risk_level': risk_level,
-            })
-    
-    # Risk score ranges
-    risk_ranges = {
-        'very_low': outputs.filter(overall_risk_score__lt=0.25).count(),
-        'low': outputs.filter(overall_risk_score__gte=0.25, overall_risk_score__lt=0.5).count(),
-        'medium': outputs.filter(overall_risk_score__gte=0.5, overall_risk_score__lt=0.75).count(),
-        'high': outputs.filter(overall_risk_score__gte=0.75).count(),
-    }
+    # Quality vs Risk data for scatter plot (rated outputs with a risk score)
+    scatter_data = scatter_points(
+        outputs.exclude(overall_risk_score=0.0).filter(quality_score_average__isnull=False),
+        'quality_score_average',
+    )
     
     context = {
-        'total_outputs': total_outputs,
-        'outputs_with_risk': outputs_with_risk.count(),
-        'risk_distribution': risk_distribution,
-        'risk_percentages': risk_percentages,
+        'total_outputs': summary['total'],
+        'outputs_with_risk': summary['with_risk'],
+        'risk_distribution': distribution,
+        'risk_percentages': summary['risk_percentages'],
         'high_risk_outputs': high_risk_outputs,
-        'oa_risk_count': oa_risk_count,
+        'oa_risk_count': summary['oa_risk'],
         'oa_risk_outputs': oa_risk_outputs,
         'scatter_data': scatter_data,
-        'risk_ranges': risk_ranges,
+        'risk_ranges': {
+            'very_low': distribution['low'],
+            'low': distribution['medium_low'],
+            'medium': distribution['medium_high'],
+            'high': distribution['high'],
+        },
     }
     
     return render(request, 'core/risk_dashboard.html', context)
@@ -6,6 +6,7 @@
 from decimal import Decimal
 from itertools import combinations
 from django.db.models import Q
+from django.db.models.functions import Coalesce
 import numpy as np
 
 
@@ -117,48 +118,51 @@ class PortfolioOptimizer:
         # Risk constraint
         filtered = filtered.filter(overall_risk_score__lte=Decimal(str(max_risk)))
         
-        # Quality constraint (filter by quality rating)
-        if min_quality >= 4:
-            filtered = filtered.filter(quality_rating='4*')
-        elif min_quality >= 3:
-            filtered = filtered.filter(quality_rating__in=['3*', '4*'])
-        elif min_quality >= 2:
-            filtered = filtered.filter(quality_rating__in=['2*', '3*', '4*'])
+        # Quality constraint (whole stars of the quality rating)
+        if min_quality >= 2:
+            filtered = filtered.filter(
+                quality_score_overall__gte=Decimal(int(min(min_quality, 4)))
+            )
         
         return filtered
     
     def _quality_focused_selection(self, outputs, min_outputs, max_outputs):
         """Select outputs prioritizing quality"""
         # Sort by quality first, then by low risk
-        sorted_outputs = sorted(
-            outputs,
-            key=lambda o: (-o.get_quality_value(), o.overall_risk_score)
+        sorted_outputs = self._with_quality_value(outputs).order_by(
+            '-quality_value', 'overall_risk_score'
         )
         
         # Take top outputs
         if max_outputs:
-            return sorted_outputs[:max_outputs]
+            return list(sorted_outputs[:max_outputs])
         elif min_outputs:
-            return sorted_outputs[:min_outputs]
+            return list(sorted_outputs[:min_outputs])
         else:
             # Take all 4* and 3* outputs
-            return [o for o in sorted_outputs if o.get_quality_value() >= 3]
+            return list(sorted_outputs.filter(quality_value__gte=3))
     
     def _risk_averse_selection(self, outputs, min_outputs, max_outputs):
         """Select outputs prioritizing low risk"""
         # Sort by risk first, then by quality
-        sorted_outputs = sorted(
-            outputs,
-            key=lambda o: (o.overall_risk_score, -o.get_quality_value())
+        sorted_outputs = self._with_quality_value(outputs).order_by(
+            'overall_risk_score', '-quality_value'
         )
         
         if max_outputs:
-            return sorted_outputs[:max_outputs]
+            return list(sorted_outputs[:max_outputs])
         elif min_outputs:
-            return sorted_outputs[:min_outputs]
+            return list(sorted_outputs[:min_outputs])
         else:
             # Take all outputs with low to medium-low risk
-            return [o for o in sorted_outputs if o.overall_risk_score < Decimal('0.50')]
+            return list(sorted_outputs.filter(overall_risk_score__lt=Decimal('0.50')))
+    
+    @staticmethod
+    def _with_quality_value(outputs):
+        """Annotate ``quality_value``, the score of get_quality_value(), for ordering in SQL"""
+        return outputs.annotate(
+            quality_value=Coalesce('quality_score_overall', Decimal('0.00'))
+        )
     
     def _inclusive_selection(self, outputs, min_outputs, max_outputs):
         """Select outputs maximizing staff inclusion"""
@@ -98,11 +98,12 @@ from django.contrib.auth.mixins import LoginRequiredMixin
 from django.shortcuts import render, redirect, get_object_or_404
 from django.db.models import Avg, Count, Q, Sum, F
 from django.http import JsonResponse, HttpResponse
-from django.urls import reverse_lazy
+from django.urls import reverse, reverse_lazy
 from decimal import Decimal
 import json
 
 from core.models import Output, REFSubmission, SubmissionOutput, Colleague
+from core.risk_analytics import risk_by_status, risk_summary, scatter_points
 
 
 class OutputRiskDashboardView(LoginRequiredMixin, ListView):
@@ -121,54 +122,20 @@ class OutputRiskDashboardView(LoginRequiredMixin, ListView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         outputs = Output.objects.all()
+        summary = risk_summary(outputs)
         
         # Overall statistics
-        context['total_outputs'] = outputs.count()
-        context['avg_risk'] = outputs.aggregate(Avg('overall_risk_score'))['overall_risk_score__avg'] or 0
-        context['avg_quality'] = sum(o.get_quality_value() for o in outputs) / outputs.count() if outputs.count() > 0 else 0
+        context['total_outputs'] = summary['total']
+        context['avg_risk'] = summary['avg_risk']
+        context['avg_quality'] = summary['avg_quality']
         
-        # Risk distribution
-        context['risk_distribution'] = {
-            'low': outputs.filter(overall_risk_score__lt=Decimal('0.25')).count(),
-            'medium_low': outputs.filter(
-                overall_risk_score__gte=Decimal('0.25'),
-                overall_risk_score__lt=Decimal('0.50')
-            ).count(),
-            'medium_high': outputs.filter(
-                overall_risk_score__gte=Decimal('0.50'),
-                overall_risk_score__lt=Decimal('0.75')
-            ).count(),
-            'high': outputs.filter(overall_risk_score__gte=Decimal('0.75')).count(),
-        }
-        
-        # Calculate percentages
-        total = context['total_outputs']
-        if total > 0:
-            context['risk_percentages'] = {
-                'low': round((context['risk_distribution']['low'] / total) * 100, 1),
-                'medium_low': round((context['risk_distribution']['medium_low'] / total) * 100, 1),
-                'medium_high': round((context['risk_distribution']['medium_high'] / total) * 100, 1),
-                'high': round((context['risk_distribution']['high'] / total) * 100, 1),
-            }
-        
-        # Quality distribution
-        context['quality_distribution'] = {
-            'four_star': outputs.filter(quality_rating='4*').count(),
-            'three_star': outputs.filter(quality_rating='3*').count(),
-            'two_star': outputs.filter(quality_rating='2*').count(),
-            'one_star': outputs.filter(quality_rating='1*').count(),
-            'unclassified': outputs.filter(quality_rating='unclassified').count(),
-        }
+        # Risk and quality distribution
+        context['risk_distribution'] = summary['risk_distribution']
+        context['risk_percentages'] = summary['risk_percentages']
+        context['quality_distribution'] = summary['quality_distribution']
         
         # Risk by publication status
-        context['risk_by_status'] = list(
-            outputs.values('status')
-            .annotate(
-                avg_risk=Avg('overall_risk_score'),
-                count=Count('id')
-            )
-            .order_by('-avg_risk')
-        )
+        context['risk_by_status'] = risk_by_status(outputs)
         
         # High priority items needing attention
         context['high_risk_outputs'] = outputs.filter(
@@ -176,27 +143,21 @@ class OutputRiskDashboardView(LoginRequiredMixin, ListView):
         ).order_by('-overall_risk_score')[:10]
         
         # OA compliance issues
-        context['oa_compliance_issues'] = outputs.filter(oa_compliance_risk=True).count()
+        context['oa_compliance_issues'] = summary['oa_risk']
         context['oa_compliance_outputs'] = outputs.filter(oa_compliance_risk=True)[:10]
+        context['oa_compliant'] = summary['oa_compliant']
+        context['oa_non_compliant'] = summary['oa_risk']
+        context['oa_compliance_rate'] = summary['oa_compliance_rate']
         
         # REF ready outputs
-        context['ref_ready_count'] = sum(1 for o in outputs if o.is_ref_ready())
-        context['ref_ready_percentage'] = round(
-            (context['ref_ready_count'] / total * 100) if total > 0 else 0, 1
-        )
+        context['ref_ready_count'] = summary['ref_ready']
+        context['ref_ready_percentage'] = summary['ref_ready_percentage']
         
         # Quality vs Risk data for scatter plot
-        context['quality_risk_data'] = json.dumps([
-            {
-                'id': o.id,
-                'title': o.title[:50],
-                'quality': o.get_quality_value(),
-                'risk': float(o.overall_risk_score),
-                'color': o.get_risk_color(),
-                'url': o.get_absolute_url() if hasattr(o, 'get_absolute_url') else '#'
-            }
-            for o in outputs
-        ])
+        points = scatter_points(outputs, 'quality_score_overall', total=summary['total'])
+        for point in points:
+            point['url'] = reverse('output_detail', kwargs={'pk': point['id']})
+        context['quality_risk_data'] = json.dumps(points)
         
         return context
 
@@ -0,0 +1,23 @@
+"""Model factories shared by the tests: the fields a valid Colleague or Output needs."""
+
+from django.contrib.auth.models import User
+
+from core.models import Colleague, Output
+
+
+def make_colleague(username=None, first_name='', last_name='', staff_id='S1', user=None, **fields):
+    """
+    A full-time, permanent UoA 11 colleague, for a new user with
+    ``username`` and names unless an existing ``user`` is given.
+    """
+    if user is None:
+        user = User.objects.create_user(username, first_name=first_name, last_name=last_name)
+    fields = dict({'fte': 1.0, 'contract_type': 'permanent', 'unit_of_assessment': 'UoA 11'}, **fields)
+    return Colleague.objects.create(user=user, staff_id=staff_id, **fields)
+
+
+def make_output(colleague, title='Paper', **fields):
+    """A 2022 UoA 11 journal article by ``colleague``, first author."""
+    fields = dict({'publication_type': 'A', 'publication_year': 2022, 'all_authors': 'A. Smith',
+                   'author_position': 1, 'uoa': 'UoA 11'}, **fields)
+    return Output.objects.create(colleague=colleague, title=title, **fields)
@@ -0,0 +1,52 @@
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+
+from core.colleague_duplicates import find_duplicate_groups
+from core.match_keys import colleague_name_keys
+from core.models import OutputColleague
+from tests.factories import make_colleague, make_output
+
+
+class ColleagueNameKeyTests(TestCase):
+    def test_keys_fold_punctuation_and_accents(self):
+        self.assertEqual(colleague_name_keys('Seán', "O'Brien"),
+                         {'surname_key': 'obrien', 'surname_code': 'O165', 'name_initials': 'S'})
+        self.assertEqual(colleague_name_keys('Eva', 'Müller')['surname_code'],
+                         colleague_name_keys('Eva', 'Muller')['surname_code'])
+
+    def test_keys_follow_user_name(self):
+        colleague = make_colleague('eva', 'Eva', 'Smith-Jones', 'S1')
+        self.assertEqual(colleague.surname_key, 'smithjones')
+        colleague.user.last_name = 'Müller'
+        colleague.user.save()
+        colleague.refresh_from_db()
+        self.assertEqual((colleague.surname_key, colleague.name_initials), ('muller', 'E'))
+
+
+class DuplicateColleagueFinderTests(TestCase):
+    def setUp(self):
+        self.sean = make_colleague('sean', 'Sean', "O'Brien", '1001')
+        self.auto = make_colleague('sean.obrien', 'S.', 'OBrien', 'OBRIEN')
+        self.anna = make_colleague('anna', 'Anna', 'Smith', '1002')
+        self.bob = make_colleague('bob', 'Bob', 'Smith', '1003')
+
+        output = make_output(self.sean, all_authors="S. O'Brien")
+        OutputColleague.objects.create(output=output, colleague=self.sean, is_main=True, author_position=1)
+        OutputColleague.objects.create(output=output, colleague=self.auto, author_position=1)
+
+    def test_groups_variants_and_ranks_by_evidence(self):
+        with self.assertNumQueries(3):
+            groups = find_duplicate_groups()
+        self.assertEqual(len(groups), 1)  # the Smiths' initials contradict
+        group = groups[0]
+        self.assertEqual(group['colleagues'], [self.sean, self.auto])
+        self.assertEqual(group['reasons'],
+                         ['1 shared output(s)', 'Auto-created staff ID', 'Same initials', 'Same surname'])
+        self.assertEqual(group['colleagues'][0].output_count, 1)
+
+    def test_page(self):
+        staff = User.objects.create_user('admin', is_staff=True)
+        self.client.force_login(staff)
+        response = self.client.get(reverse('find_duplicate_colleagues'))
+        self.assertContains(response, 'Auto-created staff ID')
@@ -0,0 +1,73 @@
+import shutil
+import tempfile
+
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+
+from core.colleague_resolver import ColleagueResolver, initials, normalize_surname
+from core.import_jobs import enqueue_import
+from core.models import Colleague, Output
+from core.views import find_or_create_colleague
+from tests.factories import make_colleague
+
+
+class ColleagueResolverTests(TestCase):
+    def setUp(self):
+        self.anna = make_colleague('anna', 'Anna', 'Smith', 'S1')
+        self.john = make_colleague('john', 'John Robert', 'Smith', 'S2')
+        self.mueller = make_colleague('mueller', 'Eva', 'Müller', 'S3')
+
+    def test_name_helpers(self):
+        self.assertEqual(normalize_surname('Müller.'), 'muller')
+        self.assertEqual(initials('Jean-Paul R.'), 'JPR')
+
+    def test_lookups_do_not_query(self):
+        resolver = ColleagueResolver()
+        with self.assertNumQueries(0):
+            self.assertEqual(resolver.find('SMITH, John Robert'), self.john)
+            self.assertEqual(resolver.find('J. Smith'), self.john)
+            self.assertEqual(resolver.find('Smith, Anna'), self.anna)
+            self.assertEqual(resolver.find('Smith, Zoe'), self.anna)  # lowest id, not arbitrary
+            self.assertEqual(resolver.find('Eva Mueller'), None)
+            self.assertEqual(resolver.find('E. Muller'), self.mueller)
+            self.assertEqual(resolver.find('s1'), self.anna)  # staff id
+
+    def test_create_allocates_unique_username_and_registers(self):
+        User.objects.create_user('ada.lovelace')
+        resolver = ColleagueResolver()
+
+        created = resolver.resolve('LOVELACE, Ada', set_as_coauthor=True)
+        self.assertEqual(created.user.username, 'ada.lovelace1')
+        self.assertEqual(created.colleague_category, 'coauthor')
+        with self.assertNumQueries(0):
+            self.assertEqual(resolver.resolve('Lovelace, A.'), created)
+        self.assertIsNone(resolver.resolve('Hopper, Grace', create_if_missing=False))
+
+    def test_find_or_create_colleague_uses_the_given_resolver(self):
+        resolver = ColleagueResolver()
+        # Only the savepoint around the lookup; no colleague or user queries
+        with self.assertNumQueries(2):
+            self.assertEqual(find_or_create_colleague('Smith, Anna', resolver), self.anna)
+
+
+class PureImportTests(TestCase):
+    def test_pure_csv_import_creates_outputs_and_colleagues(self):
+        job_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, job_root, ignore_errors=True)
+        csv = (
+            'Title,Person,Type,Full date,Journal title,DOIs (Digital Object Identifiers)\n'
+            'First paper,"LOVELACE, Ada // BABBAGE, Charles",Article,2024-03-01,Engines,10.1000/x\n'
+            'Second paper,"LOVELACE, Ada",Article,2023-01-01,Engines,\n'
+            'First paper,"LOVELACE, Ada",Article,2024-03-01,Engines,\n'
+        ).encode()
+
+        with override_settings(IMPORT_JOB_ROOT=job_root, IMPORT_JOBS_ASYNC=False):
+            job = enqueue_import('pure', SimpleUploadedFile('pure.csv', csv), None,
+                                 skip_duplicates=True, create_missing_staff=True)
+        job.refresh_from_db()
+
+        self.assertEqual(job.status, 'completed')
+        self.assertEqual((job.created_count, job.skipped_count), (2, 1))
+        self.assertEqual(Colleague.objects.filter(user__last_name='LOVELACE').count(), 1)
+        self.assertEqual(set(Output.objects.values_list('publication_year', flat=True)), {2023, 2024})
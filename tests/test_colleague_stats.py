@@ -0,0 +1,80 @@
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from core.models import ColleagueStats, Output, OutputColleague, Role
+from tests.factories import make_colleague, make_output
+
+
+class ColleagueStatsTests(TestCase):
+    def setUp(self):
+        self.ada = make_colleague('ada', 'Ada', 'Smith', 'S1')
+        self.bob = make_colleague('bob', 'Bob', 'Smith', 'S2', fte=0.5)
+
+    def stats(self, colleague):
+        return ColleagueStats.objects.get(colleague=colleague)
+
+    def test_maintained_by_signals(self):
+        self.assertEqual((self.stats(self.ada).required_outputs, self.stats(self.bob).required_outputs), (2, 1))
+
+        first = make_output(self.ada, status='approved', quality_rating_average='3.75')
+        make_output(self.ada, status='approved', quality_rating_average='3*')
+        make_output(self.ada)
+        stats = self.stats(self.ada)
+        self.assertEqual(
+            (stats.total_outputs, stats.approved_outputs, stats.four_star_outputs,
+             stats.three_star_outputs, stats.completion_percentage),
+            (3, 2, 1, 1, 100),
+        )
+
+        first.colleague = self.bob
+        first.save()
+        self.assertEqual((self.stats(self.ada).total_outputs, self.stats(self.bob).total_outputs), (2, 1))
+        self.assertEqual(self.stats(self.ada).completion_percentage, 50)
+
+        OutputColleague.objects.create(output=first, colleague=self.ada, author_position=2)
+        self.assertEqual(self.stats(self.ada).linked_outputs, 1)
+
+        first.delete()
+        self.assertEqual(self.stats(self.bob).total_outputs, 0)
+        self.assertEqual(self.stats(self.ada).linked_outputs, 0)
+
+        self.ada.fte = 0.4
+        self.ada.save()
+        self.assertEqual(self.stats(self.ada).required_outputs, 1)
+
+        self.ada.delete()  # cascades to its outputs without recreating the stats row
+        self.assertFalse(ColleagueStats.objects.filter(colleague_id=self.ada.pk).exists())
+
+    def test_rebuild_command(self):
+        output = make_output(self.ada)
+        Output.objects.filter(pk=output.pk).update(status='approved')
+        ColleagueStats.objects.filter(colleague=self.bob).delete()
+        out = StringIO()
+        call_command('rebuild_colleague_stats', stdout=out)
+        self.assertIn('2 of 2', out.getvalue())
+        self.assertEqual(self.stats(self.ada).approved_outputs, 1)
+        self.assertEqual(self.ada.submitted_outputs_count, 1)
+
+    def test_colleague_list_runs_constant_queries(self):
+        admin = User.objects.create_superuser('admin', 'admin@example.com', 'pw')
+        admin.ref_profile.roles.add(Role.objects.update_or_create(
+            code=Role.ADMIN, defaults=Role.get_default_permissions()[Role.ADMIN])[0])
+        self.client.force_login(admin)
+        counts = []
+        for staff_id in ['S3', 'S4']:
+            colleague = make_colleague(f'user{staff_id}', staff_id=staff_id, colleague_category='postdoc')
+            make_output(colleague)
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(reverse('colleague_list'))
+            counts.append(len(queries))
+        self.assertEqual(counts[0], counts[1])
+        self.assertEqual(response.context['category_counts']['all'], 4)
+        self.assertEqual(response.context['category_counts']['postdoc'], 2)
+        self.assertEqual(response.context['employment_counts'], {'current': 4, 'former': 0})
+        self.assertEqual({c.staff_id: c.output_count for c in response.context['colleagues']}['S3'], 1)
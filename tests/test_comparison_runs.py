@@ -0,0 +1,104 @@
+import json
+
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase
+from django.urls import reverse
+
+from core.models import ComparisonResult, ComparisonRun, Output
+from tests.factories import make_colleague, make_output
+
+
+class ComparisonRunTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('ada', password='pw', first_name='Ada', last_name='Smith')
+        self.output = make_output(make_colleague(user=self.user), 'Deep learning for protein folding',
+                                  all_authors='A. Smith; B. Jones', doi='10.1000/abc')
+        self.client.force_login(self.user)
+
+    def upload(self):
+        csv = (
+            'Title,Authors,DOI,Publication_Date\n'
+            'Deep learning for protein folding,A. Smith,10.1000/ABC,2022\n'
+            'Deep-learning for protien folding,A. Smith; B. Jones,,2022\n'
+            'Something new,C. Wang,,2024\n'
+        ).encode()
+        return self.client.post(reverse('compare_outputs'),
+                                {'spreadsheet': SimpleUploadedFile('outputs.csv', csv)})
+
+    def test_upload_stores_run_and_review_filters(self):
+        response = self.upload()
+        run = ComparisonRun.objects.get()
+        self.assertRedirects(response, run.get_absolute_url())
+        self.assertEqual(self.client.session['comparison_run_id'], run.pk)
+        self.assertEqual((run.exact_count, run.duplicate_count, run.new_count), (1, 1, 1))
+
+        duplicate = run.results.get(category='duplicate')
+        self.assertEqual((duplicate.row_number, duplicate.best_match), (3, self.output))
+        self.assertNotIn('raw_row', duplicate.spreadsheet_row)
+
+        response = self.client.get(run.get_absolute_url(), {'category': 'duplicate', 'min_confidence': 50})
+        self.assertEqual([r.pk for r in response.context['results']], [duplicate.pk])
+        self.assertEqual(self.client.get(reverse('review_comparison')).status_code, 302)
+
+        other = User.objects.create_user('bob')
+        self.client.force_login(other)
+        self.assertEqual(self.client.get(run.get_absolute_url()).status_code, 404)
+
+    def test_decisions_are_recorded_once(self):
+        self.upload()
+        run = ComparisonRun.objects.get()
+        new = run.results.get(category='new')
+        url = reverse('process_comparison_decisions', args=[run.pk])
+
+        response = self.client.post(url, {'decisions': json.dumps({new.pk: {'action': 'skip'}})})
+        self.assertEqual(response.json()['skipped'], 1)
+        new.refresh_from_db()
+        self.assertEqual(new.decision, 'skip')
+
+        response = self.client.post(url, {'decisions': json.dumps({new.pk: {'action': 'skip'}})})
+        self.assertEqual(response.json()['skipped'], 0)
+        response = self.client.get(run.get_absolute_url(), {'status': 'undecided'})
+        self.assertEqual(response.context['stats']['decided_count'], 1)
+        self.assertEqual(len(response.context['results']), 2)
+        self.assertEqual(ComparisonResult.objects.filter(decision='').count(), 2)
+
+    def test_import_and_merge_in_bulk(self):
+        self.upload()
+        run = ComparisonRun.objects.get()
+        new = run.results.get(category='new')
+        duplicate = run.results.get(category='duplicate')
+        decisions = {
+            new.pk: {'action': 'import', 'edits': {'publication_type': 'Book chapter'}},
+            duplicate.pk: {'action': 'merge', 'edits': {'url': 'https://example.org/paper'}},
+        }
+
+        response = self.client.post(reverse('process_comparison_decisions', args=[run.pk]),
+                                    {'decisions': json.dumps(decisions)})
+        summary = response.json()
+        self.assertEqual((summary['imported'], summary['merged'], summary['errors']), (1, 1, []))
+        self.assertIn('total', summary['timings'])
+
+        created = Output.objects.get(title='Something new')
+        self.assertEqual((created.publication_type, created.publication_year), ('C', 2024))
+        self.assertEqual(created.colleague.user.last_name, 'Wang')
+        self.assertEqual(created.colleagues.get(), created.colleague)
+        self.output.refresh_from_db()
+        self.assertEqual(self.output.url, 'https://example.org/paper')
+        self.assertIn('Merged from spreadsheet import', self.output.internal_notes)
+        self.assertFalse(run.results.filter(category__in=['new', 'duplicate'], decision='').exists())
+
+    def test_rejected_rows_do_not_create_colleagues(self):
+        self.upload()
+        run = ComparisonRun.objects.get()
+        new = run.results.get(category='new')
+        decisions = {new.pk: {'action': 'import', 'edits': {'publication_date': '', 'publication_year': ''}}}
+
+        response = self.client.post(reverse('process_comparison_decisions', args=[run.pk]),
+                                    {'decisions': json.dumps(decisions)})
+        summary = response.json()
+        self.assertEqual(summary['imported'], 0)
+        self.assertEqual(summary['errors'], [f'Row {new.row_number}: No publication year.'])
+        self.assertFalse(User.objects.filter(last_name='Wang').exists())
+        new.refresh_from_db()
+        self.assertEqual(new.decision, '')
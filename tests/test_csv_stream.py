@@ -0,0 +1,43 @@
+import io
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import SimpleTestCase
+
+from core.csv_stream import iter_blocks, iter_csv_rows, read_csv_header
+
+
+class CSVStreamTests(SimpleTestCase):
+    def test_utf8_with_bom_and_multiline_fields(self):
+        data = '﻿title,doi\r\n"Line one\nline two",10.1/x\r\nCafé,10.1/y\r\n'.encode('utf-8')
+        upload = SimpleUploadedFile('outputs.csv', data)
+
+        rows = list(iter_csv_rows(upload, chunk_size=5))
+        self.assertEqual(rows, [
+            {'title': 'Line one\nline two', 'doi': '10.1/x'},
+            {'title': 'Café', 'doi': '10.1/y'},
+        ])
+
+    def test_falls_back_to_latin1(self):
+        data = ('title\n' + 'plain\n' * 50 + 'Caf\xe9 \xfcber\n').encode('latin-1')
+        rows = list(iter_csv_rows(io.BytesIO(data), chunk_size=16))
+        self.assertEqual(len(rows), 51)
+        self.assertEqual(rows[-1]['title'], 'Café über')
+
+    def test_encoding_is_decided_once_per_file(self):
+        data = 'title\nCafé\n'.encode('utf-8') + 'Caf\xe9\n'.encode('latin-1')
+        for chunk_size in [4, 9, 64]:
+            rows = [row['title'] for row in iter_csv_rows(io.BytesIO(data), chunk_size=chunk_size)]
+            # Not valid UTF-8 as a whole, so every row is read as Latin-1
+            self.assertEqual(rows, ['CafÃ©', 'Café'], chunk_size)
+
+    def test_bom_is_dropped_when_falling_back_to_latin1(self):
+        data = b'\xef\xbb\xbftitle,doi\nCaf\xe9,10.1/x\n'
+        for chunk_size in [1, 2, 64]:
+            rows = list(iter_csv_rows(io.BytesIO(data), chunk_size=chunk_size))
+            self.assertEqual(rows, [{'title': 'Café', 'doi': '10.1/x'}], chunk_size)
+
+    def test_header_and_blocks(self):
+        upload = SimpleUploadedFile('outputs.csv', b'Title,Person\nA,B\n')
+        self.assertEqual(read_csv_header(upload), ['Title', 'Person'])
+        self.assertEqual(list(iter_csv_rows(upload)), [{'Title': 'A', 'Person': 'B'}])
+        self.assertEqual(list(iter_blocks(range(5), 2)), [[0, 1], [2, 3], [4]])
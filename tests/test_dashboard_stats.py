@@ -0,0 +1,47 @@
+from unittest import mock
+
+from django.core.cache import cache, caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.test import TestCase
+from django.urls import reverse
+
+from core.dashboard_stats import CACHE_KEY, get_dashboard_stats, invalidate_dashboard_stats
+from tests.factories import make_colleague, make_output
+
+
+class DashboardStatsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.colleague = make_colleague('ada', 'Ada', 'Smith')
+        self.user = self.colleague.user
+        for rating in ['3.75', '3.49', '4*', 'U', '0.25', '']:
+            make_output(self.colleague, status='approved', quality_rating_average=rating)
+        make_output(self.colleague, status='internal-review')
+        self.client.force_login(self.user)
+
+    def test_snapshot_is_cached_and_invalidated(self):
+        response = self.client.get(reverse('dashboard'))
+        context = response.context
+        self.assertEqual((context['total_outputs'], context['approved_outputs'], context['outputs_in_review']),
+                         (7, 6, 1))
+        self.assertEqual(context['quality_distribution'],
+                         {'four_star': 2, 'three_star': 1, 'two_star': 0, 'one_star': 0, 'unclassified': 2})
+        self.assertEqual(context['quality_percentages']['four_star'], 40.0)
+
+        with self.assertNumQueries(3):  # session, user and the cached snapshot
+            self.client.get(reverse('dashboard'))
+
+        make_output(self.colleague, status='approved', quality_rating_average='2.0')
+        response = self.client.get(reverse('dashboard'))
+        self.assertEqual(response.context['quality_distribution']['two_star'], 1)
+
+    def test_invalidation_reaches_other_processes(self):
+        # A fresh connection to the configured cache, as another worker process would have
+        other = caches.create_connection('default')
+        self.assertNotIsInstance(other, LocMemCache)
+        get_dashboard_stats()
+        self.assertIsNotNone(other.get(CACHE_KEY))
+        with mock.patch('core.dashboard_stats.cache', other):
+            invalidate_dashboard_stats()
+        self.assertIsNone(cache.get(CACHE_KEY))
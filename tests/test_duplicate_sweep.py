@@ -0,0 +1,37 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from core.models import DuplicateCandidate, DuplicateSweep
+from tests.factories import make_colleague, make_output
+
+
+class DuplicateSweepTests(TestCase):
+    def setUp(self):
+        self.colleague = make_colleague('ada', 'Ada', 'Smith')
+        self.first = make_output(self.colleague, 'Deep learning for protein folding')
+        self.second = make_output(self.colleague, 'Deep-learning for protein folding.')
+        self.other = make_output(self.colleague, 'A survey of graph databases', all_authors='C. Wang')
+
+    def sweep(self, *args):
+        call_command('find_duplicate_outputs', *args, stdout=StringIO())
+        return DuplicateSweep.objects.first()
+
+    def test_full_then_incremental_sweep(self):
+        record = self.sweep()
+        self.assertEqual((record.incremental, record.outputs_compared, record.candidates_found), (False, 3, 1))
+        candidate = DuplicateCandidate.objects.get()
+        self.assertEqual((candidate.output_a, candidate.output_b, candidate.cluster),
+                         (self.first, self.second, self.first.pk))
+        self.assertIn('100% author overlap', candidate.reasons)
+
+        DuplicateCandidate.objects.update(status='distinct')
+        third = make_output(self.colleague, 'Deep learning for protein folding', doi='10.1000/x')
+        record = self.sweep('--incremental')
+        self.assertEqual((record.incremental, record.outputs_compared, record.candidates_found), (True, 1, 2))
+
+        self.assertEqual(DuplicateCandidate.objects.get(output_b=self.second).status, 'distinct')
+        clusters = dict(DuplicateCandidate.objects.filter(output_b=third).values_list('output_a', 'cluster'))
+        # Both new pairs share the third output, so they form one cluster
+        self.assertEqual(clusters, {self.first.pk: self.first.pk, self.second.pk: self.first.pk})
@@ -0,0 +1,77 @@
+import os
+import tempfile
+
+import openpyxl
+from django.contrib.auth.models import User
+from django.test import TestCase
+
+from core.excel_import import ExcelImporter
+from core.models import Colleague, CriticalFriend, Output
+
+COLLEAGUE_HEADERS = ['Staff ID', 'First Name', 'Last Name', 'Email', 'Title', 'FTE',
+                     'Contract Type', 'Unit of Assessment', 'Is Returnable']
+
+
+def write_workbook(headers, rows):
+    handle, path = tempfile.mkstemp(suffix='.xlsx')
+    os.close(handle)
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    sheet.append(headers)
+    for row in rows:
+        sheet.append(row)
+    workbook.save(path)
+    return path
+
+
+class ExcelImporterTests(TestCase):
+    def workbook(self, headers, rows):
+        path = write_workbook(headers, rows)
+        self.addCleanup(os.remove, path)
+        return path
+
+    def staff_rows(self, count, fte=1.0):
+        return [[f'S{i}', 'Ada', f'Person{i}', f'p{i}@york.ac.uk', 'Dr', fte, 'Permanent', 'UoA 11', 'yes']
+                for i in range(count)]
+
+    def test_reimport_only_writes_changed_rows(self):
+        rows = self.staff_rows(30)
+        importer = ExcelImporter(batch_size=10)
+        self.assertTrue(importer.import_colleagues(self.workbook(COLLEAGUE_HEADERS, rows)))
+        self.assertEqual((importer.created_count, importer.errors), (30, []))
+        self.assertTrue(User.objects.get(username='p0').ref_profile)
+
+        rows[5][5] = 0.5
+        path = self.workbook(COLLEAGUE_HEADERS, rows)
+        importer = ExcelImporter(batch_size=10)
+        # Per batch: users, colleagues, user owners; plus one UPDATE and the transaction,
+        # five to refresh the statistics of the updated colleague and three to drop the
+        # dashboard snapshot from the shared cache
+        with self.assertNumQueries(3 * 3 + 1 + 2 + 5 + 3):
+            importer.import_colleagues(path)
+        self.assertEqual((importer.created_count, importer.updated_count, importer.unchanged_count), (0, 1, 29))
+        self.assertEqual(float(Colleague.objects.get(staff_id='S5').fte), 0.5)
+
+    def test_user_linked_to_other_staff_id_is_reported(self):
+        rows = self.staff_rows(1) + [['S9', 'Ada', 'Person0', 'p0@york.ac.uk', 'Dr', 1, '', 'UoA 11', 'yes']]
+        importer = ExcelImporter()
+        importer.import_colleagues(self.workbook(COLLEAGUE_HEADERS, rows))
+        self.assertEqual(Colleague.objects.count(), 1)
+        self.assertIn("already linked to staff ID 'S0'", importer.errors[0])
+
+    def test_outputs_and_critical_friends(self):
+        ExcelImporter().import_colleagues(self.workbook(COLLEAGUE_HEADERS, self.staff_rows(1)))
+        importer = ExcelImporter()
+        importer.import_outputs(self.workbook(
+            ['Staff ID', 'Title', 'Publication Date', 'Quality Rating'],
+            [['S0', 'Paper', '2024-02-01', '3'], ['S404', 'Lost', '2024-02-01', '']],
+        ))
+        self.assertEqual(Output.objects.get().quality_rating, '3*')
+        self.assertEqual(importer.errors, ["Row 3: Staff ID 'S404' not found"])
+
+        headers = ['Name', 'Email', 'Institution', 'Expertise Area']
+        ExcelImporter().import_critical_friends(self.workbook(headers, [['Bo', 'bo@x.org', 'X', 'AI']]))
+        importer = ExcelImporter()
+        importer.import_critical_friends(self.workbook(headers, [['Bo', 'bo@x.org', 'Y', 'AI']]))
+        self.assertEqual(importer.updated_count, 1)
+        self.assertEqual(CriticalFriend.objects.get().institution, 'Y')
@@ -0,0 +1,104 @@
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from core.import_jobs import JobProgress, claim_next_job, fail_stale_jobs, run_job
+from core.models import ImportJob, Output
+from tests.factories import make_colleague
+
+CSV = (
+    b'title,publication_year,staff_id,doi\n'
+    b'Paper A,2024,S1,10.1000/a\n'
+    b'Paper A again,2024,S1,10.1000/A\n'
+    b'No year,,S1,\n'
+)
+
+
+class ImportJobTests(TestCase):
+    def setUp(self):
+        self.job_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.job_root, ignore_errors=True)
+        settings_override = override_settings(IMPORT_JOB_ROOT=self.job_root, IMPORT_JOBS_ASYNC=True)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.user = User.objects.create_user('ada', password='pw', is_staff=True)
+        make_colleague(user=self.user)
+        self.client.login(username='ada', password='pw')
+
+    def _upload(self):
+        return self.client.post(reverse('enhanced_bulk_import'), {
+            'csv_file': SimpleUploadedFile('outputs.csv', CSV),
+            'import_mode': 'manual',
+            'skip_duplicates': 'on',
+            'auto_link_colleagues': 'on',
+        })
+
+    def test_upload_is_queued_and_run_by_worker(self):
+        response = self._upload()
+        job = ImportJob.objects.get()
+        self.assertRedirects(response, reverse('import_job_detail', args=[job.pk]))
+        self.assertEqual(job.status, 'queued')
+        self.assertEqual(Output.objects.count(), 0)
+
+        claimed = claim_next_job('test-worker')
+        self.assertEqual(claimed.pk, job.pk)
+        self.assertIsNone(claim_next_job('other-worker'))
+
+        run_job(claimed)
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'completed')
+        self.assertEqual((job.rows_total, job.rows_processed), (3, 3))
+        self.assertEqual((job.created_count, job.skipped_count, job.error_count), (1, 1, 1))
+        self.assertEqual(job.result_messages[0]['level'], 'success')
+        self.assertEqual(Output.objects.count(), 1)
+
+        progress = self.client.get(reverse('import_job_progress', args=[job.pk])).json()
+        self.assertTrue(progress['finished'])
+        self.assertEqual(progress['percent'], 100)
+        self.assertContains(self.client.get(reverse('import_job_detail', args=[job.pk])), 'Import complete')
+
+    def test_rows_total_is_estimated_from_the_share_of_the_file_read(self):
+        self._upload()
+        job = ImportJob.objects.get()
+        with job.file.open('rb') as csv_file:
+            progress = JobProgress(job, interval=0, file=csv_file)
+            csv_file.seek(len(CSV) // 4)
+            progress.update(rows_processed=1)
+        job.refresh_from_db()
+        self.assertEqual((job.rows_total, job.rows_processed), (4, 1))
+
+    @override_settings(IMPORT_JOBS_ASYNC=False)
+    def test_inline_mode_runs_in_request(self):
+        self._upload()
+        self.assertEqual(ImportJob.objects.get().status, 'completed')
+
+    def test_failed_job_deletes_upload(self):
+        self._upload()
+        job = claim_next_job('test-worker')
+        path = job.file.path
+        with mock.patch('core.import_jobs.import_string', return_value=mock.Mock(side_effect=ValueError('bad'))), \
+                self.assertLogs('core.import_jobs', 'ERROR'):
+            run_job(job)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.file.name), ('failed', ''))
+        self.assertFalse(os.path.exists(path))
+
+    def test_stale_running_job_is_failed(self):
+        self._upload()
+        job = ImportJob.objects.get()
+        path = job.file.path
+        ImportJob.objects.filter(pk=job.pk).update(status='running', updated_at=timezone.now() - timedelta(hours=1))
+
+        self.assertEqual(fail_stale_jobs(), 1)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.file.name), ('failed', ''))
+        self.assertFalse(os.path.exists(path))
@@ -0,0 +1,54 @@
+from django.test import TestCase
+
+from core.import_writer import DuplicateIndex, ImportWriter
+from core.models import Output, OutputColleague
+from tests.factories import make_colleague, make_output
+
+
+class ImportWriterTests(TestCase):
+    def setUp(self):
+        self.colleague = make_colleague('ada', last_name='Lovelace')
+
+    def _output(self, title, **kwargs):
+        fields = dict(colleague=self.colleague, title=title, publication_type='A',
+                      publication_year=2024, all_authors='Lovelace, A.',
+                      author_position=1, uoa='UoA 11')
+        fields.update(kwargs)
+        return Output(**fields)
+
+    def test_writes_in_chunks_with_links(self):
+        with ImportWriter(chunk_size=2) as writer:
+            for row_num in range(2, 7):
+                writer.add(row_num, self._output(f'Paper {row_num}'))
+
+        self.assertEqual(writer.created, 5)
+        self.assertEqual(writer.chunks_written, 3)
+        self.assertEqual(writer.errors, [])
+        self.assertEqual(Output.objects.count(), 5)
+        self.assertEqual(Output.objects.filter(title_normalized='paper 2').count(), 1)
+        self.assertEqual(OutputColleague.objects.filter(is_main=True, colleague=self.colleague).count(), 5)
+
+    def test_bad_rows_are_reported_without_losing_the_chunk(self):
+        with ImportWriter(chunk_size=10) as writer:
+            writer.add(2, self._output('Good'))
+            writer.add(3, self._output('Bad year', publication_year='soon'))
+            writer.add(4, self._output('x' * 600))
+            writer.add(5, self._output('No colleague', colleague=None))
+            writer.add(6, self._output('Also good', publication_year='2023'))
+
+        self.assertEqual(writer.created, 2)
+        self.assertEqual([e.split(':')[0] for e in writer.errors], ['Row 3', 'Row 4', 'Row 5'])
+        self.assertEqual(Output.objects.get(title='Also good').publication_year, 2023)
+
+
+class DuplicateIndexTests(TestCase):
+    def test_matches_existing_and_queued_rows(self):
+        make_output(make_colleague('ada'), 'On the Analytical Engine.', doi='10.1000/ABC')
+
+        index = DuplicateIndex()
+        self.assertEqual(index.match(doi='https://doi.org/10.1000/abc'), 'doi')
+        self.assertEqual(index.match(title='on the analytical  engine'), 'title')
+        self.assertIsNone(index.match(doi='10.1000/new', title='Notes'))
+
+        index.add('10.1000/new', 'Notes')
+        self.assertEqual(index.match(title='NOTES'), 'title')
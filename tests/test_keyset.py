@@ -0,0 +1,85 @@
+from datetime import date, timedelta
+
+from django.contrib.auth.models import User
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+
+from core.keyset import paginate, paginate_request
+from core.models import Request, Role, Task
+from tests.factories import make_colleague, make_output
+
+
+class KeysetPaginationTests(TestCase):
+    def walk(self, queryset, per_page):
+        """Every row of every page, following the cursors."""
+        rows, cursor = [], None
+        while True:
+            page = paginate(queryset, cursor, per_page=per_page)
+            rows.extend(page)
+            if not page.has_next:
+                return rows
+            cursor = page.next_cursor
+
+    def test_pages_follow_the_ordering_with_nulls_last(self):
+        for i, (priority, days) in enumerate([('high', None), ('high', 3), ('low', 1), ('high', 3),
+                                              ('medium', None), ('low', None), ('high', 1)]):
+            Task.objects.create(title=f'Task {i}', priority=priority,
+                                due_date=date(2025, 1, 1) + timedelta(days=days) if days else None)
+        # Meta.ordering with undated tasks last within each priority
+        expected = sorted(
+            Task.objects.order_by('due_date', '-created_at', 'pk'),
+            key=lambda task: task.due_date is None,
+        )
+        expected.sort(key=lambda task: task.priority, reverse=True)
+        for per_page in [1, 2, 3, 10]:
+            self.assertEqual(self.walk(Task.objects.all(), per_page), expected, per_page)
+
+    def test_cursor_skips_rows_added_before_it(self):
+        for i in range(4):
+            Request.objects.create(from_entity='REF', subject=f'Request {i}', description='-')
+        first = paginate(Request.objects.all(), per_page=2)
+        Request.objects.create(from_entity='REF', subject='Newest', description='-')
+        second = paginate(Request.objects.all(), first.next_cursor, per_page=2)
+        self.assertEqual([r.subject for r in first] + [r.subject for r in second],
+                         ['Request 3', 'Request 2', 'Request 1', 'Request 0'])
+        self.assertFalse(second.has_next)
+
+    def test_request_links_keep_filters(self):
+        for i in range(3):
+            Request.objects.create(from_entity='REF', subject=f'Request {i}', description='-')
+        request = RequestFactory().get('/requests/', {'status': 'pending', 'after': 'not-a-cursor'})
+        page = paginate_request(request, Request.objects.all(), per_page=2)
+        self.assertEqual(len(page), 2)  # an invalid cursor restarts the list
+        self.assertEqual(page.first_url, '?status=pending')
+        self.assertTrue(page.next_url.startswith('?status=pending&after='))
+
+
+@override_settings(LIST_PAGE_SIZE=2)
+class KeysetListViewTests(TestCase):
+    def setUp(self):
+        admin = User.objects.create_superuser('admin', 'admin@example.com', 'pw', last_name='Admin')
+        admin.ref_profile.roles.add(Role.objects.update_or_create(
+            code=Role.ADMIN, defaults=Role.get_default_permissions()[Role.ADMIN])[0])
+        self.client.force_login(admin)
+        colleague = make_colleague(user=admin)
+        for year in [2021, 2022, 2023]:
+            make_output(colleague, f'Paper {year}', publication_year=year)
+
+    def test_output_list_pages_and_fragments(self):
+        response = self.client.get(reverse('output_list'))
+        page = response.context['page']
+        self.assertEqual([o.publication_year for o in page], [2023, 2022])
+        self.assertContains(response, 'Load more')
+
+        response = self.client.get(reverse('output_list') + page.next_url + '&format=json')
+        data = response.json()
+        self.assertIn('Paper 2021', data['html'])
+        self.assertNotIn('Paper 2022', data['html'])
+        self.assertFalse(data['has_next'])
+        self.assertIsNone(data['next_url'])
+
+    def test_list_views_render(self):
+        for name in ['colleague_list', 'task_list', 'request_list']:
+            response = self.client.get(reverse(name))
+            self.assertEqual(response.status_code, 200, name)
+            self.assertIn('html', self.client.get(reverse(name), {'format': 'json'}).json())
@@ -0,0 +1,165 @@
+import json
+import threading
+from datetime import datetime, timedelta, timezone as dt_timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+from django.test import SimpleTestCase, TestCase
+
+from core.models import DOIMetadataCache
+from core.openalex import MetadataLookup, OpenAlexEnricher, normalize_doi, parse_work
+
+
+KNOWN_WORKS = {
+    '10.1000/a': {'doi': 'https://doi.org/10.1000/A', 'title': 'Paper A'},
+    '10.1000/b': {'doi': 'https://doi.org/10.1000/b', 'title': 'Paper B'},
+    '10.1000/c': {'doi': 'https://doi.org/10.1000/c', 'title': 'Paper C'},
+}
+
+
+class StandInOpenAlex(BaseHTTPRequestHandler):
+    """Minimal stand-in for the OpenAlex /works endpoint."""
+
+    requests_seen = []
+    fail_next = 0
+
+    def do_GET(self):
+        parsed = urlparse(self.path)
+        StandInOpenAlex.requests_seen.append(self.path)
+
+        if StandInOpenAlex.fail_next:
+            StandInOpenAlex.fail_next -= 1
+            self._send(503, {'error': 'busy'})
+            return
+
+        if parsed.path == '/works':
+            doi_filter = parse_qs(parsed.query)['filter'][0]
+            dois = doi_filter[len('doi:'):].split('|')
+            results = [KNOWN_WORKS[d] for d in dois if d in KNOWN_WORKS]
+            self._send(200, {'results': results})
+        elif parsed.path.startswith('/works/doi:') and parsed.path[len('/works/doi:'):] in KNOWN_WORKS:
+            self._send(200, KNOWN_WORKS[parsed.path[len('/works/doi:'):]])
+        else:
+            self._send(404, {'error': 'not found'})
+
+    def _send(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class StandInServerMixin:
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), StandInOpenAlex)
+        cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+        cls.base_url = f"http://127.0.0.1:{cls.server.server_address[1]}"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def setUp(self):
+        StandInOpenAlex.requests_seen = []
+        StandInOpenAlex.fail_next = 0
+
+    def _enricher(self, **kwargs):
+        options = dict(base_url=self.base_url, batch_size=2, max_workers=2,
+                       backoff=0.01, rate_limit=0, mailto='')
+        options.update(kwargs)
+        return OpenAlexEnricher(**options)
+
+
+class OpenAlexEnricherTests(StandInServerMixin, SimpleTestCase):
+    def test_normalize_doi(self):
+        self.assertEqual(normalize_doi(' https://doi.org/10.1000/ABC '), '10.1000/abc')
+        self.assertEqual(normalize_doi('doi:10.1000/x'), '10.1000/x')
+        self.assertEqual(normalize_doi(''), '')
+
+    def test_batches_and_deduplicates(self):
+        """DOIs are grouped into filter batches; misses map to None."""
+        enricher = self._enricher()
+        works = enricher.fetch_many(
+            ['10.1000/A', 'https://doi.org/10.1000/b', '10.1000/c', '10.1000/missing', '10.1000/a']
+        )
+
+        self.assertEqual(works['10.1000/a']['title'], 'Paper A')
+        self.assertEqual(works['10.1000/b']['title'], 'Paper B')
+        self.assertEqual(works['10.1000/c']['title'], 'Paper C')
+        self.assertIsNone(works['10.1000/missing'])
+        self.assertEqual(len(StandInOpenAlex.requests_seen), 2)
+        self.assertEqual(enricher.stats.dois_requested, 4)
+        self.assertEqual(enricher.stats.dois_found, 3)
+        self.assertGreater(enricher.stats.mean_latency, 0)
+
+    def test_retries_transient_errors(self):
+        StandInOpenAlex.fail_next = 2
+        enricher = self._enricher(max_workers=1, max_retries=3)
+        works = enricher.fetch_many(['10.1000/a'])
+
+        self.assertEqual(works['10.1000/a']['title'], 'Paper A')
+        self.assertEqual(enricher.stats.retries, 2)
+
+    def test_gives_up_after_max_retries(self):
+        StandInOpenAlex.fail_next = 10
+        enricher = self._enricher(max_workers=1, max_retries=1)
+        works = enricher.fetch_many(['10.1000/a'])
+
+        self.assertNotIn('10.1000/a', works)
+        self.assertEqual(enricher.stats.failed_dois, {'10.1000/a'})
+
+
+class MetadataLookupTests(StandInServerMixin, TestCase):
+    def test_second_lookup_is_served_from_cache(self):
+        first = MetadataLookup(self._enricher())
+        works = first.get_many(['10.1000/a', '10.1000/missing'])
+        self.assertEqual(works['10.1000/a']['title'], 'Paper A')
+        self.assertEqual((first.hits, first.misses), (0, 2))
+        requests_after_first = len(StandInOpenAlex.requests_seen)
+
+        second = MetadataLookup(self._enricher())
+        works = second.get_many(['https://doi.org/10.1000/A', '10.1000/missing'])
+        self.assertEqual(works['10.1000/a']['title'], 'Paper A')
+        self.assertIsNone(works['10.1000/missing'])
+        self.assertEqual((second.hits, second.misses), (2, 0))
+        self.assertEqual(len(StandInOpenAlex.requests_seen), requests_after_first)
+
+        stats = DOIMetadataCache.get_stats()
+        self.assertEqual(stats['entries'], 2)
+        self.assertEqual(stats['not_found'], 1)
+        self.assertEqual(stats['hits'], 2)
+
+    def test_expired_entry_is_refetched(self):
+        DOIMetadataCache.objects.create(
+            doi='10.1000/b', data={'title': 'Stale'}, found=True,
+            fetched_at=datetime.now(dt_timezone.utc) - timedelta(days=365),
+        )
+        lookup = MetadataLookup(self._enricher())
+        self.assertEqual(lookup.get('10.1000/b')['title'], 'Paper B')
+        self.assertEqual(lookup.misses, 1)
+        self.assertEqual(DOIMetadataCache.objects.get(doi='10.1000/b').data['title'], 'Paper B')
+
+    def test_parse_work(self):
+        metadata = parse_work({
+            'doi': 'https://doi.org/10.1000/A',
+            'title': 'Paper A',
+            'type': 'journal-article',
+            'biblio': {'first_page': '1', 'last_page': '9'},
+            'authorships': [{'author': {'display_name': 'Ada Lovelace'}}],
+            'open_access': {'is_oa': True, 'oa_status': 'gold'},
+        })
+        self.assertEqual(metadata['publication_type'], 'A')
+        self.assertEqual(metadata['pages'], '1-9')
+        self.assertEqual(metadata['all_authors'], 'Ada Lovelace')
+        self.assertEqual(metadata['oa_status'], 'gold')
+        self.assertEqual(metadata['doi_url'], 'https://doi.org/10.1000/a')
@@ -0,0 +1,86 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase
+
+from core.match_keys import title_fingerprint
+from core.models import Output
+from core.output_comparison import OutputComparator
+from tests.factories import make_colleague, make_output
+
+
+def output(pk, title, authors, year, doi=''):
+    return Output(pk=pk, title=title, all_authors=authors, publication_year=year, doi=doi)
+
+
+class OutputComparatorTests(SimpleTestCase):
+    def setUp(self):
+        self.outputs = [
+            output(1, 'Deep learning for protein folding', 'A. Smith; B. Jones', 2022, doi='10.1000/ABC'),
+            output(2, 'A survey of graph databases', 'C. Wang', 2021),
+            output(3, 'Unrelated topic entirely', 'D. Brown; E. Green', 2020),
+        ]
+
+    def compare(self, **row):
+        row.setdefault('title', '')
+        row.setdefault('all_authors', '')
+        return OutputComparator(self.outputs).compare_spreadsheet([row])
+
+    def test_doi_match_ignores_prefix_and_case(self):
+        results = self.compare(doi='https://doi.org/10.1000/abc')
+        self.assertEqual(results['exact'][0]['database_match'].pk, 1)
+
+    def test_similar_title_matches_with_reasons(self):
+        results = self.compare(title='Deep-learning for protien folding', publication_date='2022-05-01')
+        match = results['duplicates'][0]['best_match']
+        self.assertEqual(match['output'].pk, 1)
+        self.assertEqual(match['match_reasons'][0][:5], 'Title')
+        self.assertIn('Similar publication date', match['match_reasons'])
+
+    def test_author_overlap_and_year(self):
+        results = self.compare(title='Something else', all_authors='E. Green; D. Brown', publication_date='2020')
+        match = results['duplicates'][0]['best_match']
+        self.assertEqual((match['output'].pk, match['confidence']), (3, 0.5))
+        self.assertEqual(match['match_reasons'], ['100% author overlap', 'Similar publication date'])
+
+    def test_ngram_backend(self):
+        results = OutputComparator(self.outputs, title_backend='ngram').compare_spreadsheet([
+            {'title': 'Protein folding: deep learning for', 'all_authors': ''},
+        ])
+        self.assertEqual(results['duplicates'][0]['best_match']['output'].pk, 1)
+        with self.assertRaises(ValueError):
+            OutputComparator(self.outputs, title_backend='nope')
+
+    def test_unrelated_row_is_new(self):
+        results = self.compare(title='Graph survey', all_authors='Z. Nobody', publication_date='2021-01-01')
+        self.assertEqual(len(results['new']), 1)
+
+
+class OutputMatchKeyTests(TestCase):
+    def setUp(self):
+        self.colleague = make_colleague('ada', 'Ada', 'Smith')
+
+    def test_keys_are_maintained_on_save(self):
+        output = make_output(self.colleague, 'Cats and Dogs!', doi='https://doi.org/10.1000/XYZ',
+                             all_authors='A. Smith; B. Jones')
+        self.assertEqual((output.doi_normalized, output.title_normalized, output.author_surnames),
+                         ('10.1000/xyz', 'cats and dogs', 'jones smith'))
+        self.assertEqual(output.title_fingerprint, title_fingerprint('dogs cats'))
+
+        output.title = 'Birds'
+        output.save(update_fields=['title'])
+        self.assertEqual(Output.objects.get().title_normalized, 'birds')
+
+    def test_backfill_and_comparator_use_stored_keys(self):
+        make_output(self.colleague, 'Deep learning for protein folding', doi='10.1000/abc')
+        make_output(self.colleague, 'Unrelated topic entirely')
+        Output.objects.update(doi_normalized='', title_normalized='')
+        call_command('backfill_match_keys', stdout=StringIO())
+
+        with self.assertNumQueries(2):  # keys, then the matched outputs
+            results = OutputComparator(Output.objects.select_related('colleague__user')).compare_spreadsheet([
+                {'doi': '10.1000/ABC', 'title': ''},
+                {'title': 'Deep learning for protein folding', 'all_authors': ''},
+            ])
+            self.assertEqual(results['exact'][0]['database_match'].doi, '10.1000/abc')
+            self.assertEqual(results['duplicates'][0]['best_match']['output'].colleague.user.first_name, 'Ada')
@@ -0,0 +1,70 @@
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from core.output_lookup import find_similar_outputs
+from tests.factories import make_colleague, make_output
+
+
+class OutputLookupTests(TestCase):
+    def setUp(self):
+        for alias in ['default', 'local']:
+            caches[alias].clear()
+            self.addCleanup(caches[alias].clear)
+        colleague = make_colleague('ada', 'Ada', 'Smith')
+        self.output = make_output(colleague, 'Deep learning for protein folding', doi='10.1000/ABC')
+        make_output(colleague, 'A survey of graph databases', publication_year=2021)
+        self.client.force_login(colleague.user)
+
+    def test_doi_and_title_matches(self):
+        matches = find_similar_outputs(doi='https://doi.org/10.1000/abc')
+        self.assertEqual([(m['output'], m['reason']) for m in matches], [(self.output, 'Same DOI')])
+
+        matches = find_similar_outputs(title='Protein folding: deep learning for')
+        self.assertEqual([(m['output'], m['reason']) for m in matches], [(self.output, 'Same title')])
+
+        self.assertEqual(find_similar_outputs(title='Deep learning for', exclude_pk=self.output.pk), [])
+
+    def test_keystrokes_reuse_cached_candidates(self):
+        with self.assertNumQueries(3):
+            matches = find_similar_outputs(title='Deep learning for protein fol')
+        self.assertEqual(matches[0]['output'], self.output)
+        self.assertTrue(matches[0]['reason'].startswith('Title'))
+
+        # Same longest words: only the exact-title lookup and the matched outputs
+        with self.assertNumQueries(2):
+            find_similar_outputs(title='Deep learning for protein fold')
+
+    def test_endpoint(self):
+        response = self.client.get(reverse('check_output_duplicates'), {'title': 'deep learning for protein folding'})
+        match = response.json()['matches'][0]
+        self.assertEqual((match['id'], match['similarity'], match['colleague']), (self.output.pk, 100, 'Ada Smith'))
+        self.assertEqual(self.client.get(reverse('check_output_duplicates')).json(), {'matches': []})
+
+    @override_settings(OUTPUT_LOOKUP_MIN_INTERVAL_MS=0)
+    def test_endpoint_hides_outputs_the_user_cannot_view(self):
+        self.client.force_login(User.objects.create_user('bob'))
+        with self.assertNumQueries(2):  # session and user only: too short to look up
+            self.assertEqual(self.client.get(reverse('check_output_duplicates'), {'title': 'deep'}).json(),
+                             {'matches': []})
+        for params in [{'title': 'deep learning for protein folding'}, {'doi': '10.1000/abc'}]:
+            self.assertEqual(self.client.get(reverse('check_output_duplicates'), params).json(), {'matches': []})
+
+    @override_settings(OUTPUT_LOOKUP_MIN_INTERVAL_MS=0)
+    def test_hidden_matches_do_not_crowd_out_visible_ones(self):
+        bob = make_colleague('bob', staff_id='S2')
+        for _ in range(5):
+            make_output(self.output.colleague, 'Deep learning for protein folding', doi='10.1000/abc')
+        own = make_output(bob, 'Deep learning for protein folding', doi='10.1000/abc')
+        self.client.force_login(bob.user)
+        for params in [{'title': 'deep learning for protein folding'}, {'doi': '10.1000/abc'}]:
+            matches = self.client.get(reverse('check_output_duplicates'), params).json()['matches']
+            self.assertEqual([match['id'] for match in matches], [own.pk])
+
+    def test_endpoint_throttles_rapid_lookups(self):
+        params = {'title': 'deep learning for protein folding'}
+        self.assertEqual(self.client.get(reverse('check_output_duplicates'), params).status_code, 200)
+        response = self.client.get(reverse('check_output_duplicates'), params)
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response.json(), {'matches': [], 'throttled': True})
@@ -0,0 +1,98 @@
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from core.models import Output, Role, Task
+from core.output_search import (
+    SEARCH_TABLE, add_search_snippets, install_search_index, search_outputs, search_tasks,
+)
+from tests.factories import make_colleague, make_output
+
+
+class OutputSearchTests(TestCase):
+    def setUp(self):
+        self.colleague = make_colleague('ada')
+
+    def titles(self, query):
+        return [o.title for o in search_outputs(Output.objects.all(), query).order_by('-search_rank', 'pk')]
+
+    def test_prefix_match_on_every_word(self):
+        make_output(self.colleague, 'Machine learning for proteins')
+        make_output(self.colleague, 'Machine tools')
+        make_output(self.colleague, 'Deep nets', keywords='machine-learning')
+        self.assertEqual(set(self.titles('mach learn')), {'Machine learning for proteins', 'Deep nets'})
+        self.assertEqual(self.titles('  "*" '), [])
+
+    def test_title_match_ranks_above_abstract_match(self):
+        make_output(self.colleague, 'Unrelated', abstract='A study of graphene sheets and more words here')
+        make_output(self.colleague, 'Graphene sheets')
+        self.assertEqual(self.titles('graphene'), ['Graphene sheets', 'Unrelated'])
+
+    def test_bulk_writes_are_indexed(self):
+        output = make_output(self.colleague, 'Old title')
+        Output.objects.filter(pk=output.pk).update(title='Quantum sensing')
+        self.assertEqual(self.titles('quantum'), ['Quantum sensing'])
+        self.assertEqual(self.titles('old'), [])
+        Output.objects.filter(pk=output.pk).delete()
+        self.assertEqual(self.titles('quantum'), [])
+
+    def test_snippets_are_escaped_and_highlighted(self):
+        make_output(self.colleague, '<b>Coral</b> reefs')
+        outputs = add_search_snippets(search_outputs(Output.objects.all(), 'coral'), 'coral')
+        self.assertIn('<mark>Coral</mark>', outputs[0].search_snippet)
+        self.assertIn('&lt;b&gt;', outputs[0].search_snippet)
+
+    def test_install_repairs_dropped_triggers(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DROP TRIGGER {SEARCH_TABLE}_insert')
+        make_output(self.colleague, 'Lost paper')
+        self.assertEqual(self.titles('lost'), [])
+        self.assertTrue(install_search_index(connection, create=False))
+        self.assertEqual(self.titles('lost'), ['Lost paper'])
+        self.assertFalse(install_search_index(connection, create=False))
+
+
+class TaskSearchTests(TestCase):
+    def setUp(self):
+        Task.objects.create(title='Chase ORCID records', notes='Ask the library')
+        Task.objects.create(title='Book room', description='For the library review meeting')
+        Task.objects.create(title='Order coffee')
+
+    def titles(self, query):
+        return {t.title for t in search_tasks(Task.objects.all(), query)}
+
+    def test_search_tasks(self):
+        self.assertEqual(self.titles('librar'), {'Chase ORCID records', 'Book room'})
+        self.assertEqual(self.titles('library review'), {'Book room'})
+        Task.objects.filter(title='Order coffee').update(notes='library')
+        self.assertEqual(len(self.titles('librar')), 3)
+
+    def test_task_list_uses_the_index(self):
+        self.client.force_login(User.objects.create_user('ada'))
+        response = self.client.get(reverse('task_list'), {'q': 'orcid'})
+        self.assertEqual([t.title for t in response.context['tasks']], ['Chase ORCID records'])
+
+
+@override_settings(LIST_PAGE_SIZE=1)
+class OutputListSearchTests(TestCase):
+    def setUp(self):
+        admin = User.objects.create_superuser('admin', 'admin@example.com', 'pw', last_name='Admin')
+        admin.ref_profile.roles.add(Role.objects.update_or_create(
+            code=Role.ADMIN, defaults=Role.get_default_permissions()[Role.ADMIN])[0])
+        self.client.force_login(admin)
+        colleague = make_colleague(user=admin)
+        for title, abstract in [('Ocean acidification', ''), ('Fisheries', 'Effects of ocean warming'),
+                                ('Forests', '')]:
+            make_output(colleague, title, abstract=abstract)
+
+    def test_ranked_pages_with_snippets(self):
+        response = self.client.get(reverse('output_list'), {'search': 'ocean'})
+        page = response.context['page']
+        self.assertEqual([o.title for o in page], ['Ocean acidification'])
+        self.assertContains(response, '<mark>Ocean</mark>')
+
+        data = self.client.get(reverse('output_list') + page.next_url + '&format=json').json()
+        self.assertIn('Fisheries', data['html'])
+        self.assertIn('<mark>ocean</mark> warming', data['html'])
+        self.assertFalse(data['has_next'])
@@ -0,0 +1,77 @@
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+
+from core.models import Colleague, InternalRating, Output, OutputColleague, PanelAssignment, Role
+from core.output_permissions import CAN_RATE, CAN_VIEW, HAS_RATED, IS_ASSIGNED, attach_permissions
+from core.templatetags.ref_permissions import can_delete, can_edit, can_rate, can_view, has_rated
+from tests.factories import make_colleague, make_output
+
+
+class OutputVisibilityTests(TestCase):
+    def setUp(self):
+        for code, perms in Role.get_default_permissions().items():
+            Role.objects.update_or_create(code=code, defaults=perms)
+        self.ada = self.colleague('ada', 'S1', Role.COLLEAGUE)
+        self.bob = self.colleague('bob', 'S2', Role.COLLEAGUE)
+        self.own = make_output(self.ada)
+        self.coauthored = make_output(self.bob)
+        OutputColleague.objects.create(output=self.coauthored, colleague=self.ada, author_position=2)
+        self.other = make_output(self.bob)
+
+        self.panel = User.objects.create_user('pam').ref_profile
+        self.panel.add_role(Role.INTERNAL_PANEL)
+        PanelAssignment.objects.create(output=self.other, panel_member=self.panel)
+        self.observer = User.objects.create_user('olly').ref_profile
+        self.observer.add_role(Role.OBSERVER)
+
+    def colleague(self, username, staff_id, role):
+        colleague = make_colleague(username, staff_id=staff_id)
+        colleague.user.ref_profile.add_role(role)
+        return colleague
+
+    def pks(self, queryset):
+        return set(queryset.values_list('pk', flat=True))
+
+    def test_querysets(self):
+        profile = self.ada.user.ref_profile
+        self.assertEqual(self.pks(Output.objects.visible_to(profile)), {self.own.pk, self.coauthored.pk})
+        self.assertEqual(self.pks(Output.objects.editable_by(profile)), {self.own.pk})
+        self.assertEqual(self.pks(Output.objects.rateable_by(profile)), set())
+        self.assertEqual(self.pks(Output.objects.visible_to(self.panel)), {self.other.pk})
+        self.assertEqual(self.pks(Output.objects.rateable_by(self.panel)), {self.other.pk})
+        self.assertEqual(Output.objects.visible_to(self.observer).count(), 3)
+        self.assertEqual(Output.objects.visible_to(None).count(), 0)
+        self.assertEqual(self.pks(Colleague.objects.visible_to(profile)), {self.ada.pk})
+
+    def test_annotations_answer_template_filters(self):
+        outputs = list(Output.objects.with_permissions(self.panel).order_by('pk'))
+        with self.assertNumQueries(0):
+            self.assertEqual([can_view(o, self.panel) for o in outputs], [False, False, True])
+            self.assertEqual([can_rate(o, self.panel) for o in outputs], [False, False, True])
+            self.assertEqual([can_edit(o, self.panel) for o in outputs], [False, False, False])
+        # Without annotations the filters query the row
+        self.assertTrue(can_view(self.other, self.panel))
+        self.assertFalse(can_view(self.own, self.panel))
+
+    def test_attached_bitmap_answers_template_filters(self):
+        InternalRating.objects.create(output=self.other, rater=self.panel, rating=3)
+        outputs = list(Output.objects.order_by('pk'))
+        self.panel.is_panel_member, self.observer.is_observer  # load the role snapshots
+        with self.assertNumQueries(1):
+            attach_permissions(outputs, self.panel)
+        self.assertEqual(outputs[2].permission_bits, CAN_VIEW | CAN_RATE | IS_ASSIGNED | HAS_RATED)
+        with self.assertNumQueries(0):
+            self.assertEqual([has_rated(o, self.panel) for o in outputs], [False, False, True])
+            self.assertEqual([can_delete(o, self.panel) for o in outputs], [False, False, False])
+            self.assertEqual([can_view(o, self.observer) for o in outputs], [True, True, True])
+
+    def test_output_list(self):
+        self.client.force_login(self.ada.user)
+        response = self.client.get(reverse('output_list'))
+        outputs = response.context['outputs']
+        self.assertEqual({o.pk for o in outputs}, {self.own.pk, self.coauthored.pk})
+        self.assertEqual({o.pk: can_edit(o, self.ada.user.ref_profile) for o in outputs},
+                         {self.own.pk: True, self.coauthored.pk: False})
+        self.assertContains(response, reverse('output_update', args=[self.own.pk]))
+        self.assertNotContains(response, reverse('output_update', args=[self.coauthored.pk]))
@@ -0,0 +1,42 @@
+from django.contrib.auth.models import User
+from django.test import TestCase
+
+from core.models import Role
+
+
+class PermissionSnapshotTests(TestCase):
+    def setUp(self):
+        self.admin_role = Role.objects.get_or_create(
+            code=Role.ADMIN, defaults={'name': 'Admin', 'can_manage_users': True, 'can_export_data': True}
+        )[0]
+        self.observer_role = Role.objects.get_or_create(
+            code=Role.OBSERVER, defaults={'name': 'Observer', 'can_view_all_outputs': True}
+        )[0]
+        self.profile = User.objects.create_user('ada').ref_profile
+        self.profile.roles.add(self.observer_role)
+        self.profile = type(self.profile).objects.get(pk=self.profile.pk)
+
+    def test_checks_share_one_query(self):
+        with self.assertNumQueries(1):
+            self.assertTrue(self.profile.is_observer)
+            self.assertFalse(self.profile.is_admin)
+            self.assertTrue(self.profile.can_view_all_outputs)
+            self.assertFalse(self.profile.can_manage_users)
+            self.assertTrue(self.profile.has_any_role(Role.ADMIN, Role.OBSERVER))
+            self.assertFalse(self.profile.has_all_roles(Role.ADMIN, Role.OBSERVER))
+            self.assertEqual(self.profile.get_role_display(), 'Observer')
+
+    def test_role_changes_invalidate(self):
+        self.assertFalse(self.profile.can_manage_users)
+        self.profile.add_role(Role.ADMIN)
+        self.assertTrue(self.profile.is_admin)
+        self.assertTrue(self.profile.can_export_data)
+
+        self.profile.remove_role(Role.ADMIN)
+        self.assertFalse(self.profile.is_admin)
+        self.assertTrue(Role.objects.filter(code=Role.ADMIN).exists())
+
+        self.profile.set_roles(Role.ADMIN)
+        self.assertEqual(self.profile.role_codes, {Role.ADMIN})
+        self.profile.roles.clear()
+        self.assertEqual(self.profile.role_codes, set())
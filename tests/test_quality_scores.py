@@ -0,0 +1,59 @@
+from decimal import Decimal
+
+from django.test import SimpleTestCase, TestCase
+
+from core.models import Output, REFSubmission
+from core.quality_scores import backfill_quality_scores, rating_score, score_band_lookups
+from tests.factories import make_colleague, make_output
+
+
+class RatingScoreTests(SimpleTestCase):
+    def test_reads_both_formats(self):
+        self.assertEqual(rating_score('4*'), Decimal('4.00'))
+        self.assertEqual(rating_score('U'), Decimal('0.00'))
+        self.assertEqual(rating_score(' 3.25 '), Decimal('3.25'))
+        self.assertEqual(rating_score('3.333'), Decimal('3.33'))
+        for rating in ['', None, 'n/a', '5', '-1', 'NaN']:
+            self.assertIsNone(rating_score(rating))
+
+    def test_score_band_lookups(self):
+        self.assertEqual(score_band_lookups('score', '3*'),
+                         {'score__isnull': False, 'score__gte': Decimal('2.50'), 'score__lt': Decimal('3.50')})
+        self.assertEqual(score_band_lookups('score', 'U'),
+                         {'score__isnull': False, 'score__lt': Decimal('0.50')})
+
+
+class OutputQualityScoreTests(TestCase):
+    def setUp(self):
+        self.colleague = make_colleague('ada', 'Ada', 'Smith')
+
+    def test_scores_follow_ratings_on_save(self):
+        output = make_output(self.colleague, quality_rating_internal='3*', quality_rating_average='3.5')
+        output.refresh_from_db()
+        self.assertEqual(output.quality_score_internal, Decimal('3.00'))
+        self.assertEqual(output.quality_score_average, Decimal('3.50'))
+        self.assertIsNone(output.quality_score_external)
+
+        output.quality_rating_average = 'U'
+        output.save(update_fields=['quality_rating_average'])
+        output.refresh_from_db()
+        self.assertEqual(output.quality_score_average, Decimal('0.00'))
+
+    def test_backfill(self):
+        output = make_output(self.colleague, quality_rating='2*', quality_rating_self='4*')
+        Output.objects.filter(pk=output.pk).update(quality_score_overall=None, quality_score_self=None)
+        self.assertEqual(backfill_quality_scores(Output.objects.all()), 1)
+        output.refresh_from_db()
+        self.assertEqual((output.quality_score_overall, output.quality_score_self),
+                         (Decimal('2.00'), Decimal('4.00')))
+
+    def test_submission_quality_score(self):
+        submission = REFSubmission.objects.create(name='REF', uoa='UoA 11', submission_year=2029)
+        submission.outputs.add(
+            make_output(self.colleague, quality_rating_average='3.5'),
+            make_output(self.colleague, quality_rating_average='4*'),
+            make_output(self.colleague, quality_rating='2*'),  # falls back to the overall rating
+            make_output(self.colleague),
+        )
+        submission.calculate_quality_score()
+        self.assertEqual(submission.portfolio_quality_score, Decimal('3.17'))
@@ -0,0 +1,75 @@
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from core.models import Output
+from core.risk_analytics import ref_ready_filter, risk_summary, scatter_points
+from tests.factories import make_colleague, make_output
+
+
+class RiskAnalyticsTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_superuser('ada', 'ada@example.com', 'pw', first_name='Ada')
+        self.colleague = make_colleague(user=self.user)
+
+    def test_summary(self):
+        for risk, rating in [('0.10', '4*'), ('0.30', '3*'), ('0.60', '3*'), ('0.80', 'U'), ('0.00', '')]:
+            make_output(self.colleague, overall_risk_score=Decimal(risk), quality_rating=rating,
+                        oa_compliance_risk=risk == '0.80')
+        summary = risk_summary()
+        self.assertEqual(summary['total'], 5)
+        self.assertEqual(summary['with_risk'], 4)
+        self.assertEqual(summary['risk_distribution'],
+                         {'low': 2, 'medium_low': 1, 'medium_high': 1, 'high': 1})
+        self.assertEqual(summary['risk_percentages']['low'], 40.0)
+        self.assertEqual(summary['quality_distribution'],
+                         {'four_star': 1, 'three_star': 2, 'two_star': 0, 'one_star': 0, 'unclassified': 1})
+        self.assertAlmostEqual(summary['avg_quality'], 2.0)
+        self.assertAlmostEqual(summary['avg_risk'], 0.36)
+        self.assertEqual((summary['oa_risk'], summary['oa_compliance_rate']), (1, 80.0))
+
+    def test_ref_ready_filter_matches_is_ref_ready(self):
+        accepted = date(2024, 1, 1)
+        cases = [
+            {},
+            {'quality_rating': '3*'},
+            {'status': 'draft', 'quality_rating': '3*'},
+            {'title': '', 'quality_rating': '3*'},
+            {'quality_rating_average': '3.5', 'acceptance_date': accepted},
+            {'quality_rating': '3*', 'acceptance_date': accepted, 'oa_exception': 'technical'},
+            {'quality_rating': '3*', 'acceptance_date': accepted, 'deposit_date': accepted + timedelta(days=92)},
+            {'quality_rating': '3*', 'acceptance_date': accepted, 'deposit_date': accepted + timedelta(days=93)},
+        ]
+        outputs = [make_output(self.colleague, **{'status': 'approved', **case}) for case in cases]
+        ready = set(Output.objects.filter(ref_ready_filter()).values_list('pk', flat=True))
+        self.assertEqual(ready, {output.pk for output in outputs if output.is_ref_ready()})
+        self.assertEqual(len(ready), 3)
+
+    def test_scatter_points_are_downsampled(self):
+        for i in range(10):
+            make_output(self.colleague, overall_risk_score=Decimal('0.80'), quality_rating='2*')
+        points = scatter_points(Output.objects.all(), 'quality_score_overall', max_points=4)
+        self.assertEqual(len(points), 4)  # every 3rd of 10
+        self.assertEqual(points[0], {
+            'id': Output.objects.order_by('pk').first().pk, 'title': 'Paper', 'quality': 2.0,
+            'risk': 0.8, 'risk_level': 'high', 'color': '#dc3545',
+        })
+        self.assertEqual(len(scatter_points(Output.objects.all(), 'quality_score_overall', max_points=0)), 10)
+
+    def test_dashboards_run_constant_queries(self):
+        self.client.force_login(self.user)
+        for url in [reverse('risk_dashboard'), reverse('reports:risk-dashboard')]:
+            counts = []
+            for _ in range(2):
+                for i in range(5):
+                    make_output(self.colleague, overall_risk_score=Decimal('0.90'), quality_rating_average='3*',
+                                oa_compliance_risk=True)
+                with CaptureQueriesContext(connection) as queries:
+                    self.assertEqual(self.client.get(url).status_code, 200)
+                counts.append(len(queries))
+            self.assertEqual(counts[0], counts[1], url)